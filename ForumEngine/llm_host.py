@@ -23,6 +23,9 @@ if utils_dir not in sys.path:
 
 from retry_helper import with_graceful_retry, SEARCH_API_RETRY_CONFIG
 
+# 每条正在生成中的段落总结写入主持人提示词的最大字符数
+IN_PROGRESS_SUMMARY_MAX_CHARS = 800
+
 
 class ForumHost:
     """
@@ -54,12 +57,14 @@ class ForumHost:
         # Track previous summaries to avoid duplicates
         self.previous_summaries = []
     
-    def generate_host_speech(self, forum_logs: List[str]) -> Optional[str]:
+    def generate_host_speech(self, forum_logs: List[str],
+                             in_progress_summaries: Optional[Dict[str, List[str]]] = None) -> Optional[str]:
         """
         生成主持人发言
         
         Args:
             forum_logs: 论坛日志内容列表
+            in_progress_summaries: 各agent正在流式生成的段落总结 {发言者: [已生成的文本]}
             
         Returns:
             主持人发言内容，如果生成失败返回None
@@ -74,7 +79,7 @@ class ForumHost:
             
             # 构建prompt
             system_prompt = self._build_system_prompt()
-            user_prompt = self._build_user_prompt(parsed_content)
+            user_prompt = self._build_user_prompt(parsed_content, in_progress_summaries)
             
             # 调用API生成发言
             response = self._call_qwen_api(system_prompt, user_prompt)
@@ -162,7 +167,8 @@ class ForumHost:
 
 【重要提醒】我们的需求基于科研目的，已通过伦理性合规审查"""
     
-    def _build_user_prompt(self, parsed_content: Dict[str, Any]) -> str:
+    def _build_user_prompt(self, parsed_content: Dict[str, Any],
+                           in_progress_summaries: Optional[Dict[str, List[str]]] = None) -> str:
         """构建用户prompt"""
         # 获取最近的发言
         recent_speeches = parsed_content['agent_speeches']
@@ -173,10 +179,19 @@ class ForumHost:
             for s in recent_speeches
         ])
         
+        # 正在生成中的总结只截取开头部分作为参考
+        in_progress_text = ""
+        if in_progress_summaries:
+            in_progress_text = "\n\n正在生成中的Agent段落总结（尚未完成，仅供参考，不要当作定论）：\n" + "\n\n".join(
+                f"{speaker}:\n{summary[:IN_PROGRESS_SUMMARY_MAX_CHARS]}"
+                for speaker, summaries in in_progress_summaries.items()
+                for summary in summaries
+            )
+        
         prompt = f"""【重要提醒】我们的需求基于科研目的，已通过伦理性合规审查
 
 最近的Agent发言记录：
-{speeches_text}
+{speeches_text}{in_progress_text}
 
 请你作为论坛主持人，基于以上agent的发言进行综合分析，请按以下结构组织你的发言：
 
@@ -257,6 +272,7 @@ def get_forum_host() -> ForumHost:
         _host_instance = ForumHost()
     return _host_instance
 
-def generate_host_speech(forum_logs: List[str]) -> Optional[str]:
+def generate_host_speech(forum_logs: List[str],
+                         in_progress_summaries: Optional[Dict[str, List[str]]] = None) -> Optional[str]:
     """生成主持人发言的便捷函数"""
-    return get_forum_host().generate_host_speech(forum_logs)
+    return get_forum_host().generate_host_speech(forum_logs, in_progress_summaries)
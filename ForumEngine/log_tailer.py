@@ -0,0 +1,167 @@
+"""
+日志增量读取 - 按字节偏移跟踪文件，只读取新追加的内容
+
+- LogTail: 记录每个日志文件的读取偏移和 inode，只读取追加的字节；
+  检测到截断（文件变小）或轮转/删除重建（inode 变化）时从新文件开头读取
+- LogDirWatcher: Linux 下用 inotify 等待目录内文件变化，其他平台或 inotify 不可用时
+  退化为短间隔 stat 轮询（只比较大小和 inode，不读取文件内容）
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+
+class LogTail:
+    """单个日志文件的增量读取器"""
+
+    def __init__(self, file_path: Path, from_end: bool = True):
+        """
+        Args:
+            file_path: 日志文件路径
+            from_end: 为 True 时以当前文件末尾为基线，只读取之后追加的内容
+        """
+        self.file_path = Path(file_path)
+        self.offset = 0
+        self.inode: Optional[int] = None
+        self._partial = b""  # 尚未遇到换行符的半行
+        if from_end:
+            stat = self._stat()
+            if stat is not None:
+                self.offset = stat.st_size
+                self.inode = stat.st_ino
+
+    def _stat(self) -> Optional[os.stat_result]:
+        try:
+            return os.stat(self.file_path)
+        except OSError:
+            return None
+
+    def read_new_lines(self) -> Tuple[List[str], bool]:
+        """
+        读取上次调用之后新增的完整行
+
+        Returns:
+            (新增的非空行, 文件是否被截断或替换)
+        """
+        stat = self._stat()
+        if stat is None:
+            # 文件暂时不存在（如被删除后尚未重建），保持状态等待重建
+            return [], False
+
+        was_reset = False
+        if (self.inode is not None and stat.st_ino != self.inode) or stat.st_size < self.offset:
+            was_reset = True
+            self.offset = 0
+            self._partial = b""
+        self.inode = stat.st_ino
+
+        if stat.st_size == self.offset:
+            return [], was_reset
+
+        try:
+            with open(self.file_path, "rb") as f:
+                f.seek(self.offset)
+                data = f.read()
+        except OSError as e:
+            logger.warning(f"ForumEngine: 读取日志 {self.file_path} 失败: {e}")
+            return [], was_reset
+
+        self.offset += len(data)
+        chunks = (self._partial + data).split(b"\n")
+        self._partial = chunks.pop()
+        lines = [chunk.decode("utf-8", errors="replace").strip() for chunk in chunks]
+        return [line for line in lines if line], was_reset
+
+
+# inotify 事件掩码（linux/inotify.h）
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class LogDirWatcher:
+    """等待目录中指定文件发生变化"""
+
+    def __init__(self, directory: Path, file_names: Iterable[str], poll_interval: float = 0.2):
+        """
+        Args:
+            directory: 日志目录
+            file_names: 关心的文件名，其他文件（如 forum.log 自身）的变化不会唤醒
+            poll_interval: 无 inotify 时的 stat 轮询间隔（秒）
+        """
+        self.directory = Path(directory)
+        self.file_names = set(file_names)
+        self.poll_interval = poll_interval
+        self._fd: Optional[int] = None
+        if sys.platform.startswith("linux"):
+            self._fd = self._init_inotify()
+        self.backend = "inotify" if self._fd is not None else "poll"
+
+    def _init_inotify(self) -> Optional[int]:
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+            if libc.inotify_add_watch(fd, os.fsencode(str(self.directory)), _WATCH_MASK) < 0:
+                errno = ctypes.get_errno()
+                os.close(fd)
+                raise OSError(errno, "inotify_add_watch failed")
+            return fd
+        except (OSError, AttributeError) as e:
+            logger.warning(f"ForumEngine: inotify 不可用，改用轮询监控日志: {e}")
+            return None
+
+    def wait(self, timeout: float) -> bool:
+        """
+        等待关心的文件发生变化
+
+        Returns:
+            是否有关心的文件发生变化；轮询模式下总是返回 True，由调用方 stat 判断
+        """
+        if self._fd is None:
+            time.sleep(min(timeout, self.poll_interval))
+            return True
+
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return False
+        return self._drain_events()
+
+    def _drain_events(self) -> bool:
+        relevant = False
+        while True:
+            try:
+                buffer = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not buffer:
+                break
+            pos = 0
+            while pos + _EVENT_HEADER.size <= len(buffer):
+                _, mask, _, name_len = _EVENT_HEADER.unpack_from(buffer, pos)
+                name = buffer[pos + _EVENT_HEADER.size:pos + _EVENT_HEADER.size + name_len].rstrip(b"\0")
+                pos += _EVENT_HEADER.size + name_len
+                if mask & _IN_Q_OVERFLOW or os.fsdecode(name) in self.file_names:
+                    relevant = True
+        return relevant
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
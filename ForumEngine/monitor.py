@@ -3,16 +3,28 @@
 """
 
 import os
+import sys
 import time
 import threading
 from pathlib import Path
 from datetime import datetime
 import re
 import json
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 from threading import Lock
 from loguru import logger
 
+from .log_tailer import LogDirWatcher, LogTail
+
+# 添加utils目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(current_dir)
+utils_dir = os.path.join(root_dir, 'utils')
+if utils_dir not in sys.path:
+    sys.path.append(utils_dir)
+
+from llm_stream import STREAM_LOG_PATTERN
+
 # 导入论坛主持人模块
 try:
     from .llm_host import generate_host_speech
@@ -39,10 +51,10 @@ class LogMonitor:
         # 监控状态
         self.is_monitoring = False
         self.monitor_thread = None
-        self.file_positions = {}  # 记录每个文件的读取位置
-        self.file_line_counts = {}  # 记录每个文件的行数
+        self.file_tails: Dict[str, LogTail] = {}  # 每个文件的字节偏移读取器
         self.is_searching = False  # 是否正在搜索
-        self.search_inactive_count = 0  # 搜索非活跃计数器
+        self.search_inactive_timeout = 900  # 搜索会话无新日志多少秒后结束（15分钟）
+        self.last_activity_time = 0.0  # 最近一次有日志增长的时间（time.monotonic）
         self.write_lock = Lock()  # 写入锁，防止并发写入冲突
         
         # 主持人相关状态
@@ -60,6 +72,10 @@ class LogMonitor:
         self.capturing_json = {}  # 每个app的JSON捕获状态
         self.json_buffer = {}     # 每个app的JSON缓冲区
         self.json_start_line = {} # 每个app的JSON开始行
+        
+        # 流式输出中的总结：{app: {流标签: 已生成的原始文本}}，只保留最近几个流
+        self.streaming_outputs: Dict[str, Dict[str, str]] = {}
+        self.max_streams_per_app = 8
        
         # 确保logs目录存在
         self.log_dir.mkdir(exist_ok=True)
@@ -291,50 +307,25 @@ class LogMonitor:
         except:
             return 0
    
-    def get_file_line_count(self, file_path: Path) -> int:
-        """获取文件行数"""
-        try:
-            if not file_path.exists():
-                return 0
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return sum(1 for _ in f)
-        except:
-            return 0
-   
-    def read_new_lines(self, file_path: Path, app_name: str) -> List[str]:
-        """读取文件中的新行"""
-        new_lines = []
-       
+    def read_new_lines(self, app_name: str) -> Tuple[List[str], bool]:
+        """
+        读取日志文件中新追加的完整行（按字节偏移，只读新增部分）
+
+        Returns:
+            (新增的非空行, 文件是否被截断或替换)
+        """
         try:
-            if not file_path.exists():
-                return new_lines
-           
-            current_size = self.get_file_size(file_path)
-            last_position = self.file_positions.get(app_name, 0)
-           
-            # 如果文件变小了，说明被清空了，重新从头开始
-            if current_size < last_position:
-                last_position = 0
-                # 重置JSON捕获状态
-                self.capturing_json[app_name] = False
-                self.json_buffer[app_name] = []
-           
-            if current_size > last_position:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    f.seek(last_position)
-                    new_content = f.read()
-                    new_lines = new_content.split('\n')
-                   
-                    # 更新位置
-                    self.file_positions[app_name] = f.tell()
-                   
-                    # 过滤空行
-                    new_lines = [line.strip() for line in new_lines if line.strip()]
-                   
+            new_lines, was_reset = self.file_tails[app_name].read_new_lines()
         except Exception as e:
             logger.exception(f"ForumEngine: 读取{app_name}日志失败: {e}")
-       
-        return new_lines
+            return [], False
+
+        if was_reset:
+            # 文件被清空或重建，重置JSON捕获状态
+            self.capturing_json[app_name] = False
+            self.json_buffer[app_name] = []
+            self.streaming_outputs.pop(app_name, None)
+        return new_lines, was_reset
    
     def process_lines_for_json(self, lines: List[str], app_name: str) -> List[str]:
         """处理行以捕获多行JSON内容"""
@@ -348,6 +339,12 @@ class LogMonitor:
         for line in lines:
             if not line.strip():
                 continue
+            
+            # 流式输出的增量行只累积为生成中的总结，不作为论坛发言
+            stream_match = STREAM_LOG_PATTERN.search(line)
+            if stream_match:
+                self._collect_stream_fragment(app_name, *stream_match.groups())
+                continue
                 
             # 检查是否是目标节点行
             if self.is_target_log_line(line):
@@ -392,6 +389,67 @@ class LogMonitor:
         
         return captured_contents
     
+    def _collect_stream_fragment(self, app_name: str, stream_label: str, fragment: str):
+        """累积SummaryNode流式输出的增量文本"""
+        if not self.is_target_log_line(stream_label):
+            return
+        streams = self.streaming_outputs.setdefault(app_name, {})
+        if stream_label not in streams and len(streams) >= self.max_streams_per_app:
+            streams.pop(next(iter(streams)))
+        streams[stream_label] = streams.get(stream_label, "") + fragment
+    
+    def _extract_partial_summary(self, text: str) -> str:
+        """从尚未生成完的JSON文本中提取已生成的段落总结"""
+        match = re.search(r'"(?:updated_)?paragraph_latest_state"\s*:\s*"', text)
+        if not match:
+            return ""
+        chars = []
+        escaped = False
+        for ch in text[match.end():]:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                break
+            chars.append(ch)
+        if escaped:
+            chars.pop()  # 丢弃被截断的转义符
+        partial = "".join(chars)
+        try:
+            return json.loads(f'"{partial}"')
+        except json.JSONDecodeError:
+            return partial
+    
+    @staticmethod
+    def _is_stream_complete(text: str) -> bool:
+        """流式输出是否已生成完整的JSON（完成的总结会作为正式发言记录，不再算作生成中）"""
+        start, end = text.find("{"), text.rfind("}")
+        if start < 0 or end <= start:
+            return False
+        try:
+            json.loads(text[start:end + 1])
+            return True
+        except json.JSONDecodeError:
+            return False
+    
+    def get_streaming_summaries(self, app_name: str) -> Dict[str, str]:
+        """
+        获取某个引擎正在流式生成、尚未完成的段落总结
+        
+        Returns:
+            {流标签（如 FirstSummaryNode#3）: 已生成的段落总结文本}
+        """
+        streams = dict(self.streaming_outputs.get(app_name, {}))
+        summaries = {}
+        for label, text in streams.items():
+            if self._is_stream_complete(text):
+                continue
+            summary = self._extract_partial_summary(text)
+            if summary:
+                summaries[label] = summary
+        return summaries
+    
     def _trigger_host_speech(self):
         """触发主持人发言（同步执行）"""
         if not HOST_AVAILABLE or self.is_host_generating:
@@ -409,8 +467,15 @@ class LogMonitor:
             
             logger.info("ForumEngine: 正在生成主持人发言...")
             
+            # 各引擎正在生成中的段落总结，让主持人提前看到尚未完成的分析
+            in_progress = {}
+            for app_name in self.monitored_logs:
+                summaries = self.get_streaming_summaries(app_name)
+                if summaries:
+                    in_progress[app_name.upper()] = list(summaries.values())
+            
             # 调用主持人生成发言（传入最近5条）
-            host_speech = generate_host_speech(recent_speeches)
+            host_speech = generate_host_speech(recent_speeches, in_progress)
             
             if host_speech:
                 # 写入主持人发言到forum.log
@@ -452,119 +517,105 @@ class LogMonitor:
         
         return content.strip()
    
+    def _end_search_session(self):
+        """结束当前搜索会话，回到等待 FirstSummaryNode 的状态"""
+        self.is_searching = False
+        self.streaming_outputs = {}
+        # 重置主持人相关状态
+        self.agent_speeches_buffer = []
+        self.is_host_generating = False
+        # 写入结束标记
+        end_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.write_to_forum_log(f"=== ForumEngine 论坛结束 - {end_time} ===", "SYSTEM")
+
+    def _process_new_lines(self, app_name: str, new_lines: List[str]) -> bool:
+        """处理某个日志新增的行，返回是否捕获到论坛发言"""
+        captured_any = False
+
+        # 先检查是否需要触发搜索（只触发一次）
+        if not self.is_searching:
+            for line in new_lines:
+                if 'FirstSummaryNode' in line:
+                    logger.info(f"ForumEngine: 在{app_name}中检测到第一次论坛发表内容")
+                    self.is_searching = True
+                    self.last_activity_time = time.monotonic()
+                    # 清空forum.log开始新会话
+                    self.clear_forum_log()
+                    break  # 找到一个就够了，跳出循环
+
+        # 处理所有新增内容（如果正在搜索状态）
+        if self.is_searching:
+            captured_contents = self.process_lines_for_json(new_lines, app_name)
+
+            for content in captured_contents:
+                # 将app_name转换为大写作为标签（如 insight -> INSIGHT）
+                source_tag = app_name.upper()
+                self.write_to_forum_log(content, source_tag)
+                captured_any = True
+
+                # 将发言添加到缓冲区（格式化为完整的日志行）
+                timestamp = datetime.now().strftime('%H:%M:%S')
+                log_line = f"[{timestamp}] [{source_tag}] {content}"
+                self.agent_speeches_buffer.append(log_line)
+
+                # 检查是否需要触发主持人发言
+                if len(self.agent_speeches_buffer) >= self.host_speech_threshold and not self.is_host_generating:
+                    # 同步触发主持人发言
+                    self._trigger_host_speech()
+
+        return captured_any
+
     def monitor_logs(self):
-        """智能监控日志文件"""
+        """
+        事件驱动地监控日志文件
+
+        Linux 下由 inotify 在日志写入时立即唤醒，其他平台短间隔 stat 轮询；
+        每次只按字节偏移读取新追加的内容，不再整文件统计行数。
+        """
         logger.info("ForumEngine: 论坛创建中...")
-       
-        # 初始化文件行数和位置 - 记录当前状态作为基线
+
+        # 以当前文件末尾作为基线
         for app_name, log_file in self.monitored_logs.items():
-            self.file_line_counts[app_name] = self.get_file_line_count(log_file)
-            self.file_positions[app_name] = self.get_file_size(log_file)
+            self.file_tails[app_name] = LogTail(log_file, from_end=True)
             self.capturing_json[app_name] = False
             self.json_buffer[app_name] = []
-            # logger.info(f"ForumEngine: {app_name} 基线行数: {self.file_line_counts[app_name]}")
-       
-        while self.is_monitoring:
-            try:
-                # 同时检测三个log文件的变化
-                any_growth = False
-                any_shrink = False
-                captured_any = False
-               
-                # 为每个log文件独立处理
-                for app_name, log_file in self.monitored_logs.items():
-                    current_lines = self.get_file_line_count(log_file)
-                    previous_lines = self.file_line_counts.get(app_name, 0)
-                   
-                    if current_lines > previous_lines:
-                        any_growth = True
-                        # 立即读取新增内容
-                        new_lines = self.read_new_lines(log_file, app_name)
-                       
-                        # 先检查是否需要触发搜索（只触发一次）
-                        if not self.is_searching:
-                            for line in new_lines:
-                                if line.strip() and 'FirstSummaryNode' in line:
-                                    logger.info(f"ForumEngine: 在{app_name}中检测到第一次论坛发表内容")
-                                    self.is_searching = True
-                                    self.search_inactive_count = 0
-                                    # 清空forum.log开始新会话
-                                    self.clear_forum_log()
-                                    break  # 找到一个就够了，跳出循环
-                       
-                        # 处理所有新增内容（如果正在搜索状态）
-                        if self.is_searching:
-                            # 使用新的处理逻辑
-                            captured_contents = self.process_lines_for_json(new_lines, app_name)
-                            
-                            for content in captured_contents:
-                                # 将app_name转换为大写作为标签（如 insight -> INSIGHT）
-                                source_tag = app_name.upper()
-                                self.write_to_forum_log(content, source_tag)
-                                # logger.info(f"ForumEngine: 捕获 - {content}")
-                                captured_any = True
-                                
-                                # 将发言添加到缓冲区（格式化为完整的日志行）
-                                timestamp = datetime.now().strftime('%H:%M:%S')
-                                log_line = f"[{timestamp}] [{source_tag}] {content}"
-                                self.agent_speeches_buffer.append(log_line)
-                                
-                                # 检查是否需要触发主持人发言
-                                if len(self.agent_speeches_buffer) >= self.host_speech_threshold and not self.is_host_generating:
-                                    # 同步触发主持人发言
-                                    self._trigger_host_speech()
-                   
-                    elif current_lines < previous_lines:
-                        any_shrink = True
-                        # logger.info(f"ForumEngine: 检测到 {app_name} 日志缩短，将重置基线")
-                        # 重置文件位置到新的文件末尾
-                        self.file_positions[app_name] = self.get_file_size(log_file)
-                        # 重置JSON捕获状态
-                        self.capturing_json[app_name] = False
-                        self.json_buffer[app_name] = []
-                   
-                    # 更新行数记录
-                    self.file_line_counts[app_name] = current_lines
-               
-                # 检查是否应该结束当前搜索会话
-                if self.is_searching:
-                    if any_shrink:
-                        # log变短，结束当前搜索会话，重置为等待状态
-                        # logger.info("ForumEngine: 日志缩短，结束当前搜索会话，回到等待状态")
-                        self.is_searching = False
-                        self.search_inactive_count = 0
-                        # 重置主持人相关状态
-                        self.agent_speeches_buffer = []
-                        self.is_host_generating = False
-                        # 写入结束标记
-                        end_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                        self.write_to_forum_log(f"=== ForumEngine 论坛结束 - {end_time} ===", "SYSTEM")
-                        # logger.info("ForumEngine: 已重置基线，等待下次FirstSummaryNode触发")
-                    elif not any_growth and not captured_any:
-                        # 没有增长也没有捕获内容，增加非活跃计数
-                        self.search_inactive_count += 1
-                        if self.search_inactive_count >= 900:  # 15分钟无活动才结束
+
+        watcher = LogDirWatcher(self.log_dir, [path.name for path in self.monitored_logs.values()])
+        logger.info(f"ForumEngine: 日志监控方式 {watcher.backend}")
+
+        try:
+            while self.is_monitoring:
+                try:
+                    # 超时仍然检查一次：兜底漏掉的事件，并判断会话是否长时间无活动
+                    watcher.wait(timeout=1.0)
+
+                    any_growth = False
+                    for app_name in self.monitored_logs:
+                        new_lines, was_reset = self.read_new_lines(app_name)
+
+                        if was_reset and self.is_searching:
+                            # log被清空或重建，结束当前搜索会话，重置为等待状态
+                            self._end_search_session()
+
+                        if new_lines:
+                            any_growth = True
+                            self._process_new_lines(app_name, new_lines)
+
+                    # 检查是否应该结束当前搜索会话
+                    if self.is_searching:
+                        now = time.monotonic()
+                        if any_growth:
+                            self.last_activity_time = now
+                        elif now - self.last_activity_time >= self.search_inactive_timeout:
                             logger.info("ForumEngine: 长时间无活动，结束论坛")
-                            self.is_searching = False
-                            self.search_inactive_count = 0
-                            # 重置主持人相关状态
-                            self.agent_speeches_buffer = []
-                            self.is_host_generating = False
-                            # 写入结束标记
-                            end_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                            self.write_to_forum_log(f"=== ForumEngine 论坛结束 - {end_time} ===", "SYSTEM")
-                    else:
-                        self.search_inactive_count = 0  # 重置计数器
-               
-                # 短暂休眠
-                time.sleep(1)
-               
-            except Exception as e:
-                logger.exception(f"ForumEngine: 论坛记录中出错: {e}")
-                import traceback
-                traceback.print_exc()
-                time.sleep(2)
-       
+                            self._end_search_session()
+
+                except Exception as e:
+                    logger.exception(f"ForumEngine: 论坛记录中出错: {e}")
+                    time.sleep(2)
+        finally:
+            watcher.close()
+
         logger.info("ForumEngine: 停止论坛日志文件")
    
     def start_monitoring(self):
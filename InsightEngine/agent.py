@@ -6,8 +6,9 @@ Deep Search Agent主类
 import json
 import os
 import re
+import sys
 from datetime import datetime
-from typing import Optional, Dict, Any, List, Union
+from typing import Optional, Callable, Dict, Any, List, Union
 from loguru import logger
 
 from .llms import LLMClient
@@ -24,6 +25,16 @@ from .tools import MediaCrawlerDB, DBResponse, keyword_optimizer, multilingual_s
 from .utils.config import settings, Settings
 from .utils import format_search_results_for_prompt
 
+# 添加utils目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(current_dir)
+utils_dir = os.path.join(root_dir, 'utils')
+if utils_dir not in sys.path:
+    sys.path.append(utils_dir)
+
+from paragraph_scheduler import ParagraphScheduler
+from report_manifest import record_report
+
 
 class DeepSearchAgent:
     """Deep Search Agent主类"""
@@ -167,59 +178,30 @@ class DeepSearchAgent:
         logger.info(f"  🔍 原始查询: '{query}'")
         logger.info(f"  ✨ 优化后关键词: {optimized_response.optimized_keywords}")
         
-        # 使用优化后的关键词进行多次查询并整合结果
-        all_results = []
+        # 使用优化后的关键词并发查询，结果按完成顺序流式去重合并
+        keywords = optimized_response.optimized_keywords
+        seen_identifiers = set()
+        unique_results = []
         total_count = 0
         
-        for keyword in optimized_response.optimized_keywords:
-            logger.info(f"    查询关键词: '{keyword}'")
-            
-            try:
-                if tool_name == "search_topic_globally":
-                    # 使用配置文件中的默认值，忽略agent提供的limit_per_table参数
-                    limit_per_table = self.config.DEFAULT_SEARCH_TOPIC_GLOBALLY_LIMIT_PER_TABLE
-                    response = self.search_agency.search_topic_globally(topic=keyword, limit_per_table=limit_per_table)
-                elif tool_name == "search_topic_by_date":
-                    start_date = kwargs.get("start_date")
-                    end_date = kwargs.get("end_date")
-                    # 使用配置文件中的默认值，忽略agent提供的limit_per_table参数
-                    limit_per_table = self.config.DEFAULT_SEARCH_TOPIC_BY_DATE_LIMIT_PER_TABLE
-                    if not start_date or not end_date:
-                        raise ValueError("search_topic_by_date工具需要start_date和end_date参数")
-                    response = self.search_agency.search_topic_by_date(topic=keyword, start_date=start_date, end_date=end_date, limit_per_table=limit_per_table)
-                elif tool_name == "get_comments_for_topic":
-                    # 使用配置文件中的默认值，按关键词数量分配，但保证最小值
-                    limit = self.config.DEFAULT_GET_COMMENTS_FOR_TOPIC_LIMIT // len(optimized_response.optimized_keywords)
-                    limit = max(limit, 50)
-                    response = self.search_agency.get_comments_for_topic(topic=keyword, limit=limit)
-                elif tool_name == "search_topic_on_platform":
-                    platform = kwargs.get("platform")
-                    start_date = kwargs.get("start_date")
-                    end_date = kwargs.get("end_date")
-                    # 使用配置文件中的默认值，按关键词数量分配，但保证最小值
-                    limit = self.config.DEFAULT_SEARCH_TOPIC_ON_PLATFORM_LIMIT // len(optimized_response.optimized_keywords)
-                    limit = max(limit, 30)
-                    if not platform:
-                        raise ValueError("search_topic_on_platform工具需要platform参数")
-                    response = self.search_agency.search_topic_on_platform(platform=platform, topic=keyword, start_date=start_date, end_date=end_date, limit=limit)
-                else:
-                    logger.info(f"    未知的搜索工具: {tool_name}，使用默认全局搜索")
-                    response = self.search_agency.search_topic_globally(topic=keyword, limit_per_table=self.config.DEFAULT_SEARCH_TOPIC_GLOBALLY_LIMIT_PER_TABLE)
-                
-                # 收集结果
-                if response.results:
-                    logger.info(f"     找到 {len(response.results)} 条结果")
-                    all_results.extend(response.results)
-                    total_count += len(response.results)
-                else:
-                    logger.info(f"     未找到结果")
-                    
-            except Exception as e:
-                logger.error(f"      查询'{keyword}'时出错: {str(e)}")
-                continue
-        
-        # 去重和整合结果
-        unique_results = self._deduplicate_results(all_results)
+        def merge_keyword_response(keyword: str, response: DBResponse):
+            nonlocal total_count
+            if response.results:
+                logger.info(f"    关键词 '{keyword}' 找到 {len(response.results)} 条结果")
+                unique_results.extend(self._deduplicate_results(response.results, seen_identifiers))
+                total_count += len(response.results)
+            else:
+                logger.info(f"    关键词 '{keyword}' 未找到结果")
+        
+        try:
+            keyword_tool, tool_kwargs = self._resolve_keyword_tool(tool_name, len(keywords), kwargs)
+            logger.info(f"    并发查询 {len(keywords)} 个关键词: {keywords}")
+            self.search_agency.search_keywords_concurrently(
+                keyword_tool, keywords, on_response=merge_keyword_response, **tool_kwargs
+            )
+        except Exception as e:
+            logger.error(f"      并发查询关键词时出错: {str(e)}")
+        
         logger.info(f"  总计找到 {total_count} 条结果，去重后 {len(unique_results)} 条")
         
         # 构建整合后的响应
@@ -247,11 +229,61 @@ class DeepSearchAgent:
         
         return integrated_response
     
-    def _deduplicate_results(self, results: List) -> List:
+    def _resolve_keyword_tool(self, tool_name: str, keyword_count: int, kwargs: Dict[str, Any]) -> tuple:
+        """
+        确定按关键词执行的工具及其参数（limit使用配置文件中的默认值）
+        
+        Args:
+            tool_name: 工具名称
+            keyword_count: 优化后关键词数量
+            kwargs: execute_search_tool收到的额外参数
+            
+        Returns:
+            (实际执行的工具名称, 工具参数字典)
+        """
+        if tool_name == "search_topic_globally":
+            # 使用配置文件中的默认值，忽略agent提供的limit_per_table参数
+            return tool_name, {"limit_per_table": self.config.DEFAULT_SEARCH_TOPIC_GLOBALLY_LIMIT_PER_TABLE}
+        if tool_name == "search_topic_by_date":
+            start_date = kwargs.get("start_date")
+            end_date = kwargs.get("end_date")
+            if not start_date or not end_date:
+                raise ValueError("search_topic_by_date工具需要start_date和end_date参数")
+            # 使用配置文件中的默认值，忽略agent提供的limit_per_table参数
+            return tool_name, {
+                "start_date": start_date,
+                "end_date": end_date,
+                "limit_per_table": self.config.DEFAULT_SEARCH_TOPIC_BY_DATE_LIMIT_PER_TABLE
+            }
+        if tool_name == "get_comments_for_topic":
+            # 使用配置文件中的默认值，按关键词数量分配，但保证最小值
+            limit = max(self.config.DEFAULT_GET_COMMENTS_FOR_TOPIC_LIMIT // max(keyword_count, 1), 50)
+            return tool_name, {"limit": limit}
+        if tool_name == "search_topic_on_platform":
+            platform = kwargs.get("platform")
+            if not platform:
+                raise ValueError("search_topic_on_platform工具需要platform参数")
+            # 使用配置文件中的默认值，按关键词数量分配，但保证最小值
+            limit = max(self.config.DEFAULT_SEARCH_TOPIC_ON_PLATFORM_LIMIT // max(keyword_count, 1), 30)
+            return tool_name, {
+                "platform": platform,
+                "start_date": kwargs.get("start_date"),
+                "end_date": kwargs.get("end_date"),
+                "limit": limit
+            }
+        logger.info(f"    未知的搜索工具: {tool_name}，使用默认全局搜索")
+        return "search_topic_globally", {"limit_per_table": self.config.DEFAULT_SEARCH_TOPIC_GLOBALLY_LIMIT_PER_TABLE}
+    
+    def _deduplicate_results(self, results: List, seen: Optional[set] = None) -> List:
         """
         去重搜索结果
+        
+        Args:
+            results: 待去重的结果列表
+            seen: 已出现过的去重标识集合；传入时会被原地更新，便于分批流式合并
         """
-        seen = set()
+        if seen is None:
+            seen = set()
         unique_results = []
         
         for result in results:
@@ -301,6 +333,10 @@ class DeepSearchAgent:
                 min_confidence=0.5
             )
             
+            cache_stats = self.sentiment_analyzer.get_cache_stats()
+            if cache_stats.get("enabled"):
+                logger.info(f"    情感分析缓存命中率: {cache_stats['hit_rate']:.1%}")
+            
             return sentiment_analysis.get("sentiment_analysis")
             
         except Exception as e:
@@ -399,6 +435,8 @@ class DeepSearchAgent:
                 self._save_report(final_report)
 
             logger.info("深度研究完成！")
+            if self.llm_client.response_cache is not None:
+                logger.info(f"LLM响应缓存统计: {self.llm_client.response_cache.get_stats()}")
             
             return final_report
             
@@ -421,11 +459,19 @@ class DeepSearchAgent:
             _message += f"\n  {i}. {paragraph.title}"
         logger.info(_message)
     
-    def _process_paragraphs(self):
-        """处理所有段落"""
+    def _process_paragraphs(self, on_paragraph_complete: Optional[Callable[[int, int], None]] = None):
+        """
+        处理所有段落
+        
+        报告结构生成后各段落相互独立，按 INSIGHT_ENGINE_PARAGRAPH_CONCURRENCY 并发处理，
+        每个段落只写入自己在 State 中的位置，最终报告仍按段落顺序生成
+        
+        Args:
+            on_paragraph_complete: 段落完成回调，参数为(段落索引, 已完成段落数)，在调用线程中执行
+        """
         total_paragraphs = len(self.state.paragraphs)
         
-        for i in range(total_paragraphs):
+        def process_paragraph(i: int):
             logger.info(f"\n[步骤 2.{i+1}] 处理段落: {self.state.paragraphs[i].title}")
             logger.info("-" * 50)
             
@@ -436,10 +482,16 @@ class DeepSearchAgent:
             self._reflection_loop(i)
             
             # 标记段落完成
-            self.state.paragraphs[i].research.mark_completed()
-            
-            progress = (i + 1) / total_paragraphs * 100
-            logger.info(f"段落处理完成 ({progress:.1f}%)")
+            self.state.mark_paragraph_completed(i)
+        
+        def report_progress(i: int, completed: int):
+            progress = completed / total_paragraphs * 100
+            logger.info(f"段落 {i + 1} 处理完成 ({progress:.1f}%)")
+            if on_paragraph_complete:
+                on_paragraph_complete(i, completed)
+        
+        scheduler = ParagraphScheduler(self.config.INSIGHT_ENGINE_PARAGRAPH_CONCURRENCY)
+        scheduler.run(total_paragraphs, process_paragraph, on_complete=report_progress)
     
     def _initial_search_and_summary(self, paragraph_index: int):
         """执行初始搜索和总结"""
@@ -550,7 +602,7 @@ class DeepSearchAgent:
             logger.info("  - 未找到搜索结果")
         
         # 更新状态中的搜索历史
-        paragraph.research.add_search_results(search_query, search_results)
+        self.state.add_paragraph_search_results(paragraph_index, search_query, search_results)
         
         # 生成初始总结
         logger.info("  - 生成初始总结...")
@@ -683,7 +735,7 @@ class DeepSearchAgent:
                 logger.info("    未找到反思搜索结果")
             
             # 更新搜索历史
-            paragraph.research.add_search_results(search_query, search_results)
+            self.state.add_paragraph_search_results(paragraph_index, search_query, search_results)
             
             # 生成反思总结
             reflection_summary_input = {
@@ -747,6 +799,9 @@ class DeepSearchAgent:
         
         logger.info(f"报告已保存到: {filepath}")
         
+        # 登记到报告清单，供ReportEngine按查询查找
+        record_report(self.config.OUTPUT_DIR, "insight", self.state.query, filepath)
+        
         # 保存状态（如果配置允许）
         if self.config.SAVE_INTERMEDIATE_STATES:
             state_filename = f"state_{query_safe}_{timestamp}.json"
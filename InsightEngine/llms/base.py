@@ -5,7 +5,7 @@ Unified OpenAI-compatible LLM client for the Insight Engine, with retry support.
 import os
 import sys
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
 from openai import OpenAI
 
@@ -25,6 +25,17 @@ except ImportError:
 
     LLM_RETRY_CONFIG = None
 
+try:
+    from llm_stream import StreamLogForwarder
+except ImportError:
+    StreamLogForwarder = None
+
+try:
+    from llm_cache import get_llm_cache
+except ImportError:
+    def get_llm_cache():
+        return None
+
 
 class LLMClient:
     """Minimal wrapper around the OpenAI-compatible chat completion API."""
@@ -45,6 +56,13 @@ class LLMClient:
         except ValueError:
             self.timeout = 1800.0
 
+        # 不支持 stream 的 OpenAI 兼容接口可通过环境变量关闭流式输出
+        stream_flag = os.getenv("LLM_STREAM_OUTPUT") or os.getenv("INSIGHT_ENGINE_STREAM_OUTPUT") or "true"
+        self.stream_enabled = stream_flag.strip().lower() not in {"0", "false", "no", "off"}
+
+        # 可选的响应缓存（LLM_CACHE_ENABLED=true 时开启），进程内所有客户端共享
+        self.response_cache = get_llm_cache()
+
         client_kwargs: Dict[str, Any] = {
             "api_key": api_key,
             "max_retries": 0,
@@ -55,22 +73,19 @@ class LLMClient:
 
     @with_retry(LLM_RETRY_CONFIG)
     def invoke(self, system_prompt: str, user_prompt: str, **kwargs) -> str:
-        current_time = datetime.now().strftime("%Y年%m月%d日%H时%M分")
-        time_prefix = f"今天的实际时间是{current_time}"
-        if user_prompt:
-            user_prompt = f"{time_prefix}\n{user_prompt}"
-        else:
-            user_prompt = time_prefix
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ]
+        messages = self._build_messages(system_prompt, user_prompt)
 
         allowed_keys = {"temperature", "top_p", "presence_penalty", "frequency_penalty", "stream"}
         extra_params = {key: value for key, value in kwargs.items() if key in allowed_keys and value is not None}
 
         timeout = kwargs.pop("timeout", self.timeout)
 
+        cache_key = self._response_cache_key(messages, extra_params)
+        if cache_key:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         response = self.client.chat.completions.create(
             model=self.model_name,
             messages=messages,
@@ -78,9 +93,112 @@ class LLMClient:
             **extra_params,
         )
 
+        content = ""
         if response.choices and response.choices[0].message:
-            return self.validate_response(response.choices[0].message.content)
-        return ""
+            content = self.validate_response(response.choices[0].message.content)
+        if cache_key:
+            self.response_cache.put(cache_key, self.model_name, content)
+        return content
+
+    def stream_invoke(self, system_prompt: str, user_prompt: str, **kwargs) -> Iterator[str]:
+        """Yield content deltas as they arrive; reasoning deltas are skipped."""
+        messages = self._build_messages(system_prompt, user_prompt)
+
+        allowed_keys = {"temperature", "top_p", "presence_penalty", "frequency_penalty"}
+        extra_params = {key: value for key, value in kwargs.items() if key in allowed_keys and value is not None}
+
+        timeout = kwargs.pop("timeout", self.timeout)
+
+        stream = self.client.chat.completions.create(
+            model=self.model_name,
+            messages=messages,
+            timeout=timeout,
+            stream=True,
+            **extra_params,
+        )
+        try:
+            for chunk in stream:
+                if not chunk.choices or chunk.choices[0].delta is None:
+                    continue
+                content = chunk.choices[0].delta.content
+                if content:
+                    yield content
+        finally:
+            stream.close()
+
+    def stream_invoke_to_string(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        label: str = "LLM",
+        on_delta: Optional[Callable[[str], None]] = None,
+        **kwargs,
+    ) -> str:
+        """
+        Stream a completion and return the assembled text, same as ``invoke``.
+
+        Deltas are written to the engine log line by line (tagged with ``label``)
+        and passed to ``on_delta``. Falls back to ``invoke`` when streaming is
+        disabled via LLM_STREAM_OUTPUT.
+        """
+        if not self.stream_enabled or StreamLogForwarder is None:
+            return self.invoke(system_prompt, user_prompt, **kwargs)
+
+        allowed_keys = {"temperature", "top_p", "presence_penalty", "frequency_penalty"}
+        extra_params = {key: value for key, value in kwargs.items() if key in allowed_keys and value is not None}
+        cache_key = self._response_cache_key(self._build_messages(system_prompt, user_prompt), extra_params)
+        if cache_key:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        content = self._collect_stream(system_prompt, user_prompt, label, on_delta, **kwargs)
+        if cache_key:
+            self.response_cache.put(cache_key, self.model_name, content)
+        return content
+
+    @with_retry(LLM_RETRY_CONFIG)
+    def _collect_stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        label: str,
+        on_delta: Optional[Callable[[str], None]],
+        **kwargs,
+    ) -> str:
+        forwarder = StreamLogForwarder(label)
+        parts: List[str] = []
+        try:
+            for delta in self.stream_invoke(system_prompt, user_prompt, **kwargs):
+                parts.append(delta)
+                forwarder.feed(delta)
+                if on_delta:
+                    on_delta(delta)
+        finally:
+            forwarder.close()
+        return self.validate_response("".join(parts))
+
+    def _build_messages(self, system_prompt: str, user_prompt: str) -> List[Dict[str, str]]:
+        current_time = datetime.now().strftime("%Y年%m月%d日%H时%M分")
+        time_prefix = f"今天的实际时间是{current_time}"
+        if user_prompt:
+            user_prompt = f"{time_prefix}\n{user_prompt}"
+        else:
+            user_prompt = time_prefix
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+
+    def _response_cache_key(self, messages: List[Dict[str, str]], params: Dict[str, Any]) -> Optional[str]:
+        if self.response_cache is None or params.get("stream"):
+            return None
+        return self.response_cache.make_key(
+            f"{self.base_url or ''}|{self.model_name}",
+            messages[0]["content"],
+            messages[1]["content"],
+            params,
+        )
 
     @staticmethod
     def validate_response(response: Optional[str]) -> str:
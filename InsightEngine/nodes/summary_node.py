@@ -100,7 +100,7 @@ class FirstSummaryNode(StateMutationNode):
             logger.info("正在生成首次段落总结")
             
             # 调用LLM
-            response = self.llm_client.invoke(SYSTEM_PROMPT_FIRST_SUMMARY, message)
+            response = self.llm_client.stream_invoke_to_string(SYSTEM_PROMPT_FIRST_SUMMARY, message, label=self.node_name)
             
             # 处理响应
             processed_response = self.process_output(response)
@@ -181,14 +181,9 @@ class FirstSummaryNode(StateMutationNode):
             # 生成总结
             summary = self.run(input_data, **kwargs)
             
-            # 更新状态
-            if 0 <= paragraph_index < len(state.paragraphs):
-                state.paragraphs[paragraph_index].research.latest_summary = summary
-                logger.info(f"已更新段落 {paragraph_index} 的首次总结")
-            else:
-                raise ValueError(f"段落索引 {paragraph_index} 超出范围")
-            
-            state.update_timestamp()
+            # 更新状态（State内部加锁，支持多个段落并发写入）
+            state.update_paragraph_summary(paragraph_index, summary)
+            logger.info(f"已更新段落 {paragraph_index} 的首次总结")
             return state
             
         except Exception as e:
@@ -265,7 +260,7 @@ class ReflectionSummaryNode(StateMutationNode):
             logger.info("正在生成反思总结")
             
             # 调用LLM
-            response = self.llm_client.invoke(SYSTEM_PROMPT_REFLECTION_SUMMARY, message)
+            response = self.llm_client.stream_invoke_to_string(SYSTEM_PROMPT_REFLECTION_SUMMARY, message, label=self.node_name)
             
             # 处理响应
             processed_response = self.process_output(response)
@@ -346,15 +341,9 @@ class ReflectionSummaryNode(StateMutationNode):
             # 生成更新后的总结
             updated_summary = self.run(input_data, **kwargs)
             
-            # 更新状态
-            if 0 <= paragraph_index < len(state.paragraphs):
-                state.paragraphs[paragraph_index].research.latest_summary = updated_summary
-                state.paragraphs[paragraph_index].research.increment_reflection()
-                logger.info(f"已更新段落 {paragraph_index} 的反思总结")
-            else:
-                raise ValueError(f"段落索引 {paragraph_index} 超出范围")
-            
-            state.update_timestamp()
+            # 更新状态（State内部加锁，支持多个段落并发写入）
+            state.update_paragraph_summary(paragraph_index, updated_summary, is_reflection=True)
+            logger.info(f"已更新段落 {paragraph_index} 的反思总结")
             return state
             
         except Exception as e:
@@ -21,6 +21,10 @@ from .sentiment_analyzer import (
     multilingual_sentiment_analyzer,
     analyze_sentiment
 )
+from .sentiment_cache import (
+    SentimentCache,
+    CachedSentiment
+)
 
 __all__ = [
     "MediaCrawlerDB",
@@ -34,5 +38,7 @@ __all__ = [
     "SentimentResult",
     "BatchSentimentResult",
     "multilingual_sentiment_analyzer",
-    "analyze_sentiment"
+    "analyze_sentiment",
+    "SentimentCache",
+    "CachedSentiment"
 ]
@@ -0,0 +1,383 @@
+"""
+本地关键词扩展引擎
+基于已爬取的舆情语料（unified_content 的标题/正文与 source_keyword）为搜索查询扩展关键词，
+使大多数查询无需调用LLM：
+- jieba 分词后建立 词 -> 文档 倒排表，查询时按共现点互信息（PMI）挑选相关词
+- 统计爬虫任务使用过的 source_keyword，优先返回与查询重合的真实搜索词
+- 查询 -> 关键词 的结果缓存在带TTL的内存LRU中
+"""
+
+import math
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from loguru import logger
+
+from ..utils.db import fetch_all, run_sync
+
+try:
+    import jieba
+    JIEBA_AVAILABLE = True
+except ImportError:
+    jieba = None  # type: ignore
+    JIEBA_AVAILABLE = False
+
+
+# 分词后需要丢弃的高频虚词/查询套话
+STOP_WORDS = {
+    "我们", "你们", "他们", "这个", "那个", "这些", "那些", "什么", "怎么", "为什么", "如何",
+    "就是", "还是", "但是", "因为", "所以", "如果", "已经", "可以", "没有", "不是", "一个",
+    "自己", "现在", "今天", "真的", "这样", "那么", "还有", "以及", "或者", "而且", "其中",
+    "相关", "分析", "情况", "问题", "方面", "进行", "关于", "影响", "评价", "看法", "观点",
+    "网友", "网民", "舆情", "舆论", "讨论", "事件", "最新", "热点", "内容", "视频", "全文",
+}
+
+_TOKEN_PATTERN = re.compile(r"[一-鿿A-Za-z0-9]")
+_KEYWORD_SPLIT_PATTERN = re.compile(r"[\s,，、;；|/]+")
+
+
+def _normalize_query(query: str) -> str:
+    """规范化查询文本，用作缓存键"""
+    return re.sub(r"\s+", " ", query or "").strip().lower()
+
+
+class KeywordMemoCache:
+    """查询 -> 关键词 的内存缓存（带TTL的有界LRU，线程安全）"""
+
+    def __init__(self, ttl: float = 3600, max_entries: int = 1024):
+        """
+        初始化缓存
+
+        Args:
+            ttl: 条目有效期（秒），<=0 表示关闭缓存
+            max_entries: 最大条目数
+        """
+        self.ttl = float(ttl)
+        self.max_entries = max(0, int(max_entries))
+        self._entries: "OrderedDict[str, Tuple[List[str], str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, query: str) -> Optional[Tuple[List[str], str]]:
+        """查询缓存，返回 (关键词列表, 来源说明)，未命中或已过期时返回None"""
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return None
+        key = _normalize_query(query)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                keywords, reasoning, created_at = entry
+                if now - created_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return list(keywords), reasoning
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, query: str, keywords: List[str], reasoning: str) -> None:
+        """写入缓存"""
+        if self.ttl <= 0 or self.max_entries <= 0 or not keywords:
+            return
+        key = _normalize_query(query)
+        with self._lock:
+            self._entries[key] = (list(keywords), reasoning, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, float]:
+        """获取命中统计"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+            }
+
+
+@dataclass
+class _CorpusIndex:
+    """语料倒排索引"""
+    doc_tokens: List[Tuple[str, ...]] = field(default_factory=list)
+    postings: Dict[str, List[int]] = field(default_factory=dict)
+    source_keywords: Counter = field(default_factory=Counter)
+    source_keyword_postings: Dict[str, List[str]] = field(default_factory=dict)
+
+    @property
+    def doc_count(self) -> int:
+        return len(self.doc_tokens)
+
+    def doc_freq(self, token: str) -> int:
+        return len(self.postings.get(token, ()))
+
+
+class LocalKeywordExpander:
+    """
+    基于本地语料的关键词扩展器
+    索引在首次使用时从数据库懒加载，过期后由一个查询线程重建，其余线程继续使用旧索引；
+    语料中证据不足（查询词未出现或扩展结果过少）时返回None，交给LLM处理
+    """
+
+    MAX_SAMPLE_DOCS = 2000
+
+    def __init__(
+        self,
+        corpus_size: int = 20000,
+        refresh_interval: float = 1800,
+        min_doc_freq: int = 3,
+        min_cooccurrence: int = 2,
+        min_keywords: int = 3,
+        max_keywords: int = 12
+    ):
+        """
+        初始化扩展器
+
+        Args:
+            corpus_size: 建立索引时读取的最新内容条数
+            refresh_interval: 索引重建间隔（秒）；加载失败后也按此间隔重试
+            min_doc_freq: 查询词在语料中至少出现的文档数，低于此值视为语料中没有该词
+            min_cooccurrence: 扩展词与查询词至少共现的文档数
+            min_keywords: 扩展结果少于此数量时视为证据不足
+            max_keywords: 最多返回的关键词数
+        """
+        self.corpus_size = max(1, int(corpus_size))
+        self.refresh_interval = float(refresh_interval)
+        self.min_doc_freq = max(1, int(min_doc_freq))
+        self.min_cooccurrence = max(1, int(min_cooccurrence))
+        self.min_keywords = max(1, int(min_keywords))
+        self.max_keywords = max(1, int(max_keywords))
+
+        self._index: Optional[_CorpusIndex] = None
+        self._loaded_at = 0.0
+        self._retry_after = 0.0
+        self._build_lock = threading.Lock()
+
+        if not JIEBA_AVAILABLE:
+            logger.warning("未安装jieba，本地关键词扩展不可用，将直接调用LLM优化关键词")
+
+    @property
+    def available(self) -> bool:
+        """本地扩展是否可用"""
+        return JIEBA_AVAILABLE
+
+    # ---------- 分词 ----------
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """分词并过滤停用词、单字与纯数字，保持首次出现顺序去重"""
+        if not text or not JIEBA_AVAILABLE:
+            return []
+        tokens: List[str] = []
+        seen = set()
+        for token in jieba.lcut(text):
+            token = token.strip().lower()
+            if (
+                len(token) < 2
+                or len(token) > 20
+                or token in seen
+                or token in STOP_WORDS
+                or token.isdigit()
+                or not _TOKEN_PATTERN.search(token)
+            ):
+                continue
+            seen.add(token)
+            tokens.append(token)
+        return tokens
+
+    # ---------- 索引 ----------
+
+    def build_index(
+        self,
+        documents: Iterable[Tuple[Optional[str], Optional[str]]],
+        keyword_counts: Optional[Dict[str, int]] = None
+    ) -> None:
+        """
+        由语料建立索引并替换当前索引
+
+        Args:
+            documents: (标题或正文, source_keyword) 序列
+            keyword_counts: source_keyword -> 内容条数；为None时从 documents 中统计
+        """
+        index = _CorpusIndex()
+        postings: Dict[str, List[int]] = {}
+        counted = keyword_counts is None
+
+        for text, source_keyword in documents:
+            # 只取前200字：标题/正文开头已足够反映话题，且控制索引体积
+            tokens = tuple(self.tokenize((text or "")[:200])[:64])
+            if tokens:
+                doc_id = len(index.doc_tokens)
+                index.doc_tokens.append(tokens)
+                for token in tokens:
+                    postings.setdefault(token, []).append(doc_id)
+            if counted and source_keyword:
+                for keyword in _KEYWORD_SPLIT_PATTERN.split(source_keyword):
+                    if keyword:
+                        index.source_keywords[keyword.lower()] += 1
+
+        if not counted:
+            for keyword, count in keyword_counts.items():
+                if keyword:
+                    index.source_keywords[keyword.strip().lower()] += int(count or 0)
+
+        index.postings = postings
+        for keyword in index.source_keywords:
+            for token in self.tokenize(keyword) or [keyword]:
+                index.source_keyword_postings.setdefault(token, []).append(keyword)
+
+        self._index = index
+        self._loaded_at = time.monotonic()
+
+    def _load_corpus(self) -> None:
+        """从 unified_content 读取最新语料与 source_keyword 统计并建立索引"""
+        started = time.monotonic()
+        rows = run_sync(fetch_all(
+            "SELECT title_or_content, source_keyword FROM unified_content "
+            "ORDER BY publish_ts DESC LIMIT :limit",
+            {"limit": self.corpus_size}
+        ))
+        keyword_rows = run_sync(fetch_all(
+            "SELECT source_keyword, COUNT(*) AS cnt FROM unified_content "
+            "WHERE source_keyword IS NOT NULL AND source_keyword <> '' "
+            "GROUP BY source_keyword ORDER BY cnt DESC LIMIT :limit",
+            {"limit": 5000}
+        ))
+        keyword_counts: Counter = Counter()
+        for row in keyword_rows:
+            for keyword in _KEYWORD_SPLIT_PATTERN.split(row["source_keyword"] or ""):
+                if keyword:
+                    keyword_counts[keyword] += int(row["cnt"] or 0)
+
+        self.build_index(
+            ((row.get("title_or_content"), row.get("source_keyword")) for row in rows),
+            keyword_counts
+        )
+        logger.info(
+            f"本地关键词索引已建立: {self._index.doc_count} 条内容, "
+            f"{len(self._index.postings)} 个词, {len(self._index.source_keywords)} 个爬取关键词, "
+            f"耗时 {time.monotonic() - started:.1f}秒"
+        )
+
+    def _ensure_index(self) -> Optional[_CorpusIndex]:
+        """
+        返回可用索引。首次加载时其它线程等待同一次加载；
+        索引过期时由一个线程重建，其余线程继续使用旧索引
+        """
+        if not JIEBA_AVAILABLE:
+            return None
+        now = time.monotonic()
+        index = self._index
+        if index is not None and now - self._loaded_at < self.refresh_interval:
+            return index
+        if now < self._retry_after:
+            return index
+
+        # 已有旧索引时不阻塞等待重建
+        if not self._build_lock.acquire(blocking=index is None):
+            return index
+        try:
+            if self._index is not None and time.monotonic() - self._loaded_at < self.refresh_interval:
+                return self._index
+            if time.monotonic() < self._retry_after:
+                return self._index
+            try:
+                self._load_corpus()
+            except Exception as e:
+                self._retry_after = time.monotonic() + self.refresh_interval
+                logger.warning(f"加载本地关键词语料失败，{self.refresh_interval:.0f}秒后重试: {e}")
+            return self._index
+        finally:
+            self._build_lock.release()
+
+    # ---------- 扩展 ----------
+
+    def expand(self, query: str) -> Optional[List[str]]:
+        """
+        为查询扩展关键词
+
+        Args:
+            query: 原始搜索查询
+
+        Returns:
+            关键词列表；索引不可用或语料证据不足时返回None
+        """
+        index = self._ensure_index()
+        if index is None or index.doc_count == 0:
+            return None
+
+        query_tokens = self.tokenize(query)
+        known_tokens = [t for t in query_tokens if index.doc_freq(t) >= self.min_doc_freq]
+        matched_keywords = self._match_source_keywords(index, query_tokens)
+        if not known_tokens and not matched_keywords:
+            return None
+
+        keywords: List[str] = []
+        seen = set()
+
+        def add(keyword: str):
+            if keyword not in seen and len(keywords) < self.max_keywords:
+                seen.add(keyword)
+                keywords.append(keyword)
+
+        # 1. 爬虫实际使用过的搜索词：最贴近数据库中的内容
+        for keyword in matched_keywords[:4]:
+            add(keyword)
+        # 2. 语料中出现过的查询词本身
+        for token in known_tokens:
+            add(token)
+        # 3. 与查询词强相关的共现词
+        for token in self._related_tokens(index, known_tokens, exclude=set(query_tokens)):
+            add(token)
+
+        if len(keywords) < self.min_keywords:
+            return None
+        return keywords
+
+    def _match_source_keywords(self, index: _CorpusIndex, query_tokens: Sequence[str]) -> List[str]:
+        """找出与查询词重合的 source_keyword，按重合词数和内容条数排序"""
+        overlap: Counter = Counter()
+        for token in query_tokens:
+            for keyword in index.source_keyword_postings.get(token, ()):
+                overlap[keyword] += 1
+        return sorted(
+            overlap,
+            key=lambda keyword: (overlap[keyword], index.source_keywords[keyword]),
+            reverse=True
+        )
+
+    def _related_tokens(
+        self,
+        index: _CorpusIndex,
+        query_tokens: Sequence[str],
+        exclude: set,
+        limit: int = 8
+    ) -> List[str]:
+        """
+        按共现PMI挑选相关词：PMI(q, t) = log(N * c(q,t) / (df(q) * df(t)))，
+        得分取 PMI * log(1 + c(q,t))，避免只出现一两次的生僻词排在前面
+        """
+        total_docs = index.doc_count
+        scores: Counter = Counter()
+        for query_token in query_tokens[:5]:
+            # 高频词只取最新的部分文档估计共现概率（倒排表按发布时间倒序）
+            doc_ids = index.postings.get(query_token, [])[:self.MAX_SAMPLE_DOCS]
+            df_query = len(doc_ids)
+            cooccurrence: Counter = Counter()
+            for doc_id in doc_ids:
+                cooccurrence.update(index.doc_tokens[doc_id])
+            for token, count in cooccurrence.items():
+                if token in exclude or count < self.min_cooccurrence:
+                    continue
+                pmi = math.log(total_docs * count / (df_query * index.doc_freq(token)))
+                if pmi > 0:
+                    scores[token] += pmi * math.log1p(count)
+        return [token for token, _ in scores.most_common(limit)]
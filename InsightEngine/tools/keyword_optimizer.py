@@ -1,6 +1,7 @@
 """
 关键词优化中间件
 使用Qwen AI将Agent生成的搜索词优化为更适合舆情数据库查询的关键词
+依次尝试：查询结果缓存 -> 本地语料扩展 -> LLM，只有前两级都未命中时才调用LLM
 """
 
 from openai import OpenAI
@@ -23,6 +24,9 @@ if utils_dir not in sys.path:
     sys.path.append(utils_dir)
 
 from retry_helper import with_graceful_retry, SEARCH_API_RETRY_CONFIG
+from llm_cache import get_llm_cache
+
+from .keyword_expander import KeywordMemoCache, LocalKeywordExpander
 
 @dataclass
 class KeywordOptimizationResponse:
@@ -48,8 +52,10 @@ class KeywordOptimizer:
             base_url: 接口基础地址，默认使用配置文件提供的SiliconFlow地址
         """
         self.api_key = api_key or settings.KEYWORD_OPTIMIZER_API_KEY
+        # 仅本地模式：只使用缓存和本地语料扩展，不调用LLM
+        self.local_only = settings.KEYWORD_OPTIMIZER_LOCAL_ONLY
 
-        if not self.api_key:
+        if not self.api_key and not self.local_only:
             raise ValueError("未找到硅基流动API密钥，请在config.py中设置KEYWORD_OPTIMIZER_API_KEY")
 
         self.base_url = base_url or settings.KEYWORD_OPTIMIZER_BASE_URL
@@ -57,8 +63,20 @@ class KeywordOptimizer:
         self.client = OpenAI(
             api_key=self.api_key,
             base_url=self.base_url
-        )
+        ) if self.api_key else None
         self.model = model_name or settings.KEYWORD_OPTIMIZER_MODEL_NAME
+        # 可选的LLM响应缓存（LLM_CACHE_ENABLED=true 时开启）
+        self.response_cache = get_llm_cache()
+
+        # 第一级：查询 -> 关键词 结果缓存
+        self.keyword_cache = KeywordMemoCache(ttl=settings.KEYWORD_CACHE_TTL)
+        # 第二级：基于已爬取语料的本地扩展
+        self.local_expander = None
+        if settings.KEYWORD_LOCAL_EXPANSION_ENABLED or self.local_only:
+            self.local_expander = LocalKeywordExpander(
+                corpus_size=settings.KEYWORD_LOCAL_CORPUS_SIZE,
+                refresh_interval=settings.KEYWORD_LOCAL_INDEX_REFRESH
+            )
     
     def optimize_keywords(self, original_query: str, context: str = "") -> KeywordOptimizationResponse:
         """
@@ -72,6 +90,41 @@ class KeywordOptimizer:
             KeywordOptimizationResponse: 优化后的关键词列表
         """
         logger.info(f"🔍 关键词优化中间件: 处理查询 '{original_query}'")
+
+        cached = self.keyword_cache.get(original_query)
+        if cached is not None:
+            keywords, reasoning = cached
+            logger.info(f"✅ 命中关键词缓存: {len(keywords)}个关键词")
+            return KeywordOptimizationResponse(
+                original_query=original_query,
+                optimized_keywords=keywords,
+                reasoning=reasoning,
+                success=True
+            )
+
+        local_keywords = self._expand_locally(original_query)
+        if local_keywords:
+            reasoning = "基于本地舆情语料扩展（爬取关键词与共现词）"
+            logger.info(
+                f"✅ 本地扩展成功: {len(local_keywords)}个关键词\n" +
+                "\n".join([f"   {i}. '{k}'" for i, k in enumerate(local_keywords, 1)])
+            )
+            self.keyword_cache.put(original_query, local_keywords, reasoning)
+            return KeywordOptimizationResponse(
+                original_query=original_query,
+                optimized_keywords=local_keywords,
+                reasoning=reasoning,
+                success=True
+            )
+
+        if self.local_only:
+            logger.info("本地语料中证据不足，仅本地模式下使用备用关键词提取")
+            return KeywordOptimizationResponse(
+                original_query=original_query,
+                optimized_keywords=self._fallback_keyword_extraction(original_query),
+                reasoning="本地语料中证据不足，使用备用关键词提取",
+                success=True
+            )
         
         try:
             # 构建优化prompt
@@ -97,6 +150,7 @@ class KeywordOptimizer:
                     
                     # 验证关键词质量
                     validated_keywords = self._validate_keywords(keywords)
+                    self.keyword_cache.put(original_query, validated_keywords, reasoning)
                     
                     logger.info(
                         f"✅ 优化成功: {len(validated_keywords)}个关键词" +
@@ -147,6 +201,16 @@ class KeywordOptimizer:
                 error_message=str(e)
             )
     
+    def _expand_locally(self, original_query: str) -> List[str]:
+        """使用本地语料扩展关键词，不可用或证据不足时返回空列表"""
+        if self.local_expander is None or not self.local_expander.available:
+            return []
+        try:
+            return self._validate_keywords(self.local_expander.expand(original_query) or [])
+        except Exception as e:
+            logger.warning(f"本地关键词扩展失败，改用LLM优化: {e}")
+            return []
+
     def _build_system_prompt(self) -> str:
         """构建系统prompt"""
         return """你是一位专业的舆情数据挖掘专家。你的任务是将用户提供的搜索查询优化为更适合在社交媒体舆情数据库中查找的关键词。
@@ -190,6 +254,15 @@ class KeywordOptimizer:
     @with_graceful_retry(SEARCH_API_RETRY_CONFIG, default_return={"success": False, "error": "关键词优化服务暂时不可用"})
     def _call_qwen_api(self, system_prompt: str, user_prompt: str) -> Dict[str, Any]:
         """调用Qwen API"""
+        cache_key = None
+        if self.response_cache is not None:
+            cache_key = self.response_cache.make_key(
+                f"{self.base_url or ''}|{self.model}", system_prompt, user_prompt, {"temperature": 0.7}
+            )
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return {"success": True, "content": cached}
+
         try:
             response = self.client.chat.completions.create(
                 model=self.model,
@@ -202,6 +275,8 @@ class KeywordOptimizer:
 
             if response.choices:
                 content = response.choices[0].message.content
+                if cache_key and content:
+                    self.response_cache.put(cache_key, self.model, content)
                 return {"success": True, "content": content}
             else:
                 return {"success": False, "error": "API返回格式异常"}
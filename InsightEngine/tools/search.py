@@ -27,9 +27,11 @@ import os
 import json
 from loguru import logger
 import asyncio
-from typing import List, Dict, Any, Optional, Literal
+from typing import List, Dict, Any, Optional, Literal, Callable, Tuple
 from dataclasses import dataclass, field
-from ..utils.db import fetch_all
+from ..utils.db import fetch_all, run_sync, warm_up_pool_in_background, get_async_engine
+from ..utils.config import settings
+from .text_search import TextSearchBackend, create_text_search_backend
 from datetime import datetime, timedelta, date
 
 # --- 1. 数据结构定义 ---
@@ -57,6 +59,14 @@ class DBResponse:
     results_count: int = 0
     error_message: Optional[str] = None
 
+@dataclass
+class _TableQuery:
+    """单表查询规格：SQL、参数，以及把原始行转换为QueryResult的函数"""
+    table: str
+    query: str
+    params: Any
+    formatter: Callable[[Dict[str, Any]], QueryResult]
+
 # --- 2. 核心客户端与专用工具集 ---
 
 class MediaCrawlerDB:
@@ -68,31 +78,107 @@ class MediaCrawlerDB:
     W_VIEW = 0.1
     W_DANMAKU = 0.5
 
-    def __init__(self):
+    def __init__(self, max_concurrency: Optional[int] = None, query_timeout: Optional[float] = None):
         """
         初始化客户端。
+
+        Args:
+            max_concurrency: 同时在途的SQL查询数上限，默认取配置 DB_QUERY_CONCURRENCY
+            query_timeout: 单条SQL查询超时（秒），默认取配置 DB_QUERY_TIMEOUT
         """
-        pass
+        self.max_concurrency = max(1, max_concurrency or settings.DB_QUERY_CONCURRENCY)
+        self.query_timeout = query_timeout or settings.DB_QUERY_TIMEOUT
+
+        # 在后台预热连接池，不阻塞初始化
+        try:
+            warm_up_pool_in_background()
+        except Exception as e:
+            logger.warning(f"数据库连接池预热启动失败: {e}")
+
+    def _run_coroutine(self, coro):
+        """在常驻的数据库后台event loop上运行协程并返回结果（线程安全）"""
+        return run_sync(coro)
         
     def _execute_query(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
         try:
-            # 获取或创建event loop
+            return self._run_coroutine(fetch_all(query, params))
+        except Exception as e:
+            logger.exception(f"数据库查询时发生错误: {e}")
+            return []
+
+    async def _fetch_table(self, spec: _TableQuery, semaphore: asyncio.Semaphore) -> List[QueryResult]:
+        """在并发上限内执行单表查询；超时或出错时记录日志并返回空列表"""
+        async with semaphore:
             try:
-                loop = asyncio.get_event_loop()
-                if loop.is_closed():
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-            
-            # 直接运行协程
-            return loop.run_until_complete(fetch_all(query, params))
-        
+                rows = await asyncio.wait_for(fetch_all(spec.query, spec.params), timeout=self.query_timeout)
+                return [spec.formatter(row) for row in rows]
+            except asyncio.TimeoutError:
+                logger.warning(f"查询表 {spec.table} 超时（>{self.query_timeout}s），已跳过")
+                return []
+            except Exception as e:
+                logger.exception(f"查询表 {spec.table} 时发生错误: {e}")
+                return []
+
+    async def _gather_tables(self, specs: List[_TableQuery], semaphore: asyncio.Semaphore) -> List[QueryResult]:
+        """并发执行一组单表查询，结果按specs顺序拼接"""
+        per_table = await asyncio.gather(*(self._fetch_table(spec, semaphore) for spec in specs))
+        return [result for table_results in per_table for result in table_results]
+
+    def _run_table_queries(self, specs: List[_TableQuery]) -> List[QueryResult]:
+        """同步入口：并发执行一组单表查询"""
+        async def runner():
+            return await self._gather_tables(specs, asyncio.Semaphore(self.max_concurrency))
+        try:
+            return self._run_coroutine(runner())
         except Exception as e:
             logger.exception(f"数据库查询时发生错误: {e}")
             return []
 
+    def search_keywords_concurrently(
+        self,
+        tool_name: str,
+        keywords: List[str],
+        on_response: Callable[[str, DBResponse], None],
+        **tool_kwargs
+    ) -> None:
+        """
+        对多个关键词并发执行同一个话题搜索工具。
+        所有关键词×数据表的查询共享同一个并发上限，每个关键词的结果一旦就绪
+        就通过 on_response(keyword, response) 回调交给调用方合并（按完成顺序）。
+
+        Args:
+            tool_name: 工具名称（search_topic_globally / search_topic_by_date /
+                       get_comments_for_topic / search_topic_on_platform）
+            keywords: 关键词列表
+            on_response: 单个关键词查询完成时的回调
+            **tool_kwargs: 传给对应工具的其余参数（limit、start_date、platform等）
+
+        Raises:
+            ValueError: 工具名称未知或参数不合法
+        """
+        builders = {
+            'search_topic_globally': self._topic_globally_queries,
+            'search_topic_by_date': self._topic_by_date_queries,
+            'get_comments_for_topic': self._comments_for_topic_queries,
+            'search_topic_on_platform': self._topic_on_platform_queries,
+        }
+        if tool_name not in builders:
+            raise ValueError(f"不支持并发执行的工具: {tool_name}")
+
+        keyword_specs = [(keyword, builders[tool_name](topic=keyword, **tool_kwargs)) for keyword in keywords]
+
+        async def run_keyword(keyword: str, specs: List[_TableQuery], semaphore: asyncio.Semaphore) -> Tuple[str, List[QueryResult]]:
+            return keyword, await self._gather_tables(specs, semaphore)
+
+        async def runner():
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            tasks = [run_keyword(keyword, specs, semaphore) for keyword, specs in keyword_specs]
+            for finished in asyncio.as_completed(tasks):
+                keyword, results = await finished
+                on_response(keyword, DBResponse(tool_name, {'topic': keyword, **tool_kwargs}, results=results, results_count=len(results)))
+
+        self._run_coroutine(runner())
+
     @staticmethod
     def _to_datetime(ts: Any) -> Optional[datetime]:
         if not ts: return None
@@ -106,6 +192,35 @@ class MediaCrawlerDB:
                 return datetime.fromisoformat(ts.split('+')[0].strip())
         except (ValueError, TypeError): return None
 
+    _fulltext_index_cache = {}
+    def _get_fulltext_indexes(self, table_name: str) -> List[frozenset]:
+        """查询表上各 FULLTEXT 索引覆盖的列集合（MySQL），结果按表缓存"""
+        if table_name in self._fulltext_index_cache: return self._fulltext_index_cache[table_name]
+        rows = self._execute_query(
+            "SELECT INDEX_NAME, COLUMN_NAME FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND INDEX_TYPE = 'FULLTEXT'",
+            {'table': table_name}
+        )
+        index_columns: Dict[str, set] = {}
+        for row in rows:
+            index_columns.setdefault(row['INDEX_NAME'], set()).add(row['COLUMN_NAME'])
+        indexes = [frozenset(columns) for columns in index_columns.values()]
+        self._fulltext_index_cache[table_name] = indexes
+        return indexes
+
+    _text_search: Optional[TextSearchBackend] = None
+    def _get_text_search(self) -> TextSearchBackend:
+        """按数据库方言和 TEXT_SEARCH_BACKEND 配置选择话题检索后端"""
+        if self._text_search is None:
+            try:
+                dialect = get_async_engine().dialect.name
+            except Exception as e:
+                logger.warning(f"无法确定数据库方言，话题检索使用 LIKE: {e}")
+                dialect = (settings.DB_DIALECT or "mysql").lower()
+            self._text_search = create_text_search_backend(dialect, settings.TEXT_SEARCH_BACKEND, self._get_fulltext_indexes)
+            logger.info(f"话题检索后端: {self._text_search.name}")
+        return self._text_search
+
     _table_columns_cache = {}
     def _get_table_columns(self, table_name: str) -> List[str]:
         if table_name in self._table_columns_cache: return self._table_columns_cache[table_name]
@@ -126,6 +241,121 @@ class MediaCrawlerDB:
                     break
         return engagement
 
+    @staticmethod
+    def _topic_row_to_result(row: Dict[str, Any], platform: str, content_type: str, table: str, time_key: Any, engagement: Dict[str, int]) -> QueryResult:
+        content = (row.get('title') or row.get('content') or row.get('desc') or row.get('content_text', ''))
+        return QueryResult(
+            platform=platform, content_type=content_type,
+            title_or_content=content if content else '',
+            author_nickname=row.get('nickname') or row.get('user_nickname') or row.get('user_name'),
+            url=row.get('video_url') or row.get('note_url') or row.get('content_url') or row.get('url') or row.get('aweme_url'),
+            publish_time=MediaCrawlerDB._to_datetime(time_key),
+            engagement=engagement,
+            source_keyword=row.get('source_keyword'),
+            source_table=table
+        )
+
+    def _topic_table_queries(self, topic: str, search_configs: Dict[str, Dict[str, Any]], limit_per_table: int) -> List[_TableQuery]:
+        """为每张表生成话题检索查询规格（谓词由文本搜索后端生成，无索引时回退 LIKE）"""
+        text_search, specs = self._get_text_search(), []
+        for table, config in search_configs.items():
+            where_clause, param_dict = text_search.topic_predicate(table, config['fields'], topic)
+            param_dict['limit'] = limit_per_table
+            query = f'SELECT * FROM {text_search.quote(table)} WHERE {where_clause} ORDER BY id DESC LIMIT :limit'
+
+            def formatter(row, table=table, content_type=config['type']):
+                time_key = row.get('create_time') or row.get('time') or row.get('created_time') or row.get('publish_time') or row.get('crawl_date')
+                return self._topic_row_to_result(row, table.split('_')[0], content_type, table, time_key, self._extract_engagement(row))
+            specs.append(_TableQuery(table, query, param_dict, formatter))
+        return specs
+
+    def _topic_globally_queries(self, topic: str, limit_per_table: int = 100) -> List[_TableQuery]:
+        search_configs = { 'bilibili_video': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video'}, 'bilibili_video_comment': {'fields': ['content'], 'type': 'comment'}, 'douyin_aweme': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video'}, 'douyin_aweme_comment': {'fields': ['content'], 'type': 'comment'}, 'kuaishou_video': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video'}, 'kuaishou_video_comment': {'fields': ['content'], 'type': 'comment'}, 'weibo_note': {'fields': ['content', 'source_keyword'], 'type': 'note'}, 'weibo_note_comment': {'fields': ['content'], 'type': 'comment'}, 'xhs_note': {'fields': ['title', 'desc', 'tag_list', 'source_keyword'], 'type': 'note'}, 'xhs_note_comment': {'fields': ['content'], 'type': 'comment'}, 'zhihu_content': {'fields': ['title', 'desc', 'content_text', 'source_keyword'], 'type': 'content'}, 'zhihu_comment': {'fields': ['content'], 'type': 'comment'}, 'tieba_note': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'note'}, 'tieba_comment': {'fields': ['content'], 'type': 'comment'}, 'daily_news': {'fields': ['title'], 'type': 'news'}, }
+        return self._topic_table_queries(topic, search_configs, limit_per_table)
+
+    def _topic_by_date_queries(self, topic: str, start_date: str, end_date: str, limit_per_table: int = 100) -> List[_TableQuery]:
+        try:
+            start_dt, end_dt = datetime.strptime(start_date, '%Y-%m-%d'), datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
+        except (ValueError, TypeError):
+            raise ValueError("日期格式错误，请使用 'YYYY-MM-DD' 格式。")
+        
+        search_configs = {
+            'bilibili_video': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'sec'}, 'douyin_aweme': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'ms'},
+            'kuaishou_video': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'ms'}, 'weibo_note': {'fields': ['content', 'source_keyword'], 'type': 'note', 'time_col': 'create_date_time', 'time_type': 'str'},
+            'xhs_note': {'fields': ['title', 'desc', 'tag_list', 'source_keyword'], 'type': 'note', 'time_col': 'time', 'time_type': 'ms'}, 'zhihu_content': {'fields': ['title', 'desc', 'content_text', 'source_keyword'], 'type': 'content', 'time_col': 'created_time', 'time_type': 'sec_str'},
+            'tieba_note': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'note', 'time_col': 'publish_time', 'time_type': 'str'}, 'daily_news': {'fields': ['title'], 'type': 'news', 'time_col': 'crawl_date', 'time_type': 'date_str'},
+        }
+        return self._topic_table_queries(topic, search_configs, limit_per_table)
+
+    def _comments_for_topic_queries(self, topic: str, limit: int = 500) -> List[_TableQuery]:
+        text_search = self._get_text_search()
+        comment_tables = ['bilibili_video_comment', 'douyin_aweme_comment', 'kuaishou_video_comment', 'weibo_note_comment', 'xhs_note_comment', 'zhihu_comment', 'tieba_comment']
+        
+        all_queries, params = [], {}
+        for table in comment_tables:
+            cols = self._get_table_columns(table)
+            author_col = 'user_nickname' if 'user_nickname' in cols else 'nickname'
+            like_col = 'comment_like_count' if 'comment_like_count' in cols else 'like_count' if 'like_count' in cols else None
+            time_col = 'publish_time' if 'publish_time' in cols else 'create_date_time' if 'create_date_time' in cols else 'create_time'
+            like_select = f"{text_search.quote(like_col)} as likes" if like_col else "'0' as likes"
+            predicate, predicate_params = text_search.topic_predicate(table, ['content'], topic, prefix=f"t{len(all_queries)}")
+            
+            query = (f"SELECT '{table.split('_')[0]}' as platform, {text_search.quote('content')}, {text_search.quote(author_col)} as author, "
+                     f"{text_search.quote(time_col)} as ts, {like_select}, '{table}' as source_table "
+                     f"FROM {text_search.quote(table)} WHERE {predicate}")
+            all_queries.append(query)
+            params.update(predicate_params)
+
+        final_query = f"({' ) UNION ALL ( '.join(all_queries)}) ORDER BY ts DESC LIMIT :limit"
+        params['limit'] = limit
+        formatter = lambda r: QueryResult(platform=r['platform'], content_type='comment', title_or_content=r['content'], author_nickname=r['author'], publish_time=self._to_datetime(r['ts']), engagement={'likes': int(r['likes']) if str(r['likes']).isdigit() else 0}, source_table=r['source_table'])
+        return [_TableQuery('comments', final_query, params, formatter)]
+
+    def _topic_on_platform_queries(self, topic: str, platform: str, start_date: Optional[str] = None, end_date: Optional[str] = None, limit: int = 20) -> List[_TableQuery]:
+        all_configs = { 'bilibili': [{'table': 'bilibili_video', 'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'sec'}, {'table': 'bilibili_video_comment', 'fields': ['content'], 'type': 'comment'}], 'douyin': [{'table': 'douyin_aweme', 'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'ms'}, {'table': 'douyin_aweme_comment', 'fields': ['content'], 'type': 'comment'}], 'kuaishou': [{'table': 'kuaishou_video', 'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'ms'}, {'table': 'kuaishou_video_comment', 'fields': ['content'], 'type': 'comment'}], 'weibo': [{'table': 'weibo_note', 'fields': ['content', 'source_keyword'], 'type': 'note', 'time_col': 'create_date_time', 'time_type': 'str'}, {'table': 'weibo_note_comment', 'fields': ['content'], 'type': 'comment'}], 'xhs': [{'table': 'xhs_note', 'fields': ['title', 'desc', 'tag_list', 'source_keyword'], 'type': 'note', 'time_col': 'time', 'time_type': 'ms'}, {'table': 'xhs_note_comment', 'fields': ['content'], 'type': 'comment'}], 'zhihu': [{'table': 'zhihu_content', 'fields': ['title', 'desc', 'content_text', 'source_keyword'], 'type': 'content', 'time_col': 'created_time', 'time_type': 'sec_str'}, {'table': 'zhihu_comment', 'fields': ['content'], 'type': 'comment'}], 'tieba': [{'table': 'tieba_note', 'fields': ['title', 'desc', 'source_keyword'], 'type': 'note', 'time_col': 'publish_time', 'time_type': 'str'}, {'table': 'tieba_comment', 'fields': ['content'], 'type': 'comment'}] }
+        
+        if platform not in all_configs:
+            raise ValueError(f"不支持的平台: {platform}")
+
+        text_search, specs = self._get_text_search(), []
+        platform_configs = all_configs[platform]
+
+        if start_date and end_date:
+            try:
+                start_dt, end_dt = datetime.strptime(start_date, '%Y-%m-%d'), datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
+            except ValueError:
+                raise ValueError("日期格式错误，请使用 'YYYY-MM-DD' 格式。")
+        else:
+            start_dt, end_dt = None, None
+
+        for config in platform_configs:
+            table = config['table']
+            topic_clause, params = text_search.topic_predicate(table, config['fields'], topic)
+            query = f"SELECT * FROM {text_search.quote(table)} WHERE {topic_clause}"
+
+            if start_dt and end_dt and 'time_col' in config:
+                time_col, time_type = config['time_col'], config['time_type']
+                if time_type == 'sec': t_params = (int(start_dt.timestamp()), int(end_dt.timestamp()))
+                elif time_type == 'ms': t_params = (int(start_dt.timestamp() * 1000), int(end_dt.timestamp() * 1000))
+                elif time_type in ['str', 'date_str']: t_params = (start_dt.strftime('%Y-%m-%d'), end_dt.strftime('%Y-%m-%d'))
+                else: t_params = (int(start_dt.timestamp()), int(end_dt.timestamp()))  # sec_str: 列已CAST为整数
+                
+                time_expr = text_search.quote(time_col)
+                if table == 'zhihu_content': time_expr = f"CAST({time_expr} AS {'UNSIGNED' if text_search.dialect == 'mysql' else 'BIGINT'})"
+                t_clause = f"{time_expr} >= :t_start AND {time_expr} < :t_end"
+                
+                query += f" AND ({t_clause})"
+                params.update({'t_start': t_params[0], 't_end': t_params[1]})
+
+            query += f" ORDER BY id DESC LIMIT :limit"
+            params['limit'] = limit
+
+            def formatter(row, table=table, config=config):
+                time_key = config.get('time_col') and row.get(config.get('time_col'))
+                return QueryResult(platform=platform, content_type=config['type'], title_or_content=(row.get('title') or row.get('content') or row.get('desc') or row.get('content_text', '')) or '', author_nickname=row.get('nickname') or row.get('user_nickname'), url=row.get('video_url') or row.get('note_url') or row.get('content_url') or row.get('url') or row.get('aweme_url'), publish_time=self._to_datetime(time_key), engagement=self._extract_engagement(row), source_keyword=row.get('source_keyword'), source_table=table)
+            specs.append(_TableQuery(table, query, params, formatter))
+        return specs
+
     def search_hot_content(
         self,
         time_period: Literal['24h', 'week', 'year'] = 'week',
@@ -144,9 +374,43 @@ class MediaCrawlerDB:
         params_for_log = {'time_period': time_period, 'limit': limit}
         logger.info(f"--- TOOL: 查找热点内容 (params: {params_for_log}) ---")
         
-        now = datetime.now()
-        start_time = now - timedelta(days={'24h': 1, 'week': 7}.get(time_period, 365))
+        start_time = datetime.now() - timedelta(days={'24h': 1, 'week': 7}.get(time_period, 365))
+
+        # 统一内容表已预先规范化互动数据并计算热度，一次索引查询即可
+        query = (
+            "SELECT platform, content_type, title_or_content, author_nickname, url, publish_ts, "
+            "liked_count, comment_count, share_count, favorite_count, coin_count, danmaku_count, view_count, "
+            "hotness_score, source_keyword, source_table "
+            "FROM unified_content WHERE publish_ts >= :start_ts ORDER BY hotness_score DESC LIMIT :limit"
+        )
+        try:
+            raw_results = self._run_coroutine(fetch_all(query, {'start_ts': int(start_time.timestamp()), 'limit': limit}))
+        except Exception as e:
+            logger.warning(f"统一内容表 unified_content 不可用，回退到逐平台实时计算热度（可运行 MindSpider/schema/unified_content.py 同步）: {e}")
+            return self._search_hot_content_legacy(params_for_log, start_time, limit)
+        if not raw_results:
+            # 统一内容表存在但尚未同步（或同步落后于时间范围）时查询成功却没有结果，同样回退
+            logger.info("统一内容表 unified_content 在该时间范围内没有数据，回退到逐平台实时计算热度")
+            return self._search_hot_content_legacy(params_for_log, start_time, limit)
 
+        formatted_results = [self._unified_row_to_result(r) for r in raw_results]
+        return DBResponse("search_hot_content", params_for_log, results=formatted_results, results_count=len(formatted_results))
+
+    @staticmethod
+    def _unified_row_to_result(row: Dict[str, Any]) -> QueryResult:
+        columns = {'likes': 'liked_count', 'comments': 'comment_count', 'shares': 'share_count', 'views': 'view_count', 'favorites': 'favorite_count', 'coins': 'coin_count', 'danmaku': 'danmaku_count'}
+        engagement = {key: int(row[col]) for key, col in columns.items() if row.get(col)}
+        return QueryResult(
+            platform=row['platform'], content_type=row['content_type'],
+            title_or_content=row.get('title_or_content') or '',
+            author_nickname=row.get('author_nickname'), url=row.get('url'),
+            publish_time=MediaCrawlerDB._to_datetime(row.get('publish_ts')),
+            engagement=engagement, hotness_score=float(row.get('hotness_score') or 0.0),
+            source_keyword=row.get('source_keyword'), source_table=row['source_table']
+        )
+
+    def _search_hot_content_legacy(self, params_for_log: Dict[str, Any], start_time: datetime, limit: int) -> DBResponse:
+        """未建立统一内容表时的回退路径：逐平台UNION ALL并在查询时计算热度（仅MySQL）"""
         # 定义各平台的热度计算SQL片段
         hotness_formulas = {
             'bilibili_video': f"(COALESCE(CAST(liked_count AS UNSIGNED), 0) * {self.W_LIKE} + COALESCE(CAST(video_comment AS UNSIGNED), 0) * {self.W_COMMENT} + COALESCE(CAST(video_share_count AS UNSIGNED), 0) * {self.W_SHARE} + COALESCE(CAST(video_favorite_count AS UNSIGNED), 0) * {self.W_SHARE} + COALESCE(CAST(video_coin_count AS UNSIGNED), 0) * {self.W_SHARE} + COALESCE(CAST(video_danmaku AS UNSIGNED), 0) * {self.W_DANMAKU} + COALESCE(CAST(video_play_count AS DECIMAL(20,2)), 0) * {self.W_VIEW})",
@@ -197,33 +461,7 @@ class MediaCrawlerDB:
         params_for_log = {'topic': topic, 'limit_per_table': limit_per_table}
         logger.info(f"--- TOOL: 全局话题搜索 (params: {params_for_log}) ---")
         
-        search_term, all_results = f"%{topic}%", []
-        search_configs = { 'bilibili_video': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video'}, 'bilibili_video_comment': {'fields': ['content'], 'type': 'comment'}, 'douyin_aweme': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video'}, 'douyin_aweme_comment': {'fields': ['content'], 'type': 'comment'}, 'kuaishou_video': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video'}, 'kuaishou_video_comment': {'fields': ['content'], 'type': 'comment'}, 'weibo_note': {'fields': ['content', 'source_keyword'], 'type': 'note'}, 'weibo_note_comment': {'fields': ['content'], 'type': 'comment'}, 'xhs_note': {'fields': ['title', 'desc', 'tag_list', 'source_keyword'], 'type': 'note'}, 'xhs_note_comment': {'fields': ['content'], 'type': 'comment'}, 'zhihu_content': {'fields': ['title', 'desc', 'content_text', 'source_keyword'], 'type': 'content'}, 'zhihu_comment': {'fields': ['content'], 'type': 'comment'}, 'tieba_note': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'note'}, 'tieba_comment': {'fields': ['content'], 'type': 'comment'}, 'daily_news': {'fields': ['title'], 'type': 'news'}, }
-        
-        for table, config in search_configs.items():
-            param_dict = {}
-            where_clauses = []
-            for idx, field in enumerate(config['fields']):
-                pname = f"term_{idx}"
-                where_clauses.append(f'"{field}" LIKE :{pname}')
-                param_dict[pname] = search_term
-            param_dict['limit'] = limit_per_table
-            where_clause = " OR ".join(where_clauses)
-            query = f'SELECT * FROM "{table}" WHERE {where_clause} ORDER BY id DESC LIMIT :limit'
-            raw_results = self._execute_query(query, param_dict)
-            for row in raw_results:
-                content = (row.get('title') or row.get('content') or row.get('desc') or row.get('content_text', ''))
-                time_key = row.get('create_time') or row.get('time') or row.get('created_time') or row.get('publish_time') or row.get('crawl_date')
-                all_results.append(QueryResult(
-                    platform=table.split('_')[0], content_type=config['type'],
-                    title_or_content=content if content else '',
-                    author_nickname=row.get('nickname') or row.get('user_nickname') or row.get('user_name'),
-                    url=row.get('video_url') or row.get('note_url') or row.get('content_url') or row.get('url') or row.get('aweme_url'),
-                    publish_time=self._to_datetime(time_key),
-                    engagement=self._extract_engagement(row),
-                    source_keyword=row.get('source_keyword'),
-                    source_table=table
-                ))
+        all_results = self._run_table_queries(self._topic_globally_queries(topic, limit_per_table))
         return DBResponse("search_topic_globally", params_for_log, results=all_results, results_count=len(all_results))
 
     def search_topic_by_date(self, topic: str, start_date: str, end_date: str, limit_per_table: int = 100) -> DBResponse:
@@ -243,42 +481,10 @@ class MediaCrawlerDB:
         logger.info(f"--- TOOL: 按日期搜索话题 (params: {params_for_log}) ---")
         
         try:
-            start_dt, end_dt = datetime.strptime(start_date, '%Y-%m-%d'), datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
-        except ValueError:
-            return DBResponse("search_topic_by_date", params_for_log, error_message="日期格式错误，请使用 'YYYY-MM-DD' 格式。")
-        
-        search_term, all_results = f"%{topic}%", []
-        search_configs = {
-            'bilibili_video': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'sec'}, 'douyin_aweme': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'ms'},
-            'kuaishou_video': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'ms'}, 'weibo_note': {'fields': ['content', 'source_keyword'], 'type': 'note', 'time_col': 'create_date_time', 'time_type': 'str'},
-            'xhs_note': {'fields': ['title', 'desc', 'tag_list', 'source_keyword'], 'type': 'note', 'time_col': 'time', 'time_type': 'ms'}, 'zhihu_content': {'fields': ['title', 'desc', 'content_text', 'source_keyword'], 'type': 'content', 'time_col': 'created_time', 'time_type': 'sec_str'},
-            'tieba_note': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'note', 'time_col': 'publish_time', 'time_type': 'str'}, 'daily_news': {'fields': ['title'], 'type': 'news', 'time_col': 'crawl_date', 'time_type': 'date_str'},
-        }
-
-        for table, config in search_configs.items():
-            param_dict = {}
-            where_clauses = []
-            for idx, field in enumerate(config['fields']):
-                pname = f"term_{idx}"
-                where_clauses.append(f'"{field}" LIKE :{pname}')
-                param_dict[pname] = search_term
-            param_dict['limit'] = limit_per_table
-            where_clause = ' OR '.join(where_clauses)
-            query = f'SELECT * FROM "{table}" WHERE {where_clause} ORDER BY id DESC LIMIT :limit'
-            raw_results = self._execute_query(query, param_dict)
-            for row in raw_results:
-                content = (row.get('title') or row.get('content') or row.get('desc') or row.get('content_text', ''))
-                time_key = row.get('create_time') or row.get('time') or row.get('created_time') or row.get('publish_time') or row.get('crawl_date')
-                all_results.append(QueryResult(
-                    platform=table.split('_')[0], content_type=config['type'],
-                    title_or_content=content if content else '',
-                    author_nickname=row.get('nickname') or row.get('user_nickname') or row.get('user_name'),
-                    url=row.get('video_url') or row.get('note_url') or row.get('content_url') or row.get('url') or row.get('aweme_url'),
-                    publish_time=self._to_datetime(time_key),
-                    engagement=self._extract_engagement(row),
-                    source_keyword=row.get('source_keyword'),
-                    source_table=table
-                ))
+            specs = self._topic_by_date_queries(topic, start_date, end_date, limit_per_table)
+        except ValueError as e:
+            return DBResponse("search_topic_by_date", params_for_log, error_message=str(e))
+        all_results = self._run_table_queries(specs)
         return DBResponse("search_topic_by_date", params_for_log, results=all_results, results_count=len(all_results))
         
     def get_comments_for_topic(self, topic: str, limit: int = 500) -> DBResponse:
@@ -295,27 +501,7 @@ class MediaCrawlerDB:
         params_for_log = {'topic': topic, 'limit': limit}
         logger.info(f"--- TOOL: 获取话题评论 (params: {params_for_log}) ---")
         
-        search_term = f"%{topic}%"
-        comment_tables = ['bilibili_video_comment', 'douyin_aweme_comment', 'kuaishou_video_comment', 'weibo_note_comment', 'xhs_note_comment', 'zhihu_comment', 'tieba_comment']
-        
-        all_queries = []
-        for table in comment_tables:
-            cols = self._get_table_columns(table)
-            author_col = 'user_nickname' if 'user_nickname' in cols else 'nickname'
-            like_col = 'comment_like_count' if 'comment_like_count' in cols else 'like_count' if 'like_count' in cols else None
-            time_col = 'publish_time' if 'publish_time' in cols else 'create_date_time' if 'create_date_time' in cols else 'create_time'
-            like_select = f"`{like_col}` as likes" if like_col else "'0' as likes"
-            
-            query = (f"SELECT '{table.split('_')[0]}' as platform, `content`, `{author_col}` as author, "
-                     f"`{time_col}` as ts, {like_select}, '{table}' as source_table "
-                     f"FROM `{table}` WHERE `content` LIKE %s")
-            all_queries.append(query)
-
-        final_query = f"({' ) UNION ALL ( '.join(all_queries)}) ORDER BY ts DESC LIMIT %s"
-        params = (search_term,) * len(comment_tables) + (limit,)
-        raw_results = self._execute_query(final_query, params)
-        
-        formatted = [QueryResult(platform=r['platform'], content_type='comment', title_or_content=r['content'], author_nickname=r['author'], publish_time=self._to_datetime(r['ts']), engagement={'likes': int(r['likes']) if str(r['likes']).isdigit() else 0}, source_table=r['source_table']) for r in raw_results]
+        formatted = self._run_table_queries(self._comments_for_topic_queries(topic, limit))
         return DBResponse("get_comments_for_topic", params_for_log, results=formatted, results_count=len(formatted))
 
     def search_topic_on_platform(
@@ -342,50 +528,11 @@ class MediaCrawlerDB:
         params_for_log = {'platform': platform, 'topic': topic, 'start_date': start_date, 'end_date': end_date, 'limit': limit}
         logger.info(f"--- TOOL: 平台定向搜索 (params: {params_for_log}) ---")
 
-        all_configs = { 'bilibili': [{'table': 'bilibili_video', 'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'sec'}, {'table': 'bilibili_video_comment', 'fields': ['content'], 'type': 'comment'}], 'douyin': [{'table': 'douyin_aweme', 'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'ms'}, {'table': 'douyin_aweme_comment', 'fields': ['content'], 'type': 'comment'}], 'kuaishou': [{'table': 'kuaishou_video', 'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'ms'}, {'table': 'kuaishou_video_comment', 'fields': ['content'], 'type': 'comment'}], 'weibo': [{'table': 'weibo_note', 'fields': ['content', 'source_keyword'], 'type': 'note', 'time_col': 'create_date_time', 'time_type': 'str'}, {'table': 'weibo_note_comment', 'fields': ['content'], 'type': 'comment'}], 'xhs': [{'table': 'xhs_note', 'fields': ['title', 'desc', 'tag_list', 'source_keyword'], 'type': 'note', 'time_col': 'time', 'time_type': 'ms'}, {'table': 'xhs_note_comment', 'fields': ['content'], 'type': 'comment'}], 'zhihu': [{'table': 'zhihu_content', 'fields': ['title', 'desc', 'content_text', 'source_keyword'], 'type': 'content', 'time_col': 'created_time', 'time_type': 'sec_str'}, {'table': 'zhihu_comment', 'fields': ['content'], 'type': 'comment'}], 'tieba': [{'table': 'tieba_note', 'fields': ['title', 'desc', 'source_keyword'], 'type': 'note', 'time_col': 'publish_time', 'time_type': 'str'}, {'table': 'tieba_comment', 'fields': ['content'], 'type': 'comment'}] }
-        
-        if platform not in all_configs:
-            return DBResponse("search_topic_on_platform", params_for_log, error_message=f"不支持的平台: {platform}")
-
-        search_term, all_results = f"%{topic}%", []
-        platform_configs = all_configs[platform]
-
-        time_clause, time_params_tuple = "", ()
-        if start_date and end_date:
-            try:
-                start_dt, end_dt = datetime.strptime(start_date, '%Y-%m-%d'), datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
-            except ValueError:
-                return DBResponse("search_topic_on_platform", params_for_log, error_message="日期格式错误，请使用 'YYYY-MM-DD' 格式。")
-        else:
-            start_dt, end_dt = None, None
-
-        for config in platform_configs:
-            table = config['table']
-            topic_clause = " OR ".join([f"`{field}` LIKE %s" for field in config['fields']])
-            query = f"SELECT * FROM `{table}` WHERE {topic_clause}"
-            params = [search_term] * len(config['fields'])
-
-            if start_dt and end_dt and 'time_col' in config:
-                time_col, time_type = config['time_col'], config['time_type']
-                if time_type == 'sec': t_params = (int(start_dt.timestamp()), int(end_dt.timestamp()))
-                elif time_type == 'ms': t_params = (int(start_dt.timestamp() * 1000), int(end_dt.timestamp() * 1000))
-                elif time_type in ['str', 'date_str']: t_params = (start_dt.strftime('%Y-%m-%d'), end_dt.strftime('%Y-%m-%d'))
-                else: t_params = (str(int(start_dt.timestamp())), str(int(end_dt.timestamp())))
-                
-                t_clause = f"`{time_col}` >= %s AND `{time_col}` < %s"
-                if table == 'zhihu_content': t_clause = f"CAST(`{time_col}` AS UNSIGNED) >= %s AND CAST(`{time_col}` AS UNSIGNED) < %s"
-                
-                query += f" AND ({t_clause})"
-                params.extend(t_params)
-
-            query += f" ORDER BY id DESC LIMIT %s"
-            params.append(limit)
-
-            raw_results = self._execute_query(query, tuple(params))
-            for row in raw_results:
-                content = (row.get('title') or row.get('content') or row.get('desc') or row.get('content_text', ''))
-                time_key = config.get('time_col') and row.get(config.get('time_col'))
-                all_results.append(QueryResult(platform=platform, content_type=config['type'], title_or_content=content if content else '', author_nickname=row.get('nickname') or row.get('user_nickname'), url=row.get('video_url') or row.get('note_url') or row.get('content_url') or row.get('url') or row.get('aweme_url'), publish_time=self._to_datetime(time_key), engagement=self._extract_engagement(row), source_keyword=row.get('source_keyword'), source_table=table))
+        try:
+            specs = self._topic_on_platform_queries(topic, platform, start_date, end_date, limit)
+        except ValueError as e:
+            return DBResponse("search_topic_on_platform", params_for_log, error_message=str(e))
+        all_results = self._run_table_queries(specs)
         
         return DBResponse("search_topic_on_platform", params_for_log, results=all_results, results_count=len(all_results))
 
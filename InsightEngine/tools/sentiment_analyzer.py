@@ -5,10 +5,13 @@
 
 import os
 import sys
-from typing import List, Dict, Any, Optional, Union
+import threading
+from typing import List, Dict, Any, Optional, Tuple, Union
 from dataclasses import dataclass
 import re
 
+from .sentiment_cache import SentimentCache, CachedSentiment
+
 try:
     import torch
     TORCH_AVAILABLE = True
@@ -28,6 +31,19 @@ except ImportError:
 # INFO：若想跳过情感分析，可手动切换此开关为False
 SENTIMENT_ANALYSIS_ENABLED = True
 
+# 批量推理时每个micro-batch的文本数；CPU部署可适当调小，GPU可调大
+SENTIMENT_BATCH_SIZE = 32
+
+# 单条文本最大token数（与模型最大输入长度一致）
+SENTIMENT_MAX_LENGTH = 512
+
+# 情感分析模型标识（同时作为结果缓存键的一部分）
+SENTIMENT_MODEL_NAME = "tabularisai/multilingual-sentiment-analysis"
+
+# 情感分析结果缓存：重复出现的帖子/评论直接复用历史结果
+SENTIMENT_CACHE_ENABLED = True
+SENTIMENT_CACHE_MEMORY_SIZE = 20000
+
 def _describe_missing_dependencies() -> str:
     missing = []
     if not TORCH_AVAILABLE:
@@ -41,6 +57,9 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(_
 weibo_sentiment_path = os.path.join(project_root, "SentimentAnalysisModel", "WeiboMultilingualSentiment")
 sys.path.append(weibo_sentiment_path)
 
+# 磁盘缓存文件路径（跨进程、跨研究会话共享）
+SENTIMENT_CACHE_PATH = os.path.join(project_root, "cache", "sentiment_cache.sqlite3")
+
 @dataclass
 class SentimentResult:
     """情感分析结果数据类"""
@@ -70,14 +89,26 @@ class WeiboMultilingualSentimentAnalyzer:
     封装WeiboMultilingualSentiment模型，为AI Agent提供情感分析功能
     """
     
-    def __init__(self):
-        """初始化情感分析器"""
+    def __init__(self, batch_size: int = SENTIMENT_BATCH_SIZE,
+                 cache: Union[SentimentCache, bool, None] = None):
+        """
+        初始化情感分析器
+
+        Args:
+            batch_size: 批量推理时每个micro-batch的文本数
+            cache: 情感分析结果缓存；不传则按SENTIMENT_CACHE_*配置在首次使用时创建，传False关闭缓存
+        """
+        self.batch_size = max(1, int(batch_size))
+        # True 表示首次使用时再按配置创建，避免导入模块时就创建缓存文件
+        self._cache: Union[SentimentCache, bool] = SENTIMENT_CACHE_ENABLED if cache is None else cache
+        self._cache_lock = threading.Lock()
         self.model = None
         self.tokenizer = None
         self.device = None
         self.is_initialized = False
         self.is_disabled = False
         self.disable_reason: Optional[str] = None
+        self._init_lock = threading.Lock()  # 多个段落并发处理时避免重复加载模型
         
         # 情感标签映射（5级分类）
         self.sentiment_map = {
@@ -100,6 +131,15 @@ class WeiboMultilingualSentimentAnalyzer:
         else:
             print("WeiboMultilingualSentimentAnalyzer 已创建，调用 initialize() 来加载模型")
 
+    @property
+    def cache(self) -> Optional[SentimentCache]:
+        """情感分析结果缓存，未启用时为None"""
+        if self._cache is True:
+            with self._cache_lock:
+                if self._cache is True:
+                    self._cache = SentimentCache(SENTIMENT_CACHE_PATH, memory_size=SENTIMENT_CACHE_MEMORY_SIZE)
+        return self._cache if isinstance(self._cache, SentimentCache) else None
+
     def disable(self, reason: Optional[str] = None, drop_state: bool = False) -> None:
         """Disable sentiment analysis, optionally clearing loaded resources."""
         self.is_disabled = True
@@ -141,6 +181,11 @@ class WeiboMultilingualSentimentAnalyzer:
         Returns:
             是否初始化成功
         """
+        with self._init_lock:
+            return self._load_model()
+
+    def _load_model(self) -> bool:
+        """加载模型和分词器（调用方需持有 _init_lock）"""
         if self.is_disabled:
             reason = self.disable_reason or "情感分析功能已禁用"
             print(f"情感分析功能已禁用，跳过模型加载：{reason}")
@@ -160,7 +205,7 @@ class WeiboMultilingualSentimentAnalyzer:
             print("正在加载多语言情感分析模型...")
             
             # 使用多语言情感分析模型
-            model_name = "tabularisai/multilingual-sentiment-analysis"
+            model_name = SENTIMENT_MODEL_NAME
             local_model_path = os.path.join(weibo_sentiment_path, "model")
             
             # 检查本地是否已有模型
@@ -231,6 +276,83 @@ class WeiboMultilingualSentimentAnalyzer:
         
         return text
     
+    def _predict_probabilities(self, processed_texts: List[str]) -> List[List[float]]:
+        """
+        对一组已预处理的文本执行一次前向推理
+
+        Args:
+            processed_texts: 已预处理的文本列表（同一个micro-batch）
+
+        Returns:
+            每条文本的5级概率分布，顺序与输入一致
+        """
+        # 分词编码：整批文本一起编码，只填充到本批次的最大长度
+        inputs = self.tokenizer(
+            processed_texts,
+            max_length=SENTIMENT_MAX_LENGTH,
+            padding=True,
+            truncation=True,
+            return_tensors='pt'
+        )
+
+        # 转移到设备
+        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+
+        # 预测
+        with torch.inference_mode():
+            outputs = self.model(**inputs)
+            probabilities = torch.softmax(outputs.logits, dim=1)
+
+        return probabilities.cpu().tolist()
+
+    def _build_result(self, text: str, probabilities: List[float]) -> SentimentResult:
+        """
+        根据概率分布构建SentimentResult
+
+        Args:
+            text: 原始文本
+            probabilities: 5级概率分布
+
+        Returns:
+            SentimentResult对象
+        """
+        prediction = max(range(len(probabilities)), key=lambda idx: probabilities[idx])
+        prob_dist = {
+            label_name: prob
+            for label_name, prob in zip(self.sentiment_map.values(), probabilities)
+        }
+
+        return SentimentResult(
+            text=text,
+            sentiment_label=self.sentiment_map[prediction],
+            confidence=probabilities[prediction],
+            probability_distribution=prob_dist,
+            success=True
+        )
+
+    def _cache_key(self, processed_text: str) -> str:
+        """生成结果缓存键（模型标识 + 规范化文本）"""
+        return SentimentCache.make_key(SENTIMENT_MODEL_NAME, processed_text)
+
+    def _result_from_cache(self, text: str, cached: CachedSentiment) -> SentimentResult:
+        """将缓存记录还原为SentimentResult"""
+        return SentimentResult(
+            text=text,
+            sentiment_label=cached.sentiment_label,
+            confidence=cached.confidence,
+            probability_distribution=dict(cached.probability_distribution),
+            success=True
+        )
+
+    @staticmethod
+    def _to_cache_entry(result: SentimentResult) -> CachedSentiment:
+        """将成功的SentimentResult转换为缓存记录"""
+        return CachedSentiment(
+            sentiment_label=result.sentiment_label,
+            confidence=result.confidence,
+            probability_distribution=result.probability_distribution
+        )
+
     def analyze_single_text(self, text: str) -> SentimentResult:
         """
         对单个文本进行情感分析
@@ -278,41 +400,17 @@ class WeiboMultilingualSentimentAnalyzer:
                     analysis_performed=False
                 )
 
-            # 分词编码
-            inputs = self.tokenizer(
-                processed_text,
-                max_length=512,
-                padding=True,
-                truncation=True,
-                return_tensors='pt'
-            )
-
-            # 转移到设备
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
-
-            # 预测
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                logits = outputs.logits
-                probabilities = torch.softmax(logits, dim=1)
-                prediction = torch.argmax(probabilities, dim=1).item()
+            cache_key = self._cache_key(processed_text)
+            if self.cache is not None:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return self._result_from_cache(text, cached)
 
-            # 构建结果
-            confidence = probabilities[0][prediction].item()
-            label = self.sentiment_map[prediction]
-
-            # 构建概率分布字典
-            prob_dist = {}
-            for label_name, prob in zip(self.sentiment_map.values(), probabilities[0]):
-                prob_dist[label_name] = prob.item()
-
-            return SentimentResult(
-                text=text,
-                sentiment_label=label,
-                confidence=confidence,
-                probability_distribution=prob_dist,
-                success=True
-            )
+            probabilities = self._predict_probabilities([processed_text])[0]
+            result = self._build_result(text, probabilities)
+            if self.cache is not None:
+                self.cache.put(cache_key, self._to_cache_entry(result))
+            return result
 
         except Exception as e:
             return SentimentResult(
@@ -325,13 +423,18 @@ class WeiboMultilingualSentimentAnalyzer:
                 analysis_performed=False
             )
 
-    def analyze_batch(self, texts: List[str], show_progress: bool = True) -> BatchSentimentResult:
+    def analyze_batch(self, texts: List[str], show_progress: bool = True,
+                      batch_size: Optional[int] = None) -> BatchSentimentResult:
         """
         批量情感分析
         
+        文本按长度分组后以micro-batch为单位一起编码和推理，
+        结果按输入顺序返回。
+        
         Args:
             texts: 文本列表
             show_progress: 是否显示进度
+            batch_size: micro-batch大小，默认使用初始化时的batch_size
             
         Returns:
             BatchSentimentResult对象
@@ -368,17 +471,11 @@ class WeiboMultilingualSentimentAnalyzer:
                 analysis_performed=False
             )
         
-        results = []
+        results = self._analyze_in_micro_batches(texts, batch_size or self.batch_size, show_progress)
         success_count = 0
         total_confidence = 0.0
-        
-        for i, text in enumerate(texts):
-            if show_progress and len(texts) > 1:
-                print(f"处理进度: {i+1}/{len(texts)}")
-            
-            result = self.analyze_single_text(text)
-            results.append(result)
-            
+
+        for result in results:
             if result.success:
                 success_count += 1
                 total_confidence += result.confidence
@@ -395,6 +492,86 @@ class WeiboMultilingualSentimentAnalyzer:
             analysis_performed=True
         )
     
+    def _analyze_in_micro_batches(self, texts: List[str], batch_size: int,
+                                  show_progress: bool) -> List[SentimentResult]:
+        """
+        按长度分组、分micro-batch推理，并将结果映射回输入位置
+
+        Args:
+            texts: 原始文本列表
+            batch_size: micro-batch大小
+            show_progress: 是否显示进度
+
+        Returns:
+            与texts一一对应的SentimentResult列表
+        """
+        batch_size = max(1, int(batch_size))
+        results: List[Optional[SentimentResult]] = [None] * len(texts)
+        pending: List[Tuple[int, str]] = []
+
+        for index, text in enumerate(texts):
+            processed_text = self._preprocess_text(text)
+            if not processed_text:
+                results[index] = SentimentResult(
+                    text=text,
+                    sentiment_label="输入错误",
+                    confidence=0.0,
+                    probability_distribution={},
+                    success=False,
+                    error_message="输入文本为空或无效内容",
+                    analysis_performed=False
+                )
+            else:
+                pending.append((index, processed_text))
+
+        # 查询结果缓存，并合并重复文本：每个不同的规范化文本只推理一次
+        keyed: Dict[str, List[int]] = {}
+        normalized: Dict[str, str] = {}
+        for index, processed_text in pending:
+            key = self._cache_key(processed_text)
+            keyed.setdefault(key, []).append(index)
+            normalized[key] = processed_text
+
+        cached = self.cache.get_many(keyed.keys()) if self.cache is not None else {}
+        for key, cached_value in cached.items():
+            for index in keyed[key]:
+                results[index] = self._result_from_cache(texts[index], cached_value)
+
+        # 按长度排序，使同一批次内的文本长度接近，减少无效填充
+        to_infer = sorted(
+            (key for key in keyed if key not in cached),
+            key=lambda key: len(normalized[key])
+        )
+
+        if show_progress and cached:
+            print(f"情感分析缓存命中: {len(cached)}/{len(keyed)}")
+
+        processed_count = 0
+        for start in range(0, len(to_infer), batch_size):
+            chunk = to_infer[start:start + batch_size]
+            fresh: Dict[str, CachedSentiment] = {}
+            try:
+                batch_probabilities = self._predict_probabilities([normalized[key] for key in chunk])
+                for key, probabilities in zip(chunk, batch_probabilities):
+                    for index in keyed[key]:
+                        results[index] = self._build_result(texts[index], probabilities)
+                    fresh[key] = self._to_cache_entry(results[keyed[key][0]])
+            except Exception as e:
+                # 整批失败时逐条重试，避免单条异常文本拖垮整个批次
+                print(f"批量推理失败，改为逐条处理: {e}")
+                for key in chunk:
+                    for index in keyed[key]:
+                        results[index] = self.analyze_single_text(texts[index])
+
+            if self.cache is not None and fresh:
+                self.cache.put_many(fresh)
+
+            processed_count += len(chunk)
+            if show_progress and len(texts) > 1:
+                print(f"处理进度: {processed_count}/{len(to_infer)}")
+
+        return results
+
     def _build_passthrough_analysis(
         self,
         original_data: List[Dict[str, Any]],
@@ -554,7 +731,7 @@ class WeiboMultilingualSentimentAnalyzer:
             模型信息字典
         """
         return {
-            "model_name": "tabularisai/multilingual-sentiment-analysis",
+            "model_name": SENTIMENT_MODEL_NAME,
             "supported_languages": [
                 "中文", "英文", "西班牙文", "阿拉伯文", "日文", "韩文", 
                 "德文", "法文", "意大利文", "葡萄牙文", "俄文", "荷兰文",
@@ -563,9 +740,24 @@ class WeiboMultilingualSentimentAnalyzer:
             ],
             "sentiment_levels": list(self.sentiment_map.values()),
             "is_initialized": self.is_initialized,
-            "device": str(self.device) if self.device else "未设置"
+            "device": str(self.device) if self.device else "未设置",
+            "cache": self.get_cache_stats()
         }
 
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        获取情感分析结果缓存的命中统计
+        
+        Returns:
+            统计字典；未启用缓存时enabled为False
+        """
+        if self._cache is True:
+            # 尚未使用过缓存，不为统计而创建缓存文件
+            return {"enabled": True}
+        if self.cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.cache.get_stats()}
+
 
 # 创建全局实例（延迟初始化）
 multilingual_sentiment_analyzer = WeiboMultilingualSentimentAnalyzer()
@@ -0,0 +1,209 @@
+"""
+情感分析结果缓存
+以"模型标识 + 规范化文本"的哈希为键，缓存情感标签、置信度和概率分布。
+内存层为有界LRU，磁盘层为SQLite，可在多次研究会话之间复用。
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+
+@dataclass
+class CachedSentiment:
+    """缓存中的单条情感分析结果"""
+    sentiment_label: str
+    confidence: float
+    probability_distribution: Dict[str, float]
+
+
+class SentimentCache:
+    """
+    两级情感分析结果缓存（内存LRU + SQLite）
+    线程安全，可被多个Agent实例共享
+    """
+
+    def __init__(self, db_path: Optional[str], memory_size: int = 10000):
+        """
+        初始化缓存
+
+        Args:
+            db_path: SQLite缓存文件路径，为None时仅使用内存缓存
+            memory_size: 内存LRU最大条目数
+        """
+        self.db_path = db_path
+        self.memory_size = max(0, int(memory_size))
+        self._memory: "OrderedDict[str, CachedSentiment]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if db_path:
+            try:
+                self._conn = self._open_database(db_path)
+            except sqlite3.Error as e:
+                print(f"情感分析磁盘缓存不可用，仅使用内存缓存: {e}")
+                self._conn = None
+
+    @staticmethod
+    def _open_database(db_path: str) -> sqlite3.Connection:
+        """打开（必要时创建）SQLite缓存库"""
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sentiment_cache (
+                cache_key TEXT PRIMARY KEY,
+                sentiment_label TEXT NOT NULL,
+                confidence REAL NOT NULL,
+                probability_distribution TEXT NOT NULL,
+                created_at INTEGER NOT NULL
+            )
+            """
+        )
+        conn.commit()
+        return conn
+
+    @staticmethod
+    def make_key(model_id: str, normalized_text: str) -> str:
+        """根据模型标识和规范化文本生成缓存键"""
+        digest = hashlib.sha256()
+        digest.update(model_id.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(normalized_text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _remember(self, key: str, value: CachedSentiment) -> None:
+        """写入内存LRU（调用方需持有锁）"""
+        if self.memory_size <= 0:
+            return
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, CachedSentiment]:
+        """
+        批量查询缓存
+
+        Args:
+            keys: 缓存键列表
+
+        Returns:
+            命中的键到缓存结果的映射
+        """
+        found: Dict[str, CachedSentiment] = {}
+        with self._lock:
+            disk_lookup: List[str] = []
+            for key in dict.fromkeys(keys):
+                value = self._memory.get(key)
+                if value is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = value
+                    self.memory_hits += 1
+                else:
+                    disk_lookup.append(key)
+
+            if disk_lookup and self._conn is not None:
+                # 分块查询，避免超过SQLite变量数上限
+                for start in range(0, len(disk_lookup), 500):
+                    chunk = disk_lookup[start:start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    try:
+                        rows = self._conn.execute(
+                            "SELECT cache_key, sentiment_label, confidence, probability_distribution "
+                            f"FROM sentiment_cache WHERE cache_key IN ({placeholders})",
+                            chunk
+                        ).fetchall()
+                    except sqlite3.Error as e:
+                        print(f"读取情感分析磁盘缓存失败: {e}")
+                        rows = []
+                    for key, label, confidence, distribution in rows:
+                        value = CachedSentiment(
+                            sentiment_label=label,
+                            confidence=confidence,
+                            probability_distribution=json.loads(distribution)
+                        )
+                        found[key] = value
+                        self._remember(key, value)
+                        self.disk_hits += 1
+
+            self.misses += sum(1 for key in disk_lookup if key not in found)
+        return found
+
+    def get(self, key: str) -> Optional[CachedSentiment]:
+        """查询单条缓存"""
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items: Dict[str, CachedSentiment]) -> None:
+        """
+        批量写入缓存
+
+        Args:
+            items: 缓存键到情感分析结果的映射
+        """
+        if not items:
+            return
+        with self._lock:
+            for key, value in items.items():
+                self._remember(key, value)
+
+            if self._conn is not None:
+                now = int(time.time())
+                try:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO sentiment_cache "
+                        "(cache_key, sentiment_label, confidence, probability_distribution, created_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        [
+                            (
+                                key,
+                                value.sentiment_label,
+                                value.confidence,
+                                json.dumps(value.probability_distribution, ensure_ascii=False),
+                                now
+                            )
+                            for key, value in items.items()
+                        ]
+                    )
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    print(f"写入情感分析磁盘缓存失败: {e}")
+
+    def put(self, key: str, value: CachedSentiment) -> None:
+        """写入单条缓存"""
+        self.put_many({key: value})
+
+    def clear(self) -> None:
+        """清空内存和磁盘缓存"""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM sentiment_cache")
+                self._conn.commit()
+
+    def get_stats(self) -> Dict[str, float]:
+        """获取命中统计"""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
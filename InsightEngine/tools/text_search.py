@@ -0,0 +1,107 @@
+"""
+话题检索谓词生成（可插拔的文本搜索层）
+
+MediaCrawlerDB 的话题类工具不再直接拼接 LIKE '%topic%'，而是通过这里的后端生成 WHERE 谓词：
+- TextSearchBackend: LIKE 回退实现，所有数据库通用
+- MySQLFulltextSearch: 表上存在覆盖检索列的 FULLTEXT(ngram) 索引时改用 MATCH ... AGAINST，否则回退 LIKE
+- PostgresTrigramSearch: 保持 LIKE 语义，由 pg_trgm GIN 索引加速（无索引时自动退化为顺序扫描）
+
+索引由 MindSpider/schema/init_database.py（fulltext_indexes.py）创建和维护。
+"""
+
+import re
+from typing import Callable, Dict, FrozenSet, List, Tuple
+
+
+class TextSearchBackend:
+    """LIKE 回退实现"""
+
+    name = "like"
+
+    def __init__(self, dialect: str):
+        self.dialect = (dialect or "").lower()
+
+    def quote(self, identifier: str) -> str:
+        """按数据库方言引用标识符"""
+        if self.dialect == "mysql":
+            return f"`{identifier}`"
+        return f'"{identifier}"'
+
+    def topic_predicate(self, table: str, fields: List[str], topic: str, prefix: str = "term") -> Tuple[str, Dict[str, str]]:
+        """
+        生成"任一检索列包含话题"的WHERE谓词
+
+        Args:
+            table: 表名
+            fields: 检索列
+            topic: 话题关键词
+            prefix: 绑定参数名前缀（同一条SQL中有多个谓词时需互不相同）
+
+        Returns:
+            (谓词SQL, 绑定参数字典)
+        """
+        params: Dict[str, str] = {}
+        clauses = []
+        for idx, field in enumerate(fields):
+            pname = f"{prefix}_{idx}"
+            clauses.append(f"{self.quote(field)} LIKE :{pname}")
+            params[pname] = f"%{topic}%"
+        return "(" + " OR ".join(clauses) + ")", params
+
+
+class PostgresTrigramSearch(TextSearchBackend):
+    """PostgreSQL: LIKE 谓词由 pg_trgm GIN 索引加速，SQL 与回退实现相同"""
+
+    name = "pg_trgm"
+
+
+class MySQLFulltextSearch(TextSearchBackend):
+    """MySQL: 优先使用 FULLTEXT(ngram) 索引"""
+
+    name = "mysql_fulltext"
+
+    # InnoDB ngram_token_size 默认为2，更短的词无法命中全文索引
+    MIN_TOKEN_LENGTH = 2
+    _BOOLEAN_OPERATORS = re.compile(r'[+\-<>()~*"@]')
+
+    def __init__(self, index_lookup: Callable[[str], List[FrozenSet[str]]]):
+        """
+        Args:
+            index_lookup: 返回某张表上各FULLTEXT索引列集合的函数（调用方负责缓存）
+        """
+        super().__init__("mysql")
+        self._index_lookup = index_lookup
+
+    def has_index(self, table: str, fields: List[str]) -> bool:
+        """MATCH 的列列表必须与某个 FULLTEXT 索引完全一致"""
+        return frozenset(fields) in self._index_lookup(table)
+
+    def topic_predicate(self, table: str, fields: List[str], topic: str, prefix: str = "term") -> Tuple[str, Dict[str, str]]:
+        phrase = self._BOOLEAN_OPERATORS.sub(" ", topic or "").strip()
+        if len(phrase) < self.MIN_TOKEN_LENGTH or not self.has_index(table, fields):
+            return super().topic_predicate(table, fields, topic, prefix)
+        columns = ", ".join(self.quote(field) for field in fields)
+        # 整体作为短语匹配，语义上接近 LIKE '%topic%'
+        return f"MATCH({columns}) AGAINST (:{prefix}_ft IN BOOLEAN MODE)", {f"{prefix}_ft": f'"{phrase}"'}
+
+
+def create_text_search_backend(dialect: str, mode: str, index_lookup: Callable[[str], List[FrozenSet[str]]]) -> TextSearchBackend:
+    """
+    根据数据库方言和配置选择文本搜索后端
+
+    Args:
+        dialect: SQLAlchemy 方言名（mysql / postgresql）
+        mode: 配置值 TEXT_SEARCH_BACKEND，"auto" 按方言选择索引后端，"like" 强制回退
+        index_lookup: MySQL FULLTEXT 索引查询函数
+
+    Returns:
+        TextSearchBackend实例
+    """
+    dialect = (dialect or "").lower()
+    if (mode or "auto").lower() == "like":
+        return TextSearchBackend(dialect)
+    if dialect == "mysql":
+        return MySQLFulltextSearch(index_lookup)
+    if dialect == "postgresql":
+        return PostgresTrigramSearch(dialect)
+    return TextSearchBackend(dialect)
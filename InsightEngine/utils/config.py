@@ -22,8 +22,18 @@ class Settings(BaseSettings):
     DB_PORT: int = Field(3306, description="数据库端口")
     DB_CHARSET: str = Field("utf8mb4", description="数据库字符集")
     DB_DIALECT: Optional[str] = Field("mysql", description="数据库方言，如mysql、postgresql等，SQLAlchemy后端选择")
+    DB_QUERY_CONCURRENCY: int = Field(8, description="同时在途的数据库查询数上限（关键词×数据表并发）")
+    DB_QUERY_TIMEOUT: float = Field(60.0, description="单条数据库查询超时（秒）")
+    DB_POOL_SIZE: int = Field(10, description="数据库连接池常驻连接数")
+    DB_MAX_OVERFLOW: int = Field(10, description="连接池允许的额外溢出连接数")
+    DB_POOL_TIMEOUT: float = Field(30.0, description="从连接池获取连接的等待超时（秒）")
+    DB_POOL_RECYCLE: int = Field(1800, description="连接最大复用时长（秒），超时后重建，替代每次取连接时的ping")
+    DB_POOL_WARMUP: int = Field(4, description="启动时预先建立的连接数，0表示不预热")
+    DB_STATEMENT_CACHE_SIZE: int = Field(500, description="SQL语句编译/预处理缓存条目数")
+    TEXT_SEARCH_BACKEND: str = Field("auto", description="话题检索后端：auto按方言使用FULLTEXT(ngram)/pg_trgm索引，like强制使用LIKE")
     MAX_REFLECTIONS: int = Field(3, description="最大反思次数")
     MAX_PARAGRAPHS: int = Field(6, description="最大段落数")
+    INSIGHT_ENGINE_PARAGRAPH_CONCURRENCY: int = Field(3, description="同时研究的段落数上限，1表示逐段顺序处理；遇到API限流时自动降低")
     SEARCH_TIMEOUT: int = Field(240, description="单次搜索请求超时")
     MAX_CONTENT_LENGTH: int = Field(500000, description="搜索最大内容长度")
     DEFAULT_SEARCH_HOT_CONTENT_LIMIT: int = Field(100, description="热榜内容默认最大数")
@@ -2,6 +2,9 @@
 通用数据库工具（异步）
 
 此模块提供基于 SQLAlchemy 2.x 异步引擎的数据库访问封装，支持 MySQL 与 PostgreSQL。
+所有查询都运行在 utils/async_runner.py 的常驻后台 event loop 线程上，同步代码（Agent、Streamlit 线程）
+通过 run_sync 提交协程，避免每次查询创建/切换 event loop，也避免多线程争用
+asyncio.get_event_loop()。
 数据模型定义位置：
 - 无（本模块仅提供连接与查询工具，不定义数据模型）
 """
@@ -10,23 +13,42 @@ from __future__ import annotations
 
 import asyncio
 import os
-from typing import Any, Dict, Iterable, List, Optional, Union
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Dict, Iterable, List, Optional, TypeVar, Union
 
+from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy import text
+from sqlalchemy.sql.elements import TextClause
 from InsightEngine.utils.config import settings
 
+utils_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'utils')
+if utils_dir not in sys.path:
+    sys.path.append(utils_dir)
+
+from async_runner import run_async, submit_async
+
 __all__ = [
     "get_async_engine",
     "fetch_all",
+    "run_sync",
+    "warm_up_pool",
+    "warm_up_pool_in_background",
 ]
 
+T = TypeVar("T")
 
 _engine: Optional[AsyncEngine] = None
+_engine_lock = threading.Lock()
+
+
+def _is_postgresql() -> bool:
+    return (settings.DB_DIALECT or "mysql").lower() in ("postgresql", "postgres")
 
 
 def _build_database_url() -> str:
-    dialect: str = (settings.DB_DIALECT or "mysql").lower()
     host: str = settings.DB_HOST or ""
     port: str = str(settings.DB_PORT or "")
     user: str = settings.DB_USER or ""
@@ -36,9 +58,12 @@ def _build_database_url() -> str:
     if os.getenv("DATABASE_URL"):
         return os.getenv("DATABASE_URL")  # 直接使用外部提供的完整URL
 
-    if dialect in ("postgresql", "postgres"):
-        # PostgreSQL 使用 asyncpg 驱动
-        return f"postgresql+asyncpg://{user}:{password}@{host}:{port}/{db_name}"
+    if _is_postgresql():
+        # PostgreSQL 使用 asyncpg 驱动，并开启服务端预处理语句缓存
+        return (
+            f"postgresql+asyncpg://{user}:{password}@{host}:{port}/{db_name}"
+            f"?prepared_statement_cache_size={settings.DB_STATEMENT_CACHE_SIZE}"
+        )
 
     # 默认 MySQL 使用 aiomysql 驱动
     return f"mysql+aiomysql://{user}:{password}@{host}:{port}/{db_name}"
@@ -47,24 +72,143 @@ def _build_database_url() -> str:
 def get_async_engine() -> AsyncEngine:
     global _engine
     if _engine is None:
-        database_url: str = _build_database_url()
-        _engine = create_async_engine(
-            database_url,
-            pool_pre_ping=True,
-            pool_recycle=1800,
-        )
+        with _engine_lock:
+            if _engine is None:
+                database_url: str = _build_database_url()
+                # 显式配置连接池；连接靠 pool_recycle 定期重建，不再在每次取连接时额外 ping
+                _engine = create_async_engine(
+                    database_url,
+                    pool_size=settings.DB_POOL_SIZE,
+                    max_overflow=settings.DB_MAX_OVERFLOW,
+                    pool_timeout=settings.DB_POOL_TIMEOUT,
+                    pool_recycle=settings.DB_POOL_RECYCLE,
+                    pool_pre_ping=False,
+                    query_cache_size=settings.DB_STATEMENT_CACHE_SIZE,
+                )
     return _engine
 
 
+# ---------------------------------------------------------------------------
+# 语句缓存：相同SQL只构造一次 TextClause，配合引擎的编译缓存复用编译结果
+# ---------------------------------------------------------------------------
+
+_statement_cache: "OrderedDict[str, TextClause]" = OrderedDict()
+_statement_cache_lock = threading.Lock()
+
+
+def _get_statement(query: str) -> TextClause:
+    with _statement_cache_lock:
+        statement = _statement_cache.get(query)
+        if statement is not None:
+            _statement_cache.move_to_end(query)
+            return statement
+        statement = text(query)
+        _statement_cache[query] = statement
+        while len(_statement_cache) > settings.DB_STATEMENT_CACHE_SIZE:
+            _statement_cache.popitem(last=False)
+        return statement
+
+
 async def fetch_all(query: str, params: Optional[Union[Iterable[Any], Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
     """
     执行只读查询并返回字典列表。
     """
     engine: AsyncEngine = get_async_engine()
     async with engine.connect() as conn:
-        result = await conn.execute(text(query), params or {})
+        result = await conn.execute(_get_statement(query), params or {})
         rows = result.mappings().all()
         # 将 RowMapping 转换为普通字典
         return [dict(row) for row in rows]
 
 
+async def warm_up_pool(connections: Optional[int] = None) -> int:
+    """
+    预先建立连接池中的连接，使首批查询不必承担建连开销。
+
+    Args:
+        connections: 预热的连接数，默认取配置 DB_POOL_WARMUP（不超过 DB_POOL_SIZE）
+
+    Returns:
+        成功预热的连接数
+    """
+    count = settings.DB_POOL_WARMUP if connections is None else connections
+    count = max(0, min(count, settings.DB_POOL_SIZE))
+    if count == 0:
+        return 0
+
+    engine: AsyncEngine = get_async_engine()
+    release = asyncio.Event()
+    all_settled = asyncio.Event()
+    settled = 0
+
+    def mark_settled():
+        nonlocal settled
+        settled += 1
+        if settled == count:
+            all_settled.set()
+
+    async def hold_connection() -> bool:
+        # 同时持有多条连接，确保连接池真正建立count条而不是反复复用同一条
+        opened = False
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(_get_statement("SELECT 1"))
+                opened = True
+                mark_settled()
+                await release.wait()
+        except Exception as e:
+            logger.debug(f"预热连接失败: {e}")
+            if not opened:
+                mark_settled()
+        return opened
+
+    tasks = [asyncio.ensure_future(hold_connection()) for _ in range(count)]
+    # 等所有连接都已建立（或失败）后再一起释放回连接池
+    await all_settled.wait()
+    release.set()
+    results = await asyncio.gather(*tasks)
+    return sum(1 for ok in results if ok)
+
+
+# ---------------------------------------------------------------------------
+# 常驻后台 event loop：同步门面
+# ---------------------------------------------------------------------------
+
+def run_sync(coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+    """
+    在后台 event loop 上运行协程，并阻塞等待结果（线程安全）。
+
+    Args:
+        coro: 要运行的协程
+        timeout: 等待超时（秒），None 表示一直等待
+
+    Returns:
+        协程的返回值
+    """
+    return run_async(coro, timeout)
+
+
+_warm_up_started = False
+_warm_up_lock = threading.Lock()
+
+
+def warm_up_pool_in_background(connections: Optional[int] = None) -> None:
+    """在后台 event loop 上异步预热连接池（每个进程只执行一次），不阻塞调用方"""
+    global _warm_up_started
+    with _warm_up_lock:
+        if _warm_up_started:
+            return
+        _warm_up_started = True
+    future = submit_async(warm_up_pool(connections))
+
+    def _report(done_future):
+        try:
+            warmed = done_future.result()
+            if warmed:
+                logger.info(f"数据库连接池已预热 {warmed} 条连接")
+            else:
+                logger.warning("数据库连接池预热未成功建立任何连接，将在首次查询时建连")
+        except Exception as e:
+            logger.warning(f"数据库连接池预热失败: {e}")
+
+    future.add_done_callback(_report)
@@ -6,8 +6,9 @@ Deep Search Agent主类
 import json
 import os
 import re
+import sys
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Callable, Dict, Any, List
 from loguru import logger
 from .llms import LLMClient
 from .nodes import (
@@ -22,6 +23,16 @@ from .state import State
 from .tools import BochaMultimodalSearch, BochaResponse
 from .utils import settings, Settings, format_search_results_for_prompt
 
+# 添加utils目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(current_dir)
+utils_dir = os.path.join(root_dir, 'utils')
+if utils_dir not in sys.path:
+    sys.path.append(utils_dir)
+
+from paragraph_scheduler import ParagraphScheduler
+from report_manifest import record_report
+
 
 class DeepSearchAgent:
     """Deep Search Agent主类"""
@@ -130,6 +141,28 @@ class DeepSearchAgent:
             logger.info(f"  ⚠️  未知的搜索工具: {tool_name}，使用默认综合搜索")
             return self.search_agency.comprehensive_search(query)
     
+    def execute_search_tools(self, tool_name: str, queries: List[str], **kwargs) -> BochaResponse:
+        """
+        使用同一个搜索工具并发执行多个查询，结果按URL去重合并
+        
+        Args:
+            tool_name: 工具名称，可选值同 execute_search_tool
+            queries: 搜索查询列表，只有一个查询时等同于 execute_search_tool
+            **kwargs: 额外参数（如max_results）
+            
+        Returns:
+            合并后的BochaResponse对象
+        """
+        if len(queries) == 1:
+            return self.execute_search_tool(tool_name, queries[0], **kwargs)
+        
+        logger.info(f"  → 并发执行搜索工具: {tool_name} × {len(queries)}")
+        
+        if tool_name not in self.search_agency.TOOL_PARAMS:
+            logger.warning(f"  ⚠️  未知的搜索工具: {tool_name}，使用默认综合搜索")
+            tool_name = "comprehensive_search"
+        return self.search_agency.search_many(tool_name, queries, **kwargs)
+    
     def research(self, query: str, save_report: bool = True) -> str:
         """
         执行深度研究
@@ -161,6 +194,10 @@ class DeepSearchAgent:
             
             logger.info(f"\n{'='*60}")
             logger.info("深度研究完成！")
+            if self.llm_client.response_cache is not None:
+                logger.info(f"LLM响应缓存统计: {self.llm_client.response_cache.get_stats()}")
+            if self.search_agency.search_cache is not None:
+                logger.info(f"搜索响应缓存统计: {self.search_agency.search_cache.get_stats()}")
             logger.info(f"{'='*60}")
             
             return final_report
@@ -186,11 +223,19 @@ class DeepSearchAgent:
             _message += f"\n  {i}. {paragraph.title}"
         logger.info(_message)
     
-    def _process_paragraphs(self):
-        """处理所有段落"""
+    def _process_paragraphs(self, on_paragraph_complete: Optional[Callable[[int, int], None]] = None):
+        """
+        处理所有段落
+        
+        报告结构生成后各段落相互独立，按 MEDIA_ENGINE_PARAGRAPH_CONCURRENCY 并发处理，
+        每个段落只写入自己在 State 中的位置，最终报告仍按段落顺序生成
+        
+        Args:
+            on_paragraph_complete: 段落完成回调，参数为(段落索引, 已完成段落数)，在调用线程中执行
+        """
         total_paragraphs = len(self.state.paragraphs)
         
-        for i in range(total_paragraphs):
+        def process_paragraph(i: int):
             logger.info(f"\n[步骤 2.{i+1}] 处理段落: {self.state.paragraphs[i].title}")
             logger.info("-" * 50)
             
@@ -201,10 +246,16 @@ class DeepSearchAgent:
             self._reflection_loop(i)
             
             # 标记段落完成
-            self.state.paragraphs[i].research.mark_completed()
-            
-            progress = (i + 1) / total_paragraphs * 100
-            logger.info(f"段落处理完成 ({progress:.1f}%)")
+            self.state.mark_paragraph_completed(i)
+        
+        def report_progress(i: int, completed: int):
+            progress = completed / total_paragraphs * 100
+            logger.info(f"段落 {i + 1} 处理完成 ({progress:.1f}%)")
+            if on_paragraph_complete:
+                on_paragraph_complete(i, completed)
+        
+        scheduler = ParagraphScheduler(self.config.MEDIA_ENGINE_PARAGRAPH_CONCURRENCY)
+        scheduler.run(total_paragraphs, process_paragraph, on_complete=report_progress)
     
     def _initial_search_and_summary(self, paragraph_index: int):
         """执行初始搜索和总结"""
@@ -220,10 +271,13 @@ class DeepSearchAgent:
         logger.info("  - 生成搜索查询...")
         search_output = self.first_search_node.run(search_input)
         search_query = search_output["search_query"]
+        search_queries = search_output.get("search_queries", [search_query])[:max(1, self.config.MEDIA_ENGINE_SEARCH_FANOUT)]
         search_tool = search_output.get("search_tool", "comprehensive_search")  # 默认工具
         reasoning = search_output["reasoning"]
         
         logger.info(f"  - 搜索查询: {search_query}")
+        if len(search_queries) > 1:
+            logger.info(f"  - 补充查询: {search_queries[1:]}")
         logger.info(f"  - 选择的工具: {search_tool}")
         logger.info(f"  - 推理: {reasoning}")
         
@@ -236,13 +290,15 @@ class DeepSearchAgent:
             # 这些工具支持max_results参数
             search_kwargs["max_results"] = 10
         
-        search_response = self.execute_search_tool(search_tool, search_query, **search_kwargs)
+        search_response = self.execute_search_tools(search_tool, search_queries, **search_kwargs)
+        # 多个查询合并记录到搜索历史和总结输入中
+        search_query = " | ".join(search_queries)
         
         # 转换为兼容格式
         search_results = []
         if search_response and search_response.webpages:
-            # 每种搜索工具都有其特定的结果数量，这里取前10个作为上限
-            max_results = min(len(search_response.webpages), 10)
+            # 每种搜索工具都有其特定的结果数量，这里每个查询取前10个作为上限
+            max_results = min(len(search_response.webpages), 10 * len(search_queries))
             for result in search_response.webpages[:max_results]:
                 search_results.append({
                     'title': result.name,
@@ -263,7 +319,7 @@ class DeepSearchAgent:
             logger.info("  - 未找到搜索结果")
         
         # 更新状态中的搜索历史
-        paragraph.research.add_search_results(search_query, search_results)
+        self.state.add_paragraph_search_results(paragraph_index, search_query, search_results)
         
         # 生成初始总结
         logger.info("  - 生成初始总结...")
@@ -300,10 +356,13 @@ class DeepSearchAgent:
             # 生成反思搜索查询
             reflection_output = self.reflection_node.run(reflection_input)
             search_query = reflection_output["search_query"]
+            search_queries = reflection_output.get("search_queries", [search_query])[:max(1, self.config.MEDIA_ENGINE_SEARCH_FANOUT)]
             search_tool = reflection_output.get("search_tool", "comprehensive_search")  # 默认工具
             reasoning = reflection_output["reasoning"]
             
             logger.info(f"    反思查询: {search_query}")
+            if len(search_queries) > 1:
+                logger.info(f"    补充查询: {search_queries[1:]}")
             logger.info(f"    选择的工具: {search_tool}")
             logger.info(f"    反思推理: {reasoning}")
             
@@ -314,13 +373,14 @@ class DeepSearchAgent:
                 # 这些工具支持max_results参数
                 search_kwargs["max_results"] = 10
             
-            search_response = self.execute_search_tool(search_tool, search_query, **search_kwargs)
+            search_response = self.execute_search_tools(search_tool, search_queries, **search_kwargs)
+            search_query = " | ".join(search_queries)
             
             # 转换为兼容格式
             search_results = []
             if search_response and search_response.webpages:
-                # 每种搜索工具都有其特定的结果数量，这里取前10个作为上限
-                max_results = min(len(search_response.webpages), 10)
+                # 每种搜索工具都有其特定的结果数量，这里每个查询取前10个作为上限
+                max_results = min(len(search_response.webpages), 10 * len(search_queries))
                 for result in search_response.webpages[:max_results]:
                     search_results.append({
                         'title': result.name,
@@ -341,7 +401,7 @@ class DeepSearchAgent:
                 logger.info("    未找到反思搜索结果")
             
             # 更新搜索历史
-            paragraph.research.add_search_results(search_query, search_results)
+            self.state.add_paragraph_search_results(paragraph_index, search_query, search_results)
             
             # 生成反思总结
             reflection_summary_input = {
@@ -405,6 +465,9 @@ class DeepSearchAgent:
         
         logger.info(f"报告已保存到: {filepath}")
         
+        # 登记到报告清单，供ReportEngine按查询查找
+        record_report(self.config.OUTPUT_DIR, "media", self.state.query, filepath)
+        
         # 保存状态（如果配置允许）
         if self.config.SAVE_INTERMEDIATE_STATES:
             state_filename = f"state_{query_safe}_{timestamp}.json"
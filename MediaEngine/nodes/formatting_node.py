@@ -69,9 +69,10 @@ class ReportFormattingNode(BaseNode):
             logger.info("正在格式化最终报告")
             
             # 调用LLM生成Markdown格式
-            response = self.llm_client.invoke(
+            response = self.llm_client.stream_invoke_to_string(
                 SYSTEM_PROMPT_REPORT_FORMATTING,
                 message,
+                label=self.node_name,
             )
             
             # 处理响应
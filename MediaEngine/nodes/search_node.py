@@ -4,7 +4,7 @@
 """
 
 import json
-from typing import Dict, Any
+from typing import Dict, Any, List
 from json.decoder import JSONDecodeError
 from loguru import logger
 
@@ -18,6 +18,27 @@ from ..utils.text_processing import (
 )
 
 
+def collect_search_queries(search_query: str, additional_queries: Any) -> List[str]:
+    """
+    合并主查询与LLM给出的补充查询（去空、去重，主查询在前）
+    
+    Args:
+        search_query: 主搜索查询
+        additional_queries: LLM输出中的additional_queries字段
+        
+    Returns:
+        查询列表
+    """
+    queries = [search_query]
+    if isinstance(additional_queries, str):
+        additional_queries = [additional_queries]
+    if isinstance(additional_queries, list):
+        for query in additional_queries:
+            if isinstance(query, str) and query.strip() and query.strip() not in queries:
+                queries.append(query.strip())
+    return queries
+
+
 class FirstSearchNode(BaseNode):
     """为段落生成首次搜索查询的节点"""
     
@@ -130,6 +151,7 @@ class FirstSearchNode(BaseNode):
             
             return {
                 "search_query": search_query,
+                "search_queries": collect_search_queries(search_query, result.get("additional_queries")),
                 "reasoning": reasoning
             }
             
@@ -265,6 +287,7 @@ class ReflectionNode(BaseNode):
             
             return {
                 "search_query": search_query,
+                "search_queries": collect_search_queries(search_query, result.get("additional_queries")),
                 "reasoning": reasoning
             }
             
@@ -33,6 +33,7 @@ output_schema_first_search = {
     "type": "object",
     "properties": {
         "search_query": {"type": "string"},
+        "additional_queries": {"type": "array", "items": {"type": "string"}, "description": "可选，最多2个从不同角度或换一种说法的补充查询，与search_query使用同一工具并行搜索"},
         "search_tool": {"type": "string"},
         "reasoning": {"type": "string"}
     },
@@ -76,6 +77,7 @@ output_schema_reflection = {
     "type": "object",
     "properties": {
         "search_query": {"type": "string"},
+        "additional_queries": {"type": "array", "items": {"type": "string"}, "description": "可选，最多2个从不同角度或换一种说法的补充查询，与search_query使用同一工具并行搜索"},
         "search_tool": {"type": "string"},
         "reasoning": {"type": "string"}
     },
@@ -167,7 +169,7 @@ SYSTEM_PROMPT_FIRST_SEARCH = f"""
 
 你的任务是：
 1. 根据段落主题选择最合适的搜索工具
-2. 制定最佳的搜索查询
+2. 制定最佳的搜索查询；如有必要，可在additional_queries中给出最多2个不同角度的补充查询
 3. 解释你的选择理由
 
 注意：所有工具都不需要额外参数，选择工具主要基于搜索意图和需要的信息类型。
@@ -280,7 +282,7 @@ SYSTEM_PROMPT_REFLECTION = f"""
 你的任务是：
 1. 反思段落文本的当前状态，思考是否遗漏了主题的某些关键方面
 2. 选择最合适的搜索工具来补充缺失信息
-3. 制定精确的搜索查询
+3. 制定精确的搜索查询；如有必要，可在additional_queries中给出最多2个不同角度的补充查询
 4. 解释你的选择和推理
 
 注意：所有工具都不需要额外参数，选择工具主要基于搜索意图和需要的信息类型。
@@ -6,6 +6,7 @@ Deep Search Agent状态管理
 from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional
 import json
+import threading
 from datetime import datetime
 
 
@@ -141,7 +142,12 @@ class Paragraph:
 
 @dataclass
 class State:
-    """整个报告的状态"""
+    """
+    整个报告的状态
+
+    段落可能被多个线程并发处理，并发写入统一通过 update_paragraph_summary、
+    add_paragraph_search_results、mark_paragraph_completed 完成
+    """
     query: str = ""                                                # 原始查询
     report_title: str = ""                                         # 报告标题
     paragraphs: List[Paragraph] = field(default_factory=list)     # 段落列表
@@ -149,6 +155,7 @@ class State:
     is_completed: bool = False                                     # 是否完成
     created_at: str = field(default_factory=lambda: datetime.now().isoformat())
     updated_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    _lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False, compare=False)
     
     def add_paragraph(self, title: str, content: str) -> int:
         """
@@ -161,11 +168,12 @@ class State:
         Returns:
             段落索引
         """
-        order = len(self.paragraphs)
-        paragraph = Paragraph(title=title, content=content, order=order)
-        self.paragraphs.append(paragraph)
-        self.update_timestamp()
-        return order
+        with self._lock:
+            order = len(self.paragraphs)
+            paragraph = Paragraph(title=title, content=content, order=order)
+            self.paragraphs.append(paragraph)
+            self.update_timestamp()
+            return order
     
     def get_paragraph(self, index: int) -> Optional[Paragraph]:
         """获取指定索引的段落"""
@@ -173,6 +181,36 @@ class State:
             return self.paragraphs[index]
         return None
     
+    def update_paragraph_summary(self, index: int, summary: str, is_reflection: bool = False):
+        """
+        写入段落的最新总结
+        
+        Args:
+            index: 段落索引
+            summary: 总结内容
+            is_reflection: 是否为反思总结（会增加反思次数）
+        """
+        with self._lock:
+            if not 0 <= index < len(self.paragraphs):
+                raise ValueError(f"段落索引 {index} 超出范围")
+            research = self.paragraphs[index].research
+            research.latest_summary = summary
+            if is_reflection:
+                research.increment_reflection()
+            self.update_timestamp()
+    
+    def add_paragraph_search_results(self, index: int, query: str, results: List[Dict[str, Any]]):
+        """向段落追加一次搜索的结果"""
+        with self._lock:
+            self.paragraphs[index].research.add_search_results(query, results)
+            self.update_timestamp()
+    
+    def mark_paragraph_completed(self, index: int):
+        """标记段落研究完成"""
+        with self._lock:
+            self.paragraphs[index].research.mark_completed()
+            self.update_timestamp()
+    
     def get_completed_paragraphs_count(self) -> int:
         """获取已完成段落数量"""
         return sum(1 for p in self.paragraphs if p.is_completed())
@@ -210,15 +248,16 @@ class State:
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式"""
-        return {
-            "query": self.query,
-            "report_title": self.report_title,
-            "paragraphs": [p.to_dict() for p in self.paragraphs],
-            "final_report": self.final_report,
-            "is_completed": self.is_completed,
-            "created_at": self.created_at,
-            "updated_at": self.updated_at
-        }
+        with self._lock:
+            return {
+                "query": self.query,
+                "report_title": self.report_title,
+                "paragraphs": [p.to_dict() for p in self.paragraphs],
+                "final_report": self.final_report,
+                "is_completed": self.is_completed,
+                "created_at": self.created_at,
+                "updated_at": self.updated_at
+            }
     
     def to_json(self, indent: int = 2) -> str:
         """转换为JSON字符串"""
@@ -11,6 +11,7 @@
 核心特性:
 - 强大多模态能力: 能同时返回网页、图片、AI总结、追问建议，以及丰富的“模态卡”结构化数据。
 - 模态卡支持: 针对天气、股票、汇率、百科、医疗等特定查询，可直接返回结构化数据卡片，便于Agent直接解析和使用。
+- 异步并发: 请求通过 httpx.AsyncClient 连接池异步发出；`search_many` 用同一工具并发搜索多个查询并按URL合并结果。
 
 主要工具:
 - comprehensive_search: 执行全面搜索，返回网页、图片、AI总结及可能的模态卡。
@@ -20,6 +21,7 @@
 - search_last_week: 获取过去一周内的主要报道。
 """
 
+import asyncio
 import os
 import json
 import sys
@@ -28,11 +30,7 @@ from typing import List, Dict, Any, Optional, Literal
 from loguru import logger
 from config import settings
 
-# 运行前请确保已安装 requests 库: pip install requests
-try:
-    import requests
-except ImportError:
-    raise ImportError("requests 库未安装，请运行 `pip install requests` 进行安装。")
+import httpx
 
 # 添加utils目录到Python路径
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -41,10 +39,12 @@ utils_dir = os.path.join(root_dir, 'utils')
 if utils_dir not in sys.path:
     sys.path.append(utils_dir)
 
-from retry_helper import with_graceful_retry, SEARCH_API_RETRY_CONFIG
+from retry_helper import with_async_graceful_retry, SEARCH_API_RETRY_CONFIG
+from search_cache import get_search_cache
+from async_runner import run_async
 
 # --- 1. 数据结构定义 ---
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 
 @dataclass
 class WebpageResult:
@@ -85,6 +85,19 @@ class BochaResponse:
     images: List[ImageResult] = field(default_factory=list)
     modal_cards: List[ModalCardResult] = field(default_factory=list)
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BochaResponse":
+        """从 asdict() 的结果还原（用于读取搜索缓存）"""
+        return cls(
+            query=data.get('query'),
+            conversation_id=data.get('conversation_id'),
+            answer=data.get('answer'),
+            follow_ups=list(data.get('follow_ups', [])),
+            webpages=[WebpageResult(**item) for item in data.get('webpages', [])],
+            images=[ImageResult(**item) for item in data.get('images', [])],
+            modal_cards=[ModalCardResult(**item) for item in data.get('modal_cards', [])]
+        )
+
 
 # --- 2. 核心客户端与专用工具集 ---
 
@@ -96,11 +109,22 @@ class BochaMultimodalSearch:
 
     BOCHA_BASE_URL = settings.BOCHA_BASE_URL or "https://api.bochaai.com/v1/ai-search"
 
-    def __init__(self, api_key: Optional[str] = None):
+    # 各工具的固定搜索参数（query 之外），max_results 对应 count
+    TOOL_PARAMS: Dict[str, Dict[str, Any]] = {
+        "comprehensive_search": {"count": 10, "answer": True},
+        "web_search_only": {"count": 15, "answer": False},
+        "search_for_structured_data": {"count": 5, "answer": True},  # 结构化查询通常不需要太多网页结果
+        "search_last_24_hours": {"freshness": "oneDay", "answer": True},
+        "search_last_week": {"freshness": "oneWeek", "answer": True},
+    }
+
+    def __init__(self, api_key: Optional[str] = None, timeout: float = 30.0, max_connections: int = 20):
         """
         初始化客户端。
         Args:
             api_key: Bocha API密钥，若不提供则从环境变量 BOCHA_API_KEY 读取。
+            timeout: 单次请求超时（秒）。
+            max_connections: 异步HTTP连接池的最大连接数。
         """
         if api_key is None:
             api_key = settings.BOCHA_WEB_SEARCH_API_KEY
@@ -112,6 +136,31 @@ class BochaMultimodalSearch:
             'Content-Type': 'application/json',
             'Accept': '*/*'
         }
+        self._timeout = timeout
+        self._max_connections = max_connections
+        # 连接池在后台 event loop 上首次请求时创建，所有段落线程共用
+        self._http_client: Optional[httpx.AsyncClient] = None
+        # 搜索响应缓存（SEARCH_CACHE_ENABLED=false 时为None）
+        self.search_cache = get_search_cache()
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                headers=self._headers,
+                timeout=self._timeout,
+                limits=httpx.Limits(
+                    max_connections=self._max_connections,
+                    max_keepalive_connections=self._max_connections
+                )
+            )
+        return self._http_client
+
+    def _tool_params(self, tool_name: str, query: str, max_results: Optional[int] = None) -> Dict[str, Any]:
+        """组合某个工具的搜索参数，max_results 为None时使用工具默认值"""
+        params = {"query": query, **self.TOOL_PARAMS[tool_name]}
+        if max_results is not None:
+            params["count"] = max_results
+        return params
 
     def _parse_search_response(self, response_dict: Dict[str, Any], query: str) -> BochaResponse:
         """从API的原始字典响应中解析出结构化的BochaResponse对象"""
@@ -171,9 +220,33 @@ class BochaMultimodalSearch:
         return final_response
 
 
-    @with_graceful_retry(SEARCH_API_RETRY_CONFIG, default_return=BochaResponse(query="搜索失败"))
     def _search_internal(self, **kwargs) -> BochaResponse:
         """内部通用的搜索执行器，所有工具最终都调用此方法"""
+        return run_async(self._search_internal_async(**kwargs))
+
+    async def _search_internal_async(self, **kwargs) -> BochaResponse:
+        """优先读取缓存，相同的并发请求只调用一次API"""
+        if self.search_cache is None:
+            return await self._search_remote(**kwargs)
+        return await self.search_cache.get_or_fetch(
+            self.search_cache.make_key("bocha", kwargs),
+            self._cache_kind(kwargs),
+            lambda: self._search_remote(**kwargs),
+            encode=asdict,
+            decode=BochaResponse.from_dict,
+            cacheable=lambda response: bool(
+                response.webpages or response.images or response.modal_cards or response.answer
+            )
+        )
+
+    @staticmethod
+    def _cache_kind(params: Dict[str, Any]) -> str:
+        """按时效性划分缓存类别：24小时内的搜索使用较短的TTL"""
+        return "recent" if params.get('freshness') == 'oneDay' else "default"
+
+    @with_async_graceful_retry(SEARCH_API_RETRY_CONFIG, default_return=BochaResponse(query="搜索失败"))
+    async def _search_remote(self, **kwargs) -> BochaResponse:
+        """调用Bocha API执行搜索"""
         query = kwargs.get("query", "Unknown Query")
         payload = {
             "stream": False,  # Agent工具通常使用非流式以获取完整结果
@@ -181,7 +254,7 @@ class BochaMultimodalSearch:
         payload.update(kwargs)
 
         try:
-            response = requests.post(self.BOCHA_BASE_URL, headers=self._headers, json=payload, timeout=30)
+            response = await self._get_http_client().post(self.BOCHA_BASE_URL, json=payload)
             response.raise_for_status()  # 如果HTTP状态码是4xx或5xx，则抛出异常
 
             response_dict = response.json()
@@ -191,13 +264,68 @@ class BochaMultimodalSearch:
 
             return self._parse_search_response(response_dict, query)
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.exception(f"搜索时发生网络错误: {str(e)}")
             raise e  # 让重试机制捕获并处理
         except Exception as e:
             logger.exception(f"处理响应时发生未知错误: {str(e)}")
             raise e  # 让重试机制捕获并处理
 
+    # --- 多查询并发 ---
+
+    def search_many(self, tool_name: str, queries: List[str], **kwargs) -> BochaResponse:
+        """
+        使用同一个工具并发搜索多个查询，并按URL合并结果。
+        Args:
+            tool_name: 工具名称（TOOL_PARAMS 中的键）。
+            queries: 查询列表。
+            **kwargs: 工具参数（如 max_results）。
+        """
+        logger.info(f"--- TOOL: {tool_name} 并发搜索 {len(queries)} 个查询 ({' | '.join(queries)}) ---")
+        params_list = [self._tool_params(tool_name, query, **kwargs) for query in queries]
+        return run_async(self._search_many_async(params_list))
+
+    async def _search_many_async(self, params_list: List[Dict[str, Any]]) -> BochaResponse:
+        responses = await asyncio.gather(*(self._search_internal_async(**params) for params in params_list))
+        return self.merge_responses([params["query"] for params in params_list], responses)
+
+    @staticmethod
+    def merge_responses(queries: List[str], responses: List[BochaResponse]) -> BochaResponse:
+        """
+        按URL合并多个查询的结果：各查询的网页交替排列，使截断后仍覆盖每个查询；
+        同一URL的网页、图片只保留一条，模态卡与追问按出现顺序去重。
+        """
+        webpages: Dict[str, WebpageResult] = {}
+        for rank in range(max((len(r.webpages) for r in responses), default=0)):
+            for response in responses:
+                if rank < len(response.webpages):
+                    page = response.webpages[rank]
+                    webpages.setdefault(page.url or f"{page.name}#{len(webpages)}", page)
+
+        images: Dict[str, ImageResult] = {}
+        modal_cards: List[ModalCardResult] = []
+        follow_ups: List[str] = []
+        for response in responses:
+            for image in response.images:
+                images.setdefault(image.content_url, image)
+            for card in response.modal_cards:
+                if card not in modal_cards:
+                    modal_cards.append(card)
+            for follow_up in response.follow_ups:
+                if follow_up not in follow_ups:
+                    follow_ups.append(follow_up)
+
+        answers = [r.answer for r in responses if r.answer]
+        return BochaResponse(
+            query=" | ".join(queries),
+            conversation_id=next((r.conversation_id for r in responses if r.conversation_id), None),
+            answer="\n\n".join(answers) if answers else None,
+            follow_ups=follow_ups,
+            webpages=list(webpages.values()),
+            images=list(images.values()),
+            modal_cards=modal_cards
+        )
+
     # --- Agent 可用的工具方法 ---
 
     def comprehensive_search(self, query: str, max_results: int = 10) -> BochaResponse:
@@ -207,11 +335,7 @@ class BochaMultimodalSearch:
         Agent可提供搜索查询(query)和可选的最大结果数(max_results)。
         """
         logger.info(f"--- TOOL: 全面综合搜索 (query: {query}) ---")
-        return self._search_internal(
-            query=query,
-            count=max_results,
-            answer=True  # 开启AI总结
-        )
+        return self._search_internal(**self._tool_params("comprehensive_search", query, max_results=max_results))
 
     def web_search_only(self, query: str, max_results: int = 15) -> BochaResponse:
         """
@@ -219,11 +343,7 @@ class BochaMultimodalSearch:
         适用于需要快速获取原始网页信息，而不需要AI额外分析的场景。速度更快，成本更低。
         """
         logger.info(f"--- TOOL: 纯网页搜索 (query: {query}) ---")
-        return self._search_internal(
-            query=query,
-            count=max_results,
-            answer=False # 关闭AI总结
-        )
+        return self._search_internal(**self._tool_params("web_search_only", query, max_results=max_results))
 
     def search_for_structured_data(self, query: str) -> BochaResponse:
         """
@@ -233,11 +353,7 @@ class BochaMultimodalSearch:
         """
         logger.info(f"--- TOOL: 结构化数据查询 (query: {query}) ---")
         # 实现上与 comprehensive_search 相同，但通过命名和文档引导Agent的意图
-        return self._search_internal(
-            query=query,
-            count=5, # 结构化查询通常不需要太多网页结果
-            answer=True
-        )
+        return self._search_internal(**self._tool_params("search_for_structured_data", query))
 
     def search_last_24_hours(self, query: str) -> BochaResponse:
         """
@@ -245,7 +361,7 @@ class BochaMultimodalSearch:
         此工具专门查找过去24小时内发布的内容。适用于追踪突发事件或最新进展。
         """
         logger.info(f"--- TOOL: 搜索24小时内信息 (query: {query}) ---")
-        return self._search_internal(query=query, freshness='oneDay', answer=True)
+        return self._search_internal(**self._tool_params("search_last_24_hours", query))
 
     def search_last_week(self, query: str) -> BochaResponse:
         """
@@ -253,7 +369,7 @@ class BochaMultimodalSearch:
         适用于进行周度舆情总结或回顾。
         """
         logger.info(f"--- TOOL: 搜索本周信息 (query: {query}) ---")
-        return self._search_internal(query=query, freshness='oneWeek', answer=True)
+        return self._search_internal(**self._tool_params("search_last_week", query))
 
 
 # --- 3. 测试与使用示例 ---
@@ -43,6 +43,8 @@ class Settings(BaseSettings):
     SEARCH_CONTENT_MAX_LENGTH: int = Field(20000, description="用于提示的最长内容长度")
     MAX_REFLECTIONS: int = Field(2, description="最大反思轮数")
     MAX_PARAGRAPHS: int = Field(5, description="最大段落数")
+    MEDIA_ENGINE_PARAGRAPH_CONCURRENCY: int = Field(3, description="同时研究的段落数上限，1表示逐段顺序处理；遇到API限流时自动降低")
+    MEDIA_ENGINE_SEARCH_FANOUT: int = Field(3, description="每次搜索/反思最多并发执行的查询数（主查询+补充查询），1表示只搜索主查询")
     
     MINDSPIDER_API_KEY: Optional[str] = Field(None, description="MindSpider API密钥")
     MINDSPIDER_BASE_URL: Optional[str] = Field("https://api.deepseek.com", description="MindSpider LLM接口BaseUrl")
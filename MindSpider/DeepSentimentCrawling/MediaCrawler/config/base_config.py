@@ -24,6 +24,19 @@ IP_PROXY_POOL_COUNT = 2
 # 代理IP提供商名称
 IP_PROXY_PROVIDER_NAME = "kuaidaili"  # kuaidaili | wandouhttp
 
+# 各平台 API client 复用同一个 httpx 连接池，以下为连接池配置
+# 最大并发连接数
+HTTPX_MAX_CONNECTIONS = 20
+
+# 最大保持的空闲长连接数
+HTTPX_MAX_KEEPALIVE_CONNECTIONS = 10
+
+# 空闲长连接的保持时间（秒）
+HTTPX_KEEPALIVE_EXPIRY = 30.0
+
+# 是否启用 HTTP/2（需要安装 h2：pip install httpx[http2]，未安装时自动使用 HTTP/1.1）
+HTTPX_ENABLE_HTTP2 = True
+
 # 设置为True不会打开浏览器（无头浏览器）
 # 设置False会打开一个浏览器
 # 小红书如果一直扫码登录不通过，打开浏览器手动过一下滑动验证码
@@ -60,8 +73,18 @@ BROWSER_LAUNCH_TIMEOUT = 30
 # 设置为False可以保持浏览器运行，便于调试
 AUTO_CLOSE_BROWSER = True
 
-# 数据保存类型选项配置,支持五种类型：csv、db、json、sqlite、postgresql, 最好保存到DB，有排重的功能。
-SAVE_DATA_OPTION = "postgresql"  # csv or db or json or sqlite or postgresql
+# 数据保存类型选项配置,支持六种类型：csv、db、json、jsonl、sqlite、postgresql, 最好保存到DB，有排重的功能。
+# 保存为文件时推荐 jsonl：每条数据追加一行，json 每写一条都要重写整个文件，数据量大时会越来越慢
+SAVE_DATA_OPTION = "postgresql"  # csv or db or json or jsonl or sqlite or postgresql
+
+# jsonl 模式：缓冲多少条数据后追加写入文件
+JSONL_FLUSH_BATCH_SIZE = 200
+
+# jsonl 模式：缓冲区定时写入间隔（秒）
+JSONL_FLUSH_INTERVAL = 2.0
+
+# jsonl 模式：fsync 间隔（秒），限制进程或机器异常退出时丢失的数据量
+JSONL_FSYNC_INTERVAL = 5.0
 
 # 用户浏览器缓存的浏览器文件配置
 USER_DATA_DIR = "%s_user_data_dir"  # %s will be replaced by platform name
@@ -27,6 +27,11 @@ mysql_db_config = {
 }
 
 
+# 数据库批量写入：每张表缓冲的最大条数，以及后台定时写入间隔（秒）
+DB_BULK_BATCH_SIZE = int(os.getenv("DB_BULK_BATCH_SIZE", 500))
+DB_BULK_FLUSH_INTERVAL = float(os.getenv("DB_BULK_FLUSH_INTERVAL", 2.0))
+
+
 # redis config
 REDIS_DB_HOST = "127.0.0.1"  # your redis host
 REDIS_DB_PWD = os.getenv("REDIS_DB_PWD", "123456")  # your redis password
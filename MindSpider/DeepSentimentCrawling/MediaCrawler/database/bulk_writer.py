@@ -0,0 +1,295 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 数据库批量写入：按表缓冲爬取结果，攒够数量或到达时间间隔后批量 upsert
+
+import asyncio
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, bindparam, inspect, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+import config
+from database.db_session import get_async_engine
+from tools import utils
+
+
+class _TableBuffer:
+    """单表的待写入缓冲区，按业务主键去重（同一主键后到的字段覆盖先到的）"""
+
+    def __init__(self, table, key_columns: Sequence[str], update_columns: Optional[Sequence[str]]):
+        self.table = table
+        self.key_columns: Tuple[str, ...] = tuple(key_columns)
+        self.update_columns = tuple(update_columns) if update_columns is not None else None
+        self.rows: Dict[Tuple, Dict] = {}
+        self.lock = asyncio.Lock()
+
+    def key_of(self, row: Dict) -> Tuple:
+        # 统一转成字符串比较，避免 "123" 与 123 被当成两条记录
+        return tuple(str(row.get(col)) for col in self.key_columns)
+
+    def columns_to_update(self, columns: Sequence[str]) -> List[str]:
+        """冲突时需要更新的列：不含业务主键和 add_ts（保留首次入库时间）"""
+        candidates = self.update_columns if self.update_columns is not None else columns
+        return [col for col in candidates if col in columns and col not in self.key_columns and col != "add_ts"]
+
+
+class BulkUpsertWriter:
+    """
+    异步批量 upsert 写入器
+
+    - 每张表一个缓冲区，达到 batch_size 条时立即写入，其余由后台任务每 flush_interval 秒写入一次
+    - 表上存在与业务主键一致的唯一索引时使用数据库原生 upsert：
+      MySQL INSERT ... ON DUPLICATE KEY UPDATE，PostgreSQL/SQLite INSERT ... ON CONFLICT DO UPDATE
+    - 否则（老库没有唯一索引）回退为每批一次 SELECT 已有主键 + 批量 INSERT + 批量 UPDATE
+    - 整批写入失败时逐条重试，坏数据只影响自身
+    - update_existing 只更新已有数据：先合并到缓冲区中尚未写入的同主键数据，缓冲区中没有时才更新数据库
+    - 爬虫结束时必须调用 close()，把缓冲区中剩余的数据写入数据库
+    """
+
+    def __init__(self, engine: AsyncEngine, batch_size: int = 500, flush_interval: float = 2.0):
+        self.engine = engine
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        self._buffers: Dict[str, _TableBuffer] = {}
+        self._native_upsert: Dict[str, bool] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def add(self, model, item: Dict, key_columns: Sequence[str], update_columns: Optional[Sequence[str]] = None):
+        """
+        缓冲一条待写入的数据
+        Args:
+            model: ORM 模型类
+            item: 数据字典，不属于该表的字段会被忽略
+            key_columns: 业务主键列（如 comment_id），用于判断新增还是更新
+            update_columns: 已存在时需要更新的列，默认为除主键和 add_ts 外的全部列
+
+        Returns:
+
+        """
+        table = model.__table__
+        row = {key: value for key, value in item.items() if key in table.c}
+        if any(row.get(col) is None for col in key_columns):
+            # 没有业务主键无法去重，直接插入
+            async with self.engine.begin() as conn:
+                await conn.execute(table.insert(), [row])
+            self.rows_written += 1
+            return
+
+        buffer = self._buffers.get(table.name)
+        if buffer is None:
+            buffer = self._buffers[table.name] = _TableBuffer(table, key_columns, update_columns)
+
+        if not self._merge_into_pending(buffer, row):
+            buffer.rows[buffer.key_of(row)] = row
+
+        self._ensure_flush_task()
+        if len(buffer.rows) >= self.batch_size:
+            await self._flush_buffer(buffer)
+
+    async def update_existing(self, model, item: Dict, key_columns: Sequence[str]) -> bool:
+        """
+        只更新已存在的数据，不存在时不新增
+        Args:
+            model: ORM 模型类
+            item: 数据字典，不属于该表的字段会被忽略
+            key_columns: 业务主键列
+
+        Returns:
+            是否找到并更新了数据（缓冲区中尚未写入的数据同样算已存在）
+        """
+        table = model.__table__
+        row = {key: value for key, value in item.items() if key in table.c}
+        if any(row.get(col) is None for col in key_columns):
+            return False
+
+        buffer = self._buffers.get(table.name)
+        if buffer is None:
+            return await self._update_rows(table, key_columns, row)
+        if self._merge_into_pending(buffer, row):
+            return True
+        async with buffer.lock:
+            # 等正在进行的写入完成后再查数据库；等待期间新缓冲的同主键数据同样合并
+            if self._merge_into_pending(buffer, row):
+                return True
+            return await self._update_rows(table, key_columns, row)
+
+    @staticmethod
+    def _merge_into_pending(buffer: _TableBuffer, row: Dict) -> bool:
+        """把数据合并到缓冲区中同主键的待写入数据（保留先到的 add_ts），没有时返回 False"""
+        pending = buffer.rows.get(buffer.key_of(row))
+        if pending is None:
+            return False
+        if "add_ts" in pending:
+            row = {key: value for key, value in row.items() if key != "add_ts"}
+        pending.update(row)
+        return True
+
+    async def _update_rows(self, table, key_columns: Sequence[str], row: Dict) -> bool:
+        values = {col: value for col, value in row.items() if col not in key_columns and col != "add_ts"}
+        if not values:
+            return False
+        stmt = update(table).where(and_(*[table.c[col] == row[col] for col in key_columns])).values(values)
+        async with self.engine.begin() as conn:
+            result = await conn.execute(stmt)
+        return result.rowcount > 0
+
+    async def flush(self):
+        """把所有缓冲区写入数据库"""
+        for buffer in list(self._buffers.values()):
+            await self._flush_buffer(buffer)
+
+    async def close(self):
+        """停止后台定时写入，并写入剩余数据"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+        utils.logger.info(f"[BulkUpsertWriter.close] flushed, total rows written: {self.rows_written}")
+
+    def _ensure_flush_task(self):
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_periodically())
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def _flush_buffer(self, buffer: _TableBuffer):
+        async with buffer.lock:
+            if not buffer.rows:
+                return
+            rows = list(buffer.rows.values())
+            buffer.rows = {}
+            try:
+                await self._write(buffer, rows)
+                return
+            except Exception as e:
+                utils.logger.error(f"[BulkUpsertWriter] batch write to {buffer.table.name} failed ({len(rows)} rows), retry one by one: {e}")
+
+            for row in rows:
+                try:
+                    await self._write(buffer, [row])
+                except Exception as e:
+                    utils.logger.error(f"[BulkUpsertWriter] write to {buffer.table.name} failed, row dropped: {e}")
+
+    async def _write(self, buffer: _TableBuffer, rows: List[Dict]):
+        async with self.engine.begin() as conn:
+            native = await self._supports_native_upsert(conn, buffer)
+            # executemany 要求每组参数的键一致
+            groups: Dict[Tuple[str, ...], List[Dict]] = {}
+            for row in rows:
+                groups.setdefault(tuple(sorted(row)), []).append(row)
+            for columns, group in groups.items():
+                if native:
+                    await conn.execute(self._upsert_statement(buffer, columns), group)
+                else:
+                    await self._select_then_write(conn, buffer, columns, group)
+        self.rows_written += len(rows)
+
+    async def _supports_native_upsert(self, conn: AsyncConnection, buffer: _TableBuffer) -> bool:
+        """表上是否有与业务主键完全一致的唯一索引/约束（结果按表缓存）"""
+        name = buffer.table.name
+        if name in self._native_upsert:
+            return self._native_upsert[name]
+
+        def unique_column_sets(sync_conn):
+            inspector = inspect(sync_conn)
+            column_sets = [set(uc["column_names"]) for uc in inspector.get_unique_constraints(name)]
+            column_sets += [set(ix["column_names"]) for ix in inspector.get_indexes(name) if ix.get("unique")]
+            return column_sets
+
+        supported = False
+        if self.engine.dialect.name in ("mysql", "postgresql", "sqlite"):
+            supported = set(buffer.key_columns) in await conn.run_sync(unique_column_sets)
+        if not supported:
+            utils.logger.info(f"[BulkUpsertWriter] no unique index on {name}({', '.join(buffer.key_columns)}), using batched select + insert/update")
+        self._native_upsert[name] = supported
+        return supported
+
+    def _upsert_statement(self, buffer: _TableBuffer, columns: Sequence[str]):
+        update_columns = buffer.columns_to_update(columns)
+        if self.engine.dialect.name == "mysql":
+            from sqlalchemy.dialects.mysql import insert
+            stmt = insert(buffer.table)
+            # 没有需要更新的列时用 key = key 作为空操作
+            assignments = update_columns or buffer.key_columns[:1]
+            return stmt.on_duplicate_key_update({col: stmt.inserted[col] for col in assignments})
+
+        if self.engine.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(buffer.table)
+        if not update_columns:
+            return stmt.on_conflict_do_nothing(index_elements=list(buffer.key_columns))
+        return stmt.on_conflict_do_update(
+            index_elements=list(buffer.key_columns),
+            set_={col: stmt.excluded[col] for col in update_columns},
+        )
+
+    async def _select_then_write(self, conn: AsyncConnection, buffer: _TableBuffer, columns: Sequence[str], rows: List[Dict]):
+        table = buffer.table
+        key_cols = [table.c[col] for col in buffer.key_columns]
+        if len(key_cols) == 1:
+            condition = key_cols[0].in_([row[buffer.key_columns[0]] for row in rows])
+        else:
+            condition = tuple_(*key_cols).in_([tuple(row[col] for col in buffer.key_columns) for row in rows])
+        result = await conn.execute(select(*key_cols).where(condition))
+        existing = {tuple(str(value) for value in record) for record in result.all()}
+
+        new_rows = [row for row in rows if buffer.key_of(row) not in existing]
+        old_rows = [row for row in rows if buffer.key_of(row) in existing]
+        if new_rows:
+            await conn.execute(table.insert(), new_rows)
+
+        update_columns = buffer.columns_to_update(columns)
+        if old_rows and update_columns:
+            stmt = (
+                update(table)
+                .where(and_(*[table.c[col] == bindparam(f"_key_{col}") for col in buffer.key_columns]))
+                .values({col: bindparam(f"_val_{col}") for col in update_columns})
+            )
+            params = [
+                {**{f"_val_{col}": row[col] for col in update_columns}, **{f"_key_{col}": row[col] for col in buffer.key_columns}}
+                for row in old_rows
+            ]
+            await conn.execute(stmt, params)
+
+
+_bulk_writer: Optional[BulkUpsertWriter] = None
+
+
+def get_bulk_writer() -> BulkUpsertWriter:
+    """获取当前存储方式对应的全局批量写入器（各 StoreFactory 每次都会新建 store，缓冲区需要进程内共享）"""
+    global _bulk_writer
+    if _bulk_writer is None:
+        _bulk_writer = BulkUpsertWriter(
+            get_async_engine(config.SAVE_DATA_OPTION),
+            batch_size=config.DB_BULK_BATCH_SIZE,
+            flush_interval=config.DB_BULK_FLUSH_INTERVAL,
+        )
+    return _bulk_writer
+
+
+async def close_bulk_writer():
+    """写入剩余数据并释放全局批量写入器"""
+    global _bulk_writer
+    if _bulk_writer is not None:
+        writer, _bulk_writer = _bulk_writer, None
+        await writer.close()
@@ -12,7 +12,8 @@ if str(project_root) not in sys.path:
     sys.path.append(str(project_root))
 
 from tools import utils
-from database.db_session import create_tables
+from database.db_session import create_tables, dispose_engines
+from database.bulk_writer import close_bulk_writer
 
 async def init_table_schema(db_type: str):
     """
@@ -30,6 +31,8 @@ async def init_db(db_type: str = None):
 
 async def close():
     """
-    Placeholder for closing database connections if needed in the future.
+    Flush buffered writes and close database connections.
+    Safe to call more than once.
     """
-    pass
+    await close_bulk_writer()
+    await dispose_engines()
@@ -25,6 +25,8 @@ from media_platform.weibo import WeiboCrawler
 from media_platform.xhs import XiaoHongShuCrawler
 from media_platform.zhihu import ZhihuCrawler
 from tools.async_file_writer import AsyncFileWriter
+from tools.httpx_client import close_all_http_clients
+from tools.jsonl_writer import close_jsonl_writer
 from var import crawler_type_var
 
 
@@ -72,11 +74,17 @@ async def main():
 
 
     crawler = CrawlerFactory.create_crawler(platform=config.PLATFORM)
-    await crawler.start()
+    try:
+        await crawler.start()
+    finally:
+        await close_all_http_clients()
+        # 写入批量写入器中尚未落库的数据
+        await db.close()
+        await close_jsonl_writer()
 
     # Generate wordcloud after crawling is complete
-    # Only for JSON save mode
-    if config.SAVE_DATA_OPTION == "json" and config.ENABLE_GET_WORDCLOUD:
+    # Only for JSON/JSONL save mode
+    if config.SAVE_DATA_OPTION in ["json", "jsonl"] and config.ENABLE_GET_WORDCLOUD:
         try:
             file_writer = AsyncFileWriter(
                 platform=config.PLATFORM,
@@ -91,8 +99,11 @@ def cleanup():
     if crawler:
         # asyncio.run(crawler.close())
         pass
-    if config.SAVE_DATA_OPTION in ["db", "sqlite"]:
-        asyncio.run(db.close())
+    if config.SAVE_DATA_OPTION in ["db", "sqlite", "postgresql"]:
+        # 与爬虫使用同一个 event loop，数据库连接绑定在该 loop 上
+        asyncio.get_event_loop().run_until_complete(db.close())
+    if config.SAVE_DATA_OPTION == "jsonl":
+        asyncio.get_event_loop().run_until_complete(close_jsonl_writer())
 
 
 if __name__ == "__main__":
@@ -538,6 +538,9 @@ class BilibiliCrawler(AbstractCrawler):
 
     async def close(self):
         """Close browser context"""
+        # 关闭 API client 复用的连接池
+        if getattr(self, "bili_client", None):
+            await self.bili_client.close()
         try:
             # 如果使用CDP模式，需要特殊处理
             if self.cdp_manager:
@@ -362,6 +362,9 @@ class DouYinCrawler(AbstractCrawler):
 
     async def close(self) -> None:
         """Close browser context"""
+        # 关闭 API client 复用的连接池
+        if getattr(self, "dy_client", None):
+            await self.dy_client.close()
         # 如果使用CDP模式，需要特殊处理
         if self.cdp_manager:
             await self.cdp_manager.cleanup()
@@ -15,12 +15,12 @@ import json
 from typing import Any, Callable, Dict, List, Optional
 from urllib.parse import urlencode
 
-import httpx
 from playwright.async_api import BrowserContext, Page
 
 import config
 from base.base_crawler import AbstractApiClient
 from tools import utils
+from tools.httpx_client import PooledHttpxClient
 
 from .exception import DataFetchError
 from .graphql import KuaiShouGraphQL
@@ -38,15 +38,31 @@ class KuaiShouClient(AbstractApiClient):
     ):
         self.proxy = proxy
         self.timeout = timeout
+        self.http_client = PooledHttpxClient(proxy)
         self.headers = headers
         self._host = "https://www.kuaishou.com/graphql"
         self.playwright_page = playwright_page
         self.cookie_dict = cookie_dict
         self.graphql = KuaiShouGraphQL()
 
+    async def update_proxy(self, proxy: Optional[str]):
+        """
+        更换代理，关闭旧连接池，之后的请求使用新代理
+        Args:
+            proxy: 新的代理地址
+
+        Returns:
+
+        """
+        self.proxy = proxy
+        await self.http_client.update_proxy(proxy)
+
+    async def close(self):
+        """关闭 httpx 连接池"""
+        await self.http_client.aclose()
+
     async def request(self, method, url, **kwargs) -> Any:
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            response = await client.request(method, url, timeout=self.timeout, **kwargs)
+        response = await self.http_client.request(method, url, timeout=self.timeout, **kwargs)
         data: Dict = response.json()
         if data.get("errors"):
             raise DataFetchError(data.get("errors", "unkonw error"))
@@ -10,6 +10,7 @@
 
 import asyncio
 import json
+from http.cookiejar import DefaultCookiePolicy
 from typing import Any, Callable, Dict, List, Optional, Union
 from urllib.parse import urlencode, quote
 
@@ -48,6 +49,13 @@ class BaiduTieBaClient(AbstractApiClient):
         self._page_extractor = TieBaExtractor()
         self.default_ip_proxy = default_ip_proxy
         self.playwright_page = playwright_page  # Playwright页面对象
+        # 复用连接池（keep-alive），不保存响应中的 Set-Cookie，每次请求仍只使用 self.headers 中的 Cookie
+        self._session = requests.Session()
+        self._session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+    async def close(self):
+        """关闭 requests 连接池"""
+        await asyncio.to_thread(self._session.close)
 
     def _sync_request(self, method, url, proxy=None, **kwargs):
         """
@@ -70,7 +78,7 @@ class BaiduTieBaClient(AbstractApiClient):
             }
 
         # 发送请求
-        response = requests.request(
+        response = self._session.request(
             method=method,
             url=url,
             headers=self.headers,
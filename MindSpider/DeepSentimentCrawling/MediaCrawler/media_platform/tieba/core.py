@@ -662,6 +662,9 @@ class TieBaCrawler(AbstractCrawler):
         Returns:
 
         """
+        # 关闭 API client 复用的连接池
+        if getattr(self, "tieba_client", None):
+            await self.tieba_client.close()
         # 如果使用CDP模式，需要特殊处理
         if self.cdp_manager:
             await self.cdp_manager.cleanup()
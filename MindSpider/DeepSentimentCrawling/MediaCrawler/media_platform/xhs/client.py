@@ -21,6 +21,7 @@ from tenacity import retry, stop_after_attempt, wait_fixed
 import config
 from base.base_crawler import AbstractApiClient
 from tools import utils
+from tools.httpx_client import PooledHttpxClient
 
 
 from .exception import DataFetchError, IPBlockError
@@ -43,6 +44,7 @@ class XiaoHongShuClient(AbstractApiClient):
     ):
         self.proxy = proxy
         self.timeout = timeout
+        self.http_client = PooledHttpxClient(proxy)
         self.headers = headers
         self._host = "https://edith.xiaohongshu.com"
         self._domain = "https://www.xiaohongshu.com"
@@ -54,6 +56,22 @@ class XiaoHongShuClient(AbstractApiClient):
         self.cookie_dict = cookie_dict
         self._extractor = XiaoHongShuExtractor()
 
+    async def update_proxy(self, proxy: Optional[str]):
+        """
+        更换代理，关闭旧连接池，之后的请求使用新代理
+        Args:
+            proxy: 新的代理地址
+
+        Returns:
+
+        """
+        self.proxy = proxy
+        await self.http_client.update_proxy(proxy)
+
+    async def close(self):
+        """关闭 httpx 连接池"""
+        await self.http_client.aclose()
+
     async def _pre_headers(self, url: str, data=None) -> Dict:
         """
         请求头参数签名
@@ -96,8 +114,7 @@ class XiaoHongShuClient(AbstractApiClient):
         """
         # return response.text
         return_response = kwargs.pop("return_response", False)
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            response = await client.request(method, url, timeout=self.timeout, **kwargs)
+        response = await self.http_client.request(method, url, timeout=self.timeout, **kwargs)
 
         if response.status_code == 471 or response.status_code == 461:
             # someday someone maybe will bypass captcha
@@ -156,24 +173,23 @@ class XiaoHongShuClient(AbstractApiClient):
         )
 
     async def get_note_media(self, url: str) -> Union[bytes, None]:
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            try:
-                response = await client.request("GET", url, timeout=self.timeout)
-                response.raise_for_status()
-                if not response.reason_phrase == "OK":
-                    utils.logger.error(
-                        f"[XiaoHongShuClient.get_note_media] request {url} err, res:{response.text}"
-                    )
-                    return None
-                else:
-                    return response.content
-            except (
-                httpx.HTTPError
-            ) as exc:  # some wrong when call httpx.request method, such as connection error, client error, server error or response status code is not 2xx
+        try:
+            response = await self.http_client.request("GET", url, timeout=self.timeout)
+            response.raise_for_status()
+            if not response.reason_phrase == "OK":
                 utils.logger.error(
-                    f"[XiaoHongShuClient.get_aweme_media] {exc.__class__.__name__} for {exc.request.url} - {exc}"
-                )  # 保留原始异常类型名称，以便开发者调试
+                    f"[XiaoHongShuClient.get_note_media] request {url} err, res:{response.text}"
+                )
                 return None
+            else:
+                return response.content
+        except (
+            httpx.HTTPError
+        ) as exc:  # some wrong when call httpx.request method, such as connection error, client error, server error or response status code is not 2xx
+            utils.logger.error(
+                f"[XiaoHongShuClient.get_aweme_media] {exc.__class__.__name__} for {exc.request.url} - {exc}"
+            )  # 保留原始异常类型名称，以便开发者调试
+            return None
 
     async def pong(self) -> bool:
         """
@@ -21,12 +21,11 @@ import pathlib
 from typing import Dict
 
 import aiofiles
-from sqlalchemy import select
 from sqlalchemy.orm import sessionmaker
 
 import config
 from base.base_crawler import AbstractStore
-from database.db_session import get_session
+from database.bulk_writer import get_bulk_writer
 from database.models import BilibiliVideoComment, BilibiliVideo, BilibiliUpInfo, BilibiliUpDynamic, BilibiliContactInfo
 from tools.async_file_writer import AsyncFileWriter
 from tools import utils, words
@@ -112,28 +111,22 @@ class BiliCsvStoreImplement(AbstractStore):
 
 
 class BiliDbStoreImplement(AbstractStore):
+    @staticmethod
+    def _as_int(item: Dict, key: str):
+        # 确保 ID 为整数类型，匹配数据库 BigInteger 字段
+        value = item.get(key)
+        if value is not None and not isinstance(value, int):
+            item[key] = int(value)
+
     async def store_content(self, content_item: Dict):
         """
         Bilibili content DB storage implementation
         Args:
             content_item: content item dict
         """
-        video_id = content_item.get("video_id")
-        # 确保 video_id 为整数类型，匹配数据库 BigInteger 字段
-        if video_id is not None:
-            video_id = int(video_id) if not isinstance(video_id, int) else video_id
-        async with get_session() as session:
-            result = await session.execute(select(BilibiliVideo).where(BilibiliVideo.video_id == video_id))
-            video_detail = result.scalar_one_or_none()
-
-            if not video_detail:
-                content_item["add_ts"] = utils.get_current_timestamp()
-                new_content = BilibiliVideo(**content_item)
-                session.add(new_content)
-            else:
-                for key, value in content_item.items():
-                    setattr(video_detail, key, value)
-            await session.commit()
+        self._as_int(content_item, "video_id")
+        content_item["add_ts"] = utils.get_current_timestamp()
+        await get_bulk_writer().add(BilibiliVideo, content_item, key_columns=["video_id"])
 
     async def store_comment(self, comment_item: Dict):
         """
@@ -141,22 +134,9 @@ class BiliDbStoreImplement(AbstractStore):
         Args:
             comment_item: comment item dict
         """
-        comment_id = comment_item.get("comment_id")
-        # 确保 comment_id 为整数类型，匹配数据库 BigInteger 字段
-        if comment_id is not None:
-            comment_id = int(comment_id) if not isinstance(comment_id, int) else comment_id
-        async with get_session() as session:
-            result = await session.execute(select(BilibiliVideoComment).where(BilibiliVideoComment.comment_id == comment_id))
-            comment_detail = result.scalar_one_or_none()
-
-            if not comment_detail:
-                comment_item["add_ts"] = utils.get_current_timestamp()
-                new_comment = BilibiliVideoComment(**comment_item)
-                session.add(new_comment)
-            else:
-                for key, value in comment_item.items():
-                    setattr(comment_detail, key, value)
-            await session.commit()
+        self._as_int(comment_item, "comment_id")
+        comment_item["add_ts"] = utils.get_current_timestamp()
+        await get_bulk_writer().add(BilibiliVideoComment, comment_item, key_columns=["comment_id"])
 
     async def store_creator(self, creator: Dict):
         """
@@ -164,22 +144,9 @@ class BiliDbStoreImplement(AbstractStore):
         Args:
             creator: creator item dict
         """
-        creator_id = creator.get("user_id")
-        # 确保 creator_id 为整数类型，匹配数据库 BigInteger 字段
-        if creator_id is not None:
-            creator_id = int(creator_id) if not isinstance(creator_id, int) else creator_id
-        async with get_session() as session:
-            result = await session.execute(select(BilibiliUpInfo).where(BilibiliUpInfo.user_id == creator_id))
-            creator_detail = result.scalar_one_or_none()
-
-            if not creator_detail:
-                creator["add_ts"] = utils.get_current_timestamp()
-                new_creator = BilibiliUpInfo(**creator)
-                session.add(new_creator)
-            else:
-                for key, value in creator.items():
-                    setattr(creator_detail, key, value)
-            await session.commit()
+        self._as_int(creator, "user_id")
+        creator["add_ts"] = utils.get_current_timestamp()
+        await get_bulk_writer().add(BilibiliUpInfo, creator, key_columns=["user_id"])
 
     async def store_contact(self, contact_item: Dict):
         """
@@ -187,27 +154,10 @@ class BiliDbStoreImplement(AbstractStore):
         Args:
             contact_item: contact item dict
         """
-        up_id = contact_item.get("up_id")
-        fan_id = contact_item.get("fan_id")
-        # 确保 up_id 和 fan_id 为整数类型，匹配数据库 BigInteger 字段
-        if up_id is not None:
-            up_id = int(up_id) if not isinstance(up_id, int) else up_id
-        if fan_id is not None:
-            fan_id = int(fan_id) if not isinstance(fan_id, int) else fan_id
-        async with get_session() as session:
-            result = await session.execute(
-                select(BilibiliContactInfo).where(BilibiliContactInfo.up_id == up_id, BilibiliContactInfo.fan_id == fan_id)
-            )
-            contact_detail = result.scalar_one_or_none()
-
-            if not contact_detail:
-                contact_item["add_ts"] = utils.get_current_timestamp()
-                new_contact = BilibiliContactInfo(**contact_item)
-                session.add(new_contact)
-            else:
-                for key, value in contact_item.items():
-                    setattr(contact_detail, key, value)
-            await session.commit()
+        self._as_int(contact_item, "up_id")
+        self._as_int(contact_item, "fan_id")
+        contact_item["add_ts"] = utils.get_current_timestamp()
+        await get_bulk_writer().add(BilibiliContactInfo, contact_item, key_columns=["up_id", "fan_id"])
 
     async def store_dynamic(self, dynamic_item):
         """
@@ -215,19 +165,8 @@ class BiliDbStoreImplement(AbstractStore):
         Args:
             dynamic_item: dynamic item dict
         """
-        dynamic_id = dynamic_item.get("dynamic_id")
-        async with get_session() as session:
-            result = await session.execute(select(BilibiliUpDynamic).where(BilibiliUpDynamic.dynamic_id == dynamic_id))
-            dynamic_detail = result.scalar_one_or_none()
-
-            if not dynamic_detail:
-                dynamic_item["add_ts"] = utils.get_current_timestamp()
-                new_dynamic = BilibiliUpDynamic(**dynamic_item)
-                session.add(new_dynamic)
-            else:
-                for key, value in dynamic_item.items():
-                    setattr(dynamic_detail, key, value)
-            await session.commit()
+        dynamic_item["add_ts"] = utils.get_current_timestamp()
+        await get_bulk_writer().add(BilibiliUpDynamic, dynamic_item, key_columns=["dynamic_id"])
 
 
 class BiliJsonStoreImplement(AbstractStore):
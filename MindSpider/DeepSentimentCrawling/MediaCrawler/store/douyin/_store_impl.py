@@ -19,11 +19,9 @@ import os
 import pathlib
 from typing import Dict
 
-from sqlalchemy import select
-
 import config
 from base.base_crawler import AbstractStore
-from database.db_session import get_session
+from database.bulk_writer import get_bulk_writer
 from database.models import DouyinAweme, DouyinAwemeComment, DyCreator
 from tools import utils, words
 from tools.async_file_writer import AsyncFileWriter
@@ -87,20 +85,12 @@ class DouyinDbStoreImplement(AbstractStore):
         Args:
             content_item: content item dict
         """
-        aweme_id = content_item.get("aweme_id")
-        async with get_session() as session:
-            result = await session.execute(select(DouyinAweme).where(DouyinAweme.aweme_id == aweme_id))
-            aweme_detail = result.scalar_one_or_none()
-
-            if not aweme_detail:
-                content_item["add_ts"] = utils.get_current_timestamp()
-                if content_item.get("title"):
-                    new_content = DouyinAweme(**content_item)
-                    session.add(new_content)
-            else:
-                for key, value in content_item.items():
-                    setattr(aweme_detail, key, value)
-            await session.commit()
+        if not content_item.get("title"):
+            # 无标题的内容只更新已有记录（包括尚未写入的缓冲数据），不新增
+            await get_bulk_writer().update_existing(DouyinAweme, content_item, key_columns=["aweme_id"])
+            return
+        content_item["add_ts"] = utils.get_current_timestamp()
+        await get_bulk_writer().add(DouyinAweme, content_item, key_columns=["aweme_id"])
 
     async def store_comment(self, comment_item: Dict):
         """
@@ -108,19 +98,8 @@ class DouyinDbStoreImplement(AbstractStore):
         Args:
             comment_item: comment item dict
         """
-        comment_id = comment_item.get("comment_id")
-        async with get_session() as session:
-            result = await session.execute(select(DouyinAwemeComment).where(DouyinAwemeComment.comment_id == comment_id))
-            comment_detail = result.scalar_one_or_none()
-
-            if not comment_detail:
-                comment_item["add_ts"] = utils.get_current_timestamp()
-                new_comment = DouyinAwemeComment(**comment_item)
-                session.add(new_comment)
-            else:
-                for key, value in comment_item.items():
-                    setattr(comment_detail, key, value)
-            await session.commit()
+        comment_item["add_ts"] = utils.get_current_timestamp()
+        await get_bulk_writer().add(DouyinAwemeComment, comment_item, key_columns=["comment_id"])
 
     async def store_creator(self, creator: Dict):
         """
@@ -128,19 +107,8 @@ class DouyinDbStoreImplement(AbstractStore):
         Args:
             creator: creator dict
         """
-        user_id = creator.get("user_id")
-        async with get_session() as session:
-            result = await session.execute(select(DyCreator).where(DyCreator.user_id == user_id))
-            user_detail = result.scalar_one_or_none()
-
-            if not user_detail:
-                creator["add_ts"] = utils.get_current_timestamp()
-                new_creator = DyCreator(**creator)
-                session.add(new_creator)
-            else:
-                for key, value in creator.items():
-                    setattr(user_detail, key, value)
-            await session.commit()
+        creator["add_ts"] = utils.get_current_timestamp()
+        await get_bulk_writer().add(DyCreator, creator, key_columns=["user_id"])
 
 
 class DouyinJsonStoreImplement(AbstractStore):
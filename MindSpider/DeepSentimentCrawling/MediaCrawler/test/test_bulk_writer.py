@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# @Desc    : 批量 upsert 写入器测试（SQLite 临时库）
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from database.bulk_writer import BulkUpsertWriter
+from database.models import Base, DouyinAweme, WeiboNoteComment, XhsNote
+
+
+class TestBulkUpsertWriter(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.db_dir = tempfile.TemporaryDirectory()
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(self.db_dir.name, 'test.db')}")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.writer = BulkUpsertWriter(self.engine, batch_size=3, flush_interval=60)
+
+    async def asyncTearDown(self):
+        await self.writer.close()
+        await self.engine.dispose()
+        self.db_dir.cleanup()
+
+    async def _comments(self):
+        async with self.engine.connect() as conn:
+            result = await conn.execute(
+                select(WeiboNoteComment.comment_id, WeiboNoteComment.content, WeiboNoteComment.add_ts)
+                .order_by(WeiboNoteComment.comment_id)
+            )
+            return [tuple(row) for row in result.all()]
+
+    async def test_flush_on_batch_size(self):
+        for i in range(2):
+            await self.writer.add(WeiboNoteComment, {"comment_id": i, "content": f"c{i}"}, ["comment_id"])
+        self.assertEqual(await self._comments(), [])
+        await self.writer.add(WeiboNoteComment, {"comment_id": 2, "content": "c2"}, ["comment_id"])
+        self.assertEqual(len(await self._comments()), 3)
+
+    async def test_upsert_keeps_add_ts_and_updates_fields(self):
+        await self.writer.add(WeiboNoteComment, {"comment_id": 1, "content": "old", "add_ts": 100}, ["comment_id"])
+        await self.writer.flush()
+        await self.writer.add(WeiboNoteComment, {"comment_id": 1, "content": "new", "add_ts": 200}, ["comment_id"])
+        await self.writer.close()
+        self.assertEqual(await self._comments(), [(1, "new", 100)])
+
+    async def test_duplicate_keys_in_one_batch_are_merged(self):
+        await self.writer.add(WeiboNoteComment, {"comment_id": 1, "content": "a", "add_ts": 1}, ["comment_id"])
+        await self.writer.add(WeiboNoteComment, {"comment_id": "1", "content": "b", "add_ts": 2}, ["comment_id"])
+        await self.writer.close()
+        self.assertEqual(await self._comments(), [(1, "b", 1)])
+
+    async def test_update_columns_limit_updated_fields(self):
+        await self.writer.add(XhsNote, {"note_id": "n1", "title": "t1", "liked_count": "1"}, ["note_id"], update_columns=["liked_count"])
+        await self.writer.flush()
+        await self.writer.add(XhsNote, {"note_id": "n1", "title": "t2", "liked_count": "9"}, ["note_id"], update_columns=["liked_count"])
+        await self.writer.close()
+        async with self.engine.connect() as conn:
+            row = (await conn.execute(select(XhsNote.title, XhsNote.liked_count))).one()
+        self.assertEqual(tuple(row), ("t1", "9"))
+
+    async def test_fallback_without_unique_index(self):
+        async with self.engine.begin() as conn:
+            # 模拟唯一索引加入之前建的老库
+            await conn.execute(text("DROP INDEX ix_weibo_note_comment_comment_id"))
+            await conn.execute(text("CREATE INDEX ix_weibo_note_comment_comment_id ON weibo_note_comment (comment_id)"))
+        await self.writer.add(WeiboNoteComment, {"comment_id": 1, "content": "old", "add_ts": 100}, ["comment_id"])
+        await self.writer.flush()
+        await self.writer.add(WeiboNoteComment, {"comment_id": 1, "content": "new"}, ["comment_id"])
+        await self.writer.add(WeiboNoteComment, {"comment_id": 2, "content": "other"}, ["comment_id"])
+        await self.writer.close()
+        self.assertFalse(self.writer._native_upsert["weibo_note_comment"])
+        self.assertEqual(await self._comments(), [(1, "new", 100), (2, "other", None)])
+
+    async def _awemes(self):
+        async with self.engine.connect() as conn:
+            result = await conn.execute(
+                select(DouyinAweme.aweme_id, DouyinAweme.title, DouyinAweme.liked_count, DouyinAweme.add_ts)
+                .order_by(DouyinAweme.aweme_id)
+            )
+            return [tuple(row) for row in result.all()]
+
+    async def test_update_existing_merges_into_buffered_row(self):
+        await self.writer.add(DouyinAweme, {"aweme_id": 1, "title": "t", "liked_count": "1", "add_ts": 100}, ["aweme_id"])
+        # 数据仍在缓冲区中，尚未写入数据库
+        self.assertTrue(await self.writer.update_existing(DouyinAweme, {"aweme_id": "1", "liked_count": "5", "add_ts": 200}, ["aweme_id"]))
+        self.assertEqual(await self._awemes(), [])
+        await self.writer.close()
+        self.assertEqual(await self._awemes(), [(1, "t", "5", 100)])
+
+    async def test_update_existing_updates_written_row(self):
+        await self.writer.add(DouyinAweme, {"aweme_id": 1, "title": "t", "liked_count": "1", "add_ts": 100}, ["aweme_id"])
+        await self.writer.flush()
+        self.assertTrue(await self.writer.update_existing(DouyinAweme, {"aweme_id": 1, "liked_count": "7"}, ["aweme_id"]))
+        self.assertEqual(await self._awemes(), [(1, "t", "7", 100)])
+
+    async def test_update_existing_does_not_insert(self):
+        self.assertFalse(await self.writer.update_existing(DouyinAweme, {"aweme_id": 2, "liked_count": "7"}, ["aweme_id"]))
+        await self.writer.close()
+        self.assertEqual(await self._awemes(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
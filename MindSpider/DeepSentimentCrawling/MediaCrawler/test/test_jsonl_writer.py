@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# @Desc    : jsonl 追加写入、流式读取与导出测试
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.jsonl_writer import JsonlWriterRegistry, compact_jsonl, export_jsonl_to_json, iter_json_items, iter_jsonl
+
+
+class TestJsonlWriter(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "search_comments.jsonl")
+        self.writer = JsonlWriterRegistry(batch_size=3, flush_interval=60, fsync_interval=60)
+
+    async def asyncTearDown(self):
+        await self.writer.close()
+        self.tmp_dir.cleanup()
+
+    async def test_buffered_append_and_close(self):
+        await self.writer.write(self.path, {"comment_id": 1, "content": "一"})
+        await self.writer.write(self.path, {"comment_id": 2, "content": "二"})
+        self.assertFalse(os.path.exists(self.path))
+        await self.writer.write(self.path, {"comment_id": 3, "content": "三"})
+        self.assertEqual([item["comment_id"] for item in iter_jsonl(self.path)], [1, 2, 3])
+
+        await self.writer.write(self.path, {"comment_id": 4, "content": "四"})
+        await self.writer.close()
+        self.assertEqual([item["comment_id"] for item in iter_jsonl(self.path)], [1, 2, 3, 4])
+
+    def test_iter_jsonl_skips_truncated_last_line(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write('{"comment_id": 1}\n\n{"comment_id": 2}\n{"comment_id": 3, "cont')
+        self.assertEqual([item["comment_id"] for item in iter_jsonl(self.path)], [1, 2])
+
+    def _write_lines(self, items):
+        with open(self.path, "w", encoding="utf-8") as f:
+            for item in items:
+                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+
+    def test_export_matches_legacy_json_array(self):
+        items = [{"note_id": "a", "title": "标题", "tags": ["x", "y"]}, {"note_id": "b", "title": "t2", "tags": []}]
+        self._write_lines(items)
+        dst = os.path.join(self.tmp_dir.name, "search_contents.json")
+        self.assertEqual(export_jsonl_to_json(self.path, dst), 2)
+        with open(dst, encoding="utf-8") as f:
+            content = f.read()
+        self.assertEqual(content, json.dumps(items, ensure_ascii=False, indent=4))
+        self.assertEqual(list(iter_json_items(dst)), items)
+
+    def test_export_empty_file(self):
+        self._write_lines([])
+        dst = os.path.join(self.tmp_dir.name, "empty.json")
+        self.assertEqual(export_jsonl_to_json(self.path, dst), 0)
+        with open(dst, encoding="utf-8") as f:
+            self.assertEqual(json.load(f), [])
+
+    def test_dedupe_keeps_last_occurrence(self):
+        self._write_lines([
+            {"comment_id": 1, "note_id": "n", "content": "old"},
+            {"comment_id": 2, "note_id": "n", "content": "other"},
+            {"comment_id": 1, "note_id": "n", "content": "new"},
+            {"content": "no key"},
+        ])
+        self.assertEqual(compact_jsonl(self.path, ["comment_id", "note_id"]), 3)
+        self.assertEqual([item["content"] for item in iter_jsonl(self.path)], ["other", "new", "no key"])
+
+
+if __name__ == '__main__':
+    unittest.main()
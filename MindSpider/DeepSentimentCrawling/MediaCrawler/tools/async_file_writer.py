@@ -3,17 +3,20 @@ import csv
 import json
 import os
 import pathlib
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional
 import aiofiles
 import config
+from tools.jsonl_writer import get_jsonl_writer, iter_json_items
 from tools.utils import utils
 from tools.words import AsyncWordCloudGenerator
 
 class AsyncFileWriter:
-    def __init__(self, platform: str, crawler_type: str):
+    def __init__(self, platform: str, crawler_type: str, json_lines: Optional[bool] = None):
         self.lock = asyncio.Lock()
         self.platform = platform
         self.crawler_type = crawler_type
+        # SAVE_DATA_OPTION=jsonl 时 write_single_item_to_json 改为追加写入 .jsonl
+        self.json_lines = config.SAVE_DATA_OPTION == "jsonl" if json_lines is None else json_lines
         self.wordcloud_generator = AsyncWordCloudGenerator() if config.ENABLE_GET_WORDCLOUD else None
 
     def _get_file_path(self, file_type: str, item_type: str) -> str:
@@ -32,7 +35,22 @@ class AsyncFileWriter:
                     await writer.writeheader()
                 await writer.writerow(item)
 
+    async def write_to_jsonl(self, item: Dict, item_type: str):
+        """
+        Append one item as a line to the .jsonl file.
+        Lines are buffered per file and appended in batches with periodic fsync,
+        call tools.jsonl_writer.close_jsonl_writer() before exit to write the rest.
+        """
+        file_path = self._get_file_path('jsonl', item_type)
+        await get_jsonl_writer().write(file_path, item)
+
     async def write_single_item_to_json(self, item: Dict, item_type: str):
+        if self.json_lines:
+            await self.write_to_jsonl(item, item_type)
+            return
+
+        # Legacy JSON array: every call reads and rewrites the whole file, O(N^2) for N items.
+        # Prefer SAVE_DATA_OPTION=jsonl and export with tools/jsonl_export.py when an array is needed.
         file_path = self._get_file_path('json', item_type)
         async with self.lock:
             existing_data = []
@@ -52,6 +70,19 @@ class AsyncFileWriter:
             async with aiofiles.open(file_path, 'w', encoding='utf-8') as f:
                 await f.write(json.dumps(existing_data, ensure_ascii=False, indent=4))
 
+    @staticmethod
+    def _iter_comment_contents(comments_file_path: str) -> Iterator[Dict]:
+        """
+        Yield {'content': text} for each comment, keeping only the text field
+        Handle different comment data structures across platforms
+        """
+        for comment in iter_json_items(comments_file_path):
+            if isinstance(comment, dict):
+                # Try different possible content field names
+                content_text = comment.get('content') or comment.get('comment_text') or comment.get('text') or ''
+                if content_text:
+                    yield {'content': content_text}
+
     async def generate_wordcloud_from_comments(self):
         """
         Generate wordcloud from comments data
@@ -64,44 +95,26 @@ class AsyncFileWriter:
             return
 
         try:
-            # Read comments from JSON file
-            comments_file_path = self._get_file_path('json', 'comments')
+            # Read comments from JSONL (streamed line by line) or legacy JSON file
+            file_type = 'jsonl' if self.json_lines else 'json'
+            comments_file_path = self._get_file_path(file_type, 'comments')
             if not os.path.exists(comments_file_path) or os.path.getsize(comments_file_path) == 0:
                 utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] No comments file found at {comments_file_path}")
                 return
 
-            async with aiofiles.open(comments_file_path, 'r', encoding='utf-8') as f:
-                content = await f.read()
-                if not content:
-                    utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] Comments file is empty")
-                    return
-
-                comments_data = json.loads(content)
-                if not isinstance(comments_data, list):
-                    comments_data = [comments_data]
-
-            # Filter comments data to only include 'content' field
-            # Handle different comment data structures across platforms
-            filtered_data = []
-            for comment in comments_data:
-                if isinstance(comment, dict):
-                    # Try different possible content field names
-                    content_text = comment.get('content') or comment.get('comment_text') or comment.get('text') or ''
-                    if content_text:
-                        filtered_data.append({'content': content_text})
-
-            if not filtered_data:
-                utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] No valid comment content found")
-                return
-
-            # Generate wordcloud
+            # Generate wordcloud, comments are consumed lazily so the file is never fully loaded (jsonl)
             words_base_path = f"data/{self.platform}/words"
             pathlib.Path(words_base_path).mkdir(parents=True, exist_ok=True)
             words_file_prefix = f"{words_base_path}/{self.crawler_type}_comments_{utils.get_current_date()}"
 
-            utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] Generating wordcloud from {len(filtered_data)} comments")
-            await self.wordcloud_generator.generate_word_frequency_and_cloud(filtered_data, words_file_prefix)
-            utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] Wordcloud generated successfully at {words_file_prefix}")
+            utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] Generating wordcloud from {comments_file_path}")
+            comment_count = await self.wordcloud_generator.generate_word_frequency_and_cloud(
+                self._iter_comment_contents(comments_file_path), words_file_prefix
+            )
+            if not comment_count:
+                utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] No valid comment content found")
+                return
+            utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] Wordcloud generated successfully at {words_file_prefix} from {comment_count} comments")
 
         except Exception as e:
             utils.logger.error(f"[AsyncFileWriter.generate_wordcloud_from_comments] Error generating wordcloud: {e}")
\ No newline at end of file
@@ -0,0 +1,84 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 各平台 API client 共用的长连接 httpx.AsyncClient
+
+import importlib.util
+import weakref
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Optional
+
+import httpx
+
+import config
+from tools import utils
+
+_live_clients: "weakref.WeakSet[PooledHttpxClient]" = weakref.WeakSet()
+
+# HTTP/2 需要可选依赖 h2（pip install httpx[http2]），未安装时使用 HTTP/1.1 keep-alive
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class PooledHttpxClient:
+    """
+    持有一个长期复用的 httpx.AsyncClient
+
+    - 连接池复用 TCP/TLS 连接（keep-alive），安装 h2 时启用 HTTP/2
+    - 不保存响应中的 Set-Cookie：各平台 client 每次请求都显式带 Cookie 请求头，
+      与之前每次请求新建 AsyncClient 的行为保持一致
+    - 切换代理时调用 update_proxy()，旧连接池关闭，下一次请求按新代理重建
+    - 爬虫结束时调用 aclose() 释放连接；main.py 退出前还会调用 close_all_http_clients() 兜底
+    """
+
+    def __init__(self, proxy: Optional[str] = None, **client_kwargs):
+        self.proxy = proxy
+        self._client_kwargs = client_kwargs
+        self._client: Optional[httpx.AsyncClient] = None
+        _live_clients.add(self)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                proxy=self.proxy,
+                http2=config.HTTPX_ENABLE_HTTP2 and HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_connections=config.HTTPX_MAX_CONNECTIONS,
+                    max_keepalive_connections=config.HTTPX_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=config.HTTPX_KEEPALIVE_EXPIRY,
+                ),
+                cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+                **self._client_kwargs,
+            )
+        return self._client
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        return await self.client.request(method, url, **kwargs)
+
+    async def update_proxy(self, proxy: Optional[str]):
+        """更换代理：关闭旧连接池，下一次请求使用新代理重建"""
+        if proxy == self.proxy:
+            return
+        utils.logger.info("[PooledHttpxClient.update_proxy] switch proxy, rebuild http client")
+        await self.aclose()
+        self.proxy = proxy
+
+    async def aclose(self):
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
+
+
+async def close_all_http_clients():
+    """关闭进程内所有尚未关闭的连接池"""
+    for pooled in list(_live_clients):
+        await pooled.aclose()
@@ -0,0 +1,75 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : jsonl 数据整理工具：按主键去重压缩，或导出为旧版 JSON 数组文件
+#
+# 用法（在 MediaCrawler 目录下）:
+#   python -m tools.jsonl_export --platform xhs                 # data/xhs/jsonl/*.jsonl -> data/xhs/json/*.json
+#   python -m tools.jsonl_export data/xhs/jsonl/search_comments_2025-01-01.jsonl --dedupe
+#   python -m tools.jsonl_export --platform xhs --compact       # 原地去重，不导出
+
+import argparse
+import glob
+import os
+import pathlib
+import sys
+from typing import List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.jsonl_writer import compact_jsonl, export_jsonl_to_json
+
+# 按顺序取第一个非空字段作为去重主键（评论数据同时带有 note_id，因此 comment_id 在前）
+DEFAULT_DEDUPE_FIELDS = ["comment_id", "dynamic_id", "note_id", "aweme_id", "video_id", "content_id", "user_id"]
+
+
+def _json_path_for(jsonl_path: str) -> str:
+    """data/<platform>/jsonl/x.jsonl -> data/<platform>/json/x.json"""
+    path = pathlib.Path(jsonl_path)
+    target_dir = path.parent.parent / "json" if path.parent.name == "jsonl" else path.parent
+    target_dir.mkdir(parents=True, exist_ok=True)
+    return str(target_dir / f"{path.stem}.json")
+
+
+def _collect_files(args) -> List[str]:
+    files = list(args.files)
+    if args.platform:
+        files += sorted(glob.glob(os.path.join(args.data_dir, args.platform, "jsonl", "*.jsonl")))
+    return files
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="jsonl 去重压缩 / 导出为 JSON 数组")
+    parser.add_argument("files", nargs="*", help="要处理的 .jsonl 文件")
+    parser.add_argument("--platform", help="处理 data/<platform>/jsonl 下的全部文件")
+    parser.add_argument("--data-dir", default="data", help="数据根目录")
+    parser.add_argument("--dedupe", action="store_true", help="导出时按主键去重，同一主键保留最后一次写入的数据")
+    parser.add_argument("--compact", action="store_true", help="只对 .jsonl 原地去重，不导出 JSON")
+    args = parser.parse_args()
+
+    files = _collect_files(args)
+    if not files:
+        parser.error("no .jsonl files given")
+
+    for file_path in files:
+        if args.compact:
+            kept = compact_jsonl(file_path, DEFAULT_DEDUPE_FIELDS)
+            print(f"compacted {file_path}: {kept} items")
+        else:
+            dst_path = _json_path_for(file_path)
+            exported = export_jsonl_to_json(file_path, dst_path, DEFAULT_DEDUPE_FIELDS if args.dedupe else None)
+            print(f"exported {file_path} -> {dst_path}: {exported} items")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
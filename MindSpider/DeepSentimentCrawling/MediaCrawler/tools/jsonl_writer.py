@@ -0,0 +1,223 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : JSON Lines 追加写入与流式读取：每条数据一行，写入只追加不重写
+
+import asyncio
+import json
+import os
+import time
+from typing import Dict, Iterable, Iterator, Optional, Sequence
+
+import config
+from tools import utils
+
+
+class JsonlFileBuffer:
+    """
+    单个 .jsonl 文件的追加缓冲区
+
+    - add() 只把序列化后的行放入内存，攒够 batch_size 行后在线程池中一次性追加到文件
+    - 距上次 fsync 超过 fsync_interval 秒时，写入后顺带 fsync，限制宕机时丢失的数据量
+    - 每个文件一把锁，不同平台/数据类型的文件互不阻塞
+    """
+
+    def __init__(self, file_path: str, batch_size: int = 200, fsync_interval: float = 5.0):
+        self.file_path = file_path
+        self.batch_size = max(1, batch_size)
+        self.fsync_interval = fsync_interval
+        self.lock = asyncio.Lock()
+        self._lines = []
+        self._last_fsync = time.monotonic()
+
+    def add(self, item: Dict) -> bool:
+        """缓冲一条数据，返回缓冲区是否已满需要写盘"""
+        self._lines.append(json.dumps(item, ensure_ascii=False) + "\n")
+        return len(self._lines) >= self.batch_size
+
+    async def flush(self, fsync: bool = False):
+        async with self.lock:
+            if not self._lines:
+                return
+            lines, self._lines = self._lines, []
+            fsync = fsync or time.monotonic() - self._last_fsync >= self.fsync_interval
+            await asyncio.to_thread(self._append, "".join(lines), fsync)
+            if fsync:
+                self._last_fsync = time.monotonic()
+
+    def _append(self, data: str, fsync: bool):
+        with open(self.file_path, "a", encoding="utf-8") as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+
+
+class JsonlWriterRegistry:
+    """进程内共享的 JSONL 缓冲区（各 StoreFactory 每次都会新建 store，缓冲区需要按文件共享）"""
+
+    def __init__(self, batch_size: int = 200, flush_interval: float = 2.0, fsync_interval: float = 5.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self._buffers: Dict[str, JsonlFileBuffer] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def write(self, file_path: str, item: Dict):
+        buffer = self._buffers.get(file_path)
+        if buffer is None:
+            buffer = self._buffers[file_path] = JsonlFileBuffer(file_path, self.batch_size, self.fsync_interval)
+        self._ensure_flush_task()
+        if buffer.add(item):
+            await buffer.flush()
+
+    async def flush(self, fsync: bool = False):
+        for buffer in list(self._buffers.values()):
+            await buffer.flush(fsync=fsync)
+
+    async def close(self):
+        """停止后台定时写入，写入剩余数据并 fsync"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush(fsync=True)
+
+    def _ensure_flush_task(self):
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_periodically())
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                utils.logger.error(f"[JsonlWriterRegistry] periodic flush failed: {e}")
+
+
+_jsonl_writer: Optional[JsonlWriterRegistry] = None
+
+
+def get_jsonl_writer() -> JsonlWriterRegistry:
+    """获取全局 JSONL 写入器"""
+    global _jsonl_writer
+    if _jsonl_writer is None:
+        _jsonl_writer = JsonlWriterRegistry(
+            batch_size=config.JSONL_FLUSH_BATCH_SIZE,
+            flush_interval=config.JSONL_FLUSH_INTERVAL,
+            fsync_interval=config.JSONL_FSYNC_INTERVAL,
+        )
+    return _jsonl_writer
+
+
+async def close_jsonl_writer():
+    """写入剩余数据并释放全局 JSONL 写入器"""
+    global _jsonl_writer
+    if _jsonl_writer is not None:
+        writer, _jsonl_writer = _jsonl_writer, None
+        await writer.close()
+
+
+def iter_jsonl(file_path: str) -> Iterator[Dict]:
+    """逐行读取 .jsonl 文件，跳过空行和无法解析的行（如进程中断时写了一半的最后一行）"""
+    with open(file_path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                utils.logger.warning(f"[iter_jsonl] skip malformed line {line_no} in {file_path}")
+
+
+def _dedupe_key(item: Dict, key_fields: Sequence[str]) -> Optional[str]:
+    for field in key_fields:
+        value = item.get(field)
+        if value not in (None, ""):
+            return f"{field}:{value}"
+    return None
+
+
+def _iter_latest(file_path: str, dedupe_fields: Optional[Sequence[str]]) -> Iterator[Dict]:
+    """流式读取，指定 dedupe_fields 时同一主键只产出最后一次写入的数据（先扫描一遍记录行号）"""
+    if not dedupe_fields:
+        yield from iter_jsonl(file_path)
+        return
+
+    last_index: Dict[str, int] = {}
+    for index, item in enumerate(iter_jsonl(file_path)):
+        key = _dedupe_key(item, dedupe_fields)
+        if key is not None:
+            last_index[key] = index
+
+    for index, item in enumerate(iter_jsonl(file_path)):
+        key = _dedupe_key(item, dedupe_fields)
+        if key is None or last_index[key] == index:
+            yield item
+
+
+def export_jsonl_to_json(src_path: str, dst_path: str, dedupe_fields: Optional[Sequence[str]] = None) -> int:
+    """
+    把 .jsonl 导出为旧版 JSON 数组文件（与 write_single_item_to_json 的输出格式一致）
+
+    边读边写，内存中不保留全部数据。指定 dedupe_fields 时按第一个非空字段去重，
+    同一主键只保留最后一次写入的数据。
+
+    Args:
+        src_path: .jsonl 源文件
+        dst_path: 导出的 .json 文件
+        dedupe_fields: 去重字段，如 ["comment_id", "note_id"]
+
+    Returns:
+        导出的条数
+    """
+    exported = 0
+    tmp_path = f"{dst_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as out:
+        out.write("[")
+        for item in _iter_latest(src_path, dedupe_fields):
+            body = json.dumps(item, ensure_ascii=False, indent=4)
+            # 与整体 json.dumps(list, indent=4) 的缩进保持一致
+            out.write(("," if exported else "") + "\n    " + body.replace("\n", "\n    "))
+            exported += 1
+        out.write("\n]" if exported else "]")
+    os.replace(tmp_path, dst_path)
+    return exported
+
+
+def compact_jsonl(file_path: str, dedupe_fields: Sequence[str]) -> int:
+    """按主键去重重写 .jsonl（保留每个主键最后一次写入的数据），返回保留的条数"""
+    kept = 0
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as out:
+        for item in _iter_latest(file_path, dedupe_fields):
+            out.write(json.dumps(item, ensure_ascii=False) + "\n")
+            kept += 1
+    os.replace(tmp_path, file_path)
+    return kept
+
+
+def iter_json_items(file_path: str) -> Iterable[Dict]:
+    """按扩展名读取爬取结果：.jsonl 流式逐行读取，旧版 .json 数组整体加载"""
+    if file_path.endswith(".jsonl"):
+        return iter_jsonl(file_path)
+    with open(file_path, "r", encoding="utf-8") as f:
+        content = f.read()
+    if not content:
+        return []
+    data = json.loads(content)
+    return data if isinstance(data, list) else [data]
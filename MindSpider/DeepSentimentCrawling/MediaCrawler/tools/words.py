@@ -12,7 +12,9 @@
 import asyncio
 import json
 import logging
+import os
 from collections import Counter
+from typing import Dict, Iterable
 
 import aiofiles
 import jieba
@@ -40,10 +42,19 @@ class AsyncWordCloudGenerator:
         with open(self.stop_words_file, 'r', encoding='utf-8') as f:
             return set(f.read().strip().split('\n'))
 
-    async def generate_word_frequency_and_cloud(self, data, save_words_prefix):
-        all_text = ' '.join(item['content'] for item in data)
-        words = [word for word in jieba.lcut(all_text) if word not in self.stop_words and len(word.strip()) > 0]
-        word_freq = Counter(words)
+    async def generate_word_frequency_and_cloud(self, data: Iterable[Dict], save_words_prefix) -> int:
+        """
+        统计词频并生成词云
+        data 可以是生成器（如逐行读取的 jsonl），逐条分词累加词频，不需要把全部文本拼接到内存
+        返回参与统计的条数；没有统计到任何词时不生成文件
+        """
+        word_freq = Counter()
+        count = 0
+        for item in data:
+            word_freq.update(word for word in jieba.lcut(item['content']) if word not in self.stop_words and len(word.strip()) > 0)
+            count += 1
+        if not word_freq:
+            return count
 
         # Save word frequency to file
         freq_file = f"{save_words_prefix}_word_freq.json"
@@ -53,9 +64,10 @@ class AsyncWordCloudGenerator:
         # Try to acquire the plot lock without waiting
         if plot_lock.locked():
             utils.logger.info("Skipping word cloud generation as the lock is held.")
-            return
+            return count
 
         await self.generate_word_cloud(word_freq, save_words_prefix)
+        return count
 
     async def generate_word_cloud(self, word_freq, save_words_prefix):
         await plot_lock.acquire()
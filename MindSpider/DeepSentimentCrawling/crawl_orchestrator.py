@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DeepSentimentCrawling模块 - 爬虫进程编排器
+在并发上限内同时运行多个平台的MediaCrawler子进程：
+- 实时逐行读取子进程输出并交给回调处理（统计解析、控制台转发）
+- 每个平台独立超时，超时或取消时先中断子进程组，让爬虫正常收尾，仍未退出再强制结束
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from loguru import logger
+
+# 终止子进程后等待其退出的时间（秒），超时后强制结束
+TERMINATE_GRACE_SECONDS = 10
+
+# 每个平台保留的最后若干行输出，用于失败时排查
+OUTPUT_TAIL_LINES = 50
+
+
+@dataclass
+class CrawlJob:
+    """单个平台的爬虫进程"""
+    platform: str
+    cmd: List[str]
+    cwd: Path
+    env: Dict[str, str] = field(default_factory=dict)
+    timeout: Optional[float] = None
+
+
+@dataclass
+class CrawlOutcome:
+    """爬虫进程的运行结果"""
+    platform: str
+    start_time: datetime
+    end_time: datetime
+    return_code: Optional[int] = None
+    timed_out: bool = False
+    cancelled: bool = False
+    error: Optional[str] = None
+    output_tail: List[str] = field(default_factory=list)
+
+    @property
+    def duration_seconds(self) -> float:
+        return (self.end_time - self.start_time).total_seconds()
+
+    @property
+    def success(self) -> bool:
+        return self.return_code == 0 and not self.timed_out and not self.cancelled
+
+
+class CrawlOrchestrator:
+    """并发运行多个平台的爬虫进程"""
+
+    def __init__(self, max_parallel: int = 3,
+                 on_line: Optional[Callable[[str, str], None]] = None):
+        """
+        Args:
+            max_parallel: 同时运行的进程数上限
+            on_line: 每读到一行输出时调用 on_line(platform, line)，在该平台的读取线程中执行
+        """
+        self.max_parallel = max(1, int(max_parallel))
+        self.on_line = on_line
+        self._procs: Dict[str, subprocess.Popen] = {}
+        # 平台 -> 终止原因（timeout / cancelled）
+        self._stop_reasons: Dict[str, str] = {}
+        self._cancel_all = threading.Event()
+        self._lock = threading.Lock()
+
+    def run(self, jobs: List[CrawlJob],
+            on_done: Optional[Callable[[CrawlOutcome], None]] = None) -> Dict[str, CrawlOutcome]:
+        """
+        运行所有任务并等待结束
+
+        Args:
+            jobs: 爬虫任务，平台名需唯一
+            on_done: 每个任务结束时调用
+
+        Returns:
+            平台 -> 运行结果
+        """
+        results: Dict[str, CrawlOutcome] = {}
+        if not jobs:
+            return results
+
+        workers = min(self.max_parallel, len(jobs))
+        logger.info(f"启动 {len(jobs)} 个平台爬虫进程，并发上限: {workers}")
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="crawl") as pool:
+            futures = [pool.submit(self._run_job, job) for job in jobs]
+            try:
+                for future in as_completed(futures):
+                    outcome = future.result()
+                    results[outcome.platform] = outcome
+                    if on_done is not None:
+                        on_done(outcome)
+            except KeyboardInterrupt:
+                # 子进程在独立的进程组中，收不到终端的中断信号，需要主动终止
+                logger.warning("收到中断信号，正在终止所有爬虫进程...")
+                self.cancel()
+                raise
+        return results
+
+    def cancel(self, platform: Optional[str] = None) -> None:
+        """取消指定平台（默认全部）的爬取，尚未启动的任务不再启动"""
+        with self._lock:
+            if platform is None:
+                self._cancel_all.set()
+                platforms = list(self._procs)
+            else:
+                self._stop_reasons.setdefault(platform, "cancelled")
+                platforms = [platform] if platform in self._procs else []
+        for name in platforms:
+            self._stop(name, "cancelled")
+
+    def _is_cancelled(self, platform: str) -> bool:
+        with self._lock:
+            return self._cancel_all.is_set() or self._stop_reasons.get(platform) == "cancelled"
+
+    def _run_job(self, job: CrawlJob) -> CrawlOutcome:
+        start_time = datetime.now()
+        if self._is_cancelled(job.platform):
+            return CrawlOutcome(job.platform, start_time, datetime.now(), cancelled=True, error="已取消")
+
+        env = os.environ.copy()
+        env.update(job.env)
+        # 子进程输出不缓冲，保证统计和控制台转发是实时的
+        env["PYTHONUNBUFFERED"] = "1"
+        env["PYTHONIOENCODING"] = "utf-8"
+
+        popen_kwargs = {}
+        if sys.platform == "win32":
+            popen_kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            popen_kwargs["start_new_session"] = True
+
+        logger.info(f"[{job.platform}] 执行命令: {' '.join(job.cmd)}")
+        try:
+            proc = subprocess.Popen(
+                job.cmd,
+                cwd=job.cwd,
+                env=env,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+                bufsize=1,
+                **popen_kwargs,
+            )
+        except OSError as e:
+            logger.exception(f"[{job.platform}] 启动爬虫进程失败: {e}")
+            return CrawlOutcome(job.platform, start_time, datetime.now(), error=f"启动失败: {e}")
+
+        with self._lock:
+            self._procs[job.platform] = proc
+            cancelled = self._cancel_all.is_set() or self._stop_reasons.get(job.platform) == "cancelled"
+        if cancelled:
+            self._stop(job.platform, "cancelled")
+
+        watchdog = None
+        if job.timeout:
+            watchdog = threading.Timer(job.timeout, self._stop, args=(job.platform, "timeout"))
+            watchdog.daemon = True
+            watchdog.start()
+
+        tail = deque(maxlen=OUTPUT_TAIL_LINES)
+        try:
+            for line in proc.stdout:
+                line = line.rstrip("\r\n")
+                tail.append(line)
+                if self.on_line is not None:
+                    try:
+                        self.on_line(job.platform, line)
+                    except Exception as e:
+                        logger.warning(f"[{job.platform}] 处理爬虫输出失败: {e}")
+            proc.wait()
+        finally:
+            if watchdog is not None:
+                watchdog.cancel()
+            proc.stdout.close()
+            with self._lock:
+                self._procs.pop(job.platform, None)
+                reason = self._stop_reasons.get(job.platform)
+
+        outcome = CrawlOutcome(
+            platform=job.platform,
+            start_time=start_time,
+            end_time=datetime.now(),
+            return_code=proc.returncode,
+            timed_out=reason == "timeout",
+            cancelled=reason == "cancelled",
+            output_tail=list(tail),
+        )
+        if outcome.timed_out:
+            outcome.error = "爬取超时"
+        elif outcome.cancelled:
+            outcome.error = "已取消"
+        elif proc.returncode != 0:
+            outcome.error = f"返回码: {proc.returncode}"
+        return outcome
+
+    def _stop(self, platform: str, reason: str) -> None:
+        """终止平台的爬虫进程组，等待片刻后仍未退出则强制结束"""
+        with self._lock:
+            proc = self._procs.get(platform)
+            if proc is None or proc.poll() is not None:
+                return
+            self._stop_reasons.setdefault(platform, reason)
+
+        if reason == "timeout":
+            logger.error(f"❌ {platform} 爬取超时，正在终止进程")
+        else:
+            logger.warning(f"{platform} 爬取已取消，正在终止进程")
+
+        self._signal_group(proc, force=False)
+        try:
+            proc.wait(timeout=TERMINATE_GRACE_SECONDS)
+        except subprocess.TimeoutExpired:
+            self._signal_group(proc, force=True)
+
+    @staticmethod
+    def _signal_group(proc: subprocess.Popen, force: bool) -> None:
+        try:
+            if sys.platform == "win32":
+                # taskkill /T 结束整个进程树（包括爬虫启动的浏览器）
+                cmd = ["taskkill", "/T", "/PID", str(proc.pid)]
+                if force:
+                    cmd.insert(1, "/F")
+                subprocess.run(cmd, capture_output=True)
+            else:
+                # 先发送SIGINT，让爬虫按中断流程退出并写入尚未落库的数据
+                os.killpg(proc.pid, signal.SIGKILL if force else signal.SIGINT)
+        except (ProcessLookupError, OSError):
+            pass
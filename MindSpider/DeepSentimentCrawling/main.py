@@ -6,6 +6,7 @@ DeepSentimentCrawling模块 - 主工作流程
 """
 
 import sys
+import asyncio
 import argparse
 from datetime import date, datetime
 from pathlib import Path
@@ -30,7 +31,7 @@ class DeepSentimentCrawling:
     def run_daily_crawling(self, target_date: date = None, platforms: List[str] = None, 
                           max_keywords_per_platform: int = 50, 
                           max_notes_per_platform: int = 50,
-                          login_type: str = "qrcode") -> Dict:
+                          login_type: str = "qrcode", max_parallel: int = None) -> Dict:
         """
         执行每日爬取任务
         
@@ -40,6 +41,7 @@ class DeepSentimentCrawling:
             max_keywords_per_platform: 每个平台最大关键词数量
             max_notes_per_platform: 每个平台最大爬取内容数量
             login_type: 登录方式
+            max_parallel: 同时爬取的平台数上限，默认使用配置 CRAWL_MAX_PARALLEL_PLATFORMS
         
         Returns:
             爬取结果统计
@@ -76,10 +78,13 @@ class DeepSentimentCrawling:
         # 3. 执行全平台关键词爬取
         print(f"\n🔄 开始全平台关键词爬取...")
         crawl_results = self.platform_crawler.run_multi_platform_crawl_by_keywords(
-            keywords, platforms, login_type, max_notes_per_platform
+            keywords, platforms, login_type, max_notes_per_platform, max_parallel
         )
         
-        # 4. 生成最终报告
+        # 4. 把新爬取的内容增量同步到统一内容表
+        self.sync_unified_content()
+
+        # 5. 生成最终报告
         final_report = {
             "date": target_date.isoformat(),
             "summary": summary,
@@ -136,8 +141,21 @@ class DeepSentimentCrawling:
             platform, keywords, login_type, max_notes
         )
         
+        self.sync_unified_content()
         return result
     
+    def sync_unified_content(self):
+        """增量同步各平台内容到 unified_content（失败不影响爬取结果）"""
+        schema_dir = str(project_root / "schema")
+        if schema_dir not in sys.path:
+            sys.path.append(schema_dir)
+        try:
+            from unified_content import sync_unified_content_from_settings
+            stats = asyncio.run(sync_unified_content_from_settings())
+            print(f"🔗 统一内容表同步完成: {sum(stats.values())} 条")
+        except Exception as e:
+            print(f"⚠️ 统一内容表同步失败，可稍后运行 MindSpider/schema/unified_content.py 补同步: {e}")
+    
     def list_available_topics(self, days: int = 7):
         """列出最近可用的话题"""
         print(f"📋 最近 {days} 天的话题数据:")
@@ -206,6 +224,8 @@ def main():
                        help="每个平台最大爬取内容数量 (默认: 50)")
     parser.add_argument("--login-type", type=str, choices=['qrcode', 'phone', 'cookie'], 
                        default='qrcode', help="登录方式 (默认: qrcode)")
+    parser.add_argument("--max-parallel", type=int,
+                       help="同时爬取的平台数量 (默认: 配置项 CRAWL_MAX_PARALLEL_PLATFORMS)")
     
     # 功能参数
     parser.add_argument("--list-topics", action="store_true", help="列出最近的话题数据")
@@ -262,7 +282,7 @@ def main():
         platforms = args.platforms if args.platforms else None
         result = crawler.run_daily_crawling(
             target_date, platforms, args.max_keywords, 
-            args.max_notes, args.login_type
+            args.max_notes, args.login_type, args.max_parallel
         )
         
         if result['success']:
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DeepSentimentCrawling模块 - MediaCrawler子进程启动器
+在MediaCrawler目录下运行，先把 MINDSPIDER_CRAWLER_OVERRIDES 环境变量中的配置写入config模块，
+再执行MediaCrawler的main.py。每个平台的爬虫进程因此使用各自的配置，
+多个平台并行爬取时不再争用同一个 config/base_config.py 文件
+"""
+
+import json
+import os
+import runpy
+import sys
+
+# 子进程配置覆盖项（JSON对象，键为 config/base_config.py 中的配置名）
+OVERRIDES_ENV = "MINDSPIDER_CRAWLER_OVERRIDES"
+
+
+def apply_overrides(overrides: dict) -> None:
+    """覆盖MediaCrawler的配置项，需在导入任何爬虫模块之前调用"""
+    import config
+    from config import base_config
+
+    for key, value in overrides.items():
+        setattr(base_config, key, value)
+        setattr(config, key, value)
+
+
+def main() -> None:
+    mediacrawler_dir = os.getcwd()
+    # 用MediaCrawler目录替换启动器所在目录，避免导入到DeepSentimentCrawling下的同名模块
+    sys.path[0] = mediacrawler_dir
+
+    apply_overrides(json.loads(os.environ.get(OVERRIDES_ENV) or "{}"))
+
+    main_path = os.path.join(mediacrawler_dir, "main.py")
+    sys.argv = [main_path] + sys.argv[1:]
+    runpy.run_path(main_path, run_name="__main__")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,9 +6,8 @@ DeepSentimentCrawling模块 - 平台爬虫管理器
 """
 
 import os
+import re
 import sys
-import subprocess
-import tempfile
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Optional
@@ -24,6 +23,26 @@ try:
 except ImportError:
     raise ImportError("无法导入config.py配置文件")
 
+from crawl_orchestrator import CrawlJob, CrawlOrchestrator, CrawlOutcome
+from mediacrawler_runner import OVERRIDES_ENV
+
+# MediaCrawler入库时输出的日志标记，如 [store.xhs.update_xhs_note]，用于实时统计内容数与评论数
+# 同一标记也会出现在入库函数的错误日志中，只有INFO级别的行才代表一次成功入库
+STORE_LOG_PATTERN = re.compile(r"\[store\.\w+\.(\w+)\]")
+NOTE_STORE_FUNCS = {
+    "update_xhs_note", "update_douyin_aweme", "update_kuaishou_video", "update_bilibili_video",
+    "update_weibo_note", "update_tieba_note", "update_zhihu_content",
+}
+COMMENT_STORE_FUNCS = {
+    "update_xhs_note_comment", "update_dy_aweme_comment", "update_ks_video_comment",
+    "update_bilibili_video_comment", "update_weibo_note_comment", "update_tieba_note_comment",
+    "update_zhihu_note_comment",
+}
+
+# 并行爬取时各进程的CDP调试端口起点依次错开
+CDP_BASE_PORT = 9222
+CDP_PORT_STRIDE = 10
+
 class PlatformCrawler:
     """平台爬虫管理器"""
     
@@ -32,6 +51,10 @@ class PlatformCrawler:
         self.mediacrawler_path = Path(__file__).parent / "MediaCrawler"
         self.supported_platforms = ['xhs', 'dy', 'ks', 'bili', 'wb', 'tieba', 'zhihu']
         self.crawl_stats = {}
+        self.runner_path = Path(__file__).parent / "mediacrawler_runner.py"
+        self.max_parallel = config.settings.CRAWL_MAX_PARALLEL_PLATFORMS
+        self.platform_timeout = config.settings.CRAWL_PLATFORM_TIMEOUT
+        self._orchestrator: Optional[CrawlOrchestrator] = None
         
         # 确保MediaCrawler目录存在
         if not self.mediacrawler_path.exists():
@@ -140,6 +163,7 @@ postgresql_db_config = {{
                           crawler_type: str = "search", max_notes: int = 50) -> bool:
         """
         创建MediaCrawler的基础配置
+        注意：该方法改写共享的 config/base_config.py，爬取流程改用 build_crawler_overrides 为每个进程单独配置
         
         Args:
             platform: 平台名称
@@ -200,6 +224,139 @@ postgresql_db_config = {{
             logger.exception(f"创建基础配置失败: {e}")
             return False
     
+    def build_crawler_overrides(self, platform: str, keywords: List[str],
+                                crawler_type: str = "search", max_notes: int = 50,
+                                slot: int = 0) -> Dict:
+        """
+        构建单个爬虫进程的MediaCrawler配置覆盖项，与 create_base_config 写入的配置一致，
+        由 mediacrawler_runner 在子进程内应用，不修改共享的 base_config.py
+
+        Args:
+            platform: 平台名称
+            keywords: 关键词列表
+            crawler_type: 爬取类型
+            max_notes: 最大爬取数量
+            slot: 进程序号，用于错开并行进程的CDP调试端口
+
+        Returns:
+            配置名 -> 配置值
+        """
+        return {
+            "PLATFORM": platform,
+            "KEYWORDS": ",".join(keywords),
+            "CRAWLER_TYPE": crawler_type,
+            "SAVE_DATA_OPTION": self._save_data_option(),
+            "CRAWLER_MAX_NOTES_COUNT": max_notes,
+            "ENABLE_GET_COMMENTS": True,
+            "CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES": 20,
+            "HEADLESS": True,
+            "CDP_DEBUG_PORT": CDP_BASE_PORT + slot * CDP_PORT_STRIDE,
+        }
+
+    def _save_data_option(self) -> str:
+        """根据数据库类型确定MediaCrawler的 SAVE_DATA_OPTION"""
+        db_dialect = (config.settings.DB_DIALECT or "mysql").lower()
+        return "postgresql" if db_dialect in ("postgresql", "postgres") else "db"
+
+    def _build_crawl_job(self, platform: str, keywords: List[str], login_type: str,
+                         max_notes: int, slot: int) -> CrawlJob:
+        """构建单个平台的爬虫进程"""
+        overrides = self.build_crawler_overrides(platform, keywords, "search", max_notes, slot)
+        cmd = [
+            sys.executable, str(self.runner_path),
+            "--platform", platform,
+            "--lt", login_type,
+            "--type", "search",
+            "--save_data_option", overrides["SAVE_DATA_OPTION"]
+        ]
+        logger.info(f"已配置 {platform} 平台，关键词数量: {len(keywords)}，最大爬取数量: {max_notes}，"
+                    f"保存数据方式: {overrides['SAVE_DATA_OPTION']}")
+        return CrawlJob(
+            platform=platform,
+            cmd=cmd,
+            cwd=self.mediacrawler_path,
+            env={OVERRIDES_ENV: json.dumps(overrides, ensure_ascii=False)},
+            timeout=self.platform_timeout,
+        )
+
+    def run_platforms(self, platforms: List[str], keywords: List[str],
+                      login_type: str = "qrcode", max_notes: int = 50,
+                      max_parallel: Optional[int] = None) -> Dict[str, Dict]:
+        """
+        并行运行多个平台的爬虫进程，实时解析输出统计内容与评论数
+
+        Args:
+            platforms: 平台列表
+            keywords: 关键词列表
+            login_type: 登录方式
+            max_notes: 最大爬取数量
+            max_parallel: 同时运行的进程数上限，默认使用配置 CRAWL_MAX_PARALLEL_PLATFORMS
+
+        Returns:
+            平台 -> 爬取结果统计
+        """
+        # 数据库配置对所有平台相同，启动进程前写入一次
+        if not self.configure_mediacrawler_db():
+            return {platform: {"success": False, "error": "数据库配置失败", "platform": platform}
+                    for platform in platforms}
+
+        live_stats = {platform: self._new_output_stats() for platform in platforms}
+        results = {}
+
+        def on_line(platform: str, line: str):
+            self._parse_crawl_line(line, live_stats[platform])
+            logger.info(f"[{platform}] {line}")
+
+        def on_done(outcome: CrawlOutcome):
+            results[outcome.platform] = self._build_crawl_stats(
+                outcome, keywords, live_stats[outcome.platform]
+            )
+
+        jobs = [self._build_crawl_job(platform, keywords, login_type, max_notes, slot)
+                for slot, platform in enumerate(platforms)]
+        orchestrator = CrawlOrchestrator(max_parallel or self.max_parallel, on_line=on_line)
+        self._orchestrator = orchestrator
+        try:
+            orchestrator.run(jobs, on_done=on_done)
+        finally:
+            self._orchestrator = None
+        return results
+
+    def _build_crawl_stats(self, outcome: CrawlOutcome, keywords: List[str], output_stats: Dict) -> Dict:
+        """根据进程结果和输出解析结果生成平台统计，并记录到 crawl_stats"""
+        platform = outcome.platform
+        crawl_stats = {
+            "platform": platform,
+            "keywords_count": len(keywords),
+            "duration_seconds": outcome.duration_seconds,
+            "start_time": outcome.start_time.isoformat(),
+            "end_time": outcome.end_time.isoformat(),
+            "return_code": outcome.return_code,
+            "success": outcome.success,
+            "timed_out": outcome.timed_out,
+            "cancelled": outcome.cancelled,
+            **output_stats
+        }
+        if outcome.error:
+            crawl_stats["error"] = outcome.error
+
+        self.crawl_stats[platform] = crawl_stats
+
+        if outcome.success:
+            logger.info(f"✅ {platform} 爬取完成，耗时: {outcome.duration_seconds:.1f}秒，"
+                        f"{crawl_stats['notes_count']} 条内容, {crawl_stats['comments_count']} 条评论")
+        else:
+            logger.error(f"❌ {platform} 爬取失败: {outcome.error}")
+            if outcome.output_tail and not outcome.cancelled:
+                logger.error(f"{platform} 最后输出:\n" + "\n".join(outcome.output_tail[-10:]))
+        return crawl_stats
+
+    def cancel(self, platform: Optional[str] = None):
+        """取消正在进行的爬取，platform 为空时取消全部平台"""
+        orchestrator = self._orchestrator
+        if orchestrator is not None:
+            orchestrator.cancel(platform)
+
     def run_crawler(self, platform: str, keywords: List[str], 
                    login_type: str = "qrcode", max_notes: int = 50) -> Dict:
         """
@@ -224,130 +381,57 @@ postgresql_db_config = {{
         start_message += f"\n关键词: {keywords[:5]}{'...' if len(keywords) > 5 else ''} (共{len(keywords)}个)"
         logger.info(start_message)
         
-        start_time = datetime.now()
-        
         try:
-            # 配置数据库
-            if not self.configure_mediacrawler_db():
-                return {"success": False, "error": "数据库配置失败"}
-            
-            # 创建基础配置
-            if not self.create_base_config(platform, keywords, "search", max_notes):
-                return {"success": False, "error": "基础配置创建失败"}
-            
-            # 判断数据库类型，确定 save_data_option
-            db_dialect = (config.settings.DB_DIALECT or "mysql").lower()
-            is_postgresql = db_dialect in ("postgresql", "postgres")
-            save_data_option = "postgresql" if is_postgresql else "db"
-            
-            # 构建命令
-            cmd = [
-                sys.executable, "main.py",
-                "--platform", platform,
-                "--lt", login_type,
-                "--type", "search",
-                "--save_data_option", save_data_option
-            ]
-            
-            logger.info(f"执行命令: {' '.join(cmd)}")
-            
-            # 切换到MediaCrawler目录并执行
-            result = subprocess.run(
-                cmd,
-                cwd=self.mediacrawler_path,
-                timeout=3600  # 60分钟超时
-            )
-            
-            end_time = datetime.now()
-            duration = (end_time - start_time).total_seconds()
-            
-            # 创建统计信息
-            crawl_stats = {
-                "platform": platform,
-                "keywords_count": len(keywords),
-                "duration_seconds": duration,
-                "start_time": start_time.isoformat(),
-                "end_time": end_time.isoformat(),
-                "return_code": result.returncode,
-                "success": result.returncode == 0,
-                "notes_count": 0,
-                "comments_count": 0,
-                "errors_count": 0
-            }
-            
-            # 保存统计信息
-            self.crawl_stats[platform] = crawl_stats
-            
-            if result.returncode == 0:
-                logger.info(f"✅ {platform} 爬取完成，耗时: {duration:.1f}秒")
-            else:
-                logger.error(f"❌ {platform} 爬取失败，返回码: {result.returncode}")
-            
-            return crawl_stats
-            
-        except subprocess.TimeoutExpired:
-            logger.exception(f"❌ {platform} 爬取超时")
-            return {"success": False, "error": "爬取超时", "platform": platform}
+            return self.run_platforms([platform], keywords, login_type, max_notes)[platform]
         except Exception as e:
             logger.exception(f"❌ {platform} 爬取异常: {e}")
             return {"success": False, "error": str(e), "platform": platform}
     
-    def _parse_crawl_output(self, output_lines: List[str], error_lines: List[str]) -> Dict:
-        """解析爬取输出，提取统计信息"""
-        stats = {
+    @staticmethod
+    def _new_output_stats() -> Dict:
+        return {
             "notes_count": 0,
             "comments_count": 0,
             "errors_count": 0,
             "login_required": False
         }
         
-        # 解析输出行
-        for line in output_lines:
-            if "条笔记" in line or "条内容" in line:
-                try:
-                    # 提取数字
-                    import re
-                    numbers = re.findall(r'\d+', line)
-                    if numbers:
-                        stats["notes_count"] = int(numbers[0])
-                except:
-                    pass
-            elif "条评论" in line:
-                try:
-                    import re
-                    numbers = re.findall(r'\d+', line)
-                    if numbers:
-                        stats["comments_count"] = int(numbers[0])
-                except:
-                    pass
-            elif "登录" in line or "扫码" in line:
-                stats["login_required"] = True
-        
-        # 解析错误行
-        for line in error_lines:
-            if "error" in line.lower() or "异常" in line:
-                stats["errors_count"] += 1
-        
-        return stats
+    @staticmethod
+    def _parse_crawl_line(line: str, stats: Dict):
+        """解析一行爬虫输出，累加到 stats"""
+        match = STORE_LOG_PATTERN.search(line)
+        if match and " INFO " in line:
+            if match.group(1) in NOTE_STORE_FUNCS:
+                stats["notes_count"] += 1
+            elif match.group(1) in COMMENT_STORE_FUNCS:
+                stats["comments_count"] += 1
+        elif " ERROR " in line or "Traceback" in line or "异常" in line:
+            stats["errors_count"] += 1
+        elif "登录" in line or "扫码" in line:
+            stats["login_required"] = True
     
     def run_multi_platform_crawl_by_keywords(self, keywords: List[str], platforms: List[str],
-                                            login_type: str = "qrcode", max_notes_per_keyword: int = 50) -> Dict:
+                                            login_type: str = "qrcode", max_notes_per_keyword: int = 50,
+                                            max_parallel: Optional[int] = None) -> Dict:
         """
-        基于关键词的多平台爬取 - 每个关键词在所有平台上都进行爬取
+        基于关键词的多平台爬取 - 每个关键词在所有平台上都进行爬取，各平台进程并行运行
         
         Args:
             keywords: 关键词列表
             platforms: 平台列表
             login_type: 登录方式
             max_notes_per_keyword: 每个关键词在每个平台的最大爬取数量
+            max_parallel: 同时爬取的平台数上限，默认使用配置 CRAWL_MAX_PARALLEL_PLATFORMS
         
         Returns:
             总体爬取统计
         """
+        platforms = list(dict.fromkeys(platforms))
         
         start_message = f"\n🚀 开始全平台关键词爬取"
         start_message += f"\n   关键词数量: {len(keywords)}"
         start_message += f"\n   平台数量: {len(platforms)}"
+        start_message += f"\n   并行平台数: {min(max_parallel or self.max_parallel, len(platforms))}"
         start_message += f"\n   登录方式: {login_type}"
         start_message += f"\n   每个关键词在每个平台的最大爬取数量: {max_notes_per_keyword}"
         start_message += f"\n   总爬取任务: {len(keywords)} × {len(platforms)} = {len(keywords) * len(platforms)}"
@@ -374,65 +458,61 @@ postgresql_db_config = {{
                 "total_comments": 0
             }
         
-        # 对每个平台一次性爬取所有关键词
+        # 所有平台一次性传递全部关键词，并行爬取
+        results = {}
+        runnable = []
         for platform in platforms:
-            logger.info(f"\n📝 在 {platform} 平台爬取所有关键词")
+            if platform not in self.supported_platforms:
+                results[platform] = {"success": False, "error": f"不支持的平台: {platform}", "platform": platform}
+            elif not keywords:
+                results[platform] = {"success": False, "error": "关键词列表不能为空", "platform": platform}
+            else:
+                runnable.append(platform)
+
+        if runnable:
+            logger.info(f"\n📝 在 {', '.join(runnable)} 平台爬取所有关键词")
             logger.info(f"   关键词: {', '.join(keywords[:5])}{'...' if len(keywords) > 5 else ''}")
-            
             try:
-                # 一次性传递所有关键词给平台
-                result = self.run_crawler(platform, keywords, login_type, max_notes_per_keyword)
+                results.update(self.run_platforms(runnable, keywords, login_type, max_notes_per_keyword, max_parallel))
+            except Exception as e:
+                logger.exception(f"   ❌ 异常: {e}")
+                for platform in runnable:
+                    results.setdefault(platform, {"success": False, "error": str(e), "platform": platform})
+            
+        for platform in platforms:
+            result = results.get(platform) or {"success": False, "error": "未运行", "platform": platform}
                 
-                if result.get("success"):
-                    total_stats["successful_tasks"] += len(keywords)
-                    total_stats["platform_summary"][platform]["successful_keywords"] = len(keywords)
-                    
-                    notes_count = result.get("notes_count", 0)
-                    comments_count = result.get("comments_count", 0)
+            # 为每个关键词记录结果
+            for keyword in keywords:
+                if keyword not in total_stats["keyword_results"]:
+                    total_stats["keyword_results"][keyword] = {}
+                total_stats["keyword_results"][keyword][platform] = result
                     
-                    total_stats["total_notes"] += notes_count
-                    total_stats["total_comments"] += comments_count
-                    total_stats["platform_summary"][platform]["total_notes"] = notes_count
-                    total_stats["platform_summary"][platform]["total_comments"] = comments_count
+            if result.get("success"):
+                total_stats["successful_tasks"] += len(keywords)
+                total_stats["platform_summary"][platform]["successful_keywords"] = len(keywords)
                     
-                    # 为每个关键词记录结果
-                    for keyword in keywords:
-                        if keyword not in total_stats["keyword_results"]:
-                            total_stats["keyword_results"][keyword] = {}
-                        total_stats["keyword_results"][keyword][platform] = result
-                    
-                    logger.info(f"   ✅ 成功: {notes_count} 条内容, {comments_count} 条评论")
-                else:
-                    total_stats["failed_tasks"] += len(keywords)
-                    total_stats["platform_summary"][platform]["failed_keywords"] = len(keywords)
+                notes_count = result.get("notes_count", 0)
+                comments_count = result.get("comments_count", 0)
                     
-                    # 为每个关键词记录失败结果
-                    for keyword in keywords:
-                        if keyword not in total_stats["keyword_results"]:
-                            total_stats["keyword_results"][keyword] = {}
-                        total_stats["keyword_results"][keyword][platform] = result
+                total_stats["total_notes"] += notes_count
+                total_stats["total_comments"] += comments_count
+                total_stats["platform_summary"][platform]["total_notes"] = notes_count
+                total_stats["platform_summary"][platform]["total_comments"] = comments_count
                     
-                    logger.error(f"   ❌ 失败: {result.get('error', '未知错误')}")
-            
-            except Exception as e:
+                logger.info(f"   ✅ {platform} 成功: {notes_count} 条内容, {comments_count} 条评论")
+            else:
                 total_stats["failed_tasks"] += len(keywords)
                 total_stats["platform_summary"][platform]["failed_keywords"] = len(keywords)
-                error_result = {"success": False, "error": str(e)}
-                
-                # 为每个关键词记录异常结果
-                for keyword in keywords:
-                    if keyword not in total_stats["keyword_results"]:
-                        total_stats["keyword_results"][keyword] = {}
-                    total_stats["keyword_results"][keyword][platform] = error_result
                 
-                logger.error(f"   ❌ 异常: {e}")
+                logger.error(f"   ❌ {platform} 失败: {result.get('error', '未知错误')}")
         
         # 打印详细统计
         finish_message = f"\n📊 全平台关键词爬取完成!"
         finish_message += f"\n   总任务: {total_stats['total_tasks']}"
         finish_message += f"\n   成功: {total_stats['successful_tasks']}"
         finish_message += f"\n   失败: {total_stats['failed_tasks']}"
-        finish_message += f"\n   成功率: {total_stats['successful_tasks']/total_stats['total_tasks']*100:.1f}%"
+        finish_message += f"\n   成功率: {total_stats['successful_tasks']/total_stats['total_tasks']*100 if total_stats['total_tasks'] else 0:.1f}%"
         finish_message += f"\n   总内容: {total_stats['total_notes']} 条"
         finish_message += f"\n   总评论: {total_stats['total_comments']} 条"
         logger.info(finish_message)
@@ -25,6 +25,8 @@ class Settings(BaseSettings):
     MINDSPIDER_API_KEY: Optional[str] = Field(None, description="MINDSPIDER API密钥")
     MINDSPIDER_BASE_URL: Optional[str] = Field("https://api.deepseek.com", description="MINDSPIDER API基础URL，推荐deepseek-chat模型使用https://api.deepseek.com")
     MINDSPIDER_MODEL_NAME: Optional[str] = Field("deepseek-chat", description="MINDSPIDER API模型名称, 推荐deepseek-chat")
+    CRAWL_MAX_PARALLEL_PLATFORMS: int = Field(3, description="多平台爬取时同时运行的MediaCrawler进程数上限")
+    CRAWL_PLATFORM_TIMEOUT: int = Field(3600, description="单个平台爬取进程的超时时间（秒）")
 
     class Config:
         env_file = ENV_FILE
@@ -0,0 +1,138 @@
+"""
+MindSpider 全文检索索引（SQLAlchemy 2.x 异步引擎）
+
+为 InsightEngine 话题搜索涉及的文本列创建全文/三元组索引，替代 LIKE '%topic%' 全表扫描：
+- MySQL: 每张表一个覆盖全部检索列的 FULLTEXT 索引（ngram 分词器，支持中文）
+- PostgreSQL: pg_trgm 扩展 + 每个检索列一个 GIN 三元组索引（LIKE '%topic%' 可直接走索引）
+
+索引按"表 -> 检索列"声明在 FULLTEXT_COLUMNS 中，列集合需与
+InsightEngine/tools/search.py 中各工具的检索字段保持一致（MySQL 的 MATCH 列表必须与索引完全一致）。
+
+数据模型定义位置：
+- MindSpider/schema/models_bigdata.py
+- MindSpider/schema/models_sa.py
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+__all__ = [
+    "FULLTEXT_COLUMNS",
+    "fulltext_index_name",
+    "trigram_index_name",
+    "create_fulltext_indexes",
+]
+
+
+# 表 -> 话题检索列
+FULLTEXT_COLUMNS: Dict[str, List[str]] = {
+    "bilibili_video": ["title", "desc", "source_keyword"],
+    "bilibili_video_comment": ["content"],
+    "douyin_aweme": ["title", "desc", "source_keyword"],
+    "douyin_aweme_comment": ["content"],
+    "kuaishou_video": ["title", "desc", "source_keyword"],
+    "kuaishou_video_comment": ["content"],
+    "weibo_note": ["content", "source_keyword"],
+    "weibo_note_comment": ["content"],
+    "xhs_note": ["title", "desc", "tag_list", "source_keyword"],
+    "xhs_note_comment": ["content"],
+    "zhihu_content": ["title", "desc", "content_text", "source_keyword"],
+    "zhihu_comment": ["content"],
+    "tieba_note": ["title", "desc", "source_keyword"],
+    "tieba_comment": ["content"],
+    "daily_news": ["title"],
+}
+
+
+def fulltext_index_name(table: str) -> str:
+    """MySQL FULLTEXT 索引名"""
+    return f"ft_{table}"
+
+
+def trigram_index_name(table: str, column: str) -> str:
+    """PostgreSQL pg_trgm GIN 索引名"""
+    return f"trgm_{table}_{column}"
+
+
+async def _mysql_existing_fulltext(conn: AsyncConnection, table: str) -> bool:
+    result = await conn.execute(
+        text(
+            "SELECT 1 FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND INDEX_NAME = :index LIMIT 1"
+        ),
+        {"table": table, "index": fulltext_index_name(table)},
+    )
+    return result.first() is not None
+
+
+async def _create_mysql_indexes(conn: AsyncConnection) -> int:
+    created = 0
+    for table, columns in FULLTEXT_COLUMNS.items():
+        if await _mysql_existing_fulltext(conn, table):
+            continue
+        column_sql = ", ".join(f"`{column}`" for column in columns)
+        try:
+            await conn.execute(
+                text(f"ALTER TABLE `{table}` ADD FULLTEXT INDEX `{fulltext_index_name(table)}` ({column_sql}) WITH PARSER ngram")
+            )
+            created += 1
+            logger.info(f"[fulltext] 已创建 FULLTEXT(ngram) 索引: {table}({', '.join(columns)})")
+        except Exception as e:
+            # 单表失败不影响其余表（例如表尚未由 MediaCrawler 创建）
+            logger.warning(f"[fulltext] 创建 {table} 全文索引失败，查询将回退到 LIKE: {e}")
+    return created
+
+
+async def _create_postgresql_indexes(conn: AsyncConnection) -> int:
+    try:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    except Exception as e:
+        logger.warning(f"[fulltext] 无法启用 pg_trgm 扩展，查询将回退到顺序扫描: {e}")
+        return 0
+
+    created = 0
+    for table, columns in FULLTEXT_COLUMNS.items():
+        for column in columns:
+            try:
+                await conn.execute(
+                    text(
+                        f'CREATE INDEX IF NOT EXISTS "{trigram_index_name(table, column)}" '
+                        f'ON "{table}" USING gin ("{column}" gin_trgm_ops)'
+                    )
+                )
+                created += 1
+            except Exception as e:
+                logger.warning(f"[fulltext] 创建 {table}.{column} 三元组索引失败: {e}")
+    logger.info(f"[fulltext] pg_trgm 索引检查/创建完成，共 {created} 个")
+    return created
+
+
+async def create_fulltext_indexes(engine) -> int:
+    """
+    创建（或补齐）话题检索所需的全文索引，已存在的索引会被跳过。
+
+    每张表在独立事务中创建，避免一张表失败导致整体回滚。
+
+    Args:
+        engine: SQLAlchemy AsyncEngine
+
+    Returns:
+        本次处理的索引数量
+    """
+    dialect = engine.url.get_backend_name()
+    if dialect == "mysql":
+        # MySQL 的 DDL 会隐式提交，逐表执行即可
+        async with engine.connect() as conn:
+            return await _create_mysql_indexes(conn)
+    if dialect == "postgresql":
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            return await _create_postgresql_indexes(conn)
+
+    logger.info(f"[fulltext] 数据库方言 {dialect} 不支持自动创建全文索引，话题搜索将使用 LIKE")
+    return 0
@@ -1,7 +1,8 @@
 """
 MindSpider 数据库初始化（SQLAlchemy 2.x 异步引擎）
 
-此脚本创建 MindSpider 扩展表（与 MediaCrawler 原始表分离）。
+此脚本创建 MindSpider 扩展表（与 MediaCrawler 原始表分离）、话题检索用的全文索引，
+并把已有的平台内容同步到 unified_content 统一内容表。
 支持 MySQL 与 PostgreSQL，需已有可连接的数据库实例。
 
 数据模型定义位置：
@@ -24,6 +25,8 @@ from models_sa import Base
 # 导入 models_bigdata 以确保所有表类被注册到 Base.metadata
 # models_bigdata 现在也使用 models_sa 的 Base，所以所有表都在同一个 metadata 中
 import models_bigdata  # noqa: F401  # 导入以注册所有表类
+from fulltext_indexes import create_fulltext_indexes
+from unified_content import sync_unified_content
 import sys
 from pathlib import Path
 
@@ -109,8 +112,14 @@ async def main() -> None:
     dialect_name = engine.url.get_backend_name()
     await _create_views_if_needed(dialect_name)
 
+    # 话题检索全文索引（MySQL FULLTEXT ngram / PostgreSQL pg_trgm），重复执行时自动跳过已有索引
+    await create_fulltext_indexes(engine)
+
+    # 统一内容表增量同步（新库时即为全量回填）
+    await sync_unified_content(engine)
+
     await engine.dispose()
-    logger.info("[init_database_sa] 数据表与视图创建完成")
+    logger.info("[init_database_sa] 数据表、视图、全文索引与统一内容表初始化完成")
 
 
 if __name__ == "__main__":
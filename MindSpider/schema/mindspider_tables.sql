@@ -105,6 +105,42 @@ CREATE TABLE `crawling_tasks` (
     FOREIGN KEY (`topic_id`) REFERENCES `daily_topics`(`topic_id`) ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='爬取任务表';
 
+-- ----------------------------
+-- Table structure for unified_content
+-- 跨平台统一内容表：各平台内容表的规范化副本（整数互动数、秒级发布时间、预计算热度）
+-- 由 unified_content.py 按源表 last_modify_ts 增量同步
+-- ----------------------------
+DROP TABLE IF EXISTS `unified_content`;
+CREATE TABLE `unified_content` (
+    `id` int NOT NULL AUTO_INCREMENT COMMENT '自增ID',
+    `platform` varchar(16) NOT NULL COMMENT '平台(bilibili|douyin|kuaishou|weibo|xhs|zhihu)',
+    `content_type` varchar(16) NOT NULL COMMENT '内容类型(video|note|content)',
+    `source_table` varchar(32) NOT NULL COMMENT '源表名',
+    `content_id` varchar(128) NOT NULL COMMENT '源表中的内容ID',
+    `title_or_content` text COMMENT '标题或正文',
+    `author_nickname` text COMMENT '作者昵称',
+    `url` text COMMENT '内容链接',
+    `publish_ts` bigint DEFAULT NULL COMMENT '发布时间（秒级时间戳）',
+    `liked_count` bigint NOT NULL DEFAULT 0 COMMENT '点赞数',
+    `comment_count` bigint NOT NULL DEFAULT 0 COMMENT '评论数',
+    `share_count` bigint NOT NULL DEFAULT 0 COMMENT '分享/转发数',
+    `favorite_count` bigint NOT NULL DEFAULT 0 COMMENT '收藏数',
+    `coin_count` bigint NOT NULL DEFAULT 0 COMMENT '投币数',
+    `danmaku_count` bigint NOT NULL DEFAULT 0 COMMENT '弹幕数',
+    `view_count` bigint NOT NULL DEFAULT 0 COMMENT '播放/浏览数',
+    `hotness_score` double NOT NULL DEFAULT 0 COMMENT '综合热度',
+    `source_keyword` text COMMENT '来源关键词',
+    `source_modify_ts` bigint DEFAULT NULL COMMENT '源表记录的last_modify_ts（同步水位）',
+    `add_ts` bigint NOT NULL COMMENT '记录添加时间戳',
+    `last_modify_ts` bigint NOT NULL COMMENT '记录最后修改时间戳',
+    PRIMARY KEY (`id`),
+    UNIQUE KEY `uq_unified_content_source` (`source_table`, `content_id`),
+    KEY `idx_unified_content_publish` (`publish_ts`),
+    KEY `idx_unified_content_hotness` (`hotness_score`),
+    KEY `idx_unified_content_platform_publish` (`platform`, `publish_ts`),
+    KEY `idx_unified_content_source_modify` (`source_table`, `source_modify_ts`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='跨平台统一内容表';
+
 -- ===============================
 -- MediaCrawler表结构扩展字段
 -- ===============================
@@ -10,7 +10,7 @@
 """
 
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import Integer, String, BigInteger, Text, ForeignKey
+from sqlalchemy import Integer, String, BigInteger, Text, ForeignKey, UniqueConstraint
 
 # 使用 models_sa 中的 Base，确保所有表在同一个 metadata 中，外键引用可以正常工作
 from models_sa import Base
@@ -52,7 +52,7 @@ class BilibiliVideoComment(Base):
     avatar: Mapped[str | None] = mapped_column(Text, nullable=True)
     add_ts: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
     last_modify_ts: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
-    comment_id: Mapped[int | None] = mapped_column(BigInteger, index=True, nullable=True)
+    comment_id: Mapped[int | None] = mapped_column(BigInteger, index=True, unique=True, nullable=True)
     video_id: Mapped[int | None] = mapped_column(BigInteger, index=True, nullable=True)
     content: Mapped[str | None] = mapped_column(Text, nullable=True)
     create_time: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
@@ -64,7 +64,7 @@ class BilibiliVideoComment(Base):
 class BilibiliUpInfo(Base):
     __tablename__ = "bilibili_up_info"
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    user_id: Mapped[int | None] = mapped_column(BigInteger, index=True, nullable=True)
+    user_id: Mapped[int | None] = mapped_column(BigInteger, index=True, unique=True, nullable=True)
     nickname: Mapped[str | None] = mapped_column(Text, nullable=True)
     sex: Mapped[str | None] = mapped_column(Text, nullable=True)
     sign: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -79,6 +79,7 @@ class BilibiliUpInfo(Base):
 
 class BilibiliContactInfo(Base):
     __tablename__ = "bilibili_contact_info"
+    __table_args__ = (UniqueConstraint("up_id", "fan_id", name="uq_bilibili_contact_info"),)
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     up_id: Mapped[int | None] = mapped_column(BigInteger, index=True, nullable=True)
     fan_id: Mapped[int | None] = mapped_column(BigInteger, index=True, nullable=True)
@@ -95,7 +96,7 @@ class BilibiliContactInfo(Base):
 class BilibiliUpDynamic(Base):
     __tablename__ = "bilibili_up_dynamic"
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    dynamic_id: Mapped[int | None] = mapped_column(BigInteger, index=True, nullable=True)
+    dynamic_id: Mapped[int | None] = mapped_column(BigInteger, index=True, unique=True, nullable=True)
     user_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
     user_name: Mapped[str | None] = mapped_column(Text, nullable=True)
     text: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -121,7 +122,7 @@ class DouyinAweme(Base):
     ip_location: Mapped[str | None] = mapped_column(Text, nullable=True)
     add_ts: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
     last_modify_ts: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
-    aweme_id: Mapped[int | None] = mapped_column(BigInteger, index=True, nullable=True)
+    aweme_id: Mapped[int | None] = mapped_column(BigInteger, index=True, unique=True, nullable=True)
     aweme_type: Mapped[str | None] = mapped_column(Text, nullable=True)
     title: Mapped[str | None] = mapped_column(Text, nullable=True)
     desc: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -152,7 +153,7 @@ class DouyinAwemeComment(Base):
     ip_location: Mapped[str | None] = mapped_column(Text, nullable=True)
     add_ts: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
     last_modify_ts: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
-    comment_id: Mapped[int | None] = mapped_column(BigInteger, index=True, nullable=True)
+    comment_id: Mapped[int | None] = mapped_column(BigInteger, index=True, unique=True, nullable=True)
     aweme_id: Mapped[int | None] = mapped_column(BigInteger, index=True, nullable=True)
     content: Mapped[str | None] = mapped_column(Text, nullable=True)
     create_time: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
@@ -165,7 +166,7 @@ class DouyinAwemeComment(Base):
 class DyCreator(Base):
     __tablename__ = "dy_creator"
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    user_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    user_id: Mapped[str | None] = mapped_column(String(255), index=True, unique=True, nullable=True)
     nickname: Mapped[str | None] = mapped_column(Text, nullable=True)
     avatar: Mapped[str | None] = mapped_column(Text, nullable=True)
     ip_location: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -187,7 +188,7 @@ class KuaishouVideo(Base):
     avatar: Mapped[str | None] = mapped_column(Text, nullable=True)
     add_ts: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
     last_modify_ts: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
-    video_id: Mapped[str | None] = mapped_column(String(255), index=True, nullable=True)
+    video_id: Mapped[str | None] = mapped_column(String(255), index=True, unique=True, nullable=True)
     video_type: Mapped[str | None] = mapped_column(Text, nullable=True)
     title: Mapped[str | None] = mapped_column(Text, nullable=True)
     desc: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -209,7 +210,7 @@ class KuaishouVideoComment(Base):
     avatar: Mapped[str | None] = mapped_column(Text, nullable=True)
     add_ts: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
     last_modify_ts: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
-    comment_id: Mapped[int | None] = mapped_column(BigInteger, index=True, nullable=True)
+    comment_id: Mapped[int | None] = mapped_column(BigInteger, index=True, unique=True, nullable=True)
     video_id: Mapped[str | None] = mapped_column(String(255), index=True, nullable=True)
     content: Mapped[str | None] = mapped_column(Text, nullable=True)
     create_time: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
@@ -226,7 +227,7 @@ class WeiboNote(Base):
     ip_location: Mapped[str | None] = mapped_column(Text, default='', nullable=True)
     add_ts: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
     last_modify_ts: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
-    note_id: Mapped[int | None] = mapped_column(BigInteger, index=True, nullable=True)
+    note_id: Mapped[int | None] = mapped_column(BigInteger, index=True, unique=True, nullable=True)
     content: Mapped[str | None] = mapped_column(Text, nullable=True)
     create_time: Mapped[int | None] = mapped_column(BigInteger, index=True, nullable=True)
     create_date_time: Mapped[str | None] = mapped_column(String(255), index=True, nullable=True)
@@ -249,7 +250,7 @@ class WeiboNoteComment(Base):
     ip_location: Mapped[str | None] = mapped_column(Text, default='', nullable=True)
     add_ts: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
     last_modify_ts: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
-    comment_id: Mapped[int | None] = mapped_column(BigInteger, index=True, nullable=True)
+    comment_id: Mapped[int | None] = mapped_column(BigInteger, index=True, unique=True, nullable=True)
     note_id: Mapped[int | None] = mapped_column(BigInteger, index=True, nullable=True)
     content: Mapped[str | None] = mapped_column(Text, nullable=True)
     create_time: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
@@ -262,7 +263,7 @@ class WeiboNoteComment(Base):
 class WeiboCreator(Base):
     __tablename__ = "weibo_creator"
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    user_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    user_id: Mapped[str | None] = mapped_column(String(255), index=True, unique=True, nullable=True)
     nickname: Mapped[str | None] = mapped_column(Text, nullable=True)
     avatar: Mapped[str | None] = mapped_column(Text, nullable=True)
     ip_location: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -278,7 +279,7 @@ class WeiboCreator(Base):
 class XhsCreator(Base):
     __tablename__ = "xhs_creator"
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    user_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    user_id: Mapped[str | None] = mapped_column(String(255), index=True, unique=True, nullable=True)
     nickname: Mapped[str | None] = mapped_column(Text, nullable=True)
     avatar: Mapped[str | None] = mapped_column(Text, nullable=True)
     ip_location: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -301,7 +302,7 @@ class XhsNote(Base):
     ip_location: Mapped[str | None] = mapped_column(Text, nullable=True)
     add_ts: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
     last_modify_ts: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
-    note_id: Mapped[str | None] = mapped_column(String(255), index=True, nullable=True)
+    note_id: Mapped[str | None] = mapped_column(String(255), index=True, unique=True, nullable=True)
     type: Mapped[str | None] = mapped_column(Text, nullable=True)
     title: Mapped[str | None] = mapped_column(Text, nullable=True)
     desc: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -330,7 +331,7 @@ class XhsNoteComment(Base):
     ip_location: Mapped[str | None] = mapped_column(Text, nullable=True)
     add_ts: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
     last_modify_ts: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
-    comment_id: Mapped[str | None] = mapped_column(String(255), index=True, nullable=True)
+    comment_id: Mapped[str | None] = mapped_column(String(255), index=True, unique=True, nullable=True)
     create_time: Mapped[int | None] = mapped_column(BigInteger, index=True, nullable=True)
     note_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
     content: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -342,7 +343,7 @@ class XhsNoteComment(Base):
 class TiebaNote(Base):
     __tablename__ = "tieba_note"
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    note_id: Mapped[str | None] = mapped_column(String(644), index=True, nullable=True)
+    note_id: Mapped[str | None] = mapped_column(String(644), index=True, unique=True, nullable=True)
     title: Mapped[str | None] = mapped_column(Text, nullable=True)
     desc: Mapped[str | None] = mapped_column(Text, nullable=True)
     note_url: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -365,7 +366,7 @@ class TiebaNote(Base):
 class TiebaComment(Base):
     __tablename__ = "tieba_comment"
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    comment_id: Mapped[str | None] = mapped_column(String(255), index=True, nullable=True)
+    comment_id: Mapped[str | None] = mapped_column(String(255), index=True, unique=True, nullable=True)
     parent_comment_id: Mapped[str | None] = mapped_column(String(255), default='', nullable=True)
     content: Mapped[str | None] = mapped_column(Text, nullable=True)
     user_link: Mapped[str | None] = mapped_column(Text, default='', nullable=True)
@@ -386,7 +387,7 @@ class TiebaComment(Base):
 class TiebaCreator(Base):
     __tablename__ = "tieba_creator"
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    user_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    user_id: Mapped[str | None] = mapped_column(String(64), index=True, unique=True, nullable=True)
     user_name: Mapped[str | None] = mapped_column(Text, nullable=True)
     nickname: Mapped[str | None] = mapped_column(Text, nullable=True)
     avatar: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -402,7 +403,7 @@ class TiebaCreator(Base):
 class ZhihuContent(Base):
     __tablename__ = "zhihu_content"
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    content_id: Mapped[str | None] = mapped_column(String(64), index=True, nullable=True)
+    content_id: Mapped[str | None] = mapped_column(String(64), index=True, unique=True, nullable=True)
     content_type: Mapped[str | None] = mapped_column(Text, nullable=True)
     content_text: Mapped[str | None] = mapped_column(Text, nullable=True)
     content_url: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -427,7 +428,7 @@ class ZhihuContent(Base):
 class ZhihuComment(Base):
     __tablename__ = "zhihu_comment"
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    comment_id: Mapped[str | None] = mapped_column(String(64), index=True, nullable=True)
+    comment_id: Mapped[str | None] = mapped_column(String(64), index=True, unique=True, nullable=True)
     parent_comment_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
     content: Mapped[str | None] = mapped_column(Text, nullable=True)
     publish_time: Mapped[str | None] = mapped_column(String(32), index=True, nullable=True)
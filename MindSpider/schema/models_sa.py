@@ -21,6 +21,7 @@ __all__ = [
     "DailyTopic",
     "TopicNewsRelation",
     "CrawlingTask",
+    "UnifiedContent",
 ]
 
 
@@ -124,3 +125,40 @@ class CrawlingTask(Base):
     last_modify_ts: Mapped[int] = mapped_column(BigInteger, nullable=False)
 
 
+class UnifiedContent(Base):
+    """
+    跨平台统一内容表：各平台内容表的规范化副本
+
+    互动数据统一为整数、发布时间统一为秒级时间戳，并预先计算综合热度，
+    供 InsightEngine 的热点查询直接走索引。由 unified_content.py 按 last_modify_ts 增量同步。
+    """
+    __tablename__ = "unified_content"
+    __table_args__ = (
+        UniqueConstraint("source_table", "content_id", name="uq_unified_content_source"),
+        Index("idx_unified_content_publish", "publish_ts"),
+        Index("idx_unified_content_hotness", "hotness_score"),
+        Index("idx_unified_content_platform_publish", "platform", "publish_ts"),
+        Index("idx_unified_content_source_modify", "source_table", "source_modify_ts"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    platform: Mapped[str] = mapped_column(String(16), nullable=False)
+    content_type: Mapped[str] = mapped_column(String(16), nullable=False)
+    source_table: Mapped[str] = mapped_column(String(32), nullable=False)
+    content_id: Mapped[str] = mapped_column(String(128), nullable=False)
+    title_or_content: Mapped[Optional[str]] = mapped_column(Text)
+    author_nickname: Mapped[Optional[str]] = mapped_column(Text)
+    url: Mapped[Optional[str]] = mapped_column(Text)
+    publish_ts: Mapped[Optional[int]] = mapped_column(BigInteger)
+    liked_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    comment_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    share_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    favorite_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    coin_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    danmaku_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    view_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    hotness_score: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    source_keyword: Mapped[Optional[str]] = mapped_column(Text)
+    source_modify_ts: Mapped[Optional[int]] = mapped_column(BigInteger)
+    add_ts: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    last_modify_ts: Mapped[int] = mapped_column(BigInteger, nullable=False)
@@ -0,0 +1,284 @@
+"""
+MindSpider 跨平台统一内容表同步（SQLAlchemy 2.x 异步引擎）
+
+各平台内容表（bilibili_video、douyin_aweme 等）的互动数据以字符串存储（如 "1.2万"），
+发布时间的单位和格式也各不相同，无法建索引。本模块把它们规范化后写入 unified_content：
+- 互动数据解析为整数（支持 "万"/"亿"/"w" 等写法）
+- 发布时间统一为秒级时间戳 publish_ts
+- 按统一权重预先计算综合热度 hotness_score
+
+同步按源表的 last_modify_ts 增量进行：每张源表只读取上次同步水位之后修改过的行，
+按主键分页批量 upsert。可在爬取结束后调用，也可单独运行：
+
+    python MindSpider/schema/unified_content.py          # 增量同步
+    python MindSpider/schema/unified_content.py --full   # 全量重建
+
+数据模型定义位置：
+- MindSpider/schema/models_sa.py（UnifiedContent）
+- MindSpider/schema/models_bigdata.py（各平台源表）
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import re
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+from sqlalchemy import column, func, select, table
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from models_sa import UnifiedContent
+
+__all__ = [
+    "HOTNESS_WEIGHTS",
+    "UNIFIED_SOURCES",
+    "parse_count",
+    "normalize_timestamp",
+    "compute_hotness",
+    "sync_unified_content",
+]
+
+
+# 综合热度权重，与 InsightEngine MediaCrawlerDB.W_* 保持一致
+HOTNESS_WEIGHTS: Dict[str, float] = {
+    "liked_count": 1.0,
+    "comment_count": 5.0,
+    "share_count": 10.0,  # 分享/转发/收藏/投币等高价值互动
+    "favorite_count": 10.0,
+    "coin_count": 10.0,
+    "danmaku_count": 0.5,
+    "view_count": 0.1,
+}
+
+# 源表 -> 字段映射；counts 为 统一列 -> 源列
+UNIFIED_SOURCES: Dict[str, Dict[str, Any]] = {
+    "bilibili_video": {
+        "platform": "bilibili", "type": "video", "id": "video_id",
+        "title": ["title", "desc"], "author": "nickname", "url": "video_url", "time": ["create_time"],
+        "counts": {
+            "liked_count": "liked_count", "comment_count": "video_comment", "share_count": "video_share_count",
+            "favorite_count": "video_favorite_count", "coin_count": "video_coin_count",
+            "danmaku_count": "video_danmaku", "view_count": "video_play_count",
+        },
+    },
+    "douyin_aweme": {
+        "platform": "douyin", "type": "video", "id": "aweme_id",
+        "title": ["title", "desc"], "author": "nickname", "url": "aweme_url", "time": ["create_time"],
+        "counts": {
+            "liked_count": "liked_count", "comment_count": "comment_count",
+            "share_count": "share_count", "favorite_count": "collected_count",
+        },
+    },
+    "kuaishou_video": {
+        "platform": "kuaishou", "type": "video", "id": "video_id",
+        "title": ["title", "desc"], "author": "nickname", "url": "video_url", "time": ["create_time"],
+        "counts": {"liked_count": "liked_count", "view_count": "viewd_count"},
+    },
+    "weibo_note": {
+        "platform": "weibo", "type": "note", "id": "note_id",
+        "title": ["content"], "author": "nickname", "url": "note_url", "time": ["create_date_time", "create_time"],
+        "counts": {"liked_count": "liked_count", "comment_count": "comments_count", "share_count": "shared_count"},
+    },
+    "xhs_note": {
+        "platform": "xhs", "type": "note", "id": "note_id",
+        "title": ["title", "desc"], "author": "nickname", "url": "note_url", "time": ["time"],
+        "counts": {
+            "liked_count": "liked_count", "comment_count": "comment_count",
+            "share_count": "share_count", "favorite_count": "collected_count",
+        },
+    },
+    "zhihu_content": {
+        "platform": "zhihu", "type": "content", "id": "content_id",
+        "title": ["title", "content_text"], "author": "user_nickname", "url": "content_url", "time": ["created_time"],
+        "counts": {"liked_count": "voteup_count", "comment_count": "comment_count"},
+    },
+}
+
+_COUNT_PATTERN = re.compile(r"^([0-9]+(?:\.[0-9]+)?)\s*(万|w|W|亿|千|k|K)?\+?$")
+_COUNT_UNITS = {"万": 10_000, "w": 10_000, "W": 10_000, "亿": 100_000_000, "千": 1_000, "k": 1_000, "K": 1_000}
+
+
+def parse_count(value: Any) -> int:
+    """把平台返回的互动数（整数、"1,234"、"1.2万"、"10w+" 等）解析为整数，无法解析时返回0"""
+    if value is None or isinstance(value, bool):
+        return 0
+    if isinstance(value, (int, float)):
+        return max(0, int(value))
+    match = _COUNT_PATTERN.match(str(value).strip().replace(",", ""))
+    if not match:
+        return 0
+    number, unit = match.groups()
+    return int(float(number) * _COUNT_UNITS.get(unit, 1))
+
+
+def normalize_timestamp(value: Any) -> Optional[int]:
+    """把秒/毫秒时间戳、数字字符串或 "YYYY-MM-DD HH:MM:SS" 统一为秒级时间戳"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    text_value = str(value).strip()
+    if isinstance(value, (int, float)) or text_value.isdigit():
+        number = int(float(value))
+        return number // 1000 if number > 1_000_000_000_000 else number
+    try:
+        return int(datetime.fromisoformat(text_value.split("+")[0].strip()).timestamp())
+    except ValueError:
+        return None
+
+
+def compute_hotness(counts: Dict[str, int]) -> float:
+    """按 HOTNESS_WEIGHTS 计算综合热度"""
+    return round(sum(counts.get(name, 0) * weight for name, weight in HOTNESS_WEIGHTS.items()), 2)
+
+
+def _first_present(row: Dict[str, Any], columns: List[str]) -> Any:
+    for col in columns:
+        value = row.get(col)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _source_columns(spec: Dict[str, Any]) -> List[str]:
+    columns = ["id", "last_modify_ts", "source_keyword", spec["id"], spec["author"], spec["url"]]
+    columns += spec["title"] + spec["time"] + list(spec["counts"].values())
+    return list(dict.fromkeys(columns))
+
+
+def _to_unified_row(source_table: str, spec: Dict[str, Any], row: Dict[str, Any], now_ts: int) -> Optional[Dict[str, Any]]:
+    content_id = row.get(spec["id"])
+    if content_id in (None, ""):
+        return None
+    counts = {name: parse_count(row.get(src)) for name, src in spec["counts"].items()}
+    unified = {name: counts.get(name, 0) for name in HOTNESS_WEIGHTS}
+    unified.update({
+        "platform": spec["platform"],
+        "content_type": spec["type"],
+        "source_table": source_table,
+        "content_id": str(content_id),
+        "title_or_content": _first_present(row, spec["title"]) or "",
+        "author_nickname": row.get(spec["author"]),
+        "url": row.get(spec["url"]),
+        "publish_ts": normalize_timestamp(_first_present(row, spec["time"])),
+        "hotness_score": compute_hotness(counts),
+        "source_keyword": row.get("source_keyword"),
+        "source_modify_ts": row.get("last_modify_ts"),
+        "add_ts": now_ts,
+        "last_modify_ts": now_ts,
+    })
+    return unified
+
+
+def _upsert_statement(dialect: str, rows: List[Dict[str, Any]]):
+    """按方言构造 upsert；以 (source_table, content_id) 唯一键去重，保留首次写入的 add_ts"""
+    target = UnifiedContent.__table__
+    update_columns = [name for name in rows[0] if name not in ("source_table", "content_id", "add_ts")]
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(target).values(rows)
+        return stmt.on_duplicate_key_update({name: stmt.inserted[name] for name in update_columns})
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise ValueError(f"unified_content 同步不支持的数据库方言: {dialect}")
+    stmt = insert(target).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=["source_table", "content_id"],
+        set_={name: stmt.excluded[name] for name in update_columns},
+    )
+
+
+async def _sync_table(conn: AsyncConnection, dialect: str, source_table: str, spec: Dict[str, Any],
+                      full: bool, batch_size: int) -> int:
+    columns = _source_columns(spec)
+    source = table(source_table, *[column(name) for name in columns])
+
+    watermark = None
+    if not full:
+        result = await conn.execute(
+            select(func.max(UnifiedContent.source_modify_ts)).where(UnifiedContent.source_table == source_table)
+        )
+        watermark = result.scalar()
+
+    synced, last_id = 0, 0
+    while True:
+        query = select(*source.c).where(source.c.id > last_id).order_by(source.c.id).limit(batch_size)
+        if watermark is not None:
+            # 同一毫秒内可能有多行，用 >= 并依赖 upsert 幂等
+            query = query.where(source.c.last_modify_ts >= watermark)
+        rows = [dict(row) for row in (await conn.execute(query)).mappings().all()]
+        if not rows:
+            break
+        last_id = rows[-1]["id"]
+
+        now_ts = int(time.time() * 1000)
+        unified_rows: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            unified = _to_unified_row(source_table, spec, row, now_ts)
+            if unified:
+                unified_rows[unified["content_id"]] = unified
+        if unified_rows:
+            await conn.execute(_upsert_statement(dialect, list(unified_rows.values())))
+            await conn.commit()
+            synced += len(unified_rows)
+        if len(rows) < batch_size:
+            break
+    return synced
+
+
+async def sync_unified_content(engine, full: bool = False, batch_size: int = 1000) -> Dict[str, int]:
+    """
+    把各平台内容表增量同步到 unified_content。
+
+    单张源表失败（例如表尚未由 MediaCrawler 创建）只记录日志，不影响其余表。
+
+    Args:
+        engine: SQLAlchemy AsyncEngine
+        full: 为 True 时忽略同步水位，重新处理全部行
+        batch_size: 每批读取/写入的行数
+
+    Returns:
+        每张源表本次同步的行数
+    """
+    dialect = engine.url.get_backend_name()
+    stats: Dict[str, int] = {}
+    for source_table, spec in UNIFIED_SOURCES.items():
+        try:
+            async with engine.connect() as conn:
+                stats[source_table] = await _sync_table(conn, dialect, source_table, spec, full, batch_size)
+        except Exception as e:
+            logger.warning(f"[unified_content] 同步 {source_table} 失败: {e}")
+            stats[source_table] = 0
+    logger.info(f"[unified_content] 同步完成: {stats}")
+    return stats
+
+
+async def sync_unified_content_from_settings(full: bool = False, batch_size: int = 1000) -> Dict[str, int]:
+    """按 MindSpider 配置连接数据库并执行同步"""
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from init_database import _build_database_url
+
+    engine = create_async_engine(_build_database_url(), pool_pre_ping=True, pool_recycle=1800)
+    try:
+        return await sync_unified_content(engine, full=full, batch_size=batch_size)
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="同步各平台内容到 unified_content 统一内容表")
+    parser.add_argument("--full", action="store_true", help="忽略同步水位，全量重建")
+    parser.add_argument("--batch-size", type=int, default=1000, help="每批处理的行数")
+    args = parser.parse_args()
+    asyncio.run(sync_unified_content_from_settings(full=args.full, batch_size=args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
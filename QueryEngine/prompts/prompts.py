@@ -33,6 +33,7 @@ output_schema_first_search = {
     "type": "object",
     "properties": {
         "search_query": {"type": "string"},
+        "additional_queries": {"type": "array", "items": {"type": "string"}, "description": "可选，最多2个从不同角度或换一种说法的补充查询，与search_query使用同一工具并行搜索"},
         "search_tool": {"type": "string"},
         "reasoning": {"type": "string"},
         "start_date": {"type": "string", "description": "开始日期，格式YYYY-MM-DD，仅search_news_by_date工具需要"},
@@ -78,6 +79,7 @@ output_schema_reflection = {
     "type": "object",
     "properties": {
         "search_query": {"type": "string"},
+        "additional_queries": {"type": "array", "items": {"type": "string"}, "description": "可选，最多2个从不同角度或换一种说法的补充查询，与search_query使用同一工具并行搜索"},
         "search_tool": {"type": "string"},
         "reasoning": {"type": "string"},
         "start_date": {"type": "string", "description": "开始日期，格式YYYY-MM-DD，仅search_news_by_date工具需要"},
@@ -177,7 +179,7 @@ SYSTEM_PROMPT_FIRST_SEARCH = f"""
 
 你的任务是：
 1. 根据段落主题选择最合适的搜索工具
-2. 制定最佳的搜索查询
+2. 制定最佳的搜索查询；如有必要，可在additional_queries中给出最多2个不同角度的补充查询
 3. 如果选择search_news_by_date工具，必须同时提供start_date和end_date参数（格式：YYYY-MM-DD）
 4. 解释你的选择理由
 5. 仔细核查新闻中的可疑点，破除谣言和误导，尽力还原事件原貌
@@ -287,7 +289,7 @@ SYSTEM_PROMPT_REFLECTION = f"""
 你的任务是：
 1. 反思段落文本的当前状态，思考是否遗漏了主题的某些关键方面
 2. 选择最合适的搜索工具来补充缺失信息
-3. 制定精确的搜索查询
+3. 制定精确的搜索查询；如有必要，可在additional_queries中给出最多2个不同角度的补充查询
 4. 如果选择search_news_by_date工具，必须同时提供start_date和end_date参数（格式：YYYY-MM-DD）
 5. 解释你的选择和推理
 6. 仔细核查新闻中的可疑点，破除谣言和误导，尽力还原事件原貌
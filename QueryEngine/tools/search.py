@@ -11,6 +11,7 @@
 新特性:
 - 新增 `basic_search_news` 工具，用于执行标准、通用的新闻搜索。
 - 每个搜索结果现在都包含 `published_date` (新闻发布日期)。
+- 请求通过 httpx.AsyncClient 连接池异步发出；`search_many` 用同一工具并发搜索多个查询并按URL合并结果。
 
 主要工具:
 - basic_search_news: (新增) 执行标准、快速的通用新闻搜索。
@@ -21,8 +22,10 @@
 - search_news_by_date: 在指定的历史日期范围内搜索。
 """
 
+import asyncio
 import os
 import sys
+from datetime import date
 from typing import List, Dict, Any, Optional
 
 # 添加utils目录到Python路径
@@ -32,14 +35,12 @@ utils_dir = os.path.join(root_dir, 'utils')
 if utils_dir not in sys.path:
     sys.path.append(utils_dir)
 
-from retry_helper import with_graceful_retry, SEARCH_API_RETRY_CONFIG
-from dataclasses import dataclass, field
+from retry_helper import with_async_graceful_retry, SEARCH_API_RETRY_CONFIG
+from search_cache import get_search_cache
+from async_runner import run_async
+from dataclasses import asdict, dataclass, field
 
-# 运行前请确保已安装Tavily库: pip install tavily-python
-try:
-    from tavily import TavilyClient
-except ImportError:
-    raise ImportError("Tavily库未安装，请运行 `pip install tavily-python` 进行安装。")
+import httpx
 
 # --- 1. 数据结构定义 ---
 
@@ -71,6 +72,17 @@ class TavilyResponse:
     images: List[ImageResult] = field(default_factory=list)
     response_time: Optional[float] = None
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TavilyResponse":
+        """从 asdict() 的结果还原（用于读取搜索缓存）"""
+        return cls(
+            query=data.get('query'),
+            answer=data.get('answer'),
+            results=[SearchResult(**item) for item in data.get('results', [])],
+            images=[ImageResult(**item) for item in data.get('images', [])],
+            response_time=data.get('response_time')
+        )
+
 
 # --- 2. 核心客户端与专用工具集 ---
 
@@ -80,25 +92,95 @@ class TavilyNewsAgency:
     每个公共方法都设计为供 AI Agent 独立调用的工具。
     """
 
-    def __init__(self, api_key: Optional[str] = None):
+    TAVILY_SEARCH_URL = "https://api.tavily.com/search"
+
+    # 各工具的固定搜索参数（query 之外）
+    TOOL_PARAMS: Dict[str, Dict[str, Any]] = {
+        "basic_search_news": {"max_results": 7, "search_depth": "basic", "include_answer": False},
+        "deep_search_news": {"search_depth": "advanced", "max_results": 20, "include_answer": "advanced"},
+        "search_news_last_24_hours": {"time_range": "d", "max_results": 10},
+        "search_news_last_week": {"time_range": "w", "max_results": 10},
+        "search_images_for_news": {"include_images": True, "include_image_descriptions": True, "max_results": 5},
+        "search_news_by_date": {"max_results": 15},
+    }
+
+    def __init__(self, api_key: Optional[str] = None, timeout: float = 60.0, max_connections: int = 20):
         """
         初始化客户端。
         Args:
             api_key: Tavily API密钥，若不提供则从环境变量 TAVILY_API_KEY 读取。
+            timeout: 单次请求超时（秒）。
+            max_connections: 异步HTTP连接池的最大连接数。
         """
         if api_key is None:
             api_key = os.getenv("TAVILY_API_KEY")
             if not api_key:
                 raise ValueError("Tavily API Key未找到！请设置TAVILY_API_KEY环境变量或在初始化时提供")
-        self._client = TavilyClient(api_key=api_key)
+        self._headers = {
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json'
+        }
+        self._timeout = timeout
+        self._max_connections = max_connections
+        # 连接池在后台 event loop 上首次请求时创建，所有段落线程共用
+        self._http_client: Optional[httpx.AsyncClient] = None
+        # 搜索响应缓存（SEARCH_CACHE_ENABLED=false 时为None）
+        self.search_cache = get_search_cache()
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                headers=self._headers,
+                timeout=self._timeout,
+                limits=httpx.Limits(
+                    max_connections=self._max_connections,
+                    max_keepalive_connections=self._max_connections
+                )
+            )
+        return self._http_client
+
+    def _tool_params(self, tool_name: str, query: str, **overrides) -> Dict[str, Any]:
+        """组合某个工具的搜索参数，overrides 中为None的参数使用工具默认值"""
+        params = {"query": query, **self.TOOL_PARAMS[tool_name]}
+        params.update({k: v for k, v in overrides.items() if v is not None})
+        return params
 
-    @with_graceful_retry(SEARCH_API_RETRY_CONFIG, default_return=TavilyResponse(query="搜索失败"))
     def _search_internal(self, **kwargs) -> TavilyResponse:
         """内部通用的搜索执行器，所有工具最终都调用此方法"""
+        return run_async(self._search_internal_async(**kwargs))
+
+    async def _search_internal_async(self, **kwargs) -> TavilyResponse:
+        """优先读取缓存，相同的并发请求只调用一次API"""
+        if self.search_cache is None:
+            return await self._search_remote(**kwargs)
+        return await self.search_cache.get_or_fetch(
+            self.search_cache.make_key("tavily", kwargs),
+            self._cache_kind(kwargs),
+            lambda: self._search_remote(**kwargs),
+            encode=asdict,
+            decode=TavilyResponse.from_dict,
+            cacheable=lambda response: bool(response.results or response.images or response.answer)
+        )
+
+    @staticmethod
+    def _cache_kind(params: Dict[str, Any]) -> str:
+        """按时效性划分缓存类别：24小时内的搜索TTL最短，已结束的历史日期范围TTL最长"""
+        if params.get('time_range') == 'd':
+            return "recent"
+        end_date = params.get('end_date')
+        if end_date and str(end_date) < date.today().isoformat():
+            return "dated"
+        return "default"
+
+    @with_async_graceful_retry(SEARCH_API_RETRY_CONFIG, default_return=TavilyResponse(query="搜索失败"))
+    async def _search_remote(self, **kwargs) -> TavilyResponse:
+        """调用Tavily API执行搜索"""
         try:
             kwargs['topic'] = 'general'
             api_params = {k: v for k, v in kwargs.items() if v is not None}
-            response_dict = self._client.search(**api_params)
+            response = await self._get_http_client().post(self.TAVILY_SEARCH_URL, json=api_params)
+            response.raise_for_status()  # 4xx/5xx（包括429限流）交给重试机制处理
+            response_dict = response.json()
             
             search_results = [
                 SearchResult(
@@ -122,6 +204,58 @@ class TavilyNewsAgency:
             print(f"搜索时发生错误: {str(e)}")
             raise e  # 让重试机制捕获并处理
 
+    # --- 多查询并发 ---
+
+    def search_many(self, tool_name: str, queries: List[str], **kwargs) -> TavilyResponse:
+        """
+        使用同一个工具并发搜索多个查询，并按URL合并结果。
+        Args:
+            tool_name: 工具名称（TOOL_PARAMS 中的键）。
+            queries: 查询列表。
+            **kwargs: 工具参数（如 max_results、start_date、end_date）。
+        """
+        print(f"--- TOOL: {tool_name} 并发搜索 {len(queries)} 个查询 ({' | '.join(queries)}) ---")
+        params_list = [self._tool_params(tool_name, query, **kwargs) for query in queries]
+        return run_async(self._search_many_async(params_list))
+
+    async def _search_many_async(self, params_list: List[Dict[str, Any]]) -> TavilyResponse:
+        responses = await asyncio.gather(*(self._search_internal_async(**params) for params in params_list))
+        return self.merge_responses([params["query"] for params in params_list], responses)
+
+    @staticmethod
+    def merge_responses(queries: List[str], responses: List[TavilyResponse]) -> TavilyResponse:
+        """
+        按URL合并多个查询的结果：各查询的结果交替排列，使截断后仍覆盖每个查询；
+        同一URL只保留一条（保留得分较高者）。
+        """
+        merged: Dict[str, SearchResult] = {}
+        for rank in range(max((len(r.results) for r in responses), default=0)):
+            for response in responses:
+                if rank >= len(response.results):
+                    continue
+                result = response.results[rank]
+                key = result.url or f"{result.title}#{len(merged)}"
+                existing = merged.get(key)
+                if existing is None:
+                    merged[key] = result
+                elif (result.score or 0) > (existing.score or 0):
+                    merged[key] = result  # 保留原位置，替换为得分更高的条目
+
+        images: Dict[str, ImageResult] = {}
+        for response in responses:
+            for image in response.images:
+                images.setdefault(image.url, image)
+
+        answers = [r.answer for r in responses if r.answer]
+        times = [r.response_time for r in responses if r.response_time is not None]
+        return TavilyResponse(
+            query=" | ".join(queries),
+            answer="\n\n".join(answers) if answers else None,
+            results=list(merged.values()),
+            images=list(images.values()),
+            response_time=max(times) if times else None
+        )
+
     # --- Agent 可用的工具方法 ---
 
     def basic_search_news(self, query: str, max_results: int = 7) -> TavilyResponse:
@@ -131,12 +265,7 @@ class TavilyNewsAgency:
         Agent可提供搜索查询(query)和可选的最大结果数(max_results)。
         """
         print(f"--- TOOL: 基础新闻搜索 (query: {query}) ---")
-        return self._search_internal(
-            query=query,
-            max_results=max_results,
-            search_depth="basic",
-            include_answer=False
-        )
+        return self._search_internal(**self._tool_params("basic_search_news", query, max_results=max_results))
 
     def deep_search_news(self, query: str) -> TavilyResponse:
         """
@@ -145,9 +274,7 @@ class TavilyNewsAgency:
         Agent只需提供搜索查询(query)。
         """
         print(f"--- TOOL: 深度新闻分析 (query: {query}) ---")
-        return self._search_internal(
-            query=query, search_depth="advanced", max_results=20, include_answer="advanced"
-        )
+        return self._search_internal(**self._tool_params("deep_search_news", query))
 
     def search_news_last_24_hours(self, query: str) -> TavilyResponse:
         """
@@ -156,7 +283,7 @@ class TavilyNewsAgency:
         Agent只需提供搜索查询(query)。
         """
         print(f"--- TOOL: 搜索24小时内新闻 (query: {query}) ---")
-        return self._search_internal(query=query, time_range='d', max_results=10)
+        return self._search_internal(**self._tool_params("search_news_last_24_hours", query))
 
     def search_news_last_week(self, query: str) -> TavilyResponse:
         """
@@ -165,7 +292,7 @@ class TavilyNewsAgency:
         Agent只需提供搜索查询(query)。
         """
         print(f"--- TOOL: 搜索本周新闻 (query: {query}) ---")
-        return self._search_internal(query=query, time_range='w', max_results=10)
+        return self._search_internal(**self._tool_params("search_news_last_week", query))
 
     def search_images_for_news(self, query: str) -> TavilyResponse:
         """
@@ -174,9 +301,7 @@ class TavilyNewsAgency:
         Agent只需提供搜索查询(query)。
         """
         print(f"--- TOOL: 查找新闻图片 (query: {query}) ---")
-        return self._search_internal(
-            query=query, include_images=True, include_image_descriptions=True, max_results=5
-        )
+        return self._search_internal(**self._tool_params("search_images_for_news", query))
 
     def search_news_by_date(self, query: str, start_date: str, end_date: str) -> TavilyResponse:
         """
@@ -186,7 +311,7 @@ class TavilyNewsAgency:
         """
         print(f"--- TOOL: 按指定日期范围搜索新闻 (query: {query}, from: {start_date}, to: {end_date}) ---")
         return self._search_internal(
-            query=query, start_date=start_date, end_date=end_date, max_results=15
+            **self._tool_params("search_news_by_date", query, start_date=start_date, end_date=end_date)
         )
 
 
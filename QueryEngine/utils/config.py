@@ -39,6 +39,8 @@ class Settings(BaseSettings):
     SEARCH_CONTENT_MAX_LENGTH: int = Field(20000, description="用于提示的最长内容长度")
     MAX_REFLECTIONS: int = Field(2, description="最大反思轮数")
     MAX_PARAGRAPHS: int = Field(5, description="最大段落数")
+    QUERY_ENGINE_PARAGRAPH_CONCURRENCY: int = Field(3, description="同时研究的段落数上限，1表示逐段顺序处理；遇到API限流时自动降低")
+    QUERY_ENGINE_SEARCH_FANOUT: int = Field(3, description="每次搜索/反思最多并发执行的查询数（主查询+补充查询），1表示只搜索主查询")
     MAX_SEARCH_RESULTS: int = Field(20, description="最大搜索结果数")
     
     # ================== 输出配置 ====================
@@ -71,6 +73,8 @@ def print_config(config: Settings):
     message += f"最长内容长度: {config.SEARCH_CONTENT_MAX_LENGTH}\n"
     message += f"最大反思次数: {config.MAX_REFLECTIONS}\n"
     message += f"最大段落数: {config.MAX_PARAGRAPHS}\n"
+    message += f"段落并发数: {config.QUERY_ENGINE_PARAGRAPH_CONCURRENCY}\n"
+    message += f"单轮并发查询数: {config.QUERY_ENGINE_SEARCH_FANOUT}\n"
     message += f"最大搜索结果数: {config.MAX_SEARCH_RESULTS}\n"
     message += f"输出目录: {config.OUTPUT_DIR}\n"
     message += f"保存中间状态: {config.SAVE_INTERMEDIATE_STATES}\n"
@@ -3,8 +3,8 @@ Report Agent主类
 整合所有模块，实现完整的报告生成流程
 """
 
-import json
 import os
+import threading
 from loguru import logger
 from datetime import datetime
 from typing import Optional, Dict, Any, List
@@ -16,94 +16,15 @@ from .nodes import (
 )
 from .state import ReportState
 from .utils.config import settings, Settings
+from .utils.readiness import ReportReadinessNotifier
 
 
-class FileCountBaseline:
-    """文件数量基准管理器"""
-    
-    def __init__(self):
-        self.baseline_file = 'logs/report_baseline.json'
-        self.baseline_data = self._load_baseline()
-    
-    def _load_baseline(self) -> Dict[str, int]:
-        """加载基准数据"""
-        try:
-            if os.path.exists(self.baseline_file):
-                with open(self.baseline_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except Exception as e:
-            logger.exception(f"加载基准数据失败: {e}")
-        return {}
-    
-    def _save_baseline(self):
-        """保存基准数据"""
-        try:
-            os.makedirs(os.path.dirname(self.baseline_file), exist_ok=True)
-            with open(self.baseline_file, 'w', encoding='utf-8') as f:
-                json.dump(self.baseline_data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            logger.exception(f"保存基准数据失败: {e}")
-    
-    def initialize_baseline(self, directories: Dict[str, str]) -> Dict[str, int]:
-        """初始化文件数量基准"""
-        current_counts = {}
-        
-        for engine, directory in directories.items():
-            if os.path.exists(directory):
-                md_files = [f for f in os.listdir(directory) if f.endswith('.md')]
-                current_counts[engine] = len(md_files)
-            else:
-                current_counts[engine] = 0
-        
-        # 保存基准数据
-        self.baseline_data = current_counts.copy()
-        self._save_baseline()
-        
-        logger.info(f"文件数量基准已初始化: {current_counts}")
-        return current_counts
-    
-    def check_new_files(self, directories: Dict[str, str]) -> Dict[str, Any]:
-        """检查是否有新文件"""
-        current_counts = {}
-        new_files_found = {}
-        all_have_new = True
-        
-        for engine, directory in directories.items():
-            if os.path.exists(directory):
-                md_files = [f for f in os.listdir(directory) if f.endswith('.md')]
-                current_counts[engine] = len(md_files)
-                baseline_count = self.baseline_data.get(engine, 0)
-                
-                if current_counts[engine] > baseline_count:
-                    new_files_found[engine] = current_counts[engine] - baseline_count
-                else:
-                    new_files_found[engine] = 0
-                    all_have_new = False
-            else:
-                current_counts[engine] = 0
-                new_files_found[engine] = 0
-                all_have_new = False
-        
-        return {
-            'ready': all_have_new,
-            'baseline_counts': self.baseline_data,
-            'current_counts': current_counts,
-            'new_files_found': new_files_found,
-            'missing_engines': [engine for engine, count in new_files_found.items() if count == 0]
-        }
-    
-    def get_latest_files(self, directories: Dict[str, str]) -> Dict[str, str]:
-        """获取每个目录的最新文件"""
-        latest_files = {}
-        
-        for engine, directory in directories.items():
-            if os.path.exists(directory):
-                md_files = [f for f in os.listdir(directory) if f.endswith('.md')]
-                if md_files:
-                    latest_file = max(md_files, key=lambda x: os.path.getmtime(os.path.join(directory, x)))
-                    latest_files[engine] = os.path.join(directory, latest_file)
-        
-        return latest_files
+# 三个引擎的报告输出目录（与各引擎Streamlit应用的OUTPUT_DIR一致）
+ENGINE_REPORT_DIRECTORIES = {
+    'insight': 'insight_engine_streamlit_reports',
+    'media': 'media_engine_streamlit_reports',
+    'query': 'query_engine_streamlit_reports'
+}
 
 
 class ReportAgent:
@@ -119,8 +40,8 @@ class ReportAgent:
         # 加载配置
         self.config = config or settings
         
-        # 初始化文件基准管理器
-        self.file_baseline = FileCountBaseline()
+        # 报告状态按线程隔离，任务队列的多个工作线程可共用同一个Agent
+        self._local = threading.local()
         
         # 初始化日志
         self._setup_logging()
@@ -131,8 +52,12 @@ class ReportAgent:
         # 初始化节点
         self._initialize_nodes()
         
-        # 初始化文件数量基准
-        self._initialize_file_baseline()
+        # 监听三个引擎的报告清单，基准之后保存的报告才视为新报告
+        self.readiness = ReportReadinessNotifier(
+            ENGINE_REPORT_DIRECTORIES,
+            poll_interval=self.config.REPORT_READINESS_POLL_INTERVAL
+        )
+        self.readiness.start()
         
         # 状态
         self.state = ReportState()
@@ -142,6 +67,19 @@ class ReportAgent:
         
         logger.info("Report Agent已初始化")
         logger.info(f"使用LLM: {self.llm_client.get_model_info()}")
+    
+    @property
+    def state(self) -> ReportState:
+        """当前线程正在生成的报告状态"""
+        state = getattr(self._local, "state", None)
+        if state is None:
+            state = ReportState()
+            self._local.state = state
+        return state
+    
+    @state.setter
+    def state(self, value: ReportState):
+        self._local.state = value
         
     def _setup_logging(self):
         """设置日志"""
@@ -152,15 +90,6 @@ class ReportAgent:
         # 创建专用的logger，避免与其他模块冲突
         logger.add(settings.LOG_FILE, level="INFO")
         
-    def _initialize_file_baseline(self):
-        """初始化文件数量基准"""
-        directories = {
-            'insight': 'insight_engine_streamlit_reports',
-            'media': 'media_engine_streamlit_reports',
-            'query': 'query_engine_streamlit_reports'
-        }
-        self.file_baseline.initialize_baseline(directories)
-    
     def _initialize_llm(self) -> LLMClient:
         """初始化LLM客户端"""
         return LLMClient(
@@ -175,7 +104,12 @@ class ReportAgent:
             self.llm_client,
             self.config.TEMPLATE_DIR
         )
-        self.html_generation_node = HTMLGenerationNode(self.llm_client)
+        self.html_generation_node = HTMLGenerationNode(
+            self.llm_client,
+            sectioned=self.config.REPORT_SECTIONED_GENERATION,
+            section_concurrency=self.config.REPORT_SECTION_CONCURRENCY,
+            excerpt_chars=self.config.REPORT_SECTION_EXCERPT_CHARS
+        )
     
     def generate_report(self, query: str, reports: List[Any], forum_logs: str = "", 
                        custom_template: str = "", save_report: bool = True) -> str:
@@ -193,6 +127,7 @@ class ReportAgent:
             最终HTML报告内容
         """
         start_time = datetime.now()
+        self.state = ReportState(query=query)
         
         logger.info(f"开始生成报告: {query}")
         self.logger.info(f"输入数据 - 报告数量: {len(reports)}, 论坛日志长度: {len(forum_logs)}")
@@ -214,6 +149,8 @@ class ReportAgent:
             self.state.metadata.generation_time = generation_time
             
             logger.info(f"报告生成完成，耗时: {generation_time:.2f} 秒")
+            if self.llm_client.response_cache is not None:
+                logger.info(f"LLM响应缓存统计: {self.llm_client.response_cache.get_stats()}")
             
             return html_report
             
@@ -379,67 +316,43 @@ class ReportAgent:
         self.state.save_to_file(filepath)
         logger.info(f"状态已保存到 {filepath}")
     
-    def check_input_files(self, insight_dir: str, media_dir: str, query_dir: str, forum_log_path: str) -> Dict[str, Any]:
+    def check_input_files(self, forum_log_path: str, query: Optional[str] = None) -> Dict[str, Any]:
         """
-        检查输入文件是否准备就绪（基于文件数量增加）
+        检查输入文件是否准备就绪（基于各引擎的报告清单）
         
         Args:
-            insight_dir: InsightEngine报告目录
-            media_dir: MediaEngine报告目录
-            query_dir: QueryEngine报告目录
             forum_log_path: 论坛日志文件路径
+            query: 研究查询；三个引擎都有该查询的报告时使用这些报告，否则使用基准之后的最新报告
             
         Returns:
             检查结果字典
         """
-        # 检查各个报告目录的文件数量变化
-        directories = {
-            'insight': insight_dir,
-            'media': media_dir,
-            'query': query_dir
-        }
-        
-        # 使用文件基准管理器检查新文件
-        check_result = self.file_baseline.check_new_files(directories)
+        result = self.readiness.get_status(query)
         
         # 检查论坛日志
         forum_ready = os.path.exists(forum_log_path)
-        
-        # 构建返回结果
-        result = {
-            'ready': check_result['ready'] and forum_ready,
-            'baseline_counts': check_result['baseline_counts'],
-            'current_counts': check_result['current_counts'],
-            'new_files_found': check_result['new_files_found'],
-            'missing_files': [],
-            'files_found': [],
-            'latest_files': {}
-        }
-        
-        # 构建详细信息
-        for engine, new_count in check_result['new_files_found'].items():
-            current_count = check_result['current_counts'][engine]
-            baseline_count = check_result['baseline_counts'].get(engine, 0)
-            
-            if new_count > 0:
-                result['files_found'].append(f"{engine}: {current_count}个文件 (新增{new_count}个)")
-            else:
-                result['missing_files'].append(f"{engine}: {current_count}个文件 (基准{baseline_count}个，无新增)")
-        
-        # 检查论坛日志
         if forum_ready:
             result['files_found'].append(f"forum: {os.path.basename(forum_log_path)}")
+            if result['ready']:
+                result['latest_files']['forum'] = forum_log_path
         else:
             result['missing_files'].append("forum: 日志文件不存在")
-        
-        # 获取最新文件路径（用于实际报告生成）
-        if result['ready']:
-            result['latest_files'] = self.file_baseline.get_latest_files(directories)
-            if forum_ready:
-                result['latest_files']['forum'] = forum_log_path
+        result['ready'] = result['ready'] and forum_ready
         
         return result
     
+    def wait_for_input_files(self, forum_log_path: str, query: Optional[str] = None, timeout: float = 60.0) -> Dict[str, Any]:
+        """
+        阻塞等待三个引擎的报告就绪（由清单变化事件唤醒），超时后返回当时的检查结果
+        
+        Args:
+            forum_log_path: 论坛日志文件路径
+            query: 研究查询
+            timeout: 最长等待时间（秒）
+        """
+        self.readiness.wait_until_ready(query, timeout)
+        return self.check_input_files(forum_log_path, query)
+    
     def load_input_files(self, file_paths: Dict[str, str]) -> Dict[str, Any]:
         """
         加载输入文件内容
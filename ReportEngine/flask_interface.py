@@ -1,18 +1,27 @@
 """
 Report Engine Flask接口
 提供HTTP API用于报告生成
+
+报告生成请求进入持久化任务队列，由 REPORT_TASK_WORKERS 个工作线程并行执行，
+可按任务ID查询进度、获取结果和取消任务，服务重启后未完成的任务会重新排队
 """
 
 import os
 import json
 import threading
-import time
-from datetime import datetime
 from flask import Blueprint, request, jsonify, Response
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Optional
 from loguru import logger
 from .agent import ReportAgent, create_agent
 from .utils.config import settings
+from .utils.task_queue import (
+    ReportTask,
+    ReportTaskQueue,
+    ReportTaskStore,
+    TASK_CANCELLED,
+    TASK_COMPLETED,
+    new_task_id
+)
 
 
 # 创建Blueprint
@@ -20,15 +29,23 @@ report_bp = Blueprint('report_engine', __name__)
 
 # 全局变量
 report_agent = None
-current_task = None
+task_queue = None
 task_lock = threading.Lock()
 
 
 def initialize_report_engine():
     """初始化Report Engine"""
-    global report_agent
+    global report_agent, task_queue
     try:
         report_agent = create_agent()
+        with task_lock:
+            if task_queue is None:
+                task_queue = ReportTaskQueue(
+                    ReportTaskStore(settings.REPORT_TASK_DB_PATH),
+                    run_report_generation,
+                    workers=settings.REPORT_TASK_WORKERS
+                )
+                task_queue.start()
         logger.info("Report Engine初始化成功")
         return True
     except Exception as e:
@@ -36,116 +53,75 @@ def initialize_report_engine():
         return False
 
 
-class ReportTask:
-    """报告生成任务"""
-
-    def __init__(self, query: str, task_id: str, custom_template: str = ""):
-        self.task_id = task_id
-        self.query = query
-        self.custom_template = custom_template
-        self.status = "pending"  # pending, running, completed, error
-        self.progress = 0
-        self.result = None
-        self.error_message = ""
-        self.created_at = datetime.now()
-        self.updated_at = datetime.now()
-        self.html_content = ""
-
-    def update_status(self, status: str, progress: int = None, error_message: str = ""):
-        """更新任务状态"""
-        self.status = status
-        if progress is not None:
-            self.progress = progress
-        if error_message:
-            self.error_message = error_message
-        self.updated_at = datetime.now()
-
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典格式"""
-        return {
-            'task_id': self.task_id,
-            'query': self.query,
-            'status': self.status,
-            'progress': self.progress,
-            'error_message': self.error_message,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat(),
-            'has_result': bool(self.html_content)
-        }
-
-
-def check_engines_ready() -> Dict[str, Any]:
-    """检查三个子引擎是否都有新文件"""
-    directories = {
-        'insight': 'insight_engine_streamlit_reports',
-        'media': 'media_engine_streamlit_reports',
-        'query': 'query_engine_streamlit_reports'
-    }
+FORUM_LOG_PATH = 'logs/forum.log'
 
-    forum_log_path = 'logs/forum.log'
 
+def check_engines_ready(query: Optional[str] = None) -> Dict[str, Any]:
+    """检查三个子引擎是否都有新报告（给定query时优先匹配该查询的报告）"""
     if not report_agent:
         return {
             'ready': False,
             'error': 'Report Engine未初始化'
         }
 
-    return report_agent.check_input_files(
-        directories['insight'],
-        directories['media'],
-        directories['query'],
-        forum_log_path
-    )
+    return report_agent.check_input_files(FORUM_LOG_PATH, query)
 
 
-def run_report_generation(task: ReportTask, query: str, custom_template: str = ""):
-    """在后台线程中运行报告生成"""
-    global current_task
+def run_report_generation(task: ReportTask, report_progress: Callable[[int], None]) -> str:
+    """
+    在任务队列的工作线程中运行报告生成
 
-    try:
-        task.update_status("running", 10)
+    Args:
+        task: 报告任务
+        report_progress: 进度回调，任务被取消时抛出 TaskCancelled
+
+    Returns:
+        HTML报告内容
+    """
+    report_progress(10)
 
-        # 检查输入文件
-        check_result = check_engines_ready()
+    # 使用提交任务时就绪的输入文件；重启恢复的旧任务没有记录时按当前状态重新检查
+    input_files = task.input_files
+    if not input_files:
+        check_result = check_engines_ready(task.query)
         if not check_result['ready']:
-            task.update_status("error", 0, f"输入文件未准备就绪: {check_result.get('missing_files', [])}")
-            return
+            raise RuntimeError(f"输入文件未准备就绪: {check_result.get('missing_files', [])}")
+        input_files = check_result['latest_files']
 
-        task.update_status("running", 30)
+    report_progress(30)
 
-        # 加载输入文件
-        content = report_agent.load_input_files(check_result['latest_files'])
+    # 加载输入文件
+    content = report_agent.load_input_files(input_files)
 
-        task.update_status("running", 50)
+    report_progress(50)
 
-        # 生成报告
-        html_report = report_agent.generate_report(
-            query=query,
-            reports=content['reports'],
-            forum_logs=content['forum_logs'],
-            custom_template=custom_template,
-            save_report=True
-        )
+    # 生成报告
+    html_report = report_agent.generate_report(
+        query=task.query,
+        reports=content['reports'],
+        forum_logs=content['forum_logs'],
+        custom_template=task.custom_template,
+        save_report=True
+    )
 
-        task.update_status("running", 90)
+    report_progress(90)
+    return html_report
 
-        # 保存结果
-        task.html_content = html_report
-        task.update_status("completed", 100)
 
-    except Exception as e:
-        task.update_status("error", 0, str(e))
-        # 只在出错时清理任务
-        with task_lock:
-            if current_task and current_task.task_id == task.task_id:
-                current_task = None
+def _task_not_found(task_id: str):
+    return jsonify({
+        'success': False,
+        'error': '任务不存在',
+        'task_id': task_id
+    }), 404
 
 
 @report_bp.route('/status', methods=['GET'])
 def get_status():
     """获取Report Engine状态"""
     try:
-        engines_status = check_engines_ready()
+        engines_status = check_engines_ready(request.args.get('query') or None)
+        running_tasks = task_queue.running_tasks() if task_queue else []
 
         return jsonify({
             'success': True,
@@ -153,7 +129,9 @@ def get_status():
             'engines_ready': engines_status['ready'],
             'files_found': engines_status.get('files_found', []),
             'missing_files': engines_status.get('missing_files', []),
-            'current_task': current_task.to_dict() if current_task else None
+            'current_task': running_tasks[0].to_dict() if running_tasks else None,
+            'running_tasks': [task.to_dict() for task in running_tasks],
+            'queue': task_queue.stats() if task_queue else None
         })
     except Exception as e:
         return jsonify({
@@ -164,40 +142,22 @@ def get_status():
 
 @report_bp.route('/generate', methods=['POST'])
 def generate_report():
-    """开始生成报告"""
-    global current_task
-
+    """提交报告生成任务"""
     try:
-        # 检查是否有任务在运行
-        with task_lock:
-            if current_task and current_task.status == "running":
-                return jsonify({
-                    'success': False,
-                    'error': '已有报告生成任务在运行中',
-                    'current_task': current_task.to_dict()
-                }), 400
-
-            # 如果有已完成的任务，清理它
-            if current_task and current_task.status in ["completed", "error"]:
-                current_task = None
-
         # 获取请求参数
         data = request.get_json() or {}
         query = data.get('query', '智能舆情分析报告')
         custom_template = data.get('custom_template', '')
 
-        # 清空日志文件
-        clear_report_log()
-
         # 检查Report Engine是否初始化
-        if not report_agent:
+        if not report_agent or not task_queue:
             return jsonify({
                 'success': False,
                 'error': 'Report Engine未初始化'
             }), 500
 
         # 检查输入文件是否准备就绪
-        engines_status = check_engines_ready()
+        engines_status = check_engines_ready(query)
         if not engines_status['ready']:
             return jsonify({
                 'success': False,
@@ -205,29 +165,86 @@ def generate_report():
                 'missing_files': engines_status.get('missing_files', [])
             }), 400
 
-        # 创建新任务
-        task_id = f"report_{int(time.time())}"
-        task = ReportTask(query, task_id, custom_template)
+        # 没有任务在执行时才清空日志，避免清掉其他任务的输出
+        if not task_queue.running_tasks():
+            clear_report_log()
 
-        with task_lock:
-            current_task = task
+        # 创建新任务并入队
+        task = ReportTask(query, new_task_id(), custom_template, engines_status.get('latest_files', {}))
+        task_queue.submit(task)
 
-        # 在后台线程中运行报告生成
-        thread = threading.Thread(
-            target=run_report_generation,
-            args=(task, query, custom_template),
-            daemon=True
-        )
-        thread.start()
+        return jsonify({
+            'success': True,
+            'task_id': task.task_id,
+            'message': '报告生成任务已提交',
+            'task': task.to_dict(),
+            'queue': task_queue.stats()
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@report_bp.route('/wait', methods=['GET'])
+def wait_engines_ready():
+    """阻塞等待三个子引擎的报告就绪（可指定query），最长等待timeout秒"""
+    try:
+        if not report_agent:
+            return jsonify({
+                'success': False,
+                'error': 'Report Engine未初始化'
+            }), 500
+
+        query = request.args.get('query') or None
+        timeout = min(max(request.args.get('timeout', 30, type=float), 0.0), 300.0)
+        engines_status = report_agent.wait_for_input_files(FORUM_LOG_PATH, query, timeout)
 
         return jsonify({
             'success': True,
-            'task_id': task_id,
-            'message': '报告生成已启动',
-            'task': task.to_dict()
+            'engines_ready': engines_status['ready'],
+            'query_id': engines_status.get('query_id'),
+            'matched_query': engines_status.get('matched_query', False),
+            'files_found': engines_status.get('files_found', []),
+            'missing_files': engines_status.get('missing_files', [])
+        })
+
+    except Exception as e:
+        logger.exception(f"等待引擎报告失败: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@report_bp.route('/tasks', methods=['GET'])
+def list_tasks():
+    """列出报告任务（可按status过滤）"""
+    try:
+        if not task_queue:
+            return jsonify({
+                'success': False,
+                'error': 'Report Engine未初始化'
+            }), 500
+
+        status = request.args.get('status') or None
+        limit = request.args.get('limit', 50, type=int)
+        running = {task.task_id: task for task in task_queue.running_tasks()}
+        tasks = [
+            running.get(task.task_id, task).to_dict()
+            for task in task_queue.store.list_tasks(status=status, limit=limit)
+        ]
+
+        return jsonify({
+            'success': True,
+            'tasks': tasks,
+            'queue': task_queue.stats()
         })
 
     except Exception as e:
+        logger.exception(f"获取报告任务列表失败: {str(e)}")
         return jsonify({
             'success': False,
             'error': str(e)
@@ -238,23 +255,13 @@ def generate_report():
 def get_progress(task_id: str):
     """获取报告生成进度"""
     try:
-        if not current_task or current_task.task_id != task_id:
-            # 如果任务不存在，可能是已经完成并被清理了
-            # 返回一个默认的完成状态而不是404
-            return jsonify({
-                'success': True,
-                'task': {
-                    'task_id': task_id,
-                    'status': 'completed',
-                    'progress': 100,
-                    'error_message': '',
-                    'has_result': True
-                }
-            })
+        task = task_queue.get(task_id) if task_queue else None
+        if task is None:
+            return _task_not_found(task_id)
 
         return jsonify({
             'success': True,
-            'task': current_task.to_dict()
+            'task': task.to_dict()
         })
 
     except Exception as e:
@@ -269,21 +276,19 @@ def get_progress(task_id: str):
 def get_result(task_id: str):
     """获取报告生成结果"""
     try:
-        if not current_task or current_task.task_id != task_id:
-            return jsonify({
-                'success': False,
-                'error': '任务不存在'
-            }), 404
+        task = task_queue.get(task_id, with_result=True) if task_queue else None
+        if task is None:
+            return _task_not_found(task_id)
 
-        if current_task.status != "completed":
+        if task.status != TASK_COMPLETED:
             return jsonify({
                 'success': False,
                 'error': '报告尚未完成',
-                'task': current_task.to_dict()
+                'task': task.to_dict()
             }), 400
 
         return Response(
-            current_task.html_content,
+            task.html_content,
             mimetype='text/html'
         )
 
@@ -299,23 +304,21 @@ def get_result(task_id: str):
 def get_result_json(task_id: str):
     """获取报告生成结果（JSON格式）"""
     try:
-        if not current_task or current_task.task_id != task_id:
-            return jsonify({
-                'success': False,
-                'error': '任务不存在'
-            }), 404
+        task = task_queue.get(task_id, with_result=True) if task_queue else None
+        if task is None:
+            return _task_not_found(task_id)
 
-        if current_task.status != "completed":
+        if task.status != TASK_COMPLETED:
             return jsonify({
                 'success': False,
                 'error': '报告尚未完成',
-                'task': current_task.to_dict()
+                'task': task.to_dict()
             }), 400
 
         return jsonify({
             'success': True,
-            'task': current_task.to_dict(),
-            'html_content': current_task.html_content
+            'task': task.to_dict(),
+            'html_content': task.html_content
         })
 
     except Exception as e:
@@ -328,24 +331,25 @@ def get_result_json(task_id: str):
 @report_bp.route('/cancel/<task_id>', methods=['POST'])
 def cancel_task(task_id: str):
     """取消报告生成任务"""
-    global current_task
-
     try:
-        with task_lock:
-            if current_task and current_task.task_id == task_id:
-                if current_task.status == "running":
-                    current_task.update_status("cancelled", 0, "用户取消任务")
-                current_task = None
-
-                return jsonify({
-                    'success': True,
-                    'message': '任务已取消'
-                })
-            else:
-                return jsonify({
-                    'success': False,
-                    'error': '任务不存在或无法取消'
-                }), 404
+        status = task_queue.cancel(task_id) if task_queue else None
+        if status is None:
+            return jsonify({
+                'success': False,
+                'error': '任务不存在或无法取消'
+            }), 404
+
+        if status == TASK_CANCELLED:
+            message = '任务已取消'
+        else:
+            # 执行中的任务在当前阶段结束后停止，结果不会保存
+            message = '已请求取消，任务将在当前阶段结束后停止'
+
+        return jsonify({
+            'success': True,
+            'message': message,
+            'status': status
+        })
 
     except Exception as e:
         return jsonify({
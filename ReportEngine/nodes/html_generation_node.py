@@ -1,31 +1,68 @@
 """
 HTML生成节点
 将整合后的内容转换为美观的HTML报告
+
+默认按模板章节分治生成：先为每个章节摘录相关内容，再并行生成各章节的HTML片段，
+最后由固定的HTML骨架按模板顺序装配，报告耗时取决于最慢的章节而不是输入总长度
 """
 
 import json
+import os
+import re
+import sys
+import time
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List
 from loguru import logger
 
 from .base_node import StateMutationNode
 from ..llms.base import LLMClient
 from ..state.state import ReportState
-from ..prompts import SYSTEM_PROMPT_HTML_GENERATION
+from ..prompts import SYSTEM_PROMPT_HTML_GENERATION, SYSTEM_PROMPT_HTML_SECTION
+from ..utils.report_sections import (
+    SectionExcerptExtractor,
+    TemplateSection,
+    parse_template,
+    render_report,
+    render_section_fallback
+)
 # 不再需要text_processing依赖
 
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+utils_dir = os.path.join(project_root, "utils")
+if utils_dir not in sys.path:
+    sys.path.append(utils_dir)
+
+from paragraph_scheduler import ParagraphScheduler
+
+# LLM返回完整HTML文档时，从中取出body内的正文
+BODY_PATTERN = re.compile(r"<body[^>]*>(.*)</body>", re.IGNORECASE | re.DOTALL)
+
 
 class HTMLGenerationNode(StateMutationNode):
     """HTML生成处理节点"""
     
-    def __init__(self, llm_client: LLMClient):
+    def __init__(
+        self,
+        llm_client: LLMClient,
+        sectioned: bool = True,
+        section_concurrency: int = 4,
+        excerpt_chars: int = 12000
+    ):
         """
         初始化HTML生成节点
         
         Args:
             llm_client: LLM客户端
+            sectioned: 是否按模板章节并行生成，False时整份报告单次生成
+            section_concurrency: 同时生成的章节数上限
+            excerpt_chars: 每个章节摘录的字符预算
         """
         super().__init__(llm_client, "HTMLGenerationNode")
+        self.sectioned = sectioned
+        self.section_concurrency = max(1, int(section_concurrency))
+        self.excerpt_chars = excerpt_chars
     
     def run(self, input_data: Dict[str, Any], **kwargs) -> str:
         """
@@ -45,6 +82,12 @@ class HTMLGenerationNode(StateMutationNode):
         """
         logger.info("开始生成HTML报告...")
         
+        if self.sectioned:
+            report_title, sections = parse_template(input_data.get('selected_template', ''))
+            if len(sections) >= 2:
+                return self._run_sectioned(input_data, report_title, sections)
+            logger.info("模板中未识别出章节结构，改为整份报告单次生成")
+        
         try:
             # 准备LLM输入数据
             llm_input = {
@@ -60,7 +103,7 @@ class HTMLGenerationNode(StateMutationNode):
             message = json.dumps(llm_input, ensure_ascii=False, indent=2)
             
             # 调用LLM生成HTML
-            response = self.llm_client.invoke(SYSTEM_PROMPT_HTML_GENERATION, message)
+            response = self.llm_client.stream_invoke_to_string(SYSTEM_PROMPT_HTML_GENERATION, message, label=self.node_name)
             
             # 处理响应（简化版）
             processed_response = self.process_output(response)
@@ -73,6 +116,79 @@ class HTMLGenerationNode(StateMutationNode):
             # 返回备用HTML
             return self._generate_fallback_html(input_data)
     
+    def _run_sectioned(self, input_data: Dict[str, Any], report_title: str, sections: List[TemplateSection]) -> str:
+        """
+        分章节生成HTML报告
+        
+        Args:
+            input_data: 同 run
+            report_title: 模板标题
+            sections: 模板章节列表
+            
+        Returns:
+            装配后的完整HTML
+        """
+        query = input_data.get('query', '')
+        start_time = time.time()
+        
+        extractor = SectionExcerptExtractor(
+            query,
+            {
+                "query_engine": input_data.get('query_engine_report', ''),
+                "media_engine": input_data.get('media_engine_report', ''),
+                "insight_engine": input_data.get('insight_engine_report', ''),
+                "forum": input_data.get('forum_logs', ''),
+            },
+            max_chars=self.excerpt_chars
+        )
+        excerpts = [extractor.extract(section) for section in sections]
+        all_sections = [section.heading for section in sections]
+        logger.info(
+            f"模板共 {len(sections)} 个章节，摘录字符数: "
+            f"{[sum(len(text) for text in item.values()) for item in excerpts]}"
+        )
+        
+        fragments: List[str] = [""] * len(sections)
+        failed: List[str] = []
+        
+        def generate_section(i: int):
+            section = sections[i]
+            section_start = time.time()
+            message = json.dumps({
+                "query": query,
+                "report_title": report_title,
+                "section_number": section.number,
+                "section_title": section.title,
+                "subsections": section.subsections,
+                "all_sections": all_sections,
+                "chart_id_prefix": f"chart-{section.number}-",
+                "excerpts": excerpts[i],
+            }, ensure_ascii=False, indent=2)
+            try:
+                response = self.llm_client.stream_invoke_to_string(
+                    SYSTEM_PROMPT_HTML_SECTION, message, label=f"{self.node_name}[{section.heading}]"
+                )
+                fragment = self.process_section_output(response)
+                if not fragment:
+                    raise ValueError("章节内容为空")
+                fragments[i] = fragment
+                logger.info(f"章节 {section.heading} 生成完成，耗时 {time.time() - section_start:.1f} 秒")
+            except Exception as e:
+                # 单个章节失败不影响其他章节，使用该章节的摘录作为备用内容
+                logger.exception(f"章节 {section.heading} 生成失败: {str(e)}")
+                fragments[i] = render_section_fallback(excerpts[i])
+                failed.append(section.heading)
+        
+        scheduler = ParagraphScheduler(self.section_concurrency)
+        scheduler.run(len(sections), generate_section)
+        
+        html_content = render_report(query, report_title, sections, fragments)
+        logger.info(
+            f"HTML报告分章节生成完成，共 {len(sections)} 个章节，总耗时 {time.time() - start_time:.1f} 秒"
+            + (f"，失败章节: {failed}" if failed else "")
+        )
+        return html_content
+    
     def mutate_state(self, input_data: Dict[str, Any], state: ReportState, **kwargs) -> ReportState:
         """
         修改报告状态，添加生成的HTML内容
@@ -131,6 +247,24 @@ class HTMLGenerationNode(StateMutationNode):
             logger.exception(f"处理HTML输出失败: {str(e)}，返回原始输出")
             return output
     
+    def process_section_output(self, output: str) -> str:
+        """
+        处理单个章节的LLM输出，得到可直接嵌入骨架的HTML片段
+        
+        Args:
+            output: LLM原始输出
+            
+        Returns:
+            HTML片段
+        """
+        fragment = self.process_output(output)
+        # 模型偶尔仍会返回完整文档，只保留body中的正文
+        match = BODY_PATTERN.search(fragment)
+        if match:
+            fragment = match.group(1)
+        fragment = re.sub(r"<style[^>]*>.*?</style>", "", fragment, flags=re.IGNORECASE | re.DOTALL)
+        return fragment.strip()
+    
     def _generate_fallback_html(self, input_data: Dict[str, Any]) -> str:
         """
         生成备用HTML报告（当LLM失败时使用）
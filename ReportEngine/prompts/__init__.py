@@ -6,13 +6,17 @@ Report Engine提示词模块
 from .prompts import (
     SYSTEM_PROMPT_TEMPLATE_SELECTION,
     SYSTEM_PROMPT_HTML_GENERATION,
+    SYSTEM_PROMPT_HTML_SECTION,
     output_schema_template_selection,
-    input_schema_html_generation
+    input_schema_html_generation,
+    input_schema_html_section
 )
 
 __all__ = [
     "SYSTEM_PROMPT_TEMPLATE_SELECTION",
     "SYSTEM_PROMPT_HTML_GENERATION", 
+    "SYSTEM_PROMPT_HTML_SECTION",
     "output_schema_template_selection",
-    "input_schema_html_generation"
+    "input_schema_html_generation",
+    "input_schema_html_section"
 ]
@@ -30,6 +30,29 @@ input_schema_html_generation = {
     }
 }
 
+# 单章节HTML生成输入Schema
+input_schema_html_section = {
+    "type": "object",
+    "properties": {
+        "query": {"type": "string"},
+        "report_title": {"type": "string"},
+        "section_number": {"type": "string"},
+        "section_title": {"type": "string"},
+        "subsections": {"type": "array", "items": {"type": "string"}},
+        "all_sections": {"type": "array", "items": {"type": "string"}},
+        "chart_id_prefix": {"type": "string"},
+        "excerpts": {
+            "type": "object",
+            "properties": {
+                "query_engine": {"type": "string"},
+                "media_engine": {"type": "string"},
+                "insight_engine": {"type": "string"},
+                "forum": {"type": "string"}
+            }
+        }
+    }
+}
+
 # HTML报告生成输出Schema - 已简化，不再使用JSON格式
 # output_schema_html_generation = {
 #     "type": "object",
@@ -133,3 +156,27 @@ SYSTEM_PROMPT_HTML_GENERATION = f"""
 
 **重要：直接返回完整的HTML代码，不要包含任何解释、说明或其他文本。只返回HTML代码本身。**
 """
+
+# 单章节HTML生成的系统提示词
+SYSTEM_PROMPT_HTML_SECTION = f"""
+你是一位专业的舆情分析报告撰写专家。一份HTML分析报告按模板章节拆分后并行撰写，你只负责其中的一个章节。
+你将收到用户查询、报告模板的全部章节名称、你负责的章节及其子条目，以及从三个分析引擎报告和论坛讨论日志中预先摘录的、与本章节相关的内容。
+
+<INPUT JSON SCHEMA>
+{json.dumps(input_schema_html_section, indent=2, ensure_ascii=False)}
+</INPUT JSON SCHEMA>
+
+**你的任务：**
+1. 只撰写section_title这一章节，按subsections的顺序逐一展开，每个子条目使用<h3>小标题
+2. 整合excerpts中三个引擎的分析结果，避免重复内容；结合论坛讨论（forum）从不同角度分析
+3. 内容详实、论证充分，本章节不少于3000字；摘录中没有依据的数据不要编造
+4. 不要重复撰写all_sections中属于其他章节的内容
+
+**HTML片段要求：**
+1. 只输出章节正文的HTML片段，不要包含DOCTYPE、html、head、body标签，也不要输出章节的一级标题（<h2>由报告骨架统一生成）
+2. 可使用<p>、<h3>、<h4>、<ul>、<ol>、<table>、<blockquote>等标签组织内容，不要使用需要点击展开的效果
+3. 需要数据可视化时使用Chart.js（页面已全局加载）：<canvas>的id必须以chart_id_prefix开头，并紧跟一个<script>标签完成图表初始化
+4. 不要输出<style>标签或外部脚本引用，页面样式由报告骨架统一提供
+
+**重要：直接返回HTML片段，不要包含任何解释、说明或其他文本。**
+"""
@@ -24,6 +24,12 @@ class Settings(BaseSettings):
     LOG_FILE: str = Field("logs/report.log", description="日志输出文件")
     ENABLE_PDF_EXPORT: bool = Field(True, description="是否允许导出PDF")
     CHART_STYLE: str = Field("modern", description="图表样式：modern/classic/")
+    REPORT_TASK_WORKERS: int = Field(2, description="报告任务队列的工作线程数，即同时生成的报告数")
+    REPORT_TASK_DB_PATH: str = Field("logs/report_tasks.db", description="报告任务持久化SQLite文件")
+    REPORT_READINESS_POLL_INTERVAL: float = Field(1.0, description="未安装watchdog时检查引擎报告清单的间隔（秒）")
+    REPORT_SECTIONED_GENERATION: bool = Field(True, description="按模板章节并行生成HTML并由固定骨架装配；关闭后整份报告单次生成")
+    REPORT_SECTION_CONCURRENCY: int = Field(4, description="同时生成的章节数上限，遇到API限流时自动降低")
+    REPORT_SECTION_EXCERPT_CHARS: int = Field(12000, description="每个章节从引擎报告和论坛日志中摘录的字符预算")
 
     class Config:
         env_file = ".env"
@@ -48,6 +54,8 @@ def print_config(config: Settings):
     message += f"日志文件: {config.LOG_FILE}\n"
     message += f"PDF 导出: {config.ENABLE_PDF_EXPORT}\n"
     message += f"图表样式: {config.CHART_STYLE}\n"
+    message += f"报告任务队列: {config.REPORT_TASK_WORKERS} 个工作线程（{config.REPORT_TASK_DB_PATH}）\n"
+    message += f"分章节生成: {config.REPORT_SECTIONED_GENERATION}（并发 {config.REPORT_SECTION_CONCURRENCY}，每章摘录 {config.REPORT_SECTION_EXCERPT_CHARS} 字符）\n"
     message += f"LLM API Key: {'已配置' if config.REPORT_ENGINE_API_KEY else '未配置'}\n"
     message += "=========================\n"
     logger.info(message)
@@ -0,0 +1,233 @@
+"""
+引擎报告就绪检测
+监听三个引擎输出目录中的报告清单（report_manifest.json），在内存中维护各引擎的最新报告
+和按查询ID索引的报告，就绪判断只需查字典，不再扫描目录。
+复用 ForumEngine 的 LogDirWatcher：Linux 下通过 inotify 感知清单变化，其他平台退化为定时检查清单文件的修改时间。
+"""
+
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+utils_dir = os.path.join(project_root, "utils")
+if utils_dir not in sys.path:
+    sys.path.append(utils_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from report_manifest import MANIFEST_FILENAME, load_manifest, make_query_id, manifest_path
+
+try:
+    from ForumEngine.log_tailer import LogDirWatcher
+    DIR_WATCHER_AVAILABLE = True
+except ImportError:
+    LogDirWatcher = None
+    DIR_WATCHER_AVAILABLE = False
+
+
+class ReportReadinessNotifier:
+    """
+    引擎报告就绪通知器
+
+    baseline 之后保存的报告视为"新报告"；按查询检查时，三个引擎都有该查询在 baseline 之后保存的报告即可。
+    """
+
+    def __init__(self, directories: Dict[str, str], poll_interval: float = 1.0):
+        """
+        Args:
+            directories: 引擎名 -> 报告输出目录
+            poll_interval: 无 inotify 时检查清单修改时间的间隔（秒），也是监听线程检查停止信号的间隔
+        """
+        self.directories = dict(directories)
+        self.poll_interval = max(0.1, float(poll_interval))
+        self.baseline = datetime.now()
+        self._manifests: Dict[str, Dict[str, Any]] = {}
+        self._mtimes: Dict[str, Optional[float]] = {}
+        self._condition = threading.Condition()
+        self._refresh_lock = threading.Lock()
+        self._subscribers: List[Callable[[str, Dict[str, Any]], None]] = []
+        self._threads: List[threading.Thread] = []
+        self._stopped = threading.Event()
+
+        self.refresh()
+
+    def start(self) -> None:
+        """开始监听清单变化"""
+        if self._threads:
+            return
+        if DIR_WATCHER_AVAILABLE:
+            backends = set()
+            for engine, directory in self.directories.items():
+                os.makedirs(directory, exist_ok=True)
+                watcher = LogDirWatcher(Path(directory), [MANIFEST_FILENAME], poll_interval=self.poll_interval)
+                backends.add(watcher.backend)
+                self._start_thread(self._watch, watcher, name=f"report-readiness-{engine}")
+            if backends == {"inotify"}:
+                logger.info("报告就绪检测: 使用 inotify 监听报告清单")
+            else:
+                logger.info(f"报告就绪检测: inotify 不可用，每 {self.poll_interval} 秒检查报告清单")
+            return
+        self._start_thread(self._poll, name="report-readiness")
+        logger.info(f"报告就绪检测: 每 {self.poll_interval} 秒检查报告清单")
+
+    def stop(self) -> None:
+        """停止监听，监听线程在下一个检查间隔内退出"""
+        self._stopped.set()
+
+    def _start_thread(self, target: Callable, *args, name: str) -> None:
+        thread = threading.Thread(target=target, args=args, name=name, daemon=True)
+        self._threads.append(thread)
+        thread.start()
+
+    def reset_baseline(self) -> None:
+        """以当前时间为基准，此前保存的报告不再视为新报告"""
+        with self._condition:
+            self.baseline = datetime.now()
+        logger.info(f"报告就绪基准已更新: {self.baseline.isoformat()}")
+
+    def subscribe(self, callback: Callable[[str, Dict[str, Any]], None]) -> None:
+        """订阅新报告事件，回调参数为(引擎名, 清单条目)，在监听线程中调用"""
+        with self._condition:
+            self._subscribers.append(callback)
+
+    def refresh(self) -> bool:
+        """重新加载有变化的清单，返回是否有变化"""
+        with self._refresh_lock:
+            changed = self._reload_changed()
+
+        if changed:
+            with self._condition:
+                subscribers = list(self._subscribers)
+                self._condition.notify_all()
+            for engine, entry in changed:
+                logger.info(f"检测到 {engine} 新报告: {entry.get('query')} -> {entry.get('path')}")
+                for callback in subscribers:
+                    try:
+                        callback(engine, entry)
+                    except Exception as e:
+                        logger.exception(f"报告就绪回调失败: {e}")
+        return bool(changed)
+
+    def _reload_changed(self) -> List[tuple]:
+        """按修改时间判断并重新加载清单，返回[(引擎名, 新的最新条目)]"""
+        changed = []
+        for engine, directory in self.directories.items():
+            try:
+                mtime = os.stat(manifest_path(directory)).st_mtime_ns
+            except OSError:
+                mtime = None
+            if engine in self._mtimes and self._mtimes[engine] == mtime:
+                continue
+            manifest = load_manifest(directory) if mtime is not None else {"latest": None, "by_query": {}}
+            with self._condition:
+                previous = (self._manifests.get(engine) or {}).get("latest")
+                self._manifests[engine] = manifest
+                self._mtimes[engine] = mtime
+            if manifest.get("latest") and manifest["latest"] != previous:
+                changed.append((engine, manifest["latest"]))
+        return changed
+
+    def _watch(self, watcher) -> None:
+        """等待目录中的清单文件变化后重新加载"""
+        try:
+            while not self._stopped.is_set():
+                if not watcher.wait(self.poll_interval) or self._stopped.is_set():
+                    continue
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logger.exception(f"检查报告清单失败: {e}")
+        finally:
+            watcher.close()
+
+    def _poll(self) -> None:
+        while not self._stopped.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.exception(f"检查报告清单失败: {e}")
+
+    def _is_new(self, entry: Optional[Dict[str, Any]]) -> bool:
+        if not entry:
+            return False
+        try:
+            return datetime.fromisoformat(entry["saved_at"]) >= self.baseline
+        except (KeyError, TypeError, ValueError):
+            return False
+
+    def get_status(self, query: Optional[str] = None) -> Dict[str, Any]:
+        """
+        获取就绪状态
+
+        Args:
+            query: 研究查询；三个引擎都有该查询在基准之后保存的报告时直接使用这些报告，
+                否则使用各引擎在基准之后保存的最新报告
+
+        Returns:
+            包含 ready / latest_files / files_found / missing_files / query_id 的字典
+        """
+        query_id = make_query_id(query) if query else None
+        with self._condition:
+            manifests = dict(self._manifests)
+
+        entries: Dict[str, Optional[Dict[str, Any]]] = {}
+        matched = False
+        if query_id:
+            entries = {
+                engine: (manifests.get(engine) or {}).get("by_query", {}).get(query_id)
+                for engine in self.directories
+            }
+            # 同一查询的旧报告（基准之前保存的）不能算作本次请求已就绪
+            matched = all(
+                self._is_new(entry) and os.path.exists(entry["path"]) for entry in entries.values()
+            )
+        if not matched:
+            entries = {
+                engine: (manifests.get(engine) or {}).get("latest")
+                for engine in self.directories
+            }
+            entries = {
+                engine: entry if self._is_new(entry) and os.path.exists(entry["path"]) else None
+                for engine, entry in entries.items()
+            }
+
+        result = {
+            'ready': all(entries.values()),
+            'query_id': query_id,
+            'matched_query': matched,
+            'baseline': self.baseline.isoformat(),
+            'files_found': [],
+            'missing_files': [],
+            'latest_files': {},
+        }
+        for engine, entry in entries.items():
+            if entry:
+                result['latest_files'][engine] = entry["path"]
+                result['files_found'].append(f"{engine}: {os.path.basename(entry['path'])}")
+            elif query_id:
+                result['missing_files'].append(f"{engine}: 基准之后无该查询的报告，也无其他新报告")
+            else:
+                result['missing_files'].append(f"{engine}: 基准之后无新报告")
+        return result
+
+    def wait_until_ready(self, query: Optional[str] = None, timeout: float = 60.0) -> Dict[str, Any]:
+        """阻塞等待报告就绪，超时后返回当时的状态"""
+        deadline = time.monotonic() + max(0.0, timeout)
+        while True:
+            status = self.get_status(query)
+            remaining = deadline - time.monotonic()
+            if status['ready'] or remaining <= 0:
+                return status
+            with self._condition:
+                self._condition.wait(min(remaining, self.poll_interval))
+            if not self._threads:
+                # 尚未启动监听时由等待方自行检查
+                self.refresh()
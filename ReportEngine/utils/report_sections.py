@@ -0,0 +1,411 @@
+"""
+报告分章节生成工具
+将选定模板拆分为章节，为每个章节从三个引擎报告和论坛日志中抽取相关片段，
+并把各章节生成的HTML片段按模板顺序装配进固定的HTML骨架。
+"""
+
+import html
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# 模板中的一级章节，例如: - **1.0 摘要与核心发现**
+BOLD_SECTION_PATTERN = re.compile(r"^\s*[-*]\s*\*\*\s*(\d+)(?:\.0)?\s*[.、:：]?\s*(.+?)\s*\*\*\s*$")
+# 模板中的二级条目，例如:   - 1.1 品牌声誉总览
+BOLD_SUBSECTION_PATTERN = re.compile(r"^\s+[-*]\s*(?:\d+\.\d+\s*)?(.+?)\s*$")
+# Markdown标题形式的模板（备用模板、自定义模板）
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+
+# 各来源在提示词和备用内容中的显示名称
+SOURCE_LABELS = {
+    "query_engine": "QueryEngine",
+    "media_engine": "MediaEngine",
+    "insight_engine": "InsightEngine",
+    "forum": "ForumEngine",
+}
+
+# 章节标题中过于通用、不能区分相关性的词
+GENERIC_TERMS = {
+    "分析", "报告", "摘要", "核心", "关键", "主要", "总览", "概览", "本期", "本周", "周期",
+    "建议", "结论", "情况", "内容", "数据", "相关", "模板", "以及", "与其", "我们",
+}
+
+# 单个片段的最大长度，超过时按句子继续切分
+MAX_CHUNK_CHARS = 1200
+
+_CJK_RUN_PATTERN = re.compile(r"[\u4e00-\u9fff]+")
+_LATIN_WORD_PATTERN = re.compile(r"[A-Za-z][A-Za-z0-9_+\-]{1,}|\d{2,}")
+_SENTENCE_END_PATTERN = re.compile(r"(?<=[。！？!?；;])")
+
+
+@dataclass
+class TemplateSection:
+    """模板中的一个一级章节"""
+    number: str
+    title: str
+    subsections: List[str] = field(default_factory=list)
+
+    @property
+    def anchor(self) -> str:
+        """章节在HTML中的锚点ID"""
+        return f"section-{self.number}"
+
+    @property
+    def heading(self) -> str:
+        """章节标题（含编号）"""
+        return f"{self.number}.0 {self.title}" if self.number.isdigit() else self.title
+
+
+@dataclass
+class TextChunk:
+    """引擎报告或论坛日志中的一个候选片段"""
+    source: str
+    position: int
+    text: str
+    terms: Counter
+
+
+def parse_template(template: str) -> Tuple[str, List[TemplateSection]]:
+    """
+    解析报告模板，返回(模板标题, 章节列表)
+
+    支持两种模板写法：内置模板的加粗列表（- **1.0 标题** + 缩进子条目），
+    以及Markdown标题（## 章节 + ### 子章节）。无法识别时章节列表为空。
+    """
+    lines = (template or "").splitlines()
+    title = ""
+    for line in lines:
+        match = HEADING_PATTERN.match(line.strip())
+        if match:
+            title = match.group(2).replace("*", "").strip()
+            break
+
+    sections: List[TemplateSection] = []
+    for line in lines:
+        if not line.strip():
+            continue
+        match = BOLD_SECTION_PATTERN.match(line)
+        if match:
+            sections.append(TemplateSection(number=match.group(1), title=match.group(2).strip()))
+            continue
+        if sections and line[:1] in (" ", "\t"):
+            sub_match = BOLD_SUBSECTION_PATTERN.match(line)
+            if sub_match:
+                sections[-1].subsections.append(sub_match.group(1).replace("*", "").strip())
+    if sections:
+        return title, sections
+
+    # Markdown标题形式：取出现的最高两级标题中较大的一级作为章节
+    headings = []
+    for line in lines:
+        match = HEADING_PATTERN.match(line.strip())
+        if match:
+            headings.append((len(match.group(1)), match.group(2).replace("*", "").strip()))
+    levels = sorted({level for level, _ in headings})
+    if len(levels) < 2:
+        return title, []
+    section_level = levels[1] if sum(1 for level, _ in headings if level == levels[0]) == 1 else levels[0]
+    for level, text in headings:
+        if level == section_level:
+            sections.append(TemplateSection(number=str(len(sections) + 1), title=text))
+        elif level > section_level and sections:
+            sections[-1].subsections.append(text)
+    return title, sections
+
+
+def extract_terms(text: str) -> Counter:
+    """提取用于相关性打分的词项：中文按双字切分，英文和数字按单词"""
+    terms: Counter = Counter()
+    for run in _CJK_RUN_PATTERN.findall(text or ""):
+        if len(run) == 1:
+            continue
+        terms.update(run[i:i + 2] for i in range(len(run) - 1))
+    terms.update(word.lower() for word in _LATIN_WORD_PATTERN.findall(text or ""))
+    return terms
+
+
+def split_chunks(source: str, text: str) -> List[TextChunk]:
+    """
+    把一个来源的文本切分为候选片段
+
+    论坛日志按行（每行一条发言）切分，引擎报告按空行和Markdown标题切分，
+    过长的段落再按句子切分到 MAX_CHUNK_CHARS 以内。
+    """
+    if not text:
+        return []
+
+    if source == "forum":
+        blocks = [line.strip() for line in text.splitlines()]
+        # 跳过监控开始/结束等系统标记行
+        blocks = [line for line in blocks if line and "[SYSTEM]" not in line]
+    else:
+        blocks = []
+        current: List[str] = []
+        for line in text.splitlines():
+            if not line.strip() or (line.lstrip().startswith("#") and current):
+                if current:
+                    blocks.append("\n".join(current).strip())
+                    current = []
+                if not line.strip():
+                    continue
+            current.append(line)
+        if current:
+            blocks.append("\n".join(current).strip())
+
+    pieces: List[str] = []
+    for block in blocks:
+        if len(block) <= MAX_CHUNK_CHARS:
+            pieces.append(block)
+            continue
+        buffer = ""
+        for sentence in _SENTENCE_END_PATTERN.split(block):
+            if buffer and len(buffer) + len(sentence) > MAX_CHUNK_CHARS:
+                pieces.append(buffer)
+                buffer = ""
+            buffer += sentence
+            while len(buffer) > MAX_CHUNK_CHARS:
+                pieces.append(buffer[:MAX_CHUNK_CHARS])
+                buffer = buffer[MAX_CHUNK_CHARS:]
+        if buffer.strip():
+            pieces.append(buffer)
+
+    return [
+        TextChunk(source=source, position=i, text=piece, terms=extract_terms(piece))
+        for i, piece in enumerate(pieces)
+    ]
+
+
+class SectionExcerptExtractor:
+    """
+    为每个模板章节挑选相关片段
+
+    以章节标题和子条目（权重较高）以及用户查询（权重较低）为检索词，
+    对所有片段做TF-IDF式打分，在字符预算内选出得分最高的片段；
+    每个非空来源至少保留一个片段，避免某个引擎的视角被完全遗漏。
+    """
+
+    def __init__(self, query: str, sources: Dict[str, str], max_chars: int = 12000):
+        """
+        Args:
+            query: 用户原始查询
+            sources: 来源名 -> 文本（query_engine / media_engine / insight_engine / forum）
+            max_chars: 每个章节摘录的总字符预算
+        """
+        self.max_chars = max(1000, int(max_chars))
+        self.query_terms = extract_terms(query)
+        self.chunks: Dict[str, List[TextChunk]] = {
+            source: split_chunks(source, text) for source, text in sources.items() if text
+        }
+        all_chunks = [chunk for chunks in self.chunks.values() for chunk in chunks]
+        doc_freq: Counter = Counter()
+        for chunk in all_chunks:
+            doc_freq.update(chunk.terms.keys())
+        total = max(1, len(all_chunks))
+        self.idf = {term: math.log((total + 1) / (freq + 0.5)) for term, freq in doc_freq.items()}
+
+    def _section_terms(self, section: TemplateSection) -> Dict[str, float]:
+        weights: Dict[str, float] = {}
+        for term in extract_terms(" ".join([section.title] + section.subsections)):
+            if term not in GENERIC_TERMS:
+                weights[term] = 1.0
+        for term in self.query_terms:
+            weights.setdefault(term, 0.5)
+        return weights
+
+    def _score(self, chunk: TextChunk, weights: Dict[str, float]) -> float:
+        score = 0.0
+        for term, weight in weights.items():
+            count = chunk.terms.get(term)
+            if count:
+                score += weight * self.idf.get(term, 0.0) * (1.0 + math.log(count))
+        # 长片段自然包含更多词项，按长度做平滑归一
+        return score / math.sqrt(max(1, len(chunk.text)) / 200 + 1)
+
+    def extract(self, section: TemplateSection) -> Dict[str, str]:
+        """返回该章节在各来源中的摘录，来源名 -> 按原文顺序拼接的片段"""
+        weights = self._section_terms(section)
+        ranked: List[Tuple[float, TextChunk]] = []
+        selected: Dict[str, List[TextChunk]] = {source: [] for source in self.chunks}
+        used = 0
+
+        for source, chunks in self.chunks.items():
+            scored = sorted(
+                ((self._score(chunk, weights), chunk) for chunk in chunks),
+                key=lambda item: (-item[0], item[1].position)
+            )
+            if not scored:
+                continue
+            # 每个来源保底一个片段（没有相关片段时即为开头部分）
+            best = scored[0][1]
+            selected[source].append(best)
+            used += len(best.text)
+            ranked.extend(item for item in scored[1:] if item[0] > 0)
+
+        ranked.sort(key=lambda item: -item[0])
+        for _, chunk in ranked:
+            if used >= self.max_chars:
+                break
+            if used + len(chunk.text) > self.max_chars:
+                continue
+            selected[chunk.source].append(chunk)
+            used += len(chunk.text)
+
+        return {
+            source: "\n\n".join(chunk.text for chunk in sorted(chunks, key=lambda c: c.position))
+            for source, chunks in selected.items()
+            if chunks
+        }
+
+
+def render_section_fallback(excerpts: Dict[str, str]) -> str:
+    """章节生成失败时的备用内容：直接展示该章节的相关摘录"""
+    parts = ['<p class="section-note">本章节自动撰写失败，以下为各引擎的相关原始内容摘录。</p>']
+    for source, text in excerpts.items():
+        label = SOURCE_LABELS.get(source, source)
+        parts.append(f'<h3>{html.escape(label)}</h3><pre class="excerpt">{html.escape(text)}</pre>')
+    return "\n".join(parts)
+
+
+SKELETON_STYLE = """
+        :root {
+            --bg: #f5f7fa; --card: #ffffff; --text: #2c3e50; --muted: #6b7785;
+            --accent: #3498db; --border: #e3e8ee; --code-bg: #f4f6f8;
+        }
+        body.dark {
+            --bg: #15191e; --card: #1e242b; --text: #e3e8ee; --muted: #9aa5b1;
+            --accent: #5dade2; --border: #2f3a45; --code-bg: #252c34;
+        }
+        * { box-sizing: border-box; }
+        body {
+            margin: 0; background: var(--bg); color: var(--text); line-height: 1.75;
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'PingFang SC', 'Microsoft YaHei', sans-serif;
+            transition: background .3s, color .3s;
+        }
+        .container { max-width: 1200px; margin: 0 auto; padding: 24px; }
+        header.report-header {
+            background: var(--card); border-radius: 10px; padding: 32px 36px; margin-bottom: 24px;
+            border-top: 4px solid var(--accent); box-shadow: 0 2px 12px rgba(0,0,0,.06);
+        }
+        header.report-header h1 { margin: 0 0 12px; font-size: 2rem; }
+        .meta { color: var(--muted); font-size: .92rem; }
+        .toolbar { margin-top: 16px; display: flex; gap: 10px; flex-wrap: wrap; }
+        .toolbar button {
+            border: 1px solid var(--accent); background: transparent; color: var(--accent);
+            padding: 6px 14px; border-radius: 6px; cursor: pointer;
+        }
+        nav.toc, section.report-section {
+            background: var(--card); border-radius: 10px; padding: 28px 36px; margin-bottom: 24px;
+            box-shadow: 0 2px 12px rgba(0,0,0,.06);
+        }
+        nav.toc ol { margin: 0; padding-left: 20px; columns: 2; }
+        nav.toc a { color: var(--accent); text-decoration: none; }
+        section.report-section > h2 {
+            margin-top: 0; padding-bottom: 10px; border-bottom: 2px solid var(--border);
+        }
+        h3 { color: var(--accent); }
+        table { width: 100%; border-collapse: collapse; margin: 16px 0; }
+        th, td { border: 1px solid var(--border); padding: 8px 10px; text-align: left; }
+        canvas { max-width: 100%; margin: 16px 0; }
+        pre.excerpt {
+            background: var(--code-bg); padding: 14px; border-radius: 6px;
+            white-space: pre-wrap; word-break: break-word; font-size: .9rem;
+        }
+        .section-note { color: var(--muted); font-style: italic; }
+        footer { text-align: center; color: var(--muted); padding: 24px 0 40px; font-size: .9rem; }
+        @media (max-width: 768px) {
+            .container { padding: 12px; }
+            header.report-header, nav.toc, section.report-section { padding: 20px; }
+            nav.toc ol { columns: 1; }
+        }
+        @media print {
+            .toolbar { display: none; }
+            body { background: #fff; }
+            section.report-section { box-shadow: none; page-break-inside: avoid; }
+        }"""
+
+SKELETON_SCRIPT = """
+        document.getElementById('theme-toggle').addEventListener('click', function () {
+            document.body.classList.toggle('dark');
+        });
+        document.getElementById('print-report').addEventListener('click', function () {
+            window.print();
+        });"""
+
+
+def render_report(
+    query: str,
+    report_title: str,
+    sections: Sequence[TemplateSection],
+    fragments: Sequence[str],
+    generation_time: Optional[str] = None
+) -> str:
+    """
+    把各章节的HTML片段装配为完整报告
+
+    页面结构（样式、目录、章节容器、页脚、Chart.js和交互脚本）全部由这里固定生成，
+    LLM只负责各章节正文，因此最终HTML的结构与章节生成的并发顺序无关。
+    """
+    generation_time = generation_time or datetime.now().strftime("%Y年%m月%d日 %H:%M:%S")
+    title = html.escape(query or "智能舆情分析报告")
+    # 模板标题形如"企业品牌声誉分析报告模板"，展示为报告类型时去掉"模板"后缀
+    report_type = re.sub(r"\s*模板\s*$", "", report_title or "").strip()
+    subtitle = html.escape(report_type or "智能舆情分析报告")
+
+    toc_items = "\n".join(
+        f'                <li><a href="#{section.anchor}">{html.escape(section.heading)}</a></li>'
+        for section in sections
+    )
+    body_sections = "\n".join(
+        f'        <section class="report-section" id="{section.anchor}">\n'
+        f'            <h2>{html.escape(section.heading)}</h2>\n'
+        f'{fragment}\n'
+        f'        </section>'
+        for section, fragment in zip(sections, fragments)
+    )
+
+    return f"""<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title} - {subtitle}</title>
+    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+    <style>{SKELETON_STYLE}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <header class="report-header">
+            <h1>{title}</h1>
+            <div class="meta">
+                <strong>报告类型:</strong> {subtitle}<br>
+                <strong>报告生成时间:</strong> {generation_time}<br>
+                <strong>数据来源:</strong> QueryEngine、MediaEngine、InsightEngine、ForumEngine
+            </div>
+            <div class="toolbar">
+                <button id="theme-toggle" type="button">切换暗色模式</button>
+                <button id="print-report" type="button">打印 / 导出PDF</button>
+            </div>
+        </header>
+
+        <nav class="toc">
+            <h2>目录</h2>
+            <ol>
+{toc_items}
+            </ol>
+        </nav>
+
+{body_sections}
+
+        <footer>
+            <p>本报告由智能舆情分析平台自动生成</p>
+            <p>ReportEngine v1.0 | 生成时间: {generation_time}</p>
+        </footer>
+    </div>
+    <script>{SKELETON_SCRIPT}
+    </script>
+</body>
+</html>"""
@@ -0,0 +1,386 @@
+"""
+报告生成任务队列
+ReportTask 持久化在SQLite中，服务重启后未完成的任务会重新排队；
+固定数量的工作线程从队列中取任务执行，支持按ID查询进度、获取结果和取消任务。
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+
+# 任务状态
+TASK_PENDING = "pending"
+TASK_RUNNING = "running"
+TASK_COMPLETED = "completed"
+TASK_ERROR = "error"
+TASK_CANCELLED = "cancelled"
+
+ACTIVE_STATUSES = (TASK_PENDING, TASK_RUNNING)
+FINISHED_STATUSES = (TASK_COMPLETED, TASK_ERROR, TASK_CANCELLED)
+
+
+class TaskCancelled(Exception):
+    """任务在执行过程中被取消"""
+
+
+class ReportTask:
+    """报告生成任务"""
+
+    def __init__(
+        self,
+        query: str,
+        task_id: str,
+        custom_template: str = "",
+        input_files: Optional[Dict[str, str]] = None
+    ):
+        self.task_id = task_id
+        self.query = query
+        self.custom_template = custom_template
+        self.input_files = dict(input_files or {})  # 提交时就绪的输入文件，排队期间新增的文件不影响该任务
+        self.status = TASK_PENDING  # pending, running, completed, error, cancelled
+        self.progress = 0
+        self.result = None
+        self.error_message = ""
+        self.created_at = datetime.now()
+        self.updated_at = datetime.now()
+        self.html_content = ""
+        self.has_result = False  # 从数据库读取摘要时不加载HTML正文，用该标记表示是否有结果
+        self.cancel_requested = False
+
+    def update_status(self, status: str, progress: int = None, error_message: str = ""):
+        """更新任务状态"""
+        self.status = status
+        if progress is not None:
+            self.progress = progress
+        if error_message:
+            self.error_message = error_message
+        self.updated_at = datetime.now()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典格式"""
+        return {
+            'task_id': self.task_id,
+            'query': self.query,
+            'status': self.status,
+            'progress': self.progress,
+            'error_message': self.error_message,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat(),
+            'has_result': self.has_result or bool(self.html_content)
+        }
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row, with_result: bool = False) -> "ReportTask":
+        """从数据库行恢复任务"""
+        task = cls(row["query"], row["task_id"], row["custom_template"], json.loads(row["input_files"] or "{}"))
+        task.status = row["status"]
+        task.progress = row["progress"]
+        task.error_message = row["error_message"]
+        task.created_at = datetime.fromisoformat(row["created_at"])
+        task.updated_at = datetime.fromisoformat(row["updated_at"])
+        task.cancel_requested = bool(row["cancel_requested"])
+        task.has_result = bool(row["has_result"])
+        if with_result:
+            task.html_content = row["html_content"] or ""
+        return task
+
+
+def new_task_id() -> str:
+    """生成任务ID（同一秒内提交多个任务也不会重复）"""
+    return f"report_{int(time.time())}_{uuid.uuid4().hex[:6]}"
+
+
+class ReportTaskStore:
+    """SQLite任务存储（线程安全）"""
+
+    SUMMARY_COLUMNS = (
+        "task_id, query, custom_template, input_files, status, progress, error_message, "
+        "created_at, updated_at, cancel_requested, html_content IS NOT NULL AND html_content != '' AS has_result"
+    )
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: SQLite数据库文件路径
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS report_tasks (
+                task_id TEXT PRIMARY KEY,
+                query TEXT NOT NULL,
+                custom_template TEXT NOT NULL DEFAULT '',
+                input_files TEXT NOT NULL DEFAULT '{}',
+                status TEXT NOT NULL,
+                progress INTEGER NOT NULL DEFAULT 0,
+                error_message TEXT NOT NULL DEFAULT '',
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                cancel_requested INTEGER NOT NULL DEFAULT 0,
+                html_content TEXT
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_report_tasks_status ON report_tasks (status, created_at)")
+        self._conn.commit()
+
+    def add(self, task: ReportTask) -> None:
+        """新增任务"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO report_tasks (task_id, query, custom_template, input_files, status, progress, "
+                "error_message, created_at, updated_at, cancel_requested) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    task.task_id, task.query, task.custom_template,
+                    json.dumps(task.input_files, ensure_ascii=False), task.status, task.progress,
+                    task.error_message, task.created_at.isoformat(), task.updated_at.isoformat(),
+                    int(task.cancel_requested)
+                )
+            )
+            self._conn.commit()
+
+    def save(self, task: ReportTask, with_result: bool = False) -> None:
+        """保存任务状态，with_result 为 True 时同时写入HTML结果"""
+        with self._lock:
+            self._conn.execute(
+                # 取消标记只会被置位，避免覆盖接口线程刚写入的取消请求
+                "UPDATE report_tasks SET status = ?, progress = ?, error_message = ?, updated_at = ?, "
+                "cancel_requested = MAX(cancel_requested, ?) WHERE task_id = ?",
+                (
+                    task.status, task.progress, task.error_message, task.updated_at.isoformat(),
+                    int(task.cancel_requested), task.task_id
+                )
+            )
+            if with_result:
+                self._conn.execute(
+                    "UPDATE report_tasks SET html_content = ? WHERE task_id = ?",
+                    (task.html_content, task.task_id)
+                )
+            self._conn.commit()
+
+    def get(self, task_id: str, with_result: bool = False) -> Optional[ReportTask]:
+        """按ID读取任务，不存在时返回None"""
+        columns = self.SUMMARY_COLUMNS + (", html_content" if with_result else "")
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {columns} FROM report_tasks WHERE task_id = ?", (task_id,)
+            ).fetchone()
+        return ReportTask.from_row(row, with_result) if row else None
+
+    def list_tasks(self, status: Optional[str] = None, limit: int = 50) -> List[ReportTask]:
+        """按创建时间倒序列出任务"""
+        sql = f"SELECT {self.SUMMARY_COLUMNS} FROM report_tasks"
+        params: List[Any] = []
+        if status:
+            sql += " WHERE status = ?"
+            params.append(status)
+        sql += " ORDER BY created_at DESC LIMIT ?"
+        params.append(max(1, int(limit)))
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [ReportTask.from_row(row) for row in rows]
+
+    def is_cancel_requested(self, task_id: str) -> bool:
+        """任务是否已被请求取消"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT cancel_requested FROM report_tasks WHERE task_id = ?", (task_id,)
+            ).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def request_cancel(self, task_id: str) -> Optional[str]:
+        """
+        请求取消任务：排队中的任务直接取消，执行中的任务打上取消标记等待工作线程处理
+
+        Returns:
+            取消后的任务状态；任务不存在或已结束时返回None
+        """
+        now = datetime.now().isoformat()
+        with self._lock:
+            row = self._conn.execute("SELECT status FROM report_tasks WHERE task_id = ?", (task_id,)).fetchone()
+            if row is None or row["status"] not in ACTIVE_STATUSES:
+                return None
+            if row["status"] == TASK_PENDING:
+                self._conn.execute(
+                    "UPDATE report_tasks SET status = ?, progress = 0, error_message = ?, cancel_requested = 1, "
+                    "updated_at = ? WHERE task_id = ?",
+                    (TASK_CANCELLED, "用户取消任务", now, task_id)
+                )
+                status = TASK_CANCELLED
+            else:
+                self._conn.execute(
+                    "UPDATE report_tasks SET cancel_requested = 1, updated_at = ? WHERE task_id = ?",
+                    (now, task_id)
+                )
+                status = TASK_RUNNING
+            self._conn.commit()
+            return status
+
+    def recover_unfinished(self) -> List[str]:
+        """服务重启后，把上次未完成的任务恢复为排队状态，返回按提交顺序排列的任务ID"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE report_tasks SET status = ?, progress = 0, error_message = ?, updated_at = ? "
+                "WHERE status = ?",
+                (TASK_PENDING, "服务重启，任务重新排队", datetime.now().isoformat(), TASK_RUNNING)
+            )
+            self._conn.commit()
+            rows = self._conn.execute(
+                "SELECT task_id FROM report_tasks WHERE status = ? ORDER BY created_at", (TASK_PENDING,)
+            ).fetchall()
+        return [row["task_id"] for row in rows]
+
+    def count_by_status(self) -> Dict[str, int]:
+        """各状态的任务数"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM report_tasks GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+
+class ReportTaskQueue:
+    """
+    报告生成工作队列
+
+    任务按提交顺序执行，最多 workers 个任务同时生成；执行中的任务保存在内存中，
+    进度更新同时写入数据库，结束后只保留在数据库中。
+    """
+
+    def __init__(
+        self,
+        store: ReportTaskStore,
+        runner: Callable[[ReportTask, Callable[[int], None]], str],
+        workers: int = 2
+    ):
+        """
+        Args:
+            store: 任务存储
+            runner: 执行单个任务的函数，参数为(任务, 进度回调)，返回HTML；
+                进度回调会在任务被取消时抛出 TaskCancelled
+            workers: 工作线程数
+        """
+        self.store = store
+        self.runner = runner
+        self.workers = max(1, int(workers))
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._running: Dict[str, ReportTask] = {}
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        """启动工作线程，并恢复上次未完成的任务"""
+        if self._threads:
+            return
+        recovered = self.store.recover_unfinished()
+        for task_id in recovered:
+            self._queue.put(task_id)
+        if recovered:
+            logger.info(f"恢复未完成的报告任务 {len(recovered)} 个")
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"report-worker-{i + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"报告任务队列已启动，工作线程数: {self.workers}")
+
+    def submit(self, task: ReportTask) -> ReportTask:
+        """提交任务"""
+        self.store.add(task)
+        self._queue.put(task.task_id)
+        return task
+
+    def get(self, task_id: str, with_result: bool = False) -> Optional[ReportTask]:
+        """按ID获取任务，执行中的任务直接返回内存中的最新状态"""
+        with self._lock:
+            task = self._running.get(task_id)
+        if task is not None and not with_result:
+            return task
+        return self.store.get(task_id, with_result)
+
+    def running_tasks(self) -> List[ReportTask]:
+        """正在执行的任务"""
+        with self._lock:
+            return list(self._running.values())
+
+    def cancel(self, task_id: str) -> Optional[str]:
+        """取消任务，返回取消后的状态，任务不存在或已结束时返回None"""
+        status = self.store.request_cancel(task_id)
+        if status == TASK_RUNNING:
+            with self._lock:
+                task = self._running.get(task_id)
+            if task is not None:
+                task.cancel_requested = True
+        return status
+
+    def stats(self) -> Dict[str, Any]:
+        """队列统计"""
+        counts = self.store.count_by_status()
+        return {
+            'workers': self.workers,
+            'running': len(self.running_tasks()),
+            'pending': counts.get(TASK_PENDING, 0),
+            'by_status': counts
+        }
+
+    def _worker(self) -> None:
+        while True:
+            task_id = self._queue.get()
+            try:
+                self._run_task(task_id)
+            except Exception as e:
+                logger.exception(f"报告任务 {task_id} 执行异常: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def _run_task(self, task_id: str) -> None:
+        task = self.store.get(task_id)
+        if task is None or task.status != TASK_PENDING:
+            # 排队期间已被取消
+            return
+
+        with self._lock:
+            self._running[task_id] = task
+
+        def check_cancelled() -> None:
+            if task.cancel_requested or self.store.is_cancel_requested(task_id):
+                raise TaskCancelled()
+
+        def report_progress(progress: int) -> None:
+            check_cancelled()
+            task.update_status(TASK_RUNNING, progress)
+            self.store.save(task)
+
+        try:
+            report_progress(5)
+            task.html_content = self.runner(task, report_progress)
+            # 生成期间被取消的任务丢弃结果
+            check_cancelled()
+            task.update_status(TASK_COMPLETED, 100)
+            self.store.save(task, with_result=True)
+            logger.info(f"报告任务 {task_id} 已完成")
+        except TaskCancelled:
+            task.html_content = ""
+            task.update_status(TASK_CANCELLED, 0, "用户取消任务")
+            self.store.save(task)
+            logger.info(f"报告任务 {task_id} 已取消")
+        except Exception as e:
+            task.update_status(TASK_ERROR, 0, str(e))
+            self.store.save(task)
+            logger.exception(f"报告任务 {task_id} 失败: {str(e)}")
+        finally:
+            with self._lock:
+                self._running.pop(task_id, None)
@@ -144,22 +144,16 @@ def execute_research(query: str, config: Settings):
         agent._generate_report_structure(query)
         progress_bar.progress(20)
 
-        # 处理段落
+        # 处理段落（多个段落并发研究，完成回调在当前线程中更新进度）
         total_paragraphs = len(agent.state.paragraphs)
-        for i in range(total_paragraphs):
-            status_text.text(f"正在处理段落 {i + 1}/{total_paragraphs}: {agent.state.paragraphs[i].title}")
+        status_text.text(f"正在处理 {total_paragraphs} 个段落...")
 
-            # 初始搜索和总结
-            agent._initial_search_and_summary(i)
-            progress_value = 20 + (i + 0.5) / total_paragraphs * 60
+        def on_paragraph_complete(i: int, completed: int):
+            status_text.text(f"已完成段落 {completed}/{total_paragraphs}: {agent.state.paragraphs[i].title}")
+            progress_value = 20 + completed / total_paragraphs * 60
             progress_bar.progress(int(progress_value))
 
-            # 反思循环
-            agent._reflection_loop(i)
-            agent.state.paragraphs[i].research.mark_completed()
-
-            progress_value = 20 + (i + 1) / total_paragraphs * 60
-            progress_bar.progress(int(progress_value))
+        agent._process_paragraphs(on_paragraph_complete=on_paragraph_complete)
 
         # 生成最终报告
         status_text.text("正在生成最终报告...")
@@ -8,6 +8,7 @@ import subprocess
 import time
 import threading
 from datetime import datetime
+from collections import deque
 from queue import Queue
 from flask import Flask, render_template, request, jsonify, Response
 from flask_socketio import SocketIO, emit
@@ -16,6 +17,8 @@ import requests
 from loguru import logger
 import importlib
 from pathlib import Path
+from utils.log_buffer import LogRingBuffer, BufferedLogWriter
+from utils.console_stream import ConsoleEmitAggregator
 
 # 导入ReportEngine
 try:
@@ -374,71 +377,40 @@ def parse_forum_log_line(line):
 
 # Forum日志监听器
 def monitor_forum_log():
-    """监听forum.log文件变化并推送到前端"""
-    import time
-    from pathlib import Path
-    
+    """增量读取forum.log新追加的行，写入forum的内存缓冲并推送到前端"""
+    from ForumEngine.log_tailer import LogTail
+
     forum_log_file = LOG_DIR / "forum.log"
-    last_position = 0
-    processed_lines = set()  # 用于跟踪已处理的行，避免重复
+    tailer = LogTail(forum_log_file, from_end=False)
     
-    # 如果文件存在，获取初始位置
-    if forum_log_file.exists():
-        with open(forum_log_file, 'r', encoding='utf-8', errors='ignore') as f:
-            # 初始化时读取所有现有行，避免重复处理
-            existing_lines = f.readlines()
-            for line in existing_lines:
-                line_hash = hash(line.strip())
-                processed_lines.add(line_hash)
-            last_position = f.tell()
+    # 启动时已有的内容只进入缓冲，不重复推送
+    existing_lines, _ = tailer.read_new_lines()
+    console_buffers['forum'].extend(existing_lines)
     
     while True:
         try:
-            if forum_log_file.exists():
-                with open(forum_log_file, 'r', encoding='utf-8', errors='ignore') as f:
-                    f.seek(last_position)
-                    new_lines = f.readlines()
-                    
-                    if new_lines:
-                        for line in new_lines:
-                            line = line.rstrip('\n\r')
-                            if line.strip():
-                                line_hash = hash(line.strip())
-                                
-                                # 避免重复处理同一行
-                                if line_hash in processed_lines:
-                                    continue
-                                
-                                processed_lines.add(line_hash)
-                                
-                                # 解析日志行并发送forum消息
-                                parsed_message = parse_forum_log_line(line)
-                                if parsed_message:
-                                    socketio.emit('forum_message', parsed_message)
-                                
-                                # 只有在控制台显示forum时才发送控制台消息
-                                timestamp = datetime.now().strftime('%H:%M:%S')
-                                formatted_line = f"[{timestamp}] {line}"
-                                socketio.emit('console_output', {
-                                    'app': 'forum',
-                                    'line': formatted_line
-                                })
-                        
-                        last_position = f.tell()
-                        
-                        # 清理processed_lines集合，避免内存泄漏（保留最近1000行的哈希）
-                        if len(processed_lines) > 1000:
-                            processed_lines.clear()
+            new_lines, rotated = tailer.read_new_lines()
+            if rotated:
+                # forum.log被清空（新一轮论坛开始），缓冲随之重置
+                console_buffers['forum'].clear()
+            
+            if new_lines:
+                first_offset = console_buffers['forum'].extend(new_lines)
+                for line in new_lines:
+                    # 解析日志行并发送forum消息
+                    parsed_message = parse_forum_log_line(line)
+                    if parsed_message:
+                        socketio.emit('forum_message', parsed_message)
+                
+                # 控制台消息合并成批次，只发给正在查看forum的客户端
+                timestamp = datetime.now().strftime('%H:%M:%S')
+                console_stream.push_many('forum', [f"[{timestamp}] {line}" for line in new_lines], first_offset)
             
             time.sleep(1)  # 每秒检查一次
         except Exception as e:
             logger.error(f"Forum日志监听错误: {e}")
             time.sleep(5)
 
-# 启动Forum日志监听线程
-forum_monitor_thread = threading.Thread(target=monitor_forum_log, daemon=True)
-forum_monitor_thread.start()
-
 # 全局变量存储进程信息
 processes = {
     'insight': {'process': None, 'port': 8501, 'status': 'stopped', 'output': [], 'log_file': None},
@@ -461,16 +433,47 @@ output_queues = {
     'forum': Queue()
 }
 
+# 每个应用的控制台输出内存缓冲，前端按offset增量拉取
+console_buffers = {app_name: LogRingBuffer() for app_name in processes}
+
+# 控制台输出按应用合并成批次推送到对应房间
+console_stream = ConsoleEmitAggregator(
+    emit=lambda event, data, room: socketio.emit(event, data, to=room),
+    enter_room=lambda sid, room: socketio.server.enter_room(sid, room, namespace='/'),
+    leave_room=lambda sid, room: socketio.server.leave_room(sid, room, namespace='/'),
+    start_task=socketio.start_background_task,
+    sleep=socketio.sleep
+)
+console_stream.start()
+
+# 日志文件缓冲写入器（按需创建，文件句柄常驻，定时批量刷盘）
+log_writers = {}
+log_writers_lock = threading.Lock()
+
+def get_log_writer(app_name):
+    """获取应用日志文件的缓冲写入器"""
+    with log_writers_lock:
+        writer = log_writers.get(app_name)
+        if writer is None:
+            writer = BufferedLogWriter(LOG_DIR / f"{app_name}.log")
+            log_writers[app_name] = writer
+        return writer
+
 def write_log_to_file(app_name, line):
-    """将日志写入文件"""
+    """将日志写入文件（缓冲写入，后台定时刷盘）"""
     try:
-        log_file_path = LOG_DIR / f"{app_name}.log"
-        with open(log_file_path, 'a', encoding='utf-8') as f:
-            f.write(line + '\n')
-            f.flush()
+        get_log_writer(app_name).write(line)
     except Exception as e:
         logger.error(f"Error writing log for {app_name}: {e}")
 
+def publish_output_line(app_name, line):
+    """记录一行应用输出：写入日志文件和内存缓冲，并交给推送聚合器批量发送"""
+    timestamp = datetime.now().strftime('%H:%M:%S')
+    formatted_line = f"[{timestamp}] {line}"
+    write_log_to_file(app_name, formatted_line)
+    offset = console_buffers[app_name].append(formatted_line)
+    console_stream.push(app_name, formatted_line, offset)
+
 def read_log_from_file(app_name, tail_lines=None):
     """从文件读取日志"""
     try:
@@ -479,18 +482,17 @@ def read_log_from_file(app_name, tail_lines=None):
             return []
         
         with open(log_file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-            lines = [line.rstrip('\n\r') for line in lines if line.strip()]
-            
+            lines = (line.rstrip('\n\r') for line in f if line.strip())
             if tail_lines:
-                return lines[-tail_lines:]
-            return lines
+                # 只保留末尾若干行，不把整个文件读入内存
+                return list(deque(lines, maxlen=tail_lines))
+            return list(lines)
     except Exception as e:
         logger.exception(f"Error reading log for {app_name}: {e}")
         return []
 
 def read_process_output(process, app_name):
-    """读取进程输出并写入文件"""
+    """读取进程输出，写入日志文件和内存缓冲"""
     import select
     import sys
     
@@ -504,13 +506,8 @@ def read_process_output(process, app_name):
                     for line in lines:
                         line = line.strip()
                         if line:
-                            timestamp = datetime.now().strftime('%H:%M:%S')
-                            formatted_line = f"[{timestamp}] {line}"
-                            write_log_to_file(app_name, formatted_line)
-                            socketio.emit('console_output', {
-                                'app': app_name,
-                                'line': formatted_line
-                            })
+                            publish_output_line(app_name, line)
+                get_log_writer(app_name).flush()
                 break
             
             # 使用非阻塞读取
@@ -520,17 +517,7 @@ def read_process_output(process, app_name):
                 if output:
                     line = output.decode('utf-8', errors='replace').strip()
                     if line:
-                        timestamp = datetime.now().strftime('%H:%M:%S')
-                        formatted_line = f"[{timestamp}] {line}"
-                        
-                        # 写入日志文件
-                        write_log_to_file(app_name, formatted_line)
-                        
-                        # 发送到前端
-                        socketio.emit('console_output', {
-                            'app': app_name,
-                            'line': formatted_line
-                        })
+                        publish_output_line(app_name, line)
                 else:
                     # 没有输出时短暂休眠
                     time.sleep(0.1)
@@ -542,23 +529,25 @@ def read_process_output(process, app_name):
                     if output:
                         line = output.decode('utf-8', errors='replace').strip()
                         if line:
-                            timestamp = datetime.now().strftime('%H:%M:%S')
-                            formatted_line = f"[{timestamp}] {line}"
-                            
-                            # 写入日志文件
-                            write_log_to_file(app_name, formatted_line)
-                            
-                            # 发送到前端
-                            socketio.emit('console_output', {
-                                'app': app_name,
-                                'line': formatted_line
-                            })
+                            publish_output_line(app_name, line)
                             
         except Exception as e:
             logger.exception(f"Error reading output for {app_name}: {e}")
+            error_msg = f"读取输出失败: {e}"
             write_log_to_file(app_name, f"[{datetime.now().strftime('%H:%M:%S')}] {error_msg}")
             break
 
+def preload_console_buffers():
+    """服务启动时把各引擎上次运行留下的日志尾部载入内存缓冲"""
+    for app_name in STREAMLIT_SCRIPTS:
+        console_buffers[app_name].extend(read_log_from_file(app_name, tail_lines=console_buffers[app_name].capacity))
+
+preload_console_buffers()
+
+# 启动Forum日志监听线程
+forum_monitor_thread = threading.Thread(target=monitor_forum_log, daemon=True)
+forum_monitor_thread.start()
+
 def start_streamlit_app(app_name, script_path, port):
     """启动Streamlit应用"""
     try:
@@ -569,14 +558,14 @@ def start_streamlit_app(app_name, script_path, port):
         if not os.path.exists(script_path):
             return False, f"文件不存在: {script_path}"
         
-        # 清空之前的日志文件
-        log_file_path = LOG_DIR / f"{app_name}.log"
-        if log_file_path.exists():
-            log_file_path.unlink()
+        # 清空之前的日志文件和内存缓冲
+        get_log_writer(app_name).truncate()
+        console_buffers[app_name].clear()
         
         # 创建启动日志
         start_msg = f"[{datetime.now().strftime('%H:%M:%S')}] 启动 {app_name} 应用..."
         write_log_to_file(app_name, start_msg)
+        console_buffers[app_name].append(start_msg)
         
         cmd = [
             sys.executable, '-m', 'streamlit', 'run',
@@ -713,7 +702,15 @@ def cleanup_processes():
         logger.exception("停止ForumEngine失败")
     _set_system_state(started=False, starting=False)
 
-# 注册清理函数
+def close_log_writers():
+    """退出前把缓冲中的日志写入文件"""
+    with log_writers_lock:
+        writers = list(log_writers.values())
+    for writer in writers:
+        writer.close()
+
+# 注册清理函数（atexit按注册的逆序执行，日志最后落盘）
+atexit.register(close_log_writers)
 atexit.register(cleanup_processes)
 
 @app.route('/')
@@ -729,7 +726,7 @@ def get_status():
         app_name: {
             'status': info['status'],
             'port': info['port'],
-            'output_lines': len(info['output'])
+            'output_lines': console_buffers[app_name].next_offset
         }
         for app_name, info in processes.items()
     })
@@ -785,30 +782,34 @@ def stop_app(app_name):
     success, message = stop_streamlit_app(app_name)
     return jsonify({'success': success, 'message': message})
 
+def _read_console_buffer(app_name):
+    """按请求参数 since_offset（或cursor）/limit 读取应用的内存缓冲"""
+    offset = request.args.get('since_offset', type=int)
+    if offset is None:
+        offset = request.args.get('cursor', type=int)
+    limit = request.args.get('limit', type=int)
+    return console_buffers[app_name].read_since(offset, limit)
+
 @app.route('/api/output/<app_name>')
 def get_output(app_name):
-    """获取应用输出"""
+    """获取应用输出（传入since_offset时只返回该offset之后的新行）"""
     if app_name not in processes:
         return jsonify({'success': False, 'message': '未知应用'})
     
-    # 特殊处理Forum Engine
-    if app_name == 'forum':
-        try:
-            forum_log_content = read_log_from_file('forum')
-            return jsonify({
-                'success': True,
-                'output': forum_log_content,
-                'total_lines': len(forum_log_content)
-            })
-        except Exception as e:
-            return jsonify({'success': False, 'message': f'读取forum日志失败: {str(e)}'})
-    
-    # 从文件读取完整日志
-    output_lines = read_log_from_file(app_name)
+    try:
+        result = _read_console_buffer(app_name)
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'读取{app_name}日志失败: {str(e)}'})
     
     return jsonify({
         'success': True,
-        'output': output_lines
+        'output': result['lines'],
+        'offset': result['offset'],
+        'next_offset': result['next_offset'],
+        'cursor': result['next_offset'],
+        'total_lines': result['total_lines'],
+        'truncated': result['truncated'],
+        'reset': result['reset']
     })
 
 @app.route('/api/test_log/<app_name>')
@@ -817,15 +818,8 @@ def test_log(app_name):
     if app_name not in processes:
         return jsonify({'success': False, 'message': '未知应用'})
     
-    # 写入测试消息
-    test_msg = f"[{datetime.now().strftime('%H:%M:%S')}] 测试日志消息 - {datetime.now()}"
-    write_log_to_file(app_name, test_msg)
-    
-    # 通过Socket.IO发送
-    socketio.emit('console_output', {
-        'app': app_name,
-        'line': test_msg
-    })
+    # 写入测试消息并通过Socket.IO发送
+    publish_output_line(app_name, f"测试日志消息 - {datetime.now()}")
     
     return jsonify({
         'success': True,
@@ -857,22 +851,12 @@ def stop_forum_monitoring_api():
 
 @app.route('/api/forum/log')
 def get_forum_log():
-    """获取ForumEngine的forum.log内容"""
+    """获取ForumEngine的forum.log内容（传入since_offset时只返回新行）"""
     try:
-        forum_log_file = LOG_DIR / "forum.log"
-        if not forum_log_file.exists():
-            return jsonify({
-                'success': True,
-                'log_lines': [],
-                'parsed_messages': [],
-                'total_lines': 0
-            })
+        result = _read_console_buffer('forum')
+        lines = result['lines']
         
-        with open(forum_log_file, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
-            lines = [line.rstrip('\n\r') for line in lines if line.strip()]
-        
-        # 解析每一行日志并提取对话信息
+        # 只解析本次返回的行
         parsed_messages = []
         for line in lines:
             parsed_message = parse_forum_log_line(line)
@@ -883,7 +867,12 @@ def get_forum_log():
             'success': True,
             'log_lines': lines,
             'parsed_messages': parsed_messages,
-            'total_lines': len(lines)
+            'offset': result['offset'],
+            'next_offset': result['next_offset'],
+            'cursor': result['next_offset'],
+            'total_lines': result['total_lines'],
+            'truncated': result['truncated'],
+            'reset': result['reset']
         })
     except Exception as e:
         return jsonify({'success': False, 'message': f'读取forum.log失败: {str(e)}'})
@@ -1015,6 +1004,24 @@ def handle_connect():
     """客户端连接"""
     emit('status', 'Connected to Flask server')
 
+@socketio.on('disconnect')
+def handle_disconnect():
+    """客户端断开"""
+    console_stream.disconnect(request.sid)
+
+@socketio.on('console_subscribe')
+def handle_console_subscribe(data):
+    """订阅控制台输出，只接收正在查看的应用"""
+    apps = [app_name for app_name in (data or {}).get('apps', []) if app_name in console_buffers]
+    emit('console_subscribed', {'apps': console_stream.subscribe(request.sid, apps)})
+
+@socketio.on('console_ack')
+def handle_console_ack(data):
+    """确认已处理的控制台输出批次"""
+    data = data or {}
+    if data.get('app') in console_buffers and isinstance(data.get('seq'), int):
+        console_stream.ack(request.sid, data['app'], data['seq'])
+
 @socketio.on('request_status')
 def handle_status_request():
     """请求状态更新"""
@@ -6,14 +6,14 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
-import json
 import os
 from pathlib import Path
-import sqlite3
-from openai import OpenAI
 import subprocess
 import threading
 
+from utils.review_classifier import ReviewClassifier, classify_pending_items
+from utils.sentiment_store import ItemFilters, get_store
+
 # 页面配置
 st.set_page_config(
     page_title="百果园舆情监测系统",
@@ -101,95 +101,30 @@ st.markdown("""
 
 # 初始化数据库
 def init_database():
-    """初始化SQLite数据库"""
-    db_path = Path("baiguoyuan_sentiment.db")
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    # 创建舆情信息表
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS sentiment_data (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            platform TEXT NOT NULL,
-            keyword TEXT NOT NULL,
-            title TEXT NOT NULL,
-            content TEXT NOT NULL,
-            url TEXT,
-            author TEXT,
-            publish_time TEXT,
-            crawl_time TEXT NOT NULL,
-            hot_score INTEGER DEFAULT 0,
-            sentiment TEXT,
-            sentiment_score REAL,
-            category TEXT,
-            status TEXT DEFAULT 'unprocessed',
-            processed_time TEXT,
-            notes TEXT
-        )
-    """)
-
-    conn.commit()
-    conn.close()
+    """初始化SQLite数据库（建表、补齐索引，连接在进程内复用）"""
+    return get_store()
 
 # DeepSeek AI分析
-def analyze_sentiment_and_category(title, content):
-    """使用DeepSeek进行情感分析和分类"""
-    try:
-        # 从环境变量读取API密钥
-        import os
-        api_key = os.getenv("INSIGHT_ENGINE_API_KEY") or os.getenv("DEEPSEEK_API_KEY")
-        if not api_key:
-            raise ValueError("未配置DeepSeek API密钥，请在.env文件中设置INSIGHT_ENGINE_API_KEY")
-
-        client = OpenAI(
-            api_key=api_key,
-            base_url="https://api.deepseek.com"
-        )
+def get_classifier():
+    """共享的批量分类器（结果按内容哈希缓存在数据库中）"""
+    global _classifier
+    if _classifier is None:
+        _classifier = ReviewClassifier(cache=get_store())
+    return _classifier
 
-        prompt = f"""
-请分析以下关于百果园的信息，返回JSON格式：
-
-标题：{title}
-内容：{content}
-
-请返回：
-1. sentiment: 情感（positive/neutral/negative）
-2. sentiment_score: 情感分数（-1到1之间，负数表示负面）
-3. category: 分类（价格问题/商品问题/服务问题/会员问题/安全问题/其他问题）
-
-只返回JSON，不要其他内容。格式：
-{{"sentiment": "...", "sentiment_score": 0.0, "category": "..."}}
-"""
-
-        response = client.chat.completions.create(
-            model="deepseek-chat",
-            messages=[
-                {"role": "system", "content": "你是一个专业的舆情分析助手，专门分析百果园品牌相关的用户反馈。"},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3
-        )
+_classifier = None
 
-        result = json.loads(response.choices[0].message.content)
-        return result
-    except Exception as e:
-        print(f"AI分析错误: {e}")
-        return {
-            "sentiment": "neutral",
-            "sentiment_score": 0,
-            "category": "其他问题"
-        }
+def analyze_sentiment_and_category(title, content):
+    """使用DeepSeek进行情感分析和分类（未配置API密钥时使用本地模型）"""
+    return get_classifier().classify_one(title, content)
 
 # 添加测试数据
 def add_sample_data():
     """添加测试数据（演示用）"""
-    conn = sqlite3.connect("baiguoyuan_sentiment.db")
-    cursor = conn.cursor()
+    store = get_store()
 
     # 检查是否已有数据
-    cursor.execute("SELECT COUNT(*) FROM sentiment_data")
-    if cursor.fetchone()[0] > 0:
-        conn.close()
+    if not store.is_empty():
         return
 
     sample_data = [
@@ -270,135 +205,60 @@ def add_sample_data():
         }
     ]
 
-    for item in sample_data:
-        cursor.execute("""
-            INSERT INTO sentiment_data
-            (platform, keyword, title, content, url, author, publish_time,
-             crawl_time, hot_score, sentiment, sentiment_score, category, status)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            item["platform"], item["keyword"], item["title"], item["content"],
-            item["url"], item["author"], item["publish_time"], item["crawl_time"],
-            item["hot_score"], item["sentiment"], item["sentiment_score"],
-            item["category"], item["status"]
-        ))
-
-    conn.commit()
-    conn.close()
+    store.insert_items(sample_data)
 
-# 获取统计数据
-def get_statistics(date_filter, status_filter):
-    """获取统计数据"""
-    conn = sqlite3.connect("baiguoyuan_sentiment.db")
+# 平台筛选项与数据库中平台代码的对应关系
+PLATFORM_CODES = {"小红书": "xhs", "抖音": "dy", "微博": "wb", "B站": "bili"}
 
-    # 构建时间过滤条件
-    date_condition = ""
+# 构建筛选条件
+def build_filters(platform_filter="全部", category_filter="全部", date_filter="全部", status_filter="全部"):
+    """把侧边栏的筛选项转换为数据库筛选条件"""
+    today = datetime.now().strftime('%Y-%m-%d')
+    since = until = None
     if date_filter == "今天":
-        date_condition = f"AND crawl_time >= '{datetime.now().strftime('%Y-%m-%d')}'"
+        since = today
     elif date_filter == "昨天":
-        yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-        date_condition = f"AND crawl_time >= '{yesterday}' AND crawl_time < '{datetime.now().strftime('%Y-%m-%d')}'"
+        since = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+        until = today
     elif date_filter == "近7天":
-        week_ago = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
-        date_condition = f"AND crawl_time >= '{week_ago}'"
+        since = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
     elif date_filter == "近30天":
-        month_ago = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
-        date_condition = f"AND crawl_time >= '{month_ago}'"
+        since = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
 
-    # 状态过滤
-    status_condition = ""
+    status = None
     if status_filter != "全部":
-        status_value = "unprocessed" if status_filter == "未处理" else "processed"
-        status_condition = f"AND status = '{status_value}'"
-
-    # 总监测数
-    total_query = f"SELECT COUNT(*) FROM sentiment_data WHERE 1=1 {date_condition} {status_condition}"
-    total_count = pd.read_sql_query(total_query, conn).iloc[0, 0]
-
-    # 未处理数
-    unprocessed_query = f"SELECT COUNT(*) FROM sentiment_data WHERE status='unprocessed' {date_condition}"
-    unprocessed_count = pd.read_sql_query(unprocessed_query, conn).iloc[0, 0]
-
-    # 负面信息数
-    negative_query = f"SELECT COUNT(*) FROM sentiment_data WHERE sentiment='negative' {date_condition} {status_condition}"
-    negative_count = pd.read_sql_query(negative_query, conn).iloc[0, 0]
-
-    # 价格问题数
-    price_query = f"SELECT COUNT(*) FROM sentiment_data WHERE category='价格问题' {date_condition} {status_condition}"
-    price_count = pd.read_sql_query(price_query, conn).iloc[0, 0]
-
-    conn.close()
+        status = "unprocessed" if status_filter == "未处理" else "processed"
+
+    return ItemFilters(
+        platform=PLATFORM_CODES[platform_filter] if platform_filter != "全部" else None,
+        category=category_filter if category_filter != "全部" else None,
+        status=status,
+        since=since,
+        until=until
+    )
 
-    return {
-        "total": total_count,
-        "unprocessed": unprocessed_count,
-        "negative": negative_count,
-        "price": price_count
-    }
+# 获取统计数据
+def get_statistics(date_filter, status_filter):
+    """获取统计数据（一次查询得到全部计数）"""
+    return get_store().get_statistics(build_filters(date_filter=date_filter, status_filter=status_filter))
 
 # 获取列表数据
-def get_items_list(platform_filter, category_filter, date_filter, status_filter, page=1, page_size=10):
-    """获取舆情列表"""
-    conn = sqlite3.connect("baiguoyuan_sentiment.db")
-
-    # 构建查询条件
-    conditions = []
-
-    if platform_filter != "全部":
-        platform_map = {"小红书": "xhs", "抖音": "dy", "微博": "wb", "B站": "bili"}
-        conditions.append(f"platform = '{platform_map[platform_filter]}'")
-
-    if category_filter != "全部":
-        conditions.append(f"category = '{category_filter}'")
-
-    if date_filter == "今天":
-        conditions.append(f"crawl_time >= '{datetime.now().strftime('%Y-%m-%d')}'")
-    elif date_filter == "昨天":
-        yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-        today = datetime.now().strftime('%Y-%m-%d')
-        conditions.append(f"crawl_time >= '{yesterday}' AND crawl_time < '{today}'")
-    elif date_filter == "近7天":
-        week_ago = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
-        conditions.append(f"crawl_time >= '{week_ago}'")
-    elif date_filter == "近30天":
-        month_ago = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
-        conditions.append(f"crawl_time >= '{month_ago}'")
-
-    if status_filter != "全部":
-        status_value = "unprocessed" if status_filter == "未处理" else "processed"
-        conditions.append(f"status = '{status_value}'")
-
-    where_clause = " AND ".join(conditions) if conditions else "1=1"
-
-    query = f"""
-        SELECT * FROM sentiment_data
-        WHERE {where_clause}
-        ORDER BY crawl_time DESC
-        LIMIT {page_size} OFFSET {(page-1)*page_size}
+def get_items_list(platform_filter, category_filter, date_filter, status_filter, cursor=None, page_size=10):
     """
+    获取舆情列表（键集分页）
 
-    df = pd.read_sql_query(query, conn)
-
-    # 获取总数
-    count_query = f"SELECT COUNT(*) FROM sentiment_data WHERE {where_clause}"
-    total_count = pd.read_sql_query(count_query, conn).iloc[0, 0]
-
-    conn.close()
-
-    return df, total_count
+    Returns:
+        (当前页DataFrame, 总条数, 下一页游标)
+    """
+    store = get_store()
+    filters = build_filters(platform_filter, category_filter, date_filter, status_filter)
+    items, next_cursor = store.list_items(filters, page_size=page_size, after=cursor)
+    return pd.DataFrame(items), store.count_items(filters), next_cursor
 
 # 标记为已处理
 def mark_as_processed(item_id):
     """标记信息为已处理"""
-    conn = sqlite3.connect("baiguoyuan_sentiment.db")
-    cursor = conn.cursor()
-    cursor.execute("""
-        UPDATE sentiment_data
-        SET status = 'processed', processed_time = ?
-        WHERE id = ?
-    """, (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), item_id))
-    conn.commit()
-    conn.close()
+    get_store().mark_processed(item_id, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
 
 # 手动触发爬虫
 def trigger_crawl():
@@ -489,6 +349,11 @@ def main():
     if st.sidebar.button("🔄 刷新数据", use_container_width=True):
         st.rerun()
 
+    if st.sidebar.button("🤖 AI分析未分类数据", use_container_width=True):
+        with st.spinner("正在批量分析未分类的舆情信息..."):
+            updated = classify_pending_items(get_store(), get_classifier())
+        st.sidebar.success(f"已分析 {updated} 条信息")
+
     # 统计概览
     st.subheader("📊 统计概览")
     stats = get_statistics(date_filter, status_filter)
@@ -532,8 +397,17 @@ def main():
     # 信息列表
     st.subheader("📋 舆情信息列表")
 
+    # 分页游标：记录已翻过的每一页的起始游标，筛选条件变化时回到第一页
+    filter_key = (platform_filter, category_filter, date_filter, status_filter)
+    if st.session_state.get("page_filter_key") != filter_key:
+        st.session_state["page_filter_key"] = filter_key
+        st.session_state["page_cursors"] = [None]
+    page_cursors = st.session_state["page_cursors"]
+
     # 获取数据
-    df, total_count = get_items_list(platform_filter, category_filter, date_filter, status_filter)
+    df, total_count, next_cursor = get_items_list(
+        platform_filter, category_filter, date_filter, status_filter, cursor=page_cursors[-1]
+    )
 
     if len(df) == 0:
         st.info("暂无符合条件的数据")
@@ -617,7 +491,20 @@ def main():
         st.markdown("---")
 
     # 分页
-    st.markdown(f"<div style='text-align: center; color: #666;'>共 {total_count} 条数据</div>", unsafe_allow_html=True)
+    col_prev, col_info, col_next = st.columns([1, 2, 1])
+    with col_prev:
+        if st.button("⬅️ 上一页", disabled=len(page_cursors) == 1, use_container_width=True):
+            page_cursors.pop()
+            st.rerun()
+    with col_info:
+        st.markdown(
+            f"<div style='text-align: center; color: #666;'>第 {len(page_cursors)} 页 · 共 {total_count} 条数据</div>",
+            unsafe_allow_html=True
+        )
+    with col_next:
+        if st.button("下一页 ➡️", disabled=next_cursor is None, use_container_width=True):
+            page_cursors.append(next_cursor)
+            st.rerun()
 
 if __name__ == "__main__":
     main()
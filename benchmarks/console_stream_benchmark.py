@@ -0,0 +1,205 @@
+"""
+控制台推送基准测试：逐行广播 console_output vs 按应用合并的 console_batch（utils/console_stream.py）
+
+在本地启动一个 Flask-SocketIO 服务（threading 模式），连接若干个 python-socketio 客户端，
+生产线程模拟引擎输出，按固定速率写入多行日志：
+- 旧路径：每行 socketio.emit('console_output') 广播给所有客户端
+- 新路径：ConsoleEmitAggregator 每 interval 毫秒或攒满 K 行合并成一个事件，只发给订阅了该应用的客户端
+
+每个客户端只查看一个应用（与前端一致）。统计服务端发出的事件数、客户端收到的行数、
+最后一行到达的延迟，以及服务端进程CPU时间。--slow-client 额外连接一个处理很慢的客户端，
+检查背压是否让它被暂停推送而不拖慢其他客户端。
+
+需要: flask-socketio、python-socketio[client]、websocket-client
+
+用法:
+    python benchmarks/console_stream_benchmark.py --lines 20000 --clients 4
+    python benchmarks/console_stream_benchmark.py --lines 20000 --clients 4 --slow-client
+"""
+
+import argparse
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import socketio  # noqa: E402
+from flask import Flask, request  # noqa: E402
+from flask_socketio import SocketIO  # noqa: E402
+
+from utils.console_stream import ConsoleEmitAggregator  # noqa: E402
+
+APPS = ("insight", "media", "query")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(mode: str, args):
+    app = Flask(__name__)
+    server = SocketIO(app, async_mode="threading", logger=False, engineio_logger=False)
+    aggregator = None
+    if mode == "batch":
+        aggregator = ConsoleEmitAggregator(
+            emit=lambda event, data, room: server.emit(event, data, to=room),
+            enter_room=lambda sid, room: server.server.enter_room(sid, room, namespace="/"),
+            leave_room=lambda sid, room: server.server.leave_room(sid, room, namespace="/"),
+            interval_ms=args.interval_ms,
+            max_batch_lines=args.batch_lines,
+        )
+        aggregator.start()
+
+        @server.on("console_subscribe")
+        def on_subscribe(data):
+            aggregator.subscribe(request.sid, data.get("apps", []))
+
+        @server.on("console_ack")
+        def on_ack(data):
+            aggregator.ack(request.sid, data["app"], data["seq"])
+
+        @server.on("disconnect")
+        def on_disconnect():
+            aggregator.disconnect(request.sid)
+
+    port = free_port()
+    threading.Thread(
+        target=server.run, args=(app,),
+        kwargs={"host": "127.0.0.1", "port": port, "allow_unsafe_werkzeug": True, "log_output": False},
+        daemon=True,
+    ).start()
+    time.sleep(0.5)
+    return server, aggregator, f"http://127.0.0.1:{port}"
+
+
+class BenchClient:
+    """只查看一个应用的客户端，记录收到的行数和最后一行到达时间"""
+
+    def __init__(self, url: str, app_name: str, mode: str, delay: float = 0.0):
+        self.app_name = app_name
+        self.delay = delay
+        self.lines = 0
+        self.events = 0
+        self.last_arrival = None
+        self.gaps = 0
+        # python-socketio 客户端在后台线程里并发执行事件处理函数，加锁模拟浏览器单线程逐个处理
+        self._handler_lock = threading.Lock()
+        self.client = socketio.Client(reconnection=False)
+        if mode == "line":
+            self.client.on("console_output", self._on_line)
+        else:
+            self.client.on("console_batch", self._on_batch)
+            self.client.on("console_gap", self._on_gap)
+        self.client.connect(url, transports=["websocket"])
+        if mode == "batch":
+            self.client.emit("console_subscribe", {"apps": [app_name]})
+
+    def _on_line(self, data):
+        # 逐行广播时客户端收到所有应用的行，自己过滤
+        with self._handler_lock:
+            self.events += 1
+            if data["app"] == self.app_name:
+                self.lines += 1
+                self.last_arrival = time.perf_counter()
+            if self.delay:
+                time.sleep(self.delay)
+
+    def _on_batch(self, data):
+        with self._handler_lock:
+            self.events += 1
+            self.lines += len(data["lines"])
+            self.last_arrival = time.perf_counter()
+            if self.delay:
+                time.sleep(self.delay)
+        self.client.emit("console_ack", {"app": data["app"], "seq": data["seq"]})
+
+    def _on_gap(self, data):
+        # 真实前端在这里调用 /api/output?since_offset= 补齐
+        self.gaps += 1
+
+
+def produce(server, aggregator, mode: str, lines: int, rate: int) -> float:
+    """按 rate 行/秒 轮流为三个应用生成日志，返回最后一行产生的时间"""
+    offsets = {app_name: 0 for app_name in APPS}
+    interval = 1.0 / rate if rate else 0.0
+    start = time.perf_counter()
+    for i in range(lines):
+        app_name = APPS[i % len(APPS)]
+        line = f"[12:00:00] {app_name} 第{i}行 " + "日志内容" * 10
+        if mode == "line":
+            server.emit("console_output", {"app": app_name, "line": line})
+        else:
+            aggregator.push(app_name, line, offsets[app_name])
+        offsets[app_name] += 1
+        if interval:
+            target = start + (i + 1) * interval
+            remaining = target - time.perf_counter()
+            if remaining > 0:
+                time.sleep(remaining)
+    return time.perf_counter()
+
+
+def run(mode: str, args) -> None:
+    server, aggregator, url = start_server(mode, args)
+    clients = [BenchClient(url, APPS[i % len(APPS)], mode) for i in range(args.clients)]
+    slow = BenchClient(url, APPS[0], mode, delay=0.05) if args.slow_client else None
+    time.sleep(0.3)
+
+    cpu_start = time.process_time()
+    produced_at = produce(server, aggregator, mode, args.lines, args.rate)
+    expected = {app_name: len(range(APPS.index(app_name), args.lines, len(APPS))) for app_name in APPS}
+
+    deadline = time.perf_counter() + args.timeout
+    while time.perf_counter() < deadline:
+        if all(client.lines >= expected[client.app_name] for client in clients):
+            break
+        time.sleep(0.01)
+    cpu_used = time.process_time() - cpu_start
+
+    received = sum(client.lines for client in clients)
+    events = sum(client.events for client in clients)
+    done = [client.last_arrival for client in clients if client.last_arrival]
+    lag_ms = (max(done) - produced_at) * 1000 if done else float("nan")
+    complete = all(client.lines >= expected[client.app_name] for client in clients)
+
+    label = "逐行广播 console_output" if mode == "line" else "合并推送 console_batch"
+    print(f"  {label}")
+    print(f"    客户端收到事件 {events:>8}   收到本应用行数 {received:>8}/{sum(expected[c.app_name] for c in clients)}"
+          f"   {'完整' if complete else '未完成'}")
+    print(f"    最后一行到达延迟 {lag_ms:8.1f} ms   服务端CPU {cpu_used:6.2f} s")
+    if slow is not None:
+        print(f"    慢客户端收到 {slow.lines} 行, 事件 {slow.events}, 恢复推送通知 {slow.gaps}")
+    if aggregator is not None:
+        print(f"    聚合统计: {aggregator.stats}")
+        aggregator.stop()
+
+    for client in clients + ([slow] if slow else []):
+        client.client.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="控制台输出逐行推送与合并推送的对比")
+    parser.add_argument("--lines", type=int, default=20000, help="三个应用合计生成的日志行数")
+    parser.add_argument("--rate", type=int, default=0, help="每秒生成行数，0 表示尽快生成")
+    parser.add_argument("--clients", type=int, default=4, help="浏览器客户端数量")
+    parser.add_argument("--interval-ms", type=int, default=100, help="合并发送间隔")
+    parser.add_argument("--batch-lines", type=int, default=200, help="单批最大行数")
+    parser.add_argument("--slow-client", action="store_true", help="额外连接一个每个事件处理50ms的客户端")
+    parser.add_argument("--timeout", type=float, default=60.0, help="等待客户端收完的最长时间")
+    args = parser.parse_args()
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    print(f"{args.lines} 行日志，{args.clients} 个客户端，速率 {args.rate or '不限'} 行/秒")
+    for mode in ("line", "batch"):
+        run(mode, args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
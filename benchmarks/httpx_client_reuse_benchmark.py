@@ -0,0 +1,142 @@
+"""
+MediaCrawler API 请求基准测试：每次请求新建 httpx.AsyncClient vs 复用连接池（PooledHttpxClient）
+
+在本地启动一个模拟评论分页接口的 HTTP(S) 服务（每页返回约 20 条评论的 JSON），
+按爬虫翻页的方式顺序请求，统计每页延迟：
+- 旧路径：async with httpx.AsyncClient() 每次请求都重新建立 TCP（和 TLS）连接
+- 新路径：tools/httpx_client.py 的 PooledHttpxClient，keep-alive 复用连接
+
+--tls 时用 openssl 生成自签名证书，测量包含 TLS 握手的情况（更接近真实平台接口）；
+--latency-ms 可给服务端加固定处理延迟，模拟网络往返。
+
+用法:
+    python benchmarks/httpx_client_reuse_benchmark.py --pages 300
+    python benchmarks/httpx_client_reuse_benchmark.py --pages 300 --tls
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import ssl
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MEDIA_CRAWLER_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "MindSpider", "DeepSentimentCrawling", "MediaCrawler")
+sys.path.insert(0, MEDIA_CRAWLER_ROOT)
+
+import httpx  # noqa: E402
+
+from tools.httpx_client import PooledHttpxClient  # noqa: E402
+
+
+def make_comment_page(page: int) -> bytes:
+    comments = [
+        {"comment_id": page * 100 + i, "content": f"第{page}页第{i}条评论，" + "内容" * 20, "like_count": i * 3, "nickname": f"user{i}"}
+        for i in range(20)
+    ]
+    return json.dumps({"ok": 1, "data": {"data": comments, "max_id": page + 1}}, ensure_ascii=False).encode("utf-8")
+
+
+class CommentPageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # 支持 keep-alive
+    # 响应头和响应体分两次写出，不关闭 Nagle 时长连接会遇到 40ms 延迟确认，真实服务端不存在此问题
+    disable_nagle_algorithm = True
+    latency = 0.0
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        page = int(self.path.rsplit("=", 1)[-1]) if "=" in self.path else 0
+        body = make_comment_page(page)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(tls: bool, latency_ms: float):
+    CommentPageHandler.latency = latency_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CommentPageHandler)
+    if tls:
+        cert_dir = tempfile.mkdtemp()
+        cert, key = os.path.join(cert_dir, "cert.pem"), os.path.join(cert_dir, "key.pem")
+        subprocess.run(
+            ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-keyout", key, "-out", cert,
+             "-days", "1", "-subj", "/CN=127.0.0.1"],
+            check=True, capture_output=True,
+        )
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert, key)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    scheme = "https" if tls else "http"
+    return server, f"{scheme}://127.0.0.1:{server.server_port}/api/comments/show?max_id="
+
+
+async def per_request_client(base_url: str, pages: int, verify) -> list:
+    latencies = []
+    for page in range(pages):
+        start = time.perf_counter()
+        async with httpx.AsyncClient(verify=verify) as client:
+            response = await client.request("GET", f"{base_url}{page}", timeout=10)
+        response.json()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def pooled_client(base_url: str, pages: int, verify) -> list:
+    # 与各平台 client 使用相同的连接池配置；仅在自签名证书场景关闭证书校验
+    pooled = PooledHttpxClient(verify=verify)
+    latencies = []
+    for page in range(pages):
+        start = time.perf_counter()
+        response = await pooled.request("GET", f"{base_url}{page}", timeout=10)
+        response.json()
+        latencies.append(time.perf_counter() - start)
+    await pooled.aclose()
+    return latencies
+
+
+def report(label: str, latencies: list) -> float:
+    ordered = sorted(latencies)
+    mean = statistics.mean(ordered) * 1000
+    p50 = ordered[len(ordered) // 2] * 1000
+    p95 = ordered[int(len(ordered) * 0.95) - 1] * 1000
+    print(f"  {label:<28} mean {mean:7.2f} ms   p50 {p50:7.2f} ms   p95 {p95:7.2f} ms")
+    return mean
+
+
+async def main_async(args):
+    server, base_url = start_server(args.tls, args.latency_ms)
+    verify = False if args.tls else True
+    print(f"[{'HTTPS' if args.tls else 'HTTP'}] {args.pages} 个评论分页请求，服务端延迟 {args.latency_ms} ms")
+    # 预热：import、事件循环、服务端线程
+    await pooled_client(base_url, 5, verify)
+
+    old_mean = report("每次请求新建 AsyncClient", await per_request_client(base_url, args.pages, verify))
+    new_mean = report("复用 PooledHttpxClient", await pooled_client(base_url, args.pages, verify))
+    print(f"  每页延迟降低: {old_mean - new_mean:.2f} ms ({old_mean / new_mean:.1f}x)")
+    server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="httpx 连接复用对评论分页请求延迟的影响")
+    parser.add_argument("--pages", type=int, default=300, help="请求的评论页数")
+    parser.add_argument("--tls", action="store_true", help="使用自签名证书的 HTTPS 服务（需要 openssl）")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="服务端每个请求的固定处理延迟")
+    asyncio.run(main_async(parser.parse_args()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+情感分析批量推理基准测试
+对比逐条推理（旧实现）与按长度分组的micro-batch推理的吞吐量（texts/sec）
+
+用法:
+    python benchmarks/sentiment_batch_benchmark.py --num-texts 500 --batch-size 32
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from InsightEngine.tools.sentiment_analyzer import WeiboMultilingualSentimentAnalyzer
+
+
+SAMPLE_TEXTS = [
+    "这家店的水果很新鲜，下次还来！",
+    "配送太慢了，等了两个小时，榴莲都快化了，再也不会买了",
+    "一般般吧，价格还行",
+    "客服态度非常好，主动帮我退了坏果，点赞👍",
+    "The delivery was late and the fruit was bruised.",
+    "I absolutely love their mango, best I've had this year!",
+    "今天路过门店看了一眼，人挺多的，没进去。",
+    "会员价比别家贵不少，感觉被割韭菜了，而且称重也有问题，投诉了三次都没人理，真的很失望。",
+]
+
+
+def build_corpus(num_texts: int, seed: int = 42):
+    """构造长度不一的评论样本，模拟搜索工具返回的评论集合"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(num_texts):
+        repeat = rng.choice([1, 1, 1, 2, 3, 6])
+        corpus.append(" ".join(rng.choice(SAMPLE_TEXTS) for _ in range(repeat)))
+    return corpus
+
+
+def run_sequential(analyzer: WeiboMultilingualSentimentAnalyzer, texts):
+    """旧实现：逐条调用analyze_single_text"""
+    start = time.perf_counter()
+    results = [analyzer.analyze_single_text(text) for text in texts]
+    return results, time.perf_counter() - start
+
+
+def run_batched(analyzer: WeiboMultilingualSentimentAnalyzer, texts, batch_size: int):
+    """新实现：analyze_batch按长度分组的micro-batch推理"""
+    start = time.perf_counter()
+    batch_result = analyzer.analyze_batch(texts, show_progress=False, batch_size=batch_size)
+    return batch_result.results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="情感分析批量推理基准测试")
+    parser.add_argument("--num-texts", type=int, default=500, help="测试文本数量")
+    parser.add_argument("--batch-size", type=int, default=32, help="micro-batch大小")
+    args = parser.parse_args()
+
+    # 关闭结果缓存，否则逐条推理和预热写入的缓存会让批量推理只测到缓存命中
+    analyzer = WeiboMultilingualSentimentAnalyzer(batch_size=args.batch_size, cache=False)
+    if not analyzer.initialize():
+        print("模型初始化失败，无法执行基准测试")
+        return 1
+
+    texts = build_corpus(args.num_texts)
+
+    # 预热，避免首次推理的初始化开销影响结果
+    analyzer.analyze_batch(texts[:args.batch_size], show_progress=False)
+
+    sequential_results, sequential_seconds = run_sequential(analyzer, texts)
+    batched_results, batched_seconds = run_batched(analyzer, texts, args.batch_size)
+
+    mismatched = sum(
+        1 for a, b in zip(sequential_results, batched_results)
+        if a.sentiment_label != b.sentiment_label
+    )
+
+    print(f"设备: {analyzer.device}，文本数: {len(texts)}，batch_size: {args.batch_size}")
+    print(f"逐条推理: {sequential_seconds:.2f}s  ({len(texts) / sequential_seconds:.1f} texts/sec)")
+    print(f"批量推理: {batched_seconds:.2f}s  ({len(texts) / batched_seconds:.1f} texts/sec)")
+    print(f"加速比: {sequential_seconds / batched_seconds:.2f}x，标签不一致: {mismatched}/{len(texts)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,15 +2,37 @@
 # -*- coding: utf-8 -*-
 """
 百果园舆情系统 - 历史数据清理脚本
-功能: 自动删除14天前的舆情数据,并备份
+功能: 将14天前的舆情数据归档为压缩分区文件后从数据库中删除,并备份
+
+- 备份使用SQLite在线备份API分页复制,每页之间让出锁,审核界面和爬虫可以照常读写
+- 过期数据按 crawl_time 索引分批归档、分批删除,每批一个短事务
+- 数据库使用 auto_vacuum=INCREMENTAL,删除后分步执行 incremental_vacuum 回收空间,不再整库 VACUUM
+- 归档文件按爬取日期分区: archive/sentiment_data/date=YYYY-MM-DD/,默认 gzip 压缩的 JSONL,
+  安装了 pyarrow 时可选 Parquet(zstd 压缩)
 """
 
+import argparse
+import gzip
+import json
+import os
 import sqlite3
-import shutil
+import time
+from collections import defaultdict
 from datetime import datetime, timedelta
 from pathlib import Path
 import logging
 
+from utils.sentiment_store import INDEXES, SENTIMENT_DB_PATH
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    pq = None
+    PYARROW_AVAILABLE = False
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -19,13 +41,55 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # 配置
-DB_PATH = "baiguoyuan_sentiment.db"
+DB_PATH = SENTIMENT_DB_PATH
 RETENTION_DAYS = 14  # 保留14天
 BACKUP_DIR = Path("backups")
+ARCHIVE_DIR = Path(os.getenv("RETENTION_ARCHIVE_DIR", "archive")) / "sentiment_data"
+
+# 归档格式: jsonl / parquet
+ARCHIVE_FORMAT = os.getenv("RETENTION_ARCHIVE_FORMAT", "jsonl").strip().lower()
+
+# 每批归档并删除的行数,以及批次之间的停顿(秒),让其他连接有机会写入
+DELETE_BATCH_SIZE = int(os.getenv("RETENTION_DELETE_BATCH_SIZE", "2000"))
+DELETE_BATCH_PAUSE = float(os.getenv("RETENTION_DELETE_BATCH_PAUSE", "0.05"))
+
+# 在线备份每步复制的页数和步间停顿(秒)
+BACKUP_PAGES_PER_STEP = int(os.getenv("RETENTION_BACKUP_PAGES_PER_STEP", "1024"))
+BACKUP_STEP_PAUSE = float(os.getenv("RETENTION_BACKUP_STEP_PAUSE", "0.01"))
+
+# 每步 incremental_vacuum 回收的页数
+VACUUM_PAGES_PER_STEP = int(os.getenv("RETENTION_VACUUM_PAGES_PER_STEP", "2000"))
+
+# 单次运行的时间预算(秒),超出后停止删除,剩余的过期数据下次运行继续处理
+# (scheduler_daemon 调用本脚本的超时为300秒)
+MAX_RUN_SECONDS = float(os.getenv("RETENTION_MAX_RUN_SECONDS", "240"))
+
+
+def connect():
+    """打开数据库连接(WAL模式,写锁冲突时等待而不是立即失败)"""
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
+
+def ensure_retention_ready(conn):
+    """确保 crawl_time 索引存在,并把数据库切换为增量回收空间模式"""
+    # 审核界面的覆盖索引以 crawl_time 开头,按时间分批删除直接使用它
+    conn.execute(INDEXES[0])
+    conn.commit()
+
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        # 已有数据库修改 auto_vacuum 需要完整 VACUUM 一次,只在首次迁移时发生
+        logger.info("🔧 首次启用增量空间回收(auto_vacuum=INCREMENTAL),需要完整整理数据库一次...")
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("VACUUM")
+        logger.info("✅ 已启用增量空间回收")
 
 
 def create_backup():
-    """创建数据库备份"""
+    """使用SQLite在线备份API创建数据库备份(分页复制,不阻塞其他连接读写)"""
     try:
         # 创建备份目录
         BACKUP_DIR.mkdir(exist_ok=True)
@@ -33,9 +97,21 @@ def create_backup():
         # 备份文件名: baiguoyuan_sentiment_backup_20250108_120000.db
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         backup_path = BACKUP_DIR / f"baiguoyuan_sentiment_backup_{timestamp}.db"
-
-        # 复制数据库文件
-        shutil.copy2(DB_PATH, backup_path)
+        tmp_path = backup_path.with_suffix(".db.tmp")
+
+        def progress(status, remaining, total):
+            if total and remaining == 0:
+                logger.info(f"📦 备份完成 {total} 页")
+
+        source = connect()
+        target = sqlite3.connect(tmp_path)
+        try:
+            source.backup(target, pages=BACKUP_PAGES_PER_STEP, progress=progress, sleep=BACKUP_STEP_PAUSE)
+        finally:
+            target.close()
+            source.close()
+        # 写完后再改名,备份目录中不会出现不完整的备份
+        os.replace(tmp_path, backup_path)
 
         logger.info(f"✅ 数据库备份成功: {backup_path}")
         return True
@@ -68,9 +144,73 @@ def cleanup_old_backups(keep_days=30):
         logger.error(f"❌ 清理旧备份失败: {e}")
 
 
-def cleanup_old_data():
-    """删除14天前的舆情数据"""
+class PartitionArchiver:
+    """按爬取日期把过期行写入压缩分区文件,每批写完并落盘后才允许删除"""
+
+    def __init__(self, archive_dir=ARCHIVE_DIR, archive_format=ARCHIVE_FORMAT):
+        if archive_format == "parquet" and not PYARROW_AVAILABLE:
+            logger.warning("⚠️  未安装 pyarrow,归档格式改为 jsonl")
+            archive_format = "jsonl"
+        self.archive_dir = Path(archive_dir)
+        self.archive_format = archive_format
+        self.run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.batch_no = 0
+        self.files = set()
+
+    def _partition_dir(self, date):
+        path = self.archive_dir / f"date={date}"
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def write(self, rows):
+        """归档一批行(sqlite3.Row),返回写入的行数"""
+        partitions = defaultdict(list)
+        for row in rows:
+            record = dict(row)
+            partitions[str(record.get("crawl_time") or "")[:10] or "unknown"].append(record)
+
+        self.batch_no += 1
+        for date, records in partitions.items():
+            if self.archive_format == "parquet":
+                # Parquet 文件只有写完文件尾才可读,每批单独一个文件
+                path = self._partition_dir(date) / f"part-{self.run_id}-{self.batch_no:05d}.parquet"
+                pq.write_table(pa.Table.from_pylist(records), path, compression="zstd")
+            else:
+                # gzip 支持多个成员拼接,同一次运行的各批追加到同一个文件
+                path = self._partition_dir(date) / f"part-{self.run_id}.jsonl.gz"
+                with open(path, "ab") as raw:
+                    with gzip.GzipFile(fileobj=raw, mode="ab") as f:
+                        for record in records:
+                            f.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+                    raw.flush()
+                    os.fsync(raw.fileno())
+            self.files.add(path)
+        return sum(len(records) for records in partitions.values())
+
+
+def incremental_vacuum(conn, deadline=None):
+    """分步回收空闲页,每步一个短事务"""
+    freed = 0
+    while True:
+        free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if free_pages == 0 or (deadline and time.monotonic() > deadline):
+            break
+        # execute() 只执行一步(回收一页),executescript 会把整条语句执行完
+        conn.executescript(f"PRAGMA incremental_vacuum({min(free_pages, VACUUM_PAGES_PER_STEP)});")
+        step_freed = free_pages - conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if step_freed <= 0:
+            break
+        freed += step_freed
+        time.sleep(DELETE_BATCH_PAUSE)
+    return freed
+
+
+def cleanup_old_data(max_seconds=MAX_RUN_SECONDS, backup=True):
+    """归档并删除14天前的舆情数据"""
     try:
+        started = time.monotonic()
+        deadline = started + max_seconds if max_seconds else None
+
         # 计算截止日期
         cutoff_date = datetime.now() - timedelta(days=RETENTION_DAYS)
         cutoff_str = cutoff_date.strftime('%Y-%m-%d %H:%M:%S')
@@ -83,50 +223,58 @@ def cleanup_old_data():
         logger.info("=" * 60)
 
         # 连接数据库
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-
-        # 查询要删除的数据数量
-        cursor.execute("""
-            SELECT COUNT(*) FROM sentiment_data
-            WHERE created_at < ?
-        """, (cutoff_str,))
-
-        to_delete_count = cursor.fetchone()[0]
+        conn = connect()
+        ensure_retention_ready(conn)
 
-        if to_delete_count == 0:
+        # 是否有需要删除的数据(走 crawl_time 索引,不做全表计数)
+        if conn.execute(
+            "SELECT 1 FROM sentiment_data WHERE crawl_time < ? LIMIT 1", (cutoff_str,)
+        ).fetchone() is None:
             logger.info("ℹ️  没有需要清理的数据")
             conn.close()
             return 0
 
-        logger.info(f"📊 待删除数据: {to_delete_count} 条")
-
         # 先备份再删除
-        logger.info("📦 正在备份数据库...")
-        if not create_backup():
-            logger.warning("⚠️  备份失败,但继续执行清理...")
-
-        # 执行删除
-        logger.info("🗑️  正在删除旧数据...")
-        cursor.execute("""
-            DELETE FROM sentiment_data
-            WHERE created_at < ?
-        """, (cutoff_str,))
-
-        deleted = cursor.rowcount
-        conn.commit()
-
-        # 优化数据库(回收空间)
-        logger.info("🔧 正在优化数据库...")
-        cursor.execute("VACUUM")
-        conn.commit()
-
+        if backup:
+            logger.info("📦 正在备份数据库...")
+            if not create_backup():
+                logger.warning("⚠️  备份失败,但继续执行清理...")
+
+        # 分批归档并删除
+        logger.info(f"🗑️  正在分批归档并删除旧数据(每批 {DELETE_BATCH_SIZE} 条)...")
+        archiver = PartitionArchiver()
+        deleted = 0
+        finished = False
+        while not (deadline and time.monotonic() > deadline):
+            rows = conn.execute(
+                "SELECT * FROM sentiment_data WHERE crawl_time < ? ORDER BY crawl_time LIMIT ?",
+                (cutoff_str, DELETE_BATCH_SIZE)
+            ).fetchall()
+            if not rows:
+                finished = True
+                break
+
+            # 归档文件落盘之后再删除;中途中断时这一批会在下次运行重新归档(至少一次)
+            archiver.write(rows)
+            ids = [row["id"] for row in rows]
+            with conn:
+                conn.executemany("DELETE FROM sentiment_data WHERE id = ?", [(item_id,) for item_id in ids])
+            deleted += len(ids)
+            if deleted % (DELETE_BATCH_SIZE * 10) == 0:
+                logger.info(f"   已归档并删除 {deleted} 条")
+            time.sleep(DELETE_BATCH_PAUSE)
+
+        # 回收空间(增量)
+        logger.info("🔧 正在回收数据库空间...")
+        freed_pages = incremental_vacuum(conn, deadline)
+        conn.execute("PRAGMA optimize")
         conn.close()
 
         logger.info("=" * 60)
-        logger.info(f"✅ 清理完成!")
+        logger.info("✅ 清理完成!" if finished else "⏱️  已达到本次运行时间上限,剩余数据下次继续清理")
         logger.info(f"删除数据: {deleted} 条")
-        logger.info(f"数据库已优化")
+        logger.info(f"归档文件: {len(archiver.files)} 个 ({archiver.archive_format}) -> {archiver.archive_dir}")
+        logger.info(f"回收空闲页: {freed_pages} 页")
         logger.info("=" * 60)
 
         # 清理旧备份
@@ -142,20 +290,19 @@ def cleanup_old_data():
 def get_database_stats():
     """获取数据库统计信息"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = connect()
         cursor = conn.cursor()
 
         # 总数据量
         cursor.execute("SELECT COUNT(*) FROM sentiment_data")
         total_count = cursor.fetchone()[0]
 
-        # 最早数据时间
-        cursor.execute("SELECT MIN(created_at) FROM sentiment_data")
-        earliest = cursor.fetchone()[0]
+        # 最早、最新数据时间(走 crawl_time 索引)
+        cursor.execute("SELECT MIN(crawl_time), MAX(crawl_time) FROM sentiment_data")
+        earliest, latest = cursor.fetchone()
 
-        # 最新数据时间
-        cursor.execute("SELECT MAX(created_at) FROM sentiment_data")
-        latest = cursor.fetchone()[0]
+        # 空闲页(增量回收后应接近0)
+        free_pages = cursor.execute("PRAGMA freelist_count").fetchone()[0]
 
         # 数据库文件大小
         db_size = Path(DB_PATH).stat().st_size / 1024 / 1024  # MB
@@ -168,7 +315,7 @@ def get_database_stats():
         logger.info(f"总数据量: {total_count:,} 条")
         logger.info(f"最早数据: {earliest or '无'}")
         logger.info(f"最新数据: {latest or '无'}")
-        logger.info(f"数据库大小: {db_size:.2f} MB")
+        logger.info(f"数据库大小: {db_size:.2f} MB (空闲页 {free_pages})")
         logger.info("=" * 60 + "\n")
 
     except Exception as e:
@@ -177,6 +324,11 @@ def get_database_stats():
 
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description="百果园舆情历史数据清理")
+    parser.add_argument("--max-seconds", type=float, default=MAX_RUN_SECONDS, help="单次运行的时间上限,0表示不限")
+    parser.add_argument("--no-backup", action="store_true", help="跳过删除前的在线备份")
+    args = parser.parse_args()
+
     logger.info("\n🚀 百果园舆情数据清理脚本启动\n")
 
     # 检查数据库文件
@@ -189,7 +341,7 @@ def main():
     get_database_stats()
 
     # 执行清理
-    deleted = cleanup_old_data()
+    deleted = cleanup_old_data(max_seconds=args.max_seconds, backup=not args.no_backup)
 
     if deleted >= 0:
         # 显示清理后统计
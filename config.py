@@ -54,6 +54,12 @@ class Settings(BaseSettings):
     REPORT_ENGINE_API_KEY: Optional[str] = Field(None, description="Report Agent（推荐Gemini，推荐中转api厂商：https://aihubmix.com/?aff=8Ds9")
     REPORT_ENGINE_BASE_URL: Optional[str] = Field("https://aihubmix.com/v1", description="Report Agent LLM接口BaseUrl")
     REPORT_ENGINE_MODEL_NAME: str = Field("gemini-2.5-pro", description="Report Agent LLM模型，如gemini-2.5-pro")
+    REPORT_TASK_WORKERS: int = Field(2, description="Report Engine任务队列的工作线程数，即同时生成的报告数")
+    REPORT_TASK_DB_PATH: str = Field("logs/report_tasks.db", description="Report Engine任务持久化SQLite文件，服务重启后未完成任务会重新排队")
+    REPORT_READINESS_POLL_INTERVAL: float = Field(1.0, description="Report Engine未安装watchdog时检查引擎报告清单的间隔（秒）")
+    REPORT_SECTIONED_GENERATION: bool = Field(True, description="Report Engine按模板章节并行生成HTML并由固定骨架装配；关闭后整份报告单次生成")
+    REPORT_SECTION_CONCURRENCY: int = Field(4, description="Report Engine同时生成的章节数上限，遇到API限流时自动降低")
+    REPORT_SECTION_EXCERPT_CHARS: int = Field(12000, description="Report Engine每个章节从引擎报告和论坛日志中摘录的字符预算")
     
     # Forum Host（Qwen3最新模型，这里我使用了硅基流动这个平台，申请地址：https://cloud.siliconflow.cn/）
     FORUM_HOST_API_KEY: Optional[str] = Field(None, description="Forum Host（Qwen3最新模型，这里我使用了硅基流动这个平台，申请地址：https://cloud.siliconflow.cn/）API密钥")
@@ -64,6 +70,11 @@ class Settings(BaseSettings):
     KEYWORD_OPTIMIZER_API_KEY: Optional[str] = Field(None, description="SQL keyword Optimizer（小参数Qwen3模型，这里我使用了硅基流动这个平台，申请地址：https://cloud.siliconflow.cn/）API密钥")
     KEYWORD_OPTIMIZER_BASE_URL: Optional[str] = Field("https://api.siliconflow.cn/v1", description="Keyword Optimizer BaseUrl")
     KEYWORD_OPTIMIZER_MODEL_NAME: str = Field("Qwen/Qwen3-30B-A3B-Instruct-2507", description="Keyword Optimizer LLM模型名称，如Qwen/Qwen3-30B-A3B-Instruct-2507")
+    KEYWORD_OPTIMIZER_LOCAL_ONLY: bool = Field(False, description="仅使用缓存和本地语料扩展关键词，不调用LLM（适合大批量运行，无需配置KEYWORD_OPTIMIZER_API_KEY）")
+    KEYWORD_LOCAL_EXPANSION_ENABLED: bool = Field(True, description="是否启用基于已爬取语料（jieba分词+共现PMI+source_keyword）的本地关键词扩展，证据不足时才调用LLM")
+    KEYWORD_CACHE_TTL: int = Field(3600, description="查询→关键词结果缓存有效期（秒），0表示不缓存")
+    KEYWORD_LOCAL_CORPUS_SIZE: int = Field(20000, description="本地关键词索引读取的最新内容条数")
+    KEYWORD_LOCAL_INDEX_REFRESH: int = Field(1800, description="本地关键词索引重建间隔（秒）")
     
     # ================== 网络工具配置 ====================
     # Tavily API（申请地址：https://www.tavily.com/）
@@ -83,8 +94,22 @@ class Settings(BaseSettings):
     MAX_HIGH_CONFIDENCE_SENTIMENT_RESULTS: int = Field(0, description="高置信度情感分析最大数")
     MAX_REFLECTIONS: int = Field(3, description="最大反思次数")
     MAX_PARAGRAPHS: int = Field(6, description="最大段落数")
+    INSIGHT_ENGINE_PARAGRAPH_CONCURRENCY: int = Field(3, description="Insight Engine同时研究的段落数上限，1表示逐段顺序处理；遇到API限流时自动降低")
+    MEDIA_ENGINE_PARAGRAPH_CONCURRENCY: int = Field(3, description="Media Engine同时研究的段落数上限")
+    QUERY_ENGINE_PARAGRAPH_CONCURRENCY: int = Field(3, description="Query Engine同时研究的段落数上限")
+    MEDIA_ENGINE_SEARCH_FANOUT: int = Field(3, description="Media Engine每次搜索/反思最多并发执行的查询数（主查询+补充查询）")
+    QUERY_ENGINE_SEARCH_FANOUT: int = Field(3, description="Query Engine每次搜索/反思最多并发执行的查询数（主查询+补充查询）")
     SEARCH_TIMEOUT: int = Field(240, description="单次搜索请求超时")
     MAX_CONTENT_LENGTH: int = Field(500000, description="搜索最大内容长度")
+    DB_QUERY_CONCURRENCY: int = Field(8, description="Insight Engine同时在途的数据库查询数上限（关键词×数据表并发）")
+    DB_QUERY_TIMEOUT: float = Field(60.0, description="Insight Engine单条数据库查询超时（秒）")
+    DB_POOL_SIZE: int = Field(10, description="Insight Engine数据库连接池常驻连接数")
+    DB_MAX_OVERFLOW: int = Field(10, description="Insight Engine连接池允许的额外溢出连接数")
+    DB_POOL_TIMEOUT: float = Field(30.0, description="从连接池获取连接的等待超时（秒）")
+    DB_POOL_RECYCLE: int = Field(1800, description="连接最大复用时长（秒），超时后重建")
+    DB_POOL_WARMUP: int = Field(4, description="启动时预先建立的数据库连接数，0表示不预热")
+    DB_STATEMENT_CACHE_SIZE: int = Field(500, description="SQL语句编译/预处理缓存条目数")
+    TEXT_SEARCH_BACKEND: str = Field("auto", description="话题检索后端：auto按方言使用MySQL FULLTEXT(ngram)/PostgreSQL pg_trgm索引（由MindSpider/schema/init_database.py创建），like强制使用LIKE")
     
     class Config:
         env_file = ENV_FILE
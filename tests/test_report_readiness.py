@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# @Desc    : 报告就绪检测的文件监听测试
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+sys.path.append(os.path.join(project_root, "utils"))
+
+from ReportEngine.utils.readiness import DIR_WATCHER_AVAILABLE, ReportReadinessNotifier
+from report_manifest import record_report
+
+ENGINES = ("insight", "media", "query")
+
+
+@unittest.skipUnless(DIR_WATCHER_AVAILABLE and sys.platform.startswith("linux"), "需要 Linux inotify")
+class TestReportReadinessWatch(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directories = {engine: os.path.join(self.tmp_dir.name, engine) for engine in ENGINES}
+        # 轮询间隔远大于测试等待时间，只有文件事件才能让通知器及时感知新报告
+        self.notifier = ReportReadinessNotifier(self.directories, poll_interval=30)
+        self.notifier.start()
+
+    def tearDown(self):
+        self.notifier.stop()
+        self.tmp_dir.cleanup()
+
+    def _save_report(self, engine, query):
+        path = os.path.join(self.directories[engine], f"{engine}_report.md")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"# {query}")
+        record_report(self.directories[engine], engine, query, path)
+
+    def test_manifest_change_fires_subscriber(self):
+        fired = threading.Event()
+        received = []
+
+        def on_report(engine, entry):
+            received.append((engine, entry["query"]))
+            fired.set()
+
+        self.notifier.subscribe(on_report)
+        self._save_report("insight", "百果园")
+        self.assertTrue(fired.wait(5))
+        self.assertEqual(received, [("insight", "百果园")])
+
+    def test_wait_until_ready_wakes_on_manifest_events(self):
+        self.assertFalse(self.notifier.get_status("百果园")["ready"])
+
+        def save_all():
+            for engine in ENGINES:
+                self._save_report(engine, "百果园")
+
+        threading.Timer(0.2, save_all).start()
+        start = time.monotonic()
+        status = self.notifier.wait_until_ready("百果园", timeout=10)
+        self.assertTrue(status["ready"])
+        self.assertTrue(status["matched_query"])
+        self.assertLess(time.monotonic() - start, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
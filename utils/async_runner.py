@@ -0,0 +1,67 @@
+"""
+后台 event loop 工具模块
+在守护线程中常驻运行一个 event loop，同步代码（Agent段落线程、Streamlit线程）通过 run_async
+提交协程并阻塞等待结果。异步HTTP客户端和数据库引擎的连接池绑定在这个 loop 上，
+所有线程发起的请求共用同一组连接，也避免每次调用都创建/关闭 event loop。
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Awaitable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class _BackgroundLoop:
+    """在守护线程中常驻运行的 event loop"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="async-runner-loop", daemon=True)
+        self.thread.start()
+        self._ready.wait()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self._ready.set)
+        self.loop.run_forever()
+
+    def submit(self, coro: Awaitable[T]) -> "concurrent.futures.Future[T]":
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+
+_background_loop: Optional[_BackgroundLoop] = None
+_background_loop_lock = threading.Lock()
+
+
+def _get_background_loop() -> _BackgroundLoop:
+    global _background_loop
+    if _background_loop is None:
+        with _background_loop_lock:
+            if _background_loop is None:
+                _background_loop = _BackgroundLoop()
+    return _background_loop
+
+
+def submit_async(coro: Awaitable[T]) -> "concurrent.futures.Future[T]":
+    """在后台 event loop 上启动协程，不等待结果"""
+    return _get_background_loop().submit(coro)
+
+
+def run_async(coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+    """
+    在后台 event loop 上运行协程，并阻塞等待结果（线程安全）
+
+    Args:
+        coro: 要运行的协程
+        timeout: 等待超时（秒），None 表示一直等待
+
+    Returns:
+        协程的返回值
+    """
+    background = _get_background_loop()
+    if threading.current_thread() is background.thread:
+        raise RuntimeError("run_async 不能在后台 event loop 线程中调用，请直接 await")
+    return background.submit(coro).result(timeout)
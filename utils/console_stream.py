@@ -0,0 +1,292 @@
+"""
+控制台输出推送聚合工具模块
+- 每个应用的输出行先进入待发送队列，每 CONSOLE_BATCH_INTERVAL_MS 毫秒或攒满 CONSOLE_BATCH_MAX_LINES 行
+  合并成一个 console_batch 事件，只发往订阅了该应用的房间（console:<app>），不再每行广播一次
+- 背压：待发送行数超过上限时丢弃最早的行并在批次中记录 dropped；客户端按批次回执（console_ack），
+  未确认批次过多的客户端暂时移出房间，确认完暂停前收到的批次（或暂停超过 CONSOLE_LAG_RESUME_SECONDS 秒）后
+  重新加入并收到 console_gap，由前端按 offset 接口补齐缺失的行
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from loguru import logger
+
+# 合并发送的时间间隔（毫秒）与单批最大行数
+CONSOLE_BATCH_INTERVAL_MS = int(os.getenv("CONSOLE_BATCH_INTERVAL_MS", "100"))
+CONSOLE_BATCH_MAX_LINES = int(os.getenv("CONSOLE_BATCH_MAX_LINES", "200"))
+
+# 每个应用待发送行数上限，超出时丢弃最早的行
+CONSOLE_MAX_PENDING_LINES = int(os.getenv("CONSOLE_MAX_PENDING_LINES", "5000"))
+
+# 单个客户端允许未确认的批次数，超出后视为落后，暂停向其推送
+CONSOLE_MAX_UNACKED_BATCHES = int(os.getenv("CONSOLE_MAX_UNACKED_BATCHES", "20"))
+
+# 被暂停的客户端迟迟没有确认（回执丢失或已丢弃积压）时，超过该秒数也恢复推送
+CONSOLE_LAG_RESUME_SECONDS = float(os.getenv("CONSOLE_LAG_RESUME_SECONDS", "10"))
+
+
+def console_room(app_name: str) -> str:
+    """应用对应的Socket.IO房间名"""
+    return f"console:{app_name}"
+
+
+class _AppStream:
+    """单个应用的待发送行与批次序号"""
+
+    def __init__(self):
+        self.pending: "deque[str]" = deque()
+        self.first_offset: Optional[int] = None
+        self.next_offset = 0
+        self.dropped = 0
+        self.seq = 0
+        self.subscribers: Set[str] = set()
+
+
+class ConsoleEmitAggregator:
+    """
+    按应用聚合控制台输出并批量推送
+
+    传输层通过回调注入，便于在Flask-SocketIO之外单独测试：
+    emit(event, data, room) 发往房间或单个客户端（room 为 sid），
+    enter_room(sid, room) / leave_room(sid, room) 管理房间成员。
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[str, Dict[str, Any], str], None],
+        enter_room: Callable[[str, str], None],
+        leave_room: Callable[[str, str], None],
+        interval_ms: int = CONSOLE_BATCH_INTERVAL_MS,
+        max_batch_lines: int = CONSOLE_BATCH_MAX_LINES,
+        max_pending_lines: int = CONSOLE_MAX_PENDING_LINES,
+        max_unacked_batches: int = CONSOLE_MAX_UNACKED_BATCHES,
+        lag_resume_seconds: float = CONSOLE_LAG_RESUME_SECONDS,
+        start_task: Optional[Callable[[Callable[[], None]], Any]] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Args:
+            emit / enter_room / leave_room: 传输层回调
+            interval_ms: 合并发送的时间间隔
+            max_batch_lines: 攒满该行数时立即发送
+            max_pending_lines: 每个应用待发送行数上限
+            max_unacked_batches: 客户端允许未确认的批次数
+            lag_resume_seconds: 被暂停的客户端最长暂停时间
+            start_task: 启动后台刷新循环的函数（如 socketio.start_background_task），默认使用守护线程
+            sleep: 刷新循环使用的休眠函数（如 socketio.sleep）
+        """
+        self._emit = emit
+        self._enter_room = enter_room
+        self._leave_room = leave_room
+        self.interval = max(1, int(interval_ms)) / 1000
+        self.max_batch_lines = max(1, int(max_batch_lines))
+        self.max_pending_lines = max(self.max_batch_lines, int(max_pending_lines))
+        self.max_unacked_batches = max(1, int(max_unacked_batches))
+        self.lag_resume_seconds = max(0.0, float(lag_resume_seconds))
+        self._start_task = start_task
+        self._sleep = sleep
+
+        self._streams: Dict[str, _AppStream] = {}
+        # sid -> {app: 最后确认的批次序号}
+        self._acked: Dict[str, Dict[str, int]] = {}
+        # 被暂停的客户端：sid -> {app: (暂停前发给它的最后一个批次序号, 暂停时间)}
+        self._lagging: Dict[str, Dict[str, Tuple[int, float]]] = {}
+        self._lock = threading.Lock()
+        # 保证同一应用的批次按顺序发出
+        self._flush_lock = threading.Lock()
+        self._running = False
+        self.stats = {'lines': 0, 'batches': 0, 'dropped': 0, 'lagging_events': 0}
+
+    def _stream(self, app_name: str) -> _AppStream:
+        stream = self._streams.get(app_name)
+        if stream is None:
+            stream = _AppStream()
+            self._streams[app_name] = stream
+        return stream
+
+    def start(self) -> None:
+        """启动后台定时刷新"""
+        if self._running:
+            return
+        self._running = True
+        if self._start_task is not None:
+            self._start_task(self._flush_loop)
+        else:
+            threading.Thread(target=self._flush_loop, name="console-emit", daemon=True).start()
+
+    def stop(self) -> None:
+        """停止后台刷新并发出剩余的行"""
+        self._running = False
+        self.flush()
+
+    def push(self, app_name: str, line: str, offset: int) -> None:
+        """加入一行输出，offset 为该行在应用内存缓冲中的序号"""
+        self.push_many(app_name, [line], offset)
+
+    def push_many(self, app_name: str, lines: List[str], first_offset: int) -> None:
+        """加入连续的多行输出"""
+        if not lines:
+            return
+        with self._lock:
+            stream = self._stream(app_name)
+            if stream.first_offset is None or first_offset != stream.next_offset:
+                # 首批，或应用重启后内存缓冲被清空、offset重新开始
+                stream.pending.clear()
+                stream.first_offset = first_offset
+            stream.pending.extend(lines)
+            stream.next_offset = first_offset + len(lines)
+            self.stats['lines'] += len(lines)
+            overflow = len(stream.pending) - self.max_pending_lines
+            if overflow > 0:
+                for _ in range(overflow):
+                    stream.pending.popleft()
+                stream.first_offset += overflow
+                stream.dropped += overflow
+                self.stats['dropped'] += overflow
+            full = len(stream.pending) >= self.max_batch_lines
+        if full:
+            self.flush(app_name)
+
+    def flush(self, app_name: Optional[str] = None) -> None:
+        """立即发出待发送的行"""
+        with self._flush_lock:
+            with self._lock:
+                names = [app_name] if app_name is not None else list(self._streams)
+            for name in names:
+                while self._flush_one(name):
+                    pass
+
+    def _flush_one(self, app_name: str) -> bool:
+        """发出一批，返回是否还有剩余"""
+        with self._lock:
+            stream = self._streams.get(app_name)
+            if stream is None or not stream.pending:
+                return False
+            count = min(len(stream.pending), self.max_batch_lines)
+            lines = [stream.pending.popleft() for _ in range(count)]
+            offset = stream.first_offset
+            stream.first_offset += count
+            stream.seq += 1
+            batch = {
+                'app': app_name,
+                'lines': lines,
+                'offset': offset,
+                'next_offset': offset + count,
+                'seq': stream.seq,
+                'dropped': stream.dropped,
+            }
+            stream.dropped = 0
+            lagging = self._mark_lagging(app_name, stream)
+            remaining = bool(stream.pending)
+            self.stats['batches'] += 1
+
+        for sid in lagging:
+            self._leave_room(sid, console_room(app_name))
+            logger.warning(f"客户端 {sid} 未确认的 {app_name} 输出批次过多，暂停推送直到其追上")
+        if stream.subscribers:
+            self._emit('console_batch', batch, console_room(app_name))
+        return remaining
+
+    def _mark_lagging(self, app_name: str, stream: _AppStream) -> List[str]:
+        """找出未确认批次超过上限的订阅者（持有 _lock 时调用）"""
+        lagging = []
+        for sid in list(stream.subscribers):
+            if app_name in self._lagging.get(sid, ()):
+                continue
+            acked = self._acked.get(sid, {}).get(app_name, stream.seq - 1)
+            if stream.seq - acked > self.max_unacked_batches:
+                # 当前批次在移出房间之后才发出，客户端最后能收到的是上一批
+                self._lagging.setdefault(sid, {})[app_name] = (stream.seq - 1, time.monotonic())
+                self.stats['lagging_events'] += 1
+                lagging.append(sid)
+        return lagging
+
+    def subscribe(self, sid: str, apps: Iterable[str]) -> List[str]:
+        """把客户端的订阅替换为 apps，返回实际订阅的应用"""
+        apps = list(dict.fromkeys(apps))
+        joined, left = [], []
+        with self._lock:
+            for app_name, stream in self._streams.items():
+                if sid in stream.subscribers and app_name not in apps:
+                    stream.subscribers.discard(sid)
+                    left.append(app_name)
+            acked = self._acked.setdefault(sid, {})
+            for app_name in apps:
+                stream = self._stream(app_name)
+                if sid not in stream.subscribers:
+                    stream.subscribers.add(sid)
+                    joined.append(app_name)
+                # 新订阅从当前批次开始计算未确认数
+                acked[app_name] = stream.seq
+            lagging = self._lagging.get(sid, {})
+            for app_name in list(lagging):
+                if app_name in apps or app_name in left:
+                    del lagging[app_name]
+        for app_name in left:
+            self._leave_room(sid, console_room(app_name))
+        for app_name in joined:
+            self._enter_room(sid, console_room(app_name))
+        return apps
+
+    def ack(self, sid: str, app_name: str, seq: int) -> None:
+        """客户端确认已处理到 seq 批次，被暂停的客户端确认完暂停前收到的批次后恢复推送"""
+        resume = None
+        with self._lock:
+            stream = self._streams.get(app_name)
+            if stream is None or sid not in stream.subscribers:
+                return
+            acked = self._acked.setdefault(sid, {})
+            acked[app_name] = max(acked.get(app_name, 0), int(seq))
+            paused = self._lagging.get(sid, {}).get(app_name)
+            if paused is not None and acked[app_name] >= paused[0]:
+                resume = self._resume_locked(sid, app_name, stream)
+        if resume is not None:
+            self._send_resume(sid, resume)
+
+    def _resume_locked(self, sid: str, app_name: str, stream: _AppStream) -> Dict[str, Any]:
+        """解除暂停（持有 _lock 时调用），返回要发给客户端的 console_gap"""
+        self._lagging[sid].pop(app_name, None)
+        self._acked.setdefault(sid, {})[app_name] = stream.seq
+        return {'app': app_name, 'next_offset': stream.first_offset, 'seq': stream.seq}
+
+    def _send_resume(self, sid: str, resume: Dict[str, Any]) -> None:
+        self._enter_room(sid, console_room(resume['app']))
+        # 前端收到后通过 /api/output?since_offset= 补齐暂停期间的输出
+        self._emit('console_gap', resume, sid)
+
+    def resume_stale(self) -> int:
+        """恢复暂停超过 lag_resume_seconds 仍未确认的客户端（回执丢失或前端已丢弃积压），返回恢复的数量"""
+        now = time.monotonic()
+        resumes = []
+        with self._lock:
+            for sid, paused_apps in self._lagging.items():
+                for app_name, (_, paused_at) in list(paused_apps.items()):
+                    stream = self._streams.get(app_name)
+                    if stream is None or sid not in stream.subscribers:
+                        paused_apps.pop(app_name, None)
+                    elif now - paused_at >= self.lag_resume_seconds:
+                        resumes.append((sid, self._resume_locked(sid, app_name, stream)))
+        for sid, resume in resumes:
+            self._send_resume(sid, resume)
+        return len(resumes)
+
+    def disconnect(self, sid: str) -> None:
+        """客户端断开时清理订阅状态"""
+        with self._lock:
+            for stream in self._streams.values():
+                stream.subscribers.discard(sid)
+            self._acked.pop(sid, None)
+            self._lagging.pop(sid, None)
+
+    def _flush_loop(self) -> None:
+        while self._running:
+            self._sleep(self.interval)
+            try:
+                self.flush()
+                self.resume_stale()
+            except Exception as e:
+                logger.exception(f"控制台输出推送失败: {e}")
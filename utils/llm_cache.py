@@ -0,0 +1,265 @@
+"""
+LLM响应缓存工具模块
+以"模型 + 系统提示词 + 规范化用户提示词 + 采样参数"的哈希为键缓存LLM响应。
+LLMClient 会在用户提示词前加上精确到分钟的时间前缀，生成缓存键时按配置的粒度
+（默认按天）规范化该前缀，使同一天内重复的规划类调用可以直接复用结果。
+内存层为带TTL的有界LRU，磁盘层为SQLite，可在多个进程、多次研究会话之间复用。
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from loguru import logger
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+# INFO：LLM响应缓存默认关闭，设置环境变量 LLM_CACHE_ENABLED=true 开启
+LLM_CACHE_ENABLED = _env_flag("LLM_CACHE_ENABLED", False)
+
+# 缓存有效期（秒），默认一天
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "86400"))
+
+# 时间前缀的规范化粒度：day / hour / minute（minute 即不规范化）
+LLM_CACHE_TIME_RESOLUTION = os.getenv("LLM_CACHE_TIME_RESOLUTION", "day")
+
+# 内存LRU最大条目数
+LLM_CACHE_MEMORY_SIZE = int(os.getenv("LLM_CACHE_MEMORY_SIZE", "512"))
+
+# 磁盘缓存文件路径（跨进程、跨研究会话共享）
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH") or os.path.join(project_root, "cache", "llm_cache.sqlite3")
+
+# LLMClient 写入的时间前缀，格式: 今天的实际时间是2025年01月02日13时45分
+TIME_PREFIX_PATTERN = re.compile(r"今天的实际时间是(\d{4})年(\d{1,2})月(\d{1,2})日(\d{1,2})时(\d{1,2})分")
+
+
+def normalize_time_prefix(prompt: str, resolution: str = LLM_CACHE_TIME_RESOLUTION) -> str:
+    """
+    按粒度规范化提示词中的时间前缀
+
+    Args:
+        prompt: 用户提示词
+        resolution: day / hour / minute
+
+    Returns:
+        规范化后的提示词
+    """
+    if resolution == "minute":
+        return prompt
+
+    def replace(match: "re.Match[str]") -> str:
+        year, month, day, hour, _ = match.groups()
+        if resolution == "hour":
+            return f"今天的实际时间是{year}年{month}月{day}日{hour}时"
+        return f"今天的实际时间是{year}年{month}月{day}日"
+
+    return TIME_PREFIX_PATTERN.sub(replace, prompt, count=1)
+
+
+class LLMResponseCache:
+    """
+    两级LLM响应缓存（内存LRU + SQLite），条目超过TTL后失效
+    线程安全，可被同一进程内的多个LLMClient共享
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str],
+        memory_size: int = 512,
+        ttl: float = 86400,
+        time_resolution: str = "day"
+    ):
+        """
+        初始化缓存
+
+        Args:
+            db_path: SQLite缓存文件路径，为None时仅使用内存缓存
+            memory_size: 内存LRU最大条目数
+            ttl: 条目有效期（秒）
+            time_resolution: 时间前缀规范化粒度
+        """
+        self.db_path = db_path
+        self.memory_size = max(0, int(memory_size))
+        self.ttl = float(ttl)
+        self.time_resolution = time_resolution
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if db_path:
+            try:
+                self._conn = self._open_database(db_path)
+            except sqlite3.Error as e:
+                logger.warning(f"LLM响应磁盘缓存不可用，仅使用内存缓存: {e}")
+                self._conn = None
+
+    @staticmethod
+    def _open_database(db_path: str) -> sqlite3.Connection:
+        """打开（必要时创建）SQLite缓存库"""
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_response_cache (
+                cache_key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        conn.commit()
+        return conn
+
+    def make_key(
+        self,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        params: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """根据模型、提示词（时间前缀已规范化）和采样参数生成缓存键"""
+        digest = hashlib.sha256()
+        for part in (
+            model,
+            system_prompt or "",
+            normalize_time_prefix(user_prompt or "", self.time_resolution),
+            json.dumps(params or {}, sort_keys=True, ensure_ascii=False),
+        ):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _remember(self, key: str, response: str, created_at: float) -> None:
+        """写入内存LRU（调用方需持有锁）"""
+        if self.memory_size <= 0:
+            return
+        self._memory[key] = (response, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        """查询缓存，未命中或已过期时返回None"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                response, created_at = entry
+                if now - created_at < self.ttl:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return response
+                del self._memory[key]
+
+            if self._conn is not None:
+                try:
+                    row = self._conn.execute(
+                        "SELECT response, created_at FROM llm_response_cache WHERE cache_key = ?",
+                        (key,)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    logger.warning(f"读取LLM响应磁盘缓存失败: {e}")
+                    row = None
+                if row is not None and now - row[1] < self.ttl:
+                    self._remember(key, row[0], row[1])
+                    self.disk_hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, model: str, response: str) -> None:
+        """写入缓存"""
+        if not response:
+            return
+        now = time.time()
+        with self._lock:
+            self._remember(key, response, now)
+            if self._conn is not None:
+                try:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO llm_response_cache (cache_key, model, response, created_at) "
+                        "VALUES (?, ?, ?, ?)",
+                        (key, model, response, now)
+                    )
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"写入LLM响应磁盘缓存失败: {e}")
+
+    def purge_expired(self) -> int:
+        """删除磁盘上已过期的条目，返回删除条数"""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            for key in [key for key, (_, created_at) in self._memory.items() if created_at <= cutoff]:
+                del self._memory[key]
+            if self._conn is None:
+                return 0
+            cursor = self._conn.execute("DELETE FROM llm_response_cache WHERE created_at <= ?", (cutoff,))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def clear(self) -> None:
+        """清空内存和磁盘缓存"""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM llm_response_cache")
+                self._conn.commit()
+
+    def get_stats(self) -> Dict[str, float]:
+        """获取命中统计"""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
+
+
+_llm_cache: Optional[LLMResponseCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """获取进程内共享的LLM响应缓存，未开启时返回None"""
+    global _llm_cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                _llm_cache = LLMResponseCache(
+                    LLM_CACHE_PATH,
+                    memory_size=LLM_CACHE_MEMORY_SIZE,
+                    ttl=LLM_CACHE_TTL,
+                    time_resolution=LLM_CACHE_TIME_RESOLUTION
+                )
+                purged = _llm_cache.purge_expired()
+                logger.info(f"LLM响应缓存已开启（TTL {LLM_CACHE_TTL:.0f}秒，已清理过期条目 {purged} 条）")
+    return _llm_cache
@@ -0,0 +1,69 @@
+"""
+LLM流式输出工具模块
+把流式返回的增量文本按行聚合后写入日志：各引擎日志经 app.py 转发到 Socket.IO 控制台，
+ForumEngine 也可以在总结生成过程中读取到已生成的内容
+"""
+
+import itertools
+import re
+import time
+from typing import Callable, Optional
+
+from loguru import logger
+
+# 流式输出日志行的标记，格式: [节点名#流编号] 流式输出: 文本
+STREAM_LOG_MARKER = "流式输出"
+STREAM_LOG_PATTERN = re.compile(rf"\[([^\[\]]+#\d+)\] {STREAM_LOG_MARKER}: ?(.*)$")
+
+_stream_ids = itertools.count(1)
+
+
+class StreamLogForwarder:
+    """按行聚合流式增量文本并写入日志"""
+
+    def __init__(
+        self,
+        label: str,
+        sink: Optional[Callable[[str], None]] = None,
+        max_chars: int = 80,
+        max_interval: float = 0.5
+    ):
+        """
+        初始化流式日志转发器
+
+        Args:
+            label: 日志标签（一般为节点名），会附加流编号以区分并发的多个流
+            sink: 日志写入函数，默认 logger.info
+            max_chars: 未遇到换行时累计多少字符强制输出一行
+            max_interval: 未遇到换行时距上次输出多少秒强制输出一行
+        """
+        self.label = f"{label}#{next(_stream_ids)}"
+        self.sink = sink or logger.info
+        self.max_chars = max_chars
+        self.max_interval = max_interval
+        self._pending = ""
+        self._last_emit = time.monotonic()
+
+    def feed(self, delta: str):
+        """写入一段增量文本"""
+        self._pending += delta
+        while "\n" in self._pending:
+            line, self._pending = self._pending.split("\n", 1)
+            self._emit(line)
+        if self._pending and (
+            len(self._pending) >= self.max_chars
+            or time.monotonic() - self._last_emit >= self.max_interval
+        ):
+            self._emit(self._pending)
+            self._pending = ""
+
+    def close(self):
+        """输出剩余的文本"""
+        if self._pending:
+            self._emit(self._pending)
+            self._pending = ""
+
+    def _emit(self, text: str):
+        self._last_emit = time.monotonic()
+        if text.strip():
+            self.sink(f"[{self.label}] {STREAM_LOG_MARKER}: {text}")
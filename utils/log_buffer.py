@@ -0,0 +1,175 @@
+"""
+控制台日志缓冲工具模块
+- LogRingBuffer: 每个应用一份的内存环形缓冲，行号（offset）单调递增，前端按 since_offset 增量拉取
+- BufferedLogWriter: 常驻文件句柄的缓冲写入器，按时间间隔或行数批量刷盘，而不是每行打开/关闭一次文件
+"""
+
+import os
+import threading
+from collections import deque
+from itertools import islice
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+# 每个应用在内存中保留的最大行数
+CONSOLE_BUFFER_LINES = int(os.getenv("CONSOLE_BUFFER_LINES", "5000"))
+
+# 日志文件刷盘间隔（秒）与缓冲行数上限
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "0.5"))
+LOG_FLUSH_MAX_LINES = int(os.getenv("LOG_FLUSH_MAX_LINES", "200"))
+
+
+class LogRingBuffer:
+    """
+    有界的日志行缓冲（线程安全）
+
+    每行的 offset 为其自创建/清空以来的序号；超出容量时丢弃最早的行，
+    读取方传入的 offset 早于缓冲起点时从起点返回并标记 truncated。
+    """
+
+    def __init__(self, capacity: int = CONSOLE_BUFFER_LINES):
+        self.capacity = max(1, int(capacity))
+        self._lines: "deque[str]" = deque(maxlen=self.capacity)
+        self._next_offset = 0
+        self._lock = threading.Lock()
+
+    def append(self, line: str) -> int:
+        """追加一行，返回该行的offset"""
+        with self._lock:
+            self._lines.append(line)
+            offset = self._next_offset
+            self._next_offset += 1
+            return offset
+
+    def extend(self, lines: List[str]) -> int:
+        """追加多行，返回第一行的offset"""
+        with self._lock:
+            self._lines.extend(lines)
+            offset = self._next_offset
+            self._next_offset += len(lines)
+            return offset
+
+    def clear(self) -> None:
+        """清空缓冲，offset 从0重新开始"""
+        with self._lock:
+            self._lines.clear()
+            self._next_offset = 0
+
+    @property
+    def next_offset(self) -> int:
+        with self._lock:
+            return self._next_offset
+
+    def read_since(self, offset: Optional[int] = None, limit: Optional[int] = None) -> Dict[str, object]:
+        """
+        读取 offset 之后的新行
+
+        Args:
+            offset: 上次返回的 next_offset，None 表示从缓冲起点读取
+            limit: 最多返回的行数，None 表示不限
+
+        Returns:
+            {'lines', 'offset'（首行offset）, 'next_offset', 'total_lines', 'truncated', 'reset'}
+        """
+        with self._lock:
+            first_offset = self._next_offset - len(self._lines)
+            reset = False
+            if offset is None or offset < 0:
+                offset = first_offset
+            elif offset > self._next_offset:
+                # 缓冲已被清空（应用重启），调用方的offset失效，从头读取
+                offset = first_offset
+                reset = True
+            truncated = offset < first_offset
+            start = max(offset, first_offset)
+            end = self._next_offset
+            if limit is not None and limit > 0:
+                end = min(end, start + limit)
+            index = start - first_offset
+            lines = list(islice(self._lines, index, index + (end - start)))
+            return {
+                'lines': lines,
+                'offset': start,
+                'next_offset': end,
+                'total_lines': self._next_offset,
+                'truncated': truncated,
+                'reset': reset,
+            }
+
+
+class BufferedLogWriter:
+    """
+    缓冲日志写入器（线程安全）
+
+    文件句柄常驻，写入先进入内存缓冲，由后台线程每 flush_interval 秒刷盘一次，
+    缓冲行数达到 max_lines 时立即刷盘。
+    """
+
+    def __init__(self, path, flush_interval: float = LOG_FLUSH_INTERVAL, max_lines: int = LOG_FLUSH_MAX_LINES):
+        self.path = str(path)
+        self.flush_interval = max(0.05, float(flush_interval))
+        self.max_lines = max(1, int(max_lines))
+        self._pending: List[str] = []
+        self._file = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._flush_loop, name=f"log-writer-{os.path.basename(self.path)}", daemon=True)
+        self._thread.start()
+
+    def write(self, line: str) -> None:
+        """写入一行（不含换行符）"""
+        with self._lock:
+            self._pending.append(line)
+            if len(self._pending) >= self.max_lines:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        """立即把缓冲写入文件"""
+        with self._lock:
+            self._flush_locked()
+
+    def truncate(self) -> None:
+        """丢弃缓冲并清空日志文件"""
+        with self._lock:
+            self._pending.clear()
+            self._close_locked()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def close(self) -> None:
+        """刷盘并关闭文件"""
+        self._stopped.set()
+        with self._lock:
+            self._flush_locked()
+            self._close_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._pending:
+            return
+        try:
+            if self._file is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write("\n".join(self._pending) + "\n")
+            self._file.flush()
+        except OSError as e:
+            logger.error(f"写入日志文件失败 {self.path}: {e}")
+            self._close_locked()
+        finally:
+            self._pending.clear()
+
+    def _close_locked(self) -> None:
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+    def _flush_loop(self) -> None:
+        while not self._stopped.wait(self.flush_interval):
+            self.flush()
+
@@ -0,0 +1,110 @@
+"""
+段落并发调度工具模块
+报告结构生成后各段落的搜索、总结与反思互不依赖，按有界并发度并行处理；
+遇到API限流时自动收缩并发度，限流解除后逐步恢复
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Optional
+
+from loguru import logger
+
+from retry_helper import LLM_RETRY_CONFIG, RateLimitCooldown
+
+
+class ParagraphScheduler:
+    """有界并发的段落调度器"""
+
+    def __init__(self, max_workers: int, cooldown: Optional[RateLimitCooldown] = None):
+        """
+        初始化段落调度器
+
+        Args:
+            max_workers: 同时处理的段落数上限，1 表示按顺序逐段处理
+            cooldown: 监听的限流冷却窗口，默认使用 LLM 调用共享的冷却窗口
+        """
+        self.max_workers = max(1, int(max_workers))
+        self.cooldown = cooldown if cooldown is not None else LLM_RETRY_CONFIG.cooldown
+        self._condition = threading.Condition()
+        self._limit = self.max_workers
+        self._running = 0
+        self._seen_hits = 0
+        self._aborted = False
+
+    def run(
+        self,
+        total: int,
+        task: Callable[[int], None],
+        on_complete: Optional[Callable[[int, int], None]] = None
+    ):
+        """
+        处理所有段落，任一段落失败时取消尚未开始的段落并抛出该异常
+
+        Args:
+            total: 段落数量
+            task: 处理单个段落的函数，参数为段落索引
+            on_complete: 段落完成回调，参数为(段落索引, 已完成段落数)，始终在调用线程中执行
+        """
+        if self.max_workers == 1 or total <= 1:
+            for index in range(total):
+                task(index)
+                if on_complete:
+                    on_complete(index, index + 1)
+            return
+
+        self._aborted = False
+        self._seen_hits = self.cooldown.hits if self.cooldown else 0
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.max_workers, total),
+            thread_name_prefix="paragraph"
+        )
+        futures = {executor.submit(self._run_task, task, index): index for index in range(total)}
+        try:
+            completed = 0
+            for future in as_completed(futures):
+                future.result()
+                completed += 1
+                if on_complete:
+                    on_complete(futures[future], completed)
+        except BaseException:
+            with self._condition:
+                self._aborted = True
+                self._condition.notify_all()
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        executor.shutdown()
+
+    def _run_task(self, task: Callable[[int], None], index: int):
+        if not self._acquire_slot():
+            return
+        try:
+            if self.cooldown is not None:
+                self.cooldown.wait()
+            task(index)
+        finally:
+            self._release_slot()
+
+    def _acquire_slot(self) -> bool:
+        with self._condition:
+            while self._running >= self._limit and not self._aborted:
+                self._condition.wait()
+            if self._aborted:
+                return False
+            self._running += 1
+            return True
+
+    def _release_slot(self):
+        with self._condition:
+            self._running -= 1
+            hits = self.cooldown.hits if self.cooldown else 0
+            if hits > self._seen_hits:
+                # 段落执行期间出现新的限流：并发度减半
+                self._seen_hits = hits
+                if self._limit > 1:
+                    self._limit = max(1, self._limit // 2)
+                    logger.warning(f"检测到API限流，段落并发度降为 {self._limit}")
+            elif self._limit < self.max_workers:
+                # 没有新的限流：并发度逐个恢复
+                self._limit += 1
+            self._condition.notify_all()
@@ -0,0 +1,117 @@
+"""
+引擎报告清单工具模块
+各引擎保存报告后把条目写入输出目录下的 report_manifest.json（临时文件 + os.replace 原子替换），
+ReportEngine 只需读取三个清单文件即可按查询ID O(1) 找到对应报告，不必扫描整个报告目录。
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+try:
+    import fcntl  # 仅POSIX可用，用于多进程写同一清单时互斥
+except ImportError:
+    fcntl = None
+
+MANIFEST_FILENAME = "report_manifest.json"
+
+# 清单中按查询保留的最大条目数，超出时淘汰最早保存的查询
+MANIFEST_MAX_QUERIES = int(os.getenv("REPORT_MANIFEST_MAX_QUERIES", "5000"))
+
+_write_lock = threading.Lock()
+
+
+def make_query_id(query: str) -> str:
+    """根据规范化后的查询文本生成查询ID，三个引擎对同一查询得到相同的ID"""
+    normalized = re.sub(r"\s+", " ", str(query or "")).strip().lower()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def manifest_path(output_dir: str) -> str:
+    """输出目录对应的清单文件路径"""
+    return os.path.join(output_dir, MANIFEST_FILENAME)
+
+
+def load_manifest(output_dir: str) -> Dict[str, Any]:
+    """读取清单，不存在或损坏时返回空清单"""
+    path = manifest_path(output_dir)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict) and isinstance(data.get("by_query"), dict):
+            return data
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        logger.warning(f"读取报告清单失败，按空清单处理: {path}: {e}")
+    return {"version": 1, "latest": None, "by_query": {}}
+
+
+def _write_atomic(path: str, data: Dict[str, Any]) -> None:
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(prefix=".manifest_", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def record_report(output_dir: str, engine: str, query: str, report_path: str) -> Optional[Dict[str, Any]]:
+    """
+    把刚保存的报告登记到输出目录的清单中
+
+    Args:
+        output_dir: 引擎报告输出目录
+        engine: 引擎名（query / media / insight）
+        query: 研究查询
+        report_path: 报告文件路径
+
+    Returns:
+        写入的清单条目，失败时返回None（不影响报告本身的保存）
+    """
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        entry = {
+            "engine": engine,
+            "query": query,
+            "query_id": make_query_id(query),
+            "path": os.path.abspath(report_path),
+            "size": os.path.getsize(report_path),
+            "saved_at": datetime.now().isoformat(),
+        }
+        with _write_lock:
+            lock_file = None
+            if fcntl is not None:
+                lock_file = open(manifest_path(output_dir) + ".lock", "w")
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                manifest = load_manifest(output_dir)
+                by_query = manifest["by_query"]
+                # 重新插入到末尾，字典顺序即保存顺序
+                by_query.pop(entry["query_id"], None)
+                by_query[entry["query_id"]] = entry
+                while len(by_query) > MANIFEST_MAX_QUERIES:
+                    by_query.pop(next(iter(by_query)))
+                manifest["latest"] = entry
+                _write_atomic(manifest_path(output_dir), manifest)
+            finally:
+                if lock_file is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                    lock_file.close()
+        return entry
+    except Exception as e:
+        logger.exception(f"登记报告清单失败: {e}")
+        return None
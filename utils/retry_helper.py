@@ -3,12 +3,65 @@
 提供通用的网络请求重试功能，增强系统健壮性
 """
 
+import asyncio
+import threading
 import time
 from functools import wraps
-from typing import Callable, Any
+from typing import Callable, Any, Optional
 import requests
 from loguru import logger
 
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """判断异常是否为服务端限流（HTTP 429 / rate limit）"""
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    if status_code == 429:
+        return True
+    message = str(error).lower()
+    return "rate limit" in message or "too many requests" in message or "error code: 429" in message
+
+
+class RateLimitCooldown:
+    """
+    进程内共享的限流冷却窗口
+
+    任一线程遇到限流错误后设置冷却截止时间，其他线程在发起下一次请求前等待到截止时间，
+    避免多个并发段落在限流期间继续打满同一个API。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._until = 0.0
+        self._hits = 0
+
+    @property
+    def hits(self) -> int:
+        """累计触发限流的次数"""
+        return self._hits
+
+    def trigger(self, delay: float):
+        """记录一次限流，冷却窗口延长到 delay 秒之后"""
+        with self._lock:
+            self._hits += 1
+            self._until = max(self._until, time.monotonic() + delay)
+
+    def wait(self):
+        """冷却期内阻塞到冷却结束"""
+        remaining = self._until - time.monotonic()
+        if remaining > 0:
+            logger.info(f"API限流冷却中，等待 {remaining:.1f} 秒后继续请求")
+            time.sleep(remaining)
+
+    async def wait_async(self):
+        """冷却期内异步等待到冷却结束（不占用线程）"""
+        remaining = self._until - time.monotonic()
+        if remaining > 0:
+            logger.info(f"API限流冷却中，等待 {remaining:.1f} 秒后继续请求")
+            await asyncio.sleep(remaining)
+
+
 # 配置日志
 class RetryConfig:
     """重试配置类"""
@@ -19,7 +72,8 @@ class RetryConfig:
         initial_delay: float = 1.0,
         backoff_factor: float = 2.0,
         max_delay: float = 60.0,
-        retry_on_exceptions: tuple = None
+        retry_on_exceptions: tuple = None,
+        cooldown: Optional[RateLimitCooldown] = None
     ):
         """
         初始化重试配置
@@ -30,11 +84,13 @@ class RetryConfig:
             backoff_factor: 退避因子（每次重试延迟翻倍）
             max_delay: 最大延迟秒数
             retry_on_exceptions: 需要重试的异常类型元组
+            cooldown: 共享的限流冷却窗口，遇到限流错误时让同一配置下的所有调用一起退避
         """
         self.max_retries = max_retries
         self.initial_delay = initial_delay
         self.backoff_factor = backoff_factor
         self.max_delay = max_delay
+        self.cooldown = cooldown
         
         # 默认需要重试的异常类型
         if retry_on_exceptions is None:
@@ -73,6 +129,8 @@ def with_retry(config: RetryConfig = None):
             last_exception = None
             
             for attempt in range(config.max_retries + 1):  # +1 因为第一次不算重试
+                if config.cooldown is not None:
+                    config.cooldown.wait()
                 try:
                     result = func(*args, **kwargs)
                     if attempt > 0:
@@ -97,6 +155,8 @@ def with_retry(config: RetryConfig = None):
                     logger.warning(f"函数 {func.__name__} 第 {attempt + 1} 次尝试失败: {str(e)}")
                     logger.info(f"将在 {delay:.1f} 秒后进行第 {attempt + 2} 次尝试...")
                     
+                    if config.cooldown is not None and is_rate_limit_error(e):
+                        config.cooldown.trigger(delay)
                     time.sleep(delay)
                 
                 except Exception as e:
@@ -198,6 +258,70 @@ def with_graceful_retry(config: RetryConfig = None, default_return=None):
         return wrapper
     return decorator
 
+def with_async_graceful_retry(config: RetryConfig = None, default_return=None):
+    """
+    异步优雅重试装饰器 - with_graceful_retry 的协程版本
+    退避期间使用 asyncio.sleep 让出 event loop，同一 loop 上的其他请求可以继续进行；
+    失败后不会抛出异常，而是返回默认值
+    
+    Args:
+        config: 重试配置，如果不提供则使用默认配置
+        default_return: 所有重试失败后返回的默认值
+    
+    Returns:
+        装饰器函数
+    """
+    if config is None:
+        config = SEARCH_API_RETRY_CONFIG
+    
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        async def wrapper(*args, **kwargs) -> Any:
+            for attempt in range(config.max_retries + 1):  # +1 因为第一次不算重试
+                if config.cooldown is not None:
+                    await config.cooldown.wait_async()
+                try:
+                    result = await func(*args, **kwargs)
+                    if attempt > 0:
+                        logger.info(f"非关键API {func.__name__} 在第 {attempt + 1} 次尝试后成功")
+                    return result
+                    
+                except asyncio.CancelledError:
+                    raise
+                    
+                except config.retry_on_exceptions as e:
+                    if attempt == config.max_retries:
+                        # 最后一次尝试也失败了，返回默认值而不抛出异常
+                        logger.warning(f"非关键API {func.__name__} 在 {config.max_retries + 1} 次尝试后仍然失败")
+                        logger.warning(f"最终错误: {str(e)}")
+                        logger.info(f"返回默认值以保证系统继续运行: {default_return}")
+                        return default_return
+                    
+                    # 计算延迟时间
+                    delay = min(
+                        config.initial_delay * (config.backoff_factor ** attempt),
+                        config.max_delay
+                    )
+                    
+                    logger.warning(f"非关键API {func.__name__} 第 {attempt + 1} 次尝试失败: {str(e)}")
+                    logger.info(f"将在 {delay:.1f} 秒后进行第 {attempt + 2} 次尝试...")
+                    
+                    if config.cooldown is not None and is_rate_limit_error(e):
+                        config.cooldown.trigger(delay)
+                    await asyncio.sleep(delay)
+                
+                except Exception as e:
+                    # 不在重试列表中的异常，返回默认值
+                    logger.warning(f"非关键API {func.__name__} 遇到不可重试的异常: {str(e)}")
+                    logger.info(f"返回默认值以保证系统继续运行: {default_return}")
+                    return default_return
+            
+            # 这里不应该到达，但作为安全网
+            return default_return
+            
+        return wrapper
+    return decorator
+
 def make_retryable_request(
     request_func: Callable,
     *args,
@@ -229,7 +353,8 @@ LLM_RETRY_CONFIG = RetryConfig(
     max_retries=6,        # 保持额外重试次数
     initial_delay=60.0,   # 首次等待至少 1 分钟
     backoff_factor=2.0,   # 继续使用指数退避
-    max_delay=600.0       # 单次等待最长 10 分钟
+    max_delay=600.0,      # 单次等待最长 10 分钟
+    cooldown=RateLimitCooldown()  # 并发段落共享限流退避
 )
 
 SEARCH_API_RETRY_CONFIG = RetryConfig(
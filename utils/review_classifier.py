@@ -0,0 +1,529 @@
+"""
+百果园舆情批量分类工具模块
+- 进程内共享一个带连接池的 OpenAI 客户端，不再每条信息新建一次
+- 多条信息打包进一个提示词，要求模型返回JSON数组；缺失或格式错误的条目单独补发一次请求，仍失败时给出默认结果
+- 各批次按有界并发度并行请求，遇到限流时共享冷却窗口并自动收缩并发度
+- 以"标题 + 正文"的内容哈希缓存分类结果，重复爬到的帖子不再重新分类
+- 未配置API密钥时使用本地多语言情感模型判断情感，分类按关键词规则判断；模型不可用时只按关键词分类
+"""
+
+import hashlib
+import importlib
+import json
+import os
+import re
+import sys
+import threading
+import types
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from loguru import logger
+
+utils_dir = os.path.dirname(os.path.abspath(__file__))
+if utils_dir not in sys.path:
+    sys.path.append(utils_dir)
+
+from paragraph_scheduler import ParagraphScheduler
+from retry_helper import RateLimitCooldown, RetryConfig, with_retry
+
+# 每个提示词打包的信息条数
+REVIEW_CLASSIFY_BATCH_ITEMS = int(os.getenv("REVIEW_CLASSIFY_BATCH_ITEMS", "10"))
+
+# 同时进行的分类请求数
+REVIEW_CLASSIFY_CONCURRENCY = int(os.getenv("REVIEW_CLASSIFY_CONCURRENCY", "4"))
+
+# 打包进提示词时每条正文保留的最大字符数
+REVIEW_CLASSIFY_MAX_CHARS = int(os.getenv("REVIEW_CLASSIFY_MAX_CHARS", "800"))
+
+REVIEW_CLASSIFY_MODEL = os.getenv("REVIEW_CLASSIFY_MODEL", "deepseek-chat")
+REVIEW_CLASSIFY_BASE_URL = os.getenv("REVIEW_CLASSIFY_BASE_URL", "https://api.deepseek.com")
+
+SENTIMENTS = ("positive", "neutral", "negative")
+CATEGORIES = ("价格问题", "商品问题", "服务问题", "会员问题", "安全问题", "其他问题")
+DEFAULT_CATEGORY = "其他问题"
+
+# 分类失败时返回的默认结果（不写入缓存，下次仍会重新分类）
+DEFAULT_RESULT = {"sentiment": "neutral", "sentiment_score": 0.0, "category": DEFAULT_CATEGORY}
+
+# 提示词或输出格式变化时修改版本号，使旧缓存失效
+PROMPT_VERSION = "v1"
+
+SYSTEM_PROMPT = "你是一个专业的舆情分析助手，专门分析百果园品牌相关的用户反馈。"
+
+SINGLE_PROMPT = """
+请分析以下关于百果园的信息，返回JSON格式：
+
+标题：{title}
+内容：{content}
+
+请返回：
+1. sentiment: 情感（positive/neutral/negative）
+2. sentiment_score: 情感分数（-1到1之间，负数表示负面）
+3. category: 分类（价格问题/商品问题/服务问题/会员问题/安全问题/其他问题）
+
+只返回JSON，不要其他内容。格式：
+{{"sentiment": "...", "sentiment_score": 0.0, "category": "..."}}
+"""
+
+BATCH_PROMPT = """
+请逐条分析以下{count}条关于百果园的信息：
+
+{items}
+
+对每条信息返回：
+1. id: 信息编号（与上面的编号一致）
+2. sentiment: 情感（positive/neutral/negative）
+3. sentiment_score: 情感分数（-1到1之间，负数表示负面）
+4. category: 分类（价格问题/商品问题/服务问题/会员问题/安全问题/其他问题）
+
+只返回一个JSON数组，按编号顺序包含全部{count}条，不要其他内容。格式：
+[{{"id": 0, "sentiment": "...", "sentiment_score": 0.0, "category": "..."}}]
+"""
+
+# 本地模型路径下的分类关键词（按顺序匹配，安全问题优先）
+CATEGORY_KEYWORDS = (
+    ("安全问题", ("食品安全", "农药", "拉肚子", "腹泻", "中毒", "过期", "发霉", "霉变", "虫")),
+    ("价格问题", ("贵", "价格", "刺客", "吃不起", "涨价", "性价比", "割韭菜", "称重", "缺斤短两")),
+    ("会员问题", ("会员", "积分", "储值", "充值", "优惠券", "退卡")),
+    ("商品问题", ("不新鲜", "坏果", "烂", "变质", "不甜", "难吃", "品质", "质量", "个头")),
+    ("服务问题", ("服务", "态度", "店员", "客服", "配送", "退款", "售后", "投诉")),
+)
+
+# 本地情感模型所在目录，直接按文件加载，不执行 InsightEngine 包的 __init__（其中会初始化需要API密钥的组件）
+INSIGHT_TOOLS_DIR = os.path.join(os.path.dirname(utils_dir), "InsightEngine", "tools")
+_INSIGHT_TOOLS_PACKAGE = "_review_insight_tools"
+
+# 本地5级情感标签对应的情感分数
+LOCAL_LABEL_SCORES = {"非常负面": -1.0, "负面": -0.5, "中性": 0.0, "正面": 0.5, "非常正面": 1.0}
+
+try:
+    import openai
+    _OPENAI_RETRYABLE_ERRORS = (openai.APIConnectionError, openai.APITimeoutError, openai.RateLimitError)
+except ImportError:
+    _OPENAI_RETRYABLE_ERRORS = ()
+
+# 只重试网络、超时和限流错误；鉴权失败、请求参数错误等重试也不会成功，直接失败
+CLASSIFY_RETRYABLE_ERRORS = (ConnectionError, TimeoutError) + _OPENAI_RETRYABLE_ERRORS
+
+# 分类请求的重试配置，限流冷却窗口由并发批次共享
+CLASSIFY_RETRY_CONFIG = RetryConfig(
+    max_retries=4,
+    initial_delay=5.0,
+    backoff_factor=2.0,
+    max_delay=120.0,
+    retry_on_exceptions=CLASSIFY_RETRYABLE_ERRORS,
+    cooldown=RateLimitCooldown()
+)
+
+# 批量结果缺失条目时逐条补发请求的重试配置，最多重试一次
+CLASSIFY_FALLBACK_RETRY_CONFIG = RetryConfig(
+    max_retries=1,
+    initial_delay=5.0,
+    retry_on_exceptions=CLASSIFY_RETRYABLE_ERRORS,
+    cooldown=CLASSIFY_RETRY_CONFIG.cooldown
+)
+
+
+def _load_sentiment_analyzer_module():
+    """从文件加载 InsightEngine/tools/sentiment_analyzer.py，其相对导入在同一目录下解析"""
+    if _INSIGHT_TOOLS_PACKAGE not in sys.modules:
+        package = types.ModuleType(_INSIGHT_TOOLS_PACKAGE)
+        package.__path__ = [INSIGHT_TOOLS_DIR]
+        sys.modules[_INSIGHT_TOOLS_PACKAGE] = package
+    return importlib.import_module(f"{_INSIGHT_TOOLS_PACKAGE}.sentiment_analyzer")
+
+
+def content_hash(title: str, content: str) -> str:
+    """标题 + 正文的内容哈希（去掉首尾和连续空白后计算）"""
+    normalized = re.sub(r"\s+", " ", f"{title or ''}\n{content or ''}").strip()
+    return hashlib.sha256(f"{PROMPT_VERSION}\n{normalized}".encode("utf-8")).hexdigest()
+
+
+def normalize_result(raw: Any) -> Optional[Dict[str, Any]]:
+    """校验并规范化模型返回的单条结果，无法识别时返回None"""
+    if not isinstance(raw, dict):
+        return None
+    sentiment = str(raw.get("sentiment", "")).strip().lower()
+    if sentiment not in SENTIMENTS:
+        return None
+    try:
+        score = float(raw.get("sentiment_score", 0.0))
+    except (TypeError, ValueError):
+        score = 0.0
+    category = str(raw.get("category", "")).strip()
+    return {
+        "sentiment": sentiment,
+        "sentiment_score": max(-1.0, min(1.0, score)),
+        "category": category if category in CATEGORIES else DEFAULT_CATEGORY,
+    }
+
+
+def _extract_json(text: str) -> Any:
+    """从模型输出中取出JSON（兼容```json代码块和前后的说明文字）"""
+    text = (text or "").strip()
+    fenced = re.search(r"```(?:json)?\s*(.*?)```", text, re.S)
+    if fenced:
+        text = fenced.group(1).strip()
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    start = min((i for i in (text.find("["), text.find("{")) if i >= 0), default=-1)
+    end = max(text.rfind("]"), text.rfind("}"))
+    if start < 0 or end <= start:
+        raise ValueError("模型输出中没有JSON")
+    return json.loads(text[start:end + 1])
+
+
+def parse_batch_response(text: str, count: int) -> Dict[int, Dict[str, Any]]:
+    """
+    解析批量分类的输出
+
+    Returns:
+        编号 -> 规范化结果，只包含能识别的条目
+    """
+    data = _extract_json(text)
+    if isinstance(data, dict):
+        data = data.get("results") or data.get("items") or [data]
+    results: Dict[int, Dict[str, Any]] = {}
+    if not isinstance(data, list):
+        return results
+    for position, raw in enumerate(data):
+        if not isinstance(raw, dict):
+            continue
+        try:
+            index = int(raw.get("id", position))
+        except (TypeError, ValueError):
+            index = position
+        result = normalize_result(raw)
+        if result is not None and 0 <= index < count and index not in results:
+            results[index] = result
+    return results
+
+
+def classify_by_keywords(title: str, content: str) -> str:
+    """按关键词判断分类"""
+    text = f"{title or ''} {content or ''}"
+    for category, keywords in CATEGORY_KEYWORDS:
+        if any(keyword in text for keyword in keywords):
+            return category
+    return DEFAULT_CATEGORY
+
+
+def get_api_key() -> Optional[str]:
+    return os.getenv("REVIEW_CLASSIFY_API_KEY") or os.getenv("INSIGHT_ENGINE_API_KEY") or os.getenv("DEEPSEEK_API_KEY")
+
+
+_shared_clients: Dict[Tuple[str, str], Any] = {}
+_shared_clients_lock = threading.Lock()
+
+
+def get_shared_client(api_key: str, base_url: str = REVIEW_CLASSIFY_BASE_URL):
+    """获取进程内共享的 OpenAI 客户端（httpx连接池大小与并发度匹配）"""
+    key = (api_key, base_url)
+    with _shared_clients_lock:
+        client = _shared_clients.get(key)
+        if client is None:
+            import httpx
+            from openai import OpenAI
+
+            pool_size = max(2, REVIEW_CLASSIFY_CONCURRENCY * 2)
+            client = OpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                http_client=httpx.Client(
+                    limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+                    timeout=httpx.Timeout(120.0, connect=10.0)
+                ),
+                max_retries=0  # 重试统一由 CLASSIFY_RETRY_CONFIG 处理，限流时共享冷却
+            )
+            _shared_clients[key] = client
+        return client
+
+
+class ReviewClassifier:
+    """舆情信息批量分类器（情感 + 问题分类）"""
+
+    def __init__(
+        self,
+        cache=None,
+        api_key: Optional[str] = None,
+        model: str = REVIEW_CLASSIFY_MODEL,
+        batch_items: int = REVIEW_CLASSIFY_BATCH_ITEMS,
+        concurrency: int = REVIEW_CLASSIFY_CONCURRENCY,
+        use_local_model: Optional[bool] = None,
+    ):
+        """
+        Args:
+            cache: 提供 get_cached_classifications / save_classifications 的对象（如 SentimentStore），None 表示不缓存
+            api_key: API密钥，默认读取环境变量
+            model: 模型名称
+            batch_items: 每个提示词打包的信息条数
+            concurrency: 同时进行的请求数
+            use_local_model: 是否使用本地模型，默认在没有API密钥时使用
+        """
+        self.cache = cache
+        self.api_key = api_key if api_key is not None else get_api_key()
+        self.model = model
+        self.batch_items = max(1, int(batch_items))
+        self.concurrency = max(1, int(concurrency))
+        self.use_local_model = (not self.api_key) if use_local_model is None else use_local_model
+        self.classifier_name = "local-sentiment+keywords" if self.use_local_model else f"{self.model}/{PROMPT_VERSION}"
+        self._local_analyzer = None
+        self._local_lock = threading.Lock()
+        self.stats = {
+            "cached": 0, "classified": 0, "keyword_only": 0, "requests": 0, "fallback_requests": 0, "failed": 0
+        }
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def classify(
+        self,
+        items: Sequence[Tuple[str, str]],
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        default: Optional[Dict[str, Any]] = DEFAULT_RESULT,
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        批量分类
+
+        Args:
+            items: (标题, 正文) 列表
+            on_progress: 进度回调，参数为(已完成批次数, 总批次数)
+            default: 分类失败的条目返回的结果，传None可区分失败的条目
+
+        Returns:
+            与输入顺序一致的分类结果列表
+        """
+        hashes = [content_hash(title, content) for title, content in items]
+        known: Dict[str, Dict[str, Any]] = {}
+        if self.cache is not None and hashes:
+            known = self.cache.get_cached_classifications(hashes)
+            self._count("cached", sum(1 for h in hashes if h in known))
+
+        # 同一批中内容相同的信息只分类一次
+        pending: Dict[str, Tuple[str, str]] = {}
+        for content_key, item in zip(hashes, items):
+            if content_key not in known and content_key not in pending:
+                pending[content_key] = item
+
+        if pending:
+            fresh, keyword_only = self._classify_pending(list(pending.items()), on_progress)
+            if self.cache is not None and fresh:
+                self.cache.save_classifications(fresh, self.classifier_name, datetime.now().isoformat())
+            known.update(fresh)
+            # 仅按关键词得到的结果不写入缓存，配置好模型或API后仍会重新分类
+            known.update(keyword_only)
+            self._count("classified", len(fresh) + len(keyword_only))
+
+        return [
+            dict(known[content_key]) if content_key in known else (dict(default) if default is not None else None)
+            for content_key in hashes
+        ]
+
+    def classify_one(self, title: str, content: str) -> Dict[str, Any]:
+        """分类单条信息"""
+        return self.classify([(title, content)])[0]
+
+    def _classify_pending(
+        self,
+        pending: List[Tuple[str, Tuple[str, str]]],
+        on_progress: Optional[Callable[[int, int], None]],
+    ) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+        """
+        分类未命中缓存的信息
+
+        Returns:
+            (可缓存的结果, 仅按关键词得到的结果)，均为 内容哈希 -> 结果，失败的条目不包含在内
+        """
+        if self.use_local_model:
+            results = self._classify_local(pending)
+            if on_progress:
+                on_progress(1, 1)
+            return results
+
+        chunks = [pending[i:i + self.batch_items] for i in range(0, len(pending), self.batch_items)]
+        results: Dict[str, Dict[str, Any]] = {}
+        results_lock = threading.Lock()
+
+        def task(index: int) -> None:
+            chunk_results = self._classify_chunk(chunks[index])
+            with results_lock:
+                results.update(chunk_results)
+
+        scheduler = ParagraphScheduler(self.concurrency, cooldown=CLASSIFY_RETRY_CONFIG.cooldown)
+        scheduler.run(
+            len(chunks),
+            task,
+            (lambda _index, done: on_progress(done, len(chunks))) if on_progress else None
+        )
+        return results, {}
+
+    @with_retry(CLASSIFY_RETRY_CONFIG)
+    def _chat(self, prompt: str) -> str:
+        return self._request(prompt)
+
+    @with_retry(CLASSIFY_FALLBACK_RETRY_CONFIG)
+    def _chat_fallback(self, prompt: str) -> str:
+        return self._request(prompt)
+
+    def _request(self, prompt: str) -> str:
+        self._count("requests")
+        response = get_shared_client(self.api_key).chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3
+        )
+        return response.choices[0].message.content or ""
+
+    def _classify_chunk(self, chunk: List[Tuple[str, Tuple[str, str]]]) -> Dict[str, Dict[str, Any]]:
+        """
+        一个提示词分类一批信息，返回结果中缺失或格式错误的条目单独补发；
+        请求本身失败（接口不可用、密钥错误等）时整批记为失败，不再逐条重发
+        """
+        if len(chunk) == 1:
+            content_key, (title, content) = chunk[0]
+            result = self._classify_single(title, content, fallback=False)
+            return {content_key: result} if result is not None else {}
+
+        items_text = "\n\n".join(
+            f"【{index}】\n标题：{title}\n内容：{(content or '')[:REVIEW_CLASSIFY_MAX_CHARS]}"
+            for index, (_, (title, content)) in enumerate(chunk)
+        )
+        try:
+            text = self._chat(BATCH_PROMPT.format(count=len(chunk), items=items_text))
+        except Exception as e:
+            logger.warning(f"批量分类请求失败，本批 {len(chunk)} 条暂不分类: {e}")
+            self._count("failed", len(chunk))
+            return {}
+        try:
+            parsed = parse_batch_response(text, len(chunk))
+        except Exception as e:
+            logger.warning(f"批量分类结果解析失败，改为逐条分类: {e}")
+            parsed = {}
+
+        results: Dict[str, Dict[str, Any]] = {}
+        for index, (content_key, (title, content)) in enumerate(chunk):
+            result = parsed.get(index)
+            if result is None:
+                result = self._classify_single(title, content)
+            if result is not None:
+                results[content_key] = result
+        return results
+
+    def _classify_single(self, title: str, content: str, fallback: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        单条分类，失败返回None
+
+        Args:
+            fallback: 是否为批量结果缺失后的补发请求（补发请求最多重试一次）
+        """
+        chat = self._chat_fallback if fallback else self._chat
+        if fallback:
+            self._count("fallback_requests")
+        try:
+            prompt = SINGLE_PROMPT.format(title=title, content=(content or "")[:REVIEW_CLASSIFY_MAX_CHARS * 2])
+            result = normalize_result(_extract_json(chat(prompt)))
+        except Exception as e:
+            logger.warning(f"AI分析错误: {e}")
+            result = None
+        if result is None:
+            self._count("failed")
+        return result
+
+    def _get_local_analyzer(self):
+        """延迟加载本地多语言情感模型，不可用时返回None"""
+        with self._local_lock:
+            if self._local_analyzer is None:
+                try:
+                    module = _load_sentiment_analyzer_module()
+                    analyzer = module.WeiboMultilingualSentimentAnalyzer(cache=False)
+                    if not analyzer.is_disabled and not analyzer.is_initialized:
+                        analyzer.initialize()
+                    self._local_analyzer = analyzer
+                except Exception as e:
+                    logger.warning(f"本地情感模型不可用，仅按关键词分类: {e}")
+                    self._local_analyzer = False
+            return self._local_analyzer or None
+
+    def _classify_local(
+        self, pending: List[Tuple[str, Tuple[str, str]]]
+    ) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+        """本地模型判断情感，关键词规则判断分类；模型不可用的条目情感记为中性"""
+        analyzer = self._get_local_analyzer()
+        texts = [f"{title} {content}".strip() for _, (title, content) in pending]
+        sentiments: List[Optional[Tuple[str, float]]] = [None] * len(pending)
+        if analyzer is not None and analyzer.is_initialized and not analyzer.is_disabled:
+            batch = analyzer.analyze_batch(texts, show_progress=False)
+            for index, result in enumerate(batch.results):
+                if result.success and result.analysis_performed and result.probability_distribution:
+                    score = sum(
+                        LOCAL_LABEL_SCORES.get(label, 0.0) * prob
+                        for label, prob in result.probability_distribution.items()
+                    )
+                    sentiments[index] = self._sentiment_from_score(score)
+
+        results: Dict[str, Dict[str, Any]] = {}
+        keyword_only: Dict[str, Dict[str, Any]] = {}
+        for (content_key, (title, content)), sentiment in zip(pending, sentiments):
+            category = classify_by_keywords(title, content)
+            if sentiment is None:
+                keyword_only[content_key] = dict(DEFAULT_RESULT, category=category)
+                continue
+            label, score = sentiment
+            results[content_key] = {
+                "sentiment": label,
+                "sentiment_score": round(score, 4),
+                "category": category,
+            }
+        self._count("keyword_only", len(keyword_only))
+        return results, keyword_only
+
+    @staticmethod
+    def _sentiment_from_score(score: float) -> Tuple[str, float]:
+        if score <= -0.2:
+            return "negative", score
+        if score >= 0.2:
+            return "positive", score
+        return "neutral", score
+
+
+def classify_pending_items(
+    store,
+    classifier: ReviewClassifier,
+    chunk_size: int = 200,
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """
+    分类数据库中尚未分类的信息并写回
+
+    Args:
+        store: SentimentStore
+        classifier: 分类器
+        chunk_size: 每次从数据库读取的条数
+        on_progress: 进度回调，参数为已写回的条数
+
+    Returns:
+        写回的条数
+    """
+    updated = 0
+    after_id = 0
+    while True:
+        rows = store.list_unclassified(limit=chunk_size, after_id=after_id)
+        if not rows:
+            break
+        after_id = rows[-1]["id"]
+        results = classifier.classify([(row["title"], row["content"]) for row in rows], default=None)
+        # 分类失败的条目保持未分类，下次再处理
+        updated += store.update_classifications(
+            (row["id"], result) for row, result in zip(rows, results) if result is not None
+        )
+        if on_progress:
+            on_progress(updated)
+    return updated
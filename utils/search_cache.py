@@ -0,0 +1,309 @@
+"""
+搜索响应缓存工具模块
+为 Tavily / Bocha 等付费搜索API缓存响应：以"规范化查询 + 工具参数"的哈希为键，
+按时效性使用不同TTL（24小时内的搜索较短，指定历史日期范围的搜索较长）。
+同一 event loop 上完全相同的并发请求只发出一次API调用，其余请求等待并共享结果。
+存储后端可选进程内LRU（默认）或Redis（多个引擎进程共享）。
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+# INFO：设置环境变量 SEARCH_CACHE_ENABLED=false 关闭搜索缓存
+SEARCH_CACHE_ENABLED = _env_flag("SEARCH_CACHE_ENABLED", True)
+
+# 存储后端：memory / redis
+SEARCH_CACHE_BACKEND = os.getenv("SEARCH_CACHE_BACKEND", "memory").strip().lower()
+
+# Redis 连接地址（SEARCH_CACHE_BACKEND=redis 时使用）
+SEARCH_CACHE_REDIS_URL = os.getenv("SEARCH_CACHE_REDIS_URL", "redis://127.0.0.1:6379/0")
+
+# 内存LRU最大条目数
+SEARCH_CACHE_MEMORY_SIZE = int(os.getenv("SEARCH_CACHE_MEMORY_SIZE", "1024"))
+
+# 各类搜索的缓存有效期（秒）
+SEARCH_CACHE_TTLS = {
+    # 最近24小时：结果变化快
+    "recent": float(os.getenv("SEARCH_CACHE_TTL_RECENT", "600")),
+    # 不限时间或最近一周
+    "default": float(os.getenv("SEARCH_CACHE_TTL_DEFAULT", "3600")),
+    # 指定历史日期范围：结果基本不再变化
+    "dated": float(os.getenv("SEARCH_CACHE_TTL_DATED", "86400")),
+}
+
+
+def normalize_query(query: Any) -> str:
+    """规范化查询文本：去除首尾空白、合并连续空白、统一小写"""
+    return re.sub(r"\s+", " ", str(query or "")).strip().lower()
+
+
+class MemoryCacheBackend:
+    """进程内缓存后端（带TTL的有界LRU，线程安全）"""
+
+    name = "memory"
+    blocking = False
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max(1, int(max_entries))
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if now >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class RedisCacheBackend:
+    """Redis缓存后端，多个引擎进程可共享同一份缓存"""
+
+    name = "redis"
+    # 网络IO，在 event loop 中需放到线程里执行
+    blocking = True
+
+    def __init__(self, url: str, prefix: str = "bettafish:search:"):
+        import redis  # 仅在选择Redis后端时才需要
+
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url, socket_timeout=2, socket_connect_timeout=2)
+        self._client.ping()
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._client.get(self.prefix + key)
+        return value.decode("utf-8") if value is not None else None
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self._client.set(self.prefix + key, value, ex=max(1, int(ttl)))
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(match=self.prefix + "*"):
+            self._client.delete(key)
+
+    def size(self) -> int:
+        return sum(1 for _ in self._client.scan_iter(match=self.prefix + "*"))
+
+
+class SearchResponseCache:
+    """
+    搜索响应缓存，负责键生成、TTL选择、并发请求合并与命中统计
+    缓存值为JSON字符串，由调用方提供序列化/反序列化函数
+    """
+
+    def __init__(self, backend, ttls: Optional[Dict[str, float]] = None):
+        """
+        初始化缓存
+
+        Args:
+            backend: 存储后端（MemoryCacheBackend / RedisCacheBackend）
+            ttls: 各类搜索的有效期（秒），键为 recent / default / dated
+        """
+        self.backend = backend
+        self.ttls = dict(SEARCH_CACHE_TTLS if ttls is None else ttls)
+        self._inflight: Dict[Tuple[int, str], "asyncio.Future"] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.stores = 0
+        self.backend_errors = 0
+
+    @staticmethod
+    def make_key(namespace: str, params: Dict[str, Any]) -> str:
+        """根据工具命名空间、规范化查询和其余参数生成缓存键"""
+        normalized = {k: v for k, v in params.items() if v is not None}
+        if "query" in normalized:
+            normalized["query"] = normalize_query(normalized["query"])
+        payload = json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str)
+        return f"{namespace}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        kind: str,
+        fetch: Callable[[], Awaitable[Any]],
+        encode: Callable[[Any], Dict[str, Any]],
+        decode: Callable[[Dict[str, Any]], Any],
+        cacheable: Callable[[Any], bool] = bool
+    ) -> Any:
+        """
+        读取缓存，未命中时调用 fetch 并写入缓存；相同键的并发调用共享一次 fetch
+
+        Args:
+            key: 缓存键
+            kind: 搜索类别（recent / default / dated），决定TTL
+            fetch: 实际请求API的协程函数
+            encode: 响应对象 -> 可JSON序列化的字典
+            decode: 字典 -> 响应对象
+            cacheable: 判断响应是否值得缓存（失败或空结果不缓存）
+
+        Returns:
+            响应对象
+        """
+        cached = await self._run_backend(self._backend_get, key)
+        if cached is not None:
+            try:
+                response = decode(json.loads(cached))
+                with self._lock:
+                    self.hits += 1
+                return response
+            except (ValueError, TypeError, KeyError) as e:
+                logger.warning(f"搜索缓存条目无法解析，重新请求: {e}")
+
+        # 进行中的请求按 event loop 区分，Future 只能在创建它的 loop 上等待
+        loop = asyncio.get_running_loop()
+        inflight_key = (id(loop), key)
+        with self._lock:
+            future = self._inflight.get(inflight_key)
+            leader = future is None
+            if leader:
+                future = loop.create_future()
+                self._inflight[inflight_key] = future
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            # 同一请求已在进行中：等待其结果（异常同样传递给等待方）
+            return await asyncio.shield(future)
+
+        try:
+            response = await fetch()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # 没有等待方时避免 "exception was never retrieved" 警告
+            future.exception()
+            raise
+        else:
+            future.set_result(response)
+            if cacheable(response):
+                try:
+                    value = json.dumps(encode(response), ensure_ascii=False)
+                except (TypeError, ValueError) as e:
+                    logger.warning(f"搜索响应无法序列化，跳过缓存: {e}")
+                else:
+                    await self._run_backend(self._backend_set, key, value, self.ttl_for(kind))
+            return response
+        finally:
+            with self._lock:
+                self._inflight.pop(inflight_key, None)
+
+    def ttl_for(self, kind: str) -> float:
+        """获取某类搜索的TTL"""
+        return self.ttls.get(kind, self.ttls.get("default", 3600))
+
+    async def _run_backend(self, func: Callable, *args) -> Any:
+        if self.backend.blocking:
+            return await asyncio.to_thread(func, *args)
+        return func(*args)
+
+    def _backend_get(self, key: str) -> Optional[str]:
+        try:
+            return self.backend.get(key)
+        except Exception as e:
+            with self._lock:
+                self.backend_errors += 1
+            logger.warning(f"读取搜索缓存失败: {e}")
+            return None
+
+    def _backend_set(self, key: str, value: str, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        try:
+            self.backend.set(key, value, ttl)
+            with self._lock:
+                self.stores += 1
+        except Exception as e:
+            with self._lock:
+                self.backend_errors += 1
+            logger.warning(f"写入搜索缓存失败: {e}")
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self.backend.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取命中统计"""
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "backend": self.backend.name,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "stores": self.stores,
+                "backend_errors": self.backend_errors,
+                "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            }
+
+
+_search_cache: Optional[SearchResponseCache] = None
+_search_cache_lock = threading.Lock()
+
+
+def _create_backend():
+    if SEARCH_CACHE_BACKEND == "redis":
+        try:
+            return RedisCacheBackend(SEARCH_CACHE_REDIS_URL)
+        except Exception as e:
+            logger.warning(f"Redis搜索缓存不可用，改用进程内缓存: {e}")
+    return MemoryCacheBackend(SEARCH_CACHE_MEMORY_SIZE)
+
+
+def get_search_cache() -> Optional[SearchResponseCache]:
+    """获取进程内共享的搜索响应缓存，未开启时返回None"""
+    global _search_cache
+    if not SEARCH_CACHE_ENABLED:
+        return None
+    if _search_cache is None:
+        with _search_cache_lock:
+            if _search_cache is None:
+                _search_cache = SearchResponseCache(_create_backend())
+                logger.info(
+                    f"搜索响应缓存已开启（后端 {_search_cache.backend.name}，"
+                    f"TTL: {', '.join(f'{k}={v:.0f}秒' for k, v in _search_cache.ttls.items())}）"
+                )
+    return _search_cache
@@ -0,0 +1,335 @@
+"""
+百果园舆情数据访问模块
+- 进程内按数据库路径缓存一个WAL模式连接，Streamlit每次rerun不再重新打开数据库
+- 为审核界面的筛选条件建立复合索引：按时间范围的统计走覆盖索引，列表按(筛选列, crawl_time)有序读取
+- 统计概览用一条 SUM(CASE ...) 查询一次扫描得到全部计数
+- 列表使用 (crawl_time, id) 键集分页，翻页代价与页码无关
+- 统计和总数按 PRAGMA data_version + 本连接的写入次数缓存，数据没有变化时rerun直接命中
+- classification_cache 表按内容哈希保存AI分类结果，重复爬到的帖子不再重新分类
+"""
+
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from loguru import logger
+
+# 数据库路径
+SENTIMENT_DB_PATH = os.getenv("BAIGUOYUAN_DB_PATH", "baiguoyuan_sentiment.db")
+
+# 统计/总数结果缓存的最大条目数
+SENTIMENT_STATS_CACHE_SIZE = int(os.getenv("SENTIMENT_STATS_CACHE_SIZE", "256"))
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS sentiment_data (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        platform TEXT NOT NULL,
+        keyword TEXT NOT NULL,
+        title TEXT NOT NULL,
+        content TEXT NOT NULL,
+        url TEXT,
+        author TEXT,
+        publish_time TEXT,
+        crawl_time TEXT NOT NULL,
+        hot_score INTEGER DEFAULT 0,
+        sentiment TEXT,
+        sentiment_score REAL,
+        category TEXT,
+        status TEXT DEFAULT 'unprocessed',
+        processed_time TEXT,
+        notes TEXT
+    )
+"""
+
+# 索引末尾隐含rowid(id)，因此 ORDER BY crawl_time DESC, id DESC 可以直接按索引顺序读取
+INDEXES = (
+    # 统计概览：按时间范围扫描，status/sentiment/category 从索引中读取，不回表
+    "CREATE INDEX IF NOT EXISTS idx_sentiment_data_crawl_stats ON sentiment_data (crawl_time, status, sentiment, category)",
+    "CREATE INDEX IF NOT EXISTS idx_sentiment_data_status_crawl ON sentiment_data (status, crawl_time)",
+    "CREATE INDEX IF NOT EXISTS idx_sentiment_data_platform_crawl ON sentiment_data (platform, status, crawl_time)",
+    "CREATE INDEX IF NOT EXISTS idx_sentiment_data_category_crawl ON sentiment_data (category, status, crawl_time)",
+    # 待分类条目（部分索引，只包含 sentiment 为空的行）
+    "CREATE INDEX IF NOT EXISTS idx_sentiment_data_unclassified ON sentiment_data (id) WHERE sentiment IS NULL",
+)
+
+CLASSIFICATION_CACHE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS classification_cache (
+        content_hash TEXT PRIMARY KEY,
+        sentiment TEXT NOT NULL,
+        sentiment_score REAL NOT NULL,
+        category TEXT NOT NULL,
+        classifier TEXT,
+        created_at TEXT NOT NULL
+    ) WITHOUT ROWID
+"""
+
+# IN (...) 查询每次最多带的参数个数
+SQL_VARIABLE_CHUNK = 500
+
+INSERT_COLUMNS = (
+    "platform", "keyword", "title", "content", "url", "author", "publish_time",
+    "crawl_time", "hot_score", "sentiment", "sentiment_score", "category", "status",
+)
+
+
+@dataclass(frozen=True)
+class ItemFilters:
+    """列表/统计的筛选条件，None 表示不限"""
+    platform: Optional[str] = None
+    category: Optional[str] = None
+    status: Optional[str] = None
+    since: Optional[str] = None   # crawl_time >= since
+    until: Optional[str] = None   # crawl_time < until
+
+    def where(self, include_status: bool = True) -> Tuple[str, List[Any]]:
+        """生成参数化的WHERE子句"""
+        conditions, params = [], []
+        if self.platform is not None:
+            conditions.append("platform = ?")
+            params.append(self.platform)
+        if self.category is not None:
+            conditions.append("category = ?")
+            params.append(self.category)
+        if include_status and self.status is not None:
+            conditions.append("status = ?")
+            params.append(self.status)
+        if self.since is not None:
+            conditions.append("crawl_time >= ?")
+            params.append(self.since)
+        if self.until is not None:
+            conditions.append("crawl_time < ?")
+            params.append(self.until)
+        return (" AND ".join(conditions) if conditions else "1=1"), params
+
+
+class SentimentStore:
+    """sentiment_data 表的数据访问对象（线程安全，共享一个连接）"""
+
+    def __init__(self, db_path: str = SENTIMENT_DB_PATH):
+        self.db_path = str(db_path)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        # 须在切换WAL之前设置：WAL会先写入数据库头，之后新库也不再接受auto_vacuum变更
+        # 仅对新建的数据库生效；已有数据库由 cleanup_old_data.py 首次运行时迁移
+        self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._cache: Dict[Tuple, Tuple[Tuple[int, int], Any]] = {}
+        self.init_schema()
+
+    def init_schema(self) -> None:
+        """建表并补齐索引（已存在时不做任何事）"""
+        with self._lock:
+            self._conn.execute(SCHEMA)
+            self._conn.execute(CLASSIFICATION_CACHE_SCHEMA)
+            for statement in INDEXES:
+                self._conn.execute(statement)
+            self._conn.commit()
+            # 让查询规划器拿到索引的统计信息
+            self._conn.execute("PRAGMA optimize")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _version(self) -> Tuple[int, int]:
+        """数据版本：其他连接提交时 data_version 变化，本连接写入时 total_changes 变化"""
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        return data_version, self._conn.total_changes
+
+    def _cached(self, key: Tuple, compute):
+        with self._lock:
+            version = self._version()
+            hit = self._cache.get(key)
+            if hit is not None and hit[0] == version:
+                return hit[1]
+            value = compute()
+            if len(self._cache) >= SENTIMENT_STATS_CACHE_SIZE:
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[key] = (version, value)
+            return value
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM sentiment_data LIMIT 1").fetchone() is None
+
+    def insert_items(self, items: Iterable[Dict[str, Any]]) -> int:
+        """批量插入舆情条目，返回插入条数"""
+        rows = [tuple(item.get(column) for column in INSERT_COLUMNS) for item in items]
+        if not rows:
+            return 0
+        placeholders = ", ".join("?" for _ in INSERT_COLUMNS)
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    f"INSERT INTO sentiment_data ({', '.join(INSERT_COLUMNS)}) VALUES ({placeholders})",
+                    rows
+                )
+        return len(rows)
+
+    def get_statistics(self, filters: ItemFilters, price_category: str = "价格问题") -> Dict[str, int]:
+        """
+        一次扫描得到统计概览
+
+        total / negative / price 受状态筛选影响，unprocessed 只受时间范围影响（与原界面一致）
+        """
+        time_filters = ItemFilters(since=filters.since, until=filters.until)
+        where, params = time_filters.where()
+        if filters.status is not None:
+            status_match, status_params = "status = ?", [filters.status]
+        else:
+            status_match, status_params = "1", []
+        query = f"""
+            SELECT
+                COALESCE(SUM(CASE WHEN {status_match} THEN 1 ELSE 0 END), 0) AS total,
+                COALESCE(SUM(CASE WHEN status = 'unprocessed' THEN 1 ELSE 0 END), 0) AS unprocessed,
+                COALESCE(SUM(CASE WHEN sentiment = 'negative' AND {status_match} THEN 1 ELSE 0 END), 0) AS negative,
+                COALESCE(SUM(CASE WHEN category = ? AND {status_match} THEN 1 ELSE 0 END), 0) AS price
+            FROM sentiment_data INDEXED BY idx_sentiment_data_crawl_stats
+            WHERE {where}
+        """
+        all_params = status_params * 2 + [price_category] + status_params + params
+
+        def compute():
+            row = self._conn.execute(query, all_params).fetchone()
+            return {key: int(row[key]) for key in ("total", "unprocessed", "negative", "price")}
+
+        return self._cached(("stats", filters.since, filters.until, filters.status, price_category), compute)
+
+    def count_items(self, filters: ItemFilters) -> int:
+        """符合筛选条件的总条数"""
+        where, params = filters.where()
+
+        def compute():
+            return self._conn.execute(f"SELECT COUNT(*) FROM sentiment_data WHERE {where}", params).fetchone()[0]
+
+        return self._cached(("count", filters), compute)
+
+    def list_items(
+        self,
+        filters: ItemFilters,
+        page_size: int = 10,
+        after: Optional[Sequence[Any]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[str, int]]]:
+        """
+        按 crawl_time、id 倒序读取一页
+
+        Args:
+            filters: 筛选条件
+            page_size: 每页条数
+            after: 上一页返回的游标 (crawl_time, id)，None 表示第一页
+
+        Returns:
+            (条目列表, 下一页游标；没有下一页时为None)
+        """
+        where, params = filters.where()
+        if after is not None:
+            # 行值比较可以直接利用 (..., crawl_time, id) 索引定位
+            where += " AND (crawl_time, id) < (?, ?)"
+            params = params + [after[0], int(after[1])]
+        query = f"""
+            SELECT * FROM sentiment_data
+            WHERE {where}
+            ORDER BY crawl_time DESC, id DESC
+            LIMIT ?
+        """
+        with self._lock:
+            rows = self._conn.execute(query, params + [int(page_size) + 1]).fetchall()
+        items = [dict(row) for row in rows[:page_size]]
+        next_cursor = None
+        if len(rows) > page_size and items:
+            next_cursor = (items[-1]["crawl_time"], items[-1]["id"])
+        return items, next_cursor
+
+    def list_unclassified(self, limit: int = 200, after_id: int = 0) -> List[Dict[str, Any]]:
+        """按id顺序读取尚未分类（sentiment为空）的条目"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, title, content FROM sentiment_data INDEXED BY idx_sentiment_data_unclassified "
+                "WHERE sentiment IS NULL AND id > ? ORDER BY id LIMIT ?",
+                (int(after_id), int(limit))
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def update_classifications(self, results: Iterable[Tuple[int, Dict[str, Any]]]) -> int:
+        """写回条目的情感和分类，results 为 (id, 分类结果)"""
+        rows = [
+            (result["sentiment"], result["sentiment_score"], result["category"], int(item_id))
+            for item_id, result in results
+        ]
+        if not rows:
+            return 0
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "UPDATE sentiment_data SET sentiment = ?, sentiment_score = ?, category = ? WHERE id = ?",
+                    rows
+                )
+        return len(rows)
+
+    def get_cached_classifications(self, content_hashes: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """按内容哈希读取已缓存的分类结果"""
+        hashes = list(dict.fromkeys(content_hashes))
+        found: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for start in range(0, len(hashes), SQL_VARIABLE_CHUNK):
+                chunk = hashes[start:start + SQL_VARIABLE_CHUNK]
+                placeholders = ", ".join("?" for _ in chunk)
+                for row in self._conn.execute(
+                    "SELECT content_hash, sentiment, sentiment_score, category FROM classification_cache "
+                    f"WHERE content_hash IN ({placeholders})",
+                    chunk
+                ):
+                    found[row["content_hash"]] = {
+                        "sentiment": row["sentiment"],
+                        "sentiment_score": row["sentiment_score"],
+                        "category": row["category"],
+                    }
+        return found
+
+    def save_classifications(self, results: Dict[str, Dict[str, Any]], classifier: str, created_at: str) -> None:
+        """按内容哈希保存分类结果"""
+        rows = [
+            (content_hash, result["sentiment"], result["sentiment_score"], result["category"], classifier, created_at)
+            for content_hash, result in results.items()
+        ]
+        if not rows:
+            return
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO classification_cache "
+                    "(content_hash, sentiment, sentiment_score, category, classifier, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+
+    def mark_processed(self, item_id: int, processed_time: str) -> None:
+        """标记条目为已处理"""
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE sentiment_data SET status = 'processed', processed_time = ? WHERE id = ?",
+                    (processed_time, int(item_id))
+                )
+
+
+_stores: Dict[str, SentimentStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(db_path: str = SENTIMENT_DB_PATH) -> SentimentStore:
+    """获取数据库路径对应的共享数据访问对象"""
+    key = os.path.abspath(db_path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            logger.info(f"打开舆情数据库(WAL): {key}")
+            store = SentimentStore(db_path)
+            _stores[key] = store
+        return store